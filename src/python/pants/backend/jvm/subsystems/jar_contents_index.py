@@ -0,0 +1,175 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from pants.base.build_environment import get_buildroot
+from pants.subsystem.subsystem import Subsystem
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import safe_concurrent_creation, safe_delete, safe_mkdir, touch
+from pants.util.strutil import ensure_text
+
+
+logger = logging.getLogger(__name__)
+
+
+class JarEntry(namedtuple('JarEntry', ['name', 'size', 'crc'])):
+  """An entry of a jar: its name, uncompressed size and CRC-32."""
+
+
+class JarContentsIndex(Subsystem):
+  """An on-disk index of the entries of jars, shared by the tasks that scan classpaths.
+
+  Third-party jars are large and rarely change, but the tasks that look inside them would otherwise
+  reopen and list each of them on every run. Jars are indexed by their real path, size and
+  modification time, so an index entry is used only as long as the jar it was read from is
+  unchanged.
+
+  Jars under the buildroot or the workdir are built by the repo and change with each rebuild, so
+  they are listed directly rather than indexed on disk. Index entries that have not been used for
+  a while are pruned.
+
+  :API: public
+  """
+  options_scope = 'jar-contents-index'
+
+  @classmethod
+  def register_options(cls, register):
+    super(JarContentsIndex, cls).register_options(register)
+    register('--dir', advanced=True,
+             default=os.path.join(register.bootstrap.pants_bootstrapdir, 'jar_contents_index'),
+             help='The directory to store the index in.')
+    register('--max-unused-days', advanced=True, type=int, default=30,
+             help='Index entries unused for this many days are deleted.')
+
+  # Pruning scans the whole index, so it happens at most once per this many seconds.
+  _PRUNE_INTERVAL_SECS = 24 * 60 * 60
+
+  def __init__(self, *args, **kwargs):
+    super(JarContentsIndex, self).__init__(*args, **kwargs)
+    options = self.get_options()
+    self._dir = options.dir
+    self._max_unused_secs = options.max_unused_days * 24 * 60 * 60
+    self._unindexed_dirs = [os.path.join(os.path.realpath(path), '')
+                            for path in (get_buildroot(), options.pants_workdir)]
+    self._lock = threading.Lock()
+    self._entries_by_key = {}
+    self._pruned = False
+
+  @staticmethod
+  def _key(real_jar):
+    stat = os.stat(real_jar)
+    key = '\0'.join((real_jar, str(stat.st_size), repr(stat.st_mtime)))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+  def _is_indexed(self, real_jar):
+    return not any(real_jar.startswith(path) for path in self._unindexed_dirs)
+
+  def _index_path(self, key):
+    return os.path.join(self._dir, key[:2], '{}.json'.format(key))
+
+  def _load(self, key):
+    path = self._index_path(key)
+    try:
+      with open(path, 'rb') as fp:
+        entries = [JarEntry(*entry) for entry in json.load(fp)['entries']]
+    except (IOError, ValueError, KeyError, TypeError):
+      return None
+    try:
+      # Marks the entry used, so that it isn't pruned.
+      os.utime(path, None)
+    except OSError:
+      pass
+    return entries
+
+  def _store(self, key, jar, entries):
+    self._maybe_prune()
+    data = json.dumps({'jar': jar, 'entries': entries})
+    try:
+      with safe_concurrent_creation(self._index_path(key)) as tmp_path:
+        with open(tmp_path, 'wb') as fp:
+          fp.write(data)
+    except (IOError, OSError) as e:
+      logger.debug('Failed to store the index of {}: {}'.format(jar, e))
+
+  def _maybe_prune(self):
+    with self._lock:
+      if self._pruned:
+        return
+      self._pruned = True
+    now = time.time()
+    marker = os.path.join(self._dir, '.last_pruned')
+    try:
+      if now - os.path.getmtime(marker) < self._PRUNE_INTERVAL_SECS:
+        return
+    except OSError:
+      pass
+    try:
+      safe_mkdir(self._dir)
+      touch(marker)
+    except (IOError, OSError) as e:
+      logger.debug('Failed to prune the jar contents index: {}'.format(e))
+      return
+    for root, _, filenames in os.walk(self._dir):
+      for filename in filenames:
+        if not filename.endswith('.json'):
+          continue
+        path = os.path.join(root, filename)
+        try:
+          if now - os.path.getmtime(path) > self._max_unused_secs:
+            safe_delete(path)
+        except OSError:
+          pass
+
+  @staticmethod
+  def _read(jar):
+    with open_zip(jar, mode='r') as zf:
+      return [JarEntry(ensure_text(info.filename), info.file_size, info.CRC)
+              for info in zf.infolist()]
+
+  def entries(self, jar):
+    """Returns the entries of the given jar, in the order they are stored in it.
+
+    :param string jar: The path of a jar.
+    :rtype: list of :class:`JarEntry`
+    """
+    real_jar = os.path.realpath(jar)
+    key = self._key(real_jar)
+    with self._lock:
+      entries = self._entries_by_key.get(key)
+    if entries is None:
+      indexed = self._is_indexed(real_jar)
+      entries = self._load(key) if indexed else None
+      if entries is None:
+        entries = self._read(jar)
+        if indexed:
+          self._store(key, real_jar, entries)
+      with self._lock:
+        self._entries_by_key[key] = entries
+    return entries
+
+  def names(self, jar):
+    """Returns the names of the entries of the given jar, as `ZipFile.namelist` would.
+
+    :param string jar: The path of a jar.
+    :rtype: list of string
+    """
+    return [entry.name for entry in self.entries(jar)]
+
+  def entries_by_jar(self, jars):
+    """Returns the entries of each of the given jars.
+
+    :param jars: The paths of jars.
+    :returns: An ordered dict from each jar to its list of :class:`JarEntry`.
+    """
+    return OrderedDict((jar, self.entries(jar)) for jar in jars)
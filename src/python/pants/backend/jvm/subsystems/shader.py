@@ -10,6 +10,7 @@ import re
 from collections import namedtuple
 from contextlib import contextmanager
 
+from pants.backend.jvm.subsystems.jar_contents_index import JarContentsIndex
 from pants.backend.jvm.subsystems.jvm_tool_mixin import JvmToolMixin
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.java.distribution.distribution import DistributionLocator
@@ -230,7 +231,8 @@ class Shader(object):
 
     @classmethod
     def subsystem_dependencies(cls):
-      return super(Shader.Factory, cls).subsystem_dependencies() + (DistributionLocator,)
+      return super(Shader.Factory, cls).subsystem_dependencies() + (DistributionLocator,
+                                                                     JarContentsIndex)
 
     @classmethod
     def register_options(cls, register):
@@ -251,7 +253,7 @@ class Shader(object):
         executor = SubprocessExecutor(DistributionLocator.cached())
       classpath = cls.global_instance().tool_classpath_from_products(context.products, 'jarjar',
                                                                      cls.options_scope)
-      return Shader(classpath, executor)
+      return Shader(classpath, executor, jar_index=JarContentsIndex.global_instance())
 
   @classmethod
   def exclude_package(cls, package_name=None, recursive=False):
@@ -321,9 +323,9 @@ class Shader(object):
     return cls._iter_packages(paths)
 
   @classmethod
-  def _iter_jar_packages(cls, path):
+  def _iter_jar_packages(cls, path, jar_index=None):
     paths = set()
-    for pathname in ClasspathUtil.classpath_entries_contents([path]):
+    for pathname in ClasspathUtil.classpath_entries_contents([path], jar_index=jar_index):
       if cls._potential_package_path(pathname):
         package = os.path.dirname(pathname)
         if package:
@@ -333,19 +335,21 @@ class Shader(object):
           paths.add(package)
     return cls._iter_packages(paths)
 
-  def __init__(self, jarjar_classpath, executor):
+  def __init__(self, jarjar_classpath, executor, jar_index=None):
     """Creates a `Shader` the will use the given `jarjar` jar to create shaded jars.
 
     :param jarjar_classpath: The jarjar classpath.
     :type jarjar_classpath: list of string.
     :param executor: A java `Executor` to use to create shaded jar files.
+    :param jar_index: An optional `JarContentsIndex` to list the contents of jars with.
     """
     self._jarjar_classpath = jarjar_classpath
     self._executor = executor
+    self._jar_index = jar_index
 
   @classmethod
   @memoized_method
-  def _system_packages(cls, distribution):
+  def _system_packages(cls, distribution, jar_index=None):
     system_packages = set()
     boot_classpath = distribution.system_properties['sun.boot.class.path']
     for path in boot_classpath.split(os.pathsep):
@@ -353,7 +357,7 @@ class Shader(object):
         if os.path.isdir(path):
           system_packages.update(cls._iter_dir_packages(path))
         else:
-          system_packages.update(cls._iter_jar_packages(path))
+          system_packages.update(cls._iter_jar_packages(path, jar_index=jar_index))
     return sorted(system_packages)
 
   def assemble_binary_rules(self, main, jar, custom_rules=None):
@@ -392,7 +396,8 @@ class Shader(object):
     rules.append(self.exclude_package(main_package))
 
     rules.extend(self.exclude_package(system_pkg)
-                 for system_pkg in self._system_packages(self._executor.distribution))
+                 for system_pkg in self._system_packages(self._executor.distribution,
+                                                         jar_index=self._jar_index))
 
     # Shade everything else.
     #
@@ -407,7 +412,8 @@ class Shader(object):
     #
     # As a result we explicitly shade all the non `main_package` packages in the binary jar instead
     # which does support recursively shading jarjar.
-    rules.extend(self.shade_package(pkg) for pkg in sorted(self._iter_jar_packages(jar))
+    jar_packages = self._iter_jar_packages(jar, jar_index=self._jar_index)
+    rules.extend(self.shade_package(pkg) for pkg in sorted(jar_packages)
                  if pkg != main_package)
 
     return rules
@@ -5,6 +5,7 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+from pants.backend.jvm.subsystems.jar_contents_index import JarContentsIndex
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.task.console_task import ConsoleTask
@@ -13,6 +14,10 @@ from pants.task.console_task import ConsoleTask
 class ClassmapTask(ConsoleTask):
   """Print a mapping from class name to the owning target from target's runtime classpath."""
 
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(ClassmapTask, cls).subsystem_dependencies() + (JarContentsIndex,)
+
   @classmethod
   def register_options(cls, register):
     super(ClassmapTask, cls).register_options(register)
@@ -23,7 +28,8 @@ class ClassmapTask(ConsoleTask):
              help='Outputs all targets in the build graph transitively.')
 
   def classname_for_classfile(self, target, classpath_products):
-    contents = ClasspathUtil.classpath_contents((target,), classpath_products)
+    contents = ClasspathUtil.classpath_contents((target,), classpath_products,
+                                                jar_index=JarContentsIndex.global_instance())
     for f in contents:
       classname = ClasspathUtil.classname_for_rel_classfile(f)
       # None for non `.class` files
@@ -91,9 +91,15 @@ class CodeCoverage(Subsystem):
   class InvalidCoverageEngine(Exception):
     """Indicates an invalid coverage engine type was selected."""
 
+  @staticmethod
+  def is_coverage_enabled(options):
+    """Returns `True` if the given junit options enable code coverage, explicitly or implicitly."""
+    return bool(options.coverage or options.coverage_processor or
+                options.is_flagged('coverage_open'))
+
   def get_coverage_engine(self, task, output_dir, all_targets, execute_java):
     options = task.get_options()
-    if options.coverage or options.coverage_processor or options.is_flagged('coverage_open'):
+    if self.is_coverage_enabled(options):
       settings = CodeCoverageSettings.from_task(task, workdir=output_dir)
       if options.coverage_processor in ('cobertura', None):
         return Cobertura.Factory.global_instance().create(settings, all_targets, execute_java)
@@ -9,6 +9,7 @@ import os
 import re
 from collections import defaultdict
 
+from pants.backend.jvm.subsystems.jar_contents_index import JarContentsIndex
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.base.exceptions import TaskError
@@ -29,6 +30,10 @@ class DuplicateDetector(JvmBinaryTask):
   def _isdir(name):
     return name[-1] == '/'
 
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(DuplicateDetector, cls).subsystem_dependencies() + (JarContentsIndex,)
+
   @classmethod
   def register_options(cls, register):
     super(DuplicateDetector, cls).register_options(register)
@@ -106,11 +111,13 @@ class DuplicateDetector(JvmBinaryTask):
     artifacts_by_file_name = defaultdict(set)
     classpath_products = self.context.products.get_data('runtime_classpath')
 
+    jar_index = JarContentsIndex.global_instance()
+
     # Select classfiles from the classpath - we want all the direct products of internal targets,
     # no external JarLibrary products.
     def record_file_ownership(target):
       entries = ClasspathUtil.internal_classpath([target], classpath_products)
-      for f in ClasspathUtil.classpath_entries_contents(entries):
+      for f in ClasspathUtil.classpath_entries_contents(entries, jar_index=jar_index):
         artifacts_by_file_name[f].add(target.address.reference())
 
     binary_target.walk(record_file_ownership)
@@ -118,10 +125,13 @@ class DuplicateDetector(JvmBinaryTask):
 
   def _get_external_dependencies(self, binary_target):
     artifacts_by_file_name = defaultdict(set)
-    for external_dep, coordinate in self.list_external_jar_dependencies(binary_target):
+    external_deps = self.list_external_jar_dependencies(binary_target)
+    names_by_jar = JarContentsIndex.global_instance().entries_by_jar(
+      external_dep for external_dep, _ in external_deps)
+    for external_dep, coordinate in external_deps:
       self.context.log.debug('  scanning {} from {}'.format(coordinate, external_dep))
-      for qualified_file_name in ClasspathUtil.classpath_entries_contents([external_dep]):
-        artifacts_by_file_name[qualified_file_name].add(coordinate.artifact_filename)
+      for entry in names_by_jar[external_dep]:
+        artifacts_by_file_name[entry.name].add(coordinate.artifact_filename)
     return artifacts_by_file_name
 
   def _is_excluded(self, path):
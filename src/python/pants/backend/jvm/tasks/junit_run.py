@@ -12,6 +12,7 @@ import os
 import shutil
 import sys
 from abc import abstractmethod
+from collections import defaultdict
 from contextlib import contextmanager
 
 from six.moves import range
@@ -30,6 +31,7 @@ from pants.backend.jvm.tasks.reports.junit_html_report import JUnitHtmlReport, N
 from pants.base.build_environment import get_buildroot
 from pants.base.deprecated import deprecated_conditional
 from pants.base.exceptions import TargetDefinitionException, TaskError
+from pants.base.hash_utils import Sharder
 from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.files import Files
 from pants.build_graph.target import Target
@@ -38,12 +40,13 @@ from pants.java.distribution.distribution import DistributionLocator
 from pants.java.executor import SubprocessExecutor
 from pants.java.junit.junit_xml_parser import RegistryOfTests, Test, parse_failed_targets
 from pants.process.lock import OwnerPrintingInterProcessFileLock
+from pants.task.duration_history import balance
 from pants.task.testrunner_task_mixin import PartitionedTestRunnerTaskMixin, TestResult
 from pants.util import desktop
 from pants.util.argutil import ensure_arg, remove_arg
 from pants.util.contextutil import environment_as, temporary_dir
 from pants.util.dirutil import safe_delete, safe_mkdir, safe_mkdir_for, safe_rmtree, safe_walk
-from pants.util.memo import memoized_method
+from pants.util.memo import memoized_method, memoized_property
 from pants.util.meta import AbstractClass
 from pants.util.strutil import pluralize
 
@@ -286,7 +289,8 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     args.append('-parallel-threads')
     args.append(str(options.parallel_threads))
 
-    if options.test_shard:
+    # NB: Tests balanced by their durations are sharded by `_shard_tests` instead.
+    if options.test_shard and not self.shard_durations:
       args.append('-test-shard')
       args.append(options.test_shard)
 
@@ -307,19 +311,21 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
                                                   if isinstance(target, JvmTarget)],
                                                   self._strict_jvm_version)
 
-  def _spawn(self, distribution, executor=None, *args, **kwargs):
+  def _spawn(self, distribution, executor=None, env_vars=None, *args, **kwargs):
     """Returns a processhandler to a process executing java.
 
     :param Executor executor: the java subprocess executor to use. If not specified, construct
       using the distribution.
     :param Distribution distribution: The JDK or JRE installed.
+    :param env_vars: Environment variables to set for the java process.
     :rtype: ProcessHandler
     """
 
     actual_executor = executor or SubprocessExecutor(distribution)
-    return distribution.execute_java_async(*args,
-                                           executor=actual_executor,
-                                           **kwargs)
+    with environment_as(**dict(env_vars or ())):
+      return distribution.execute_java_async(*args,
+                                             executor=actual_executor,
+                                             **kwargs)
 
   def execute_java_for_coverage(self, targets, *args, **kwargs):
     """Execute java for targets directly and don't use the test mixin.
@@ -391,8 +397,40 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
   def _batched(self):
     return self._batch_size != self._BATCH_ALL
 
+  @memoized_property
+  def _class_durations(self):
+    class_durations = defaultdict(float)
+    for key, secs in self.shard_durations.items():
+      classname, _, _ = key.partition('#')
+      class_durations[classname] += secs
+    return class_durations
+
+  def _test_secs(self, test):
+    if test.methodname is None:
+      return self._class_durations.get(test.classname)
+    return self.shard_durations.get(self.test_key(test.classname, test.methodname))
+
+  def _shard_tests(self, test_registry):
+    """Returns a registry of just the tests of this shard when sharding by recorded durations.
+
+    :returns: A 2-tuple of the registry of tests to run and, if sharded by durations, a 2-tuple of
+              the predicted duration of this shard and the predicted makespan of all shards.
+    """
+    shard_spec = self.get_options().test_shard
+    if not shard_spec or not self.shard_durations:
+      return test_registry, None
+    try:
+      sharder = Sharder(shard_spec)
+    except Sharder.InvalidShardSpec as e:
+      raise TaskError(e)
+    shards = balance(test_registry.tests, sharder.nshards, self._test_secs)
+    tests, predicted_secs = shards[sharder.shard]
+    makespan_secs = max(secs for _, secs in shards)
+    registry = RegistryOfTests((test, test_registry.get_owning_target(test)) for test in tests)
+    return registry, (predicted_secs, makespan_secs)
+
   def run_tests(self, fail_fast, test_targets, output_dir, coverage):
-    test_registry = self._collect_test_targets(test_targets)
+    test_registry, prediction = self._shard_tests(self._collect_test_targets(test_targets))
     if test_registry.empty:
       return TestResult.rc(0)
 
@@ -409,6 +447,7 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     classpath_product = self.context.products.get_data('instrument_classpath')
 
     result = 0
+    actual_secs = 0.0
     for batch_id, (properties, batch) in enumerate(self._iter_batches(test_registry)):
       (workdir, platform, target_jvm_options, target_env_vars, concurrency, threads) = properties
 
@@ -454,24 +493,24 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
         with self._chroot(relevant_targets, workdir) as chroot:
           self.context.log.debug('CWD = {}'.format(chroot))
           self.context.log.debug('platform = {}'.format(platform))
-          with environment_as(**dict(target_env_vars)):
-            subprocess_result = self._spawn_and_wait(
-              executor=SubprocessExecutor(distribution),
-              distribution=distribution,
-              classpath=complete_classpath,
-              main=JUnit.RUNNER_MAIN,
-              jvm_options=self.jvm_options + extra_jvm_options + list(target_jvm_options),
-              args=args + batch_tests,
-              workunit_factory=self.context.new_workunit,
-              workunit_name='run',
-              workunit_labels=[WorkUnitLabel.TEST],
-              cwd=chroot,
-              synthetic_jar_dir=batch_output_dir,
-              create_synthetic_jar=self.synthetic_classpath,
-            )
-            self.context.log.debug('JUnit subprocess exited with result ({})'
-                                   .format(subprocess_result))
-            result += abs(subprocess_result)
+          subprocess_result = self._spawn_and_wait(
+            executor=SubprocessExecutor(distribution),
+            distribution=distribution,
+            env_vars=target_env_vars,
+            classpath=complete_classpath,
+            main=JUnit.RUNNER_MAIN,
+            jvm_options=self.jvm_options + extra_jvm_options + list(target_jvm_options),
+            args=args + batch_tests,
+            workunit_factory=self.context.new_workunit,
+            workunit_name='run',
+            workunit_labels=[WorkUnitLabel.TEST],
+            cwd=chroot,
+            synthetic_jar_dir=batch_output_dir,
+            create_synthetic_jar=self.synthetic_classpath,
+          )
+          self.context.log.debug('JUnit subprocess exited with result ({})'
+                                 .format(subprocess_result))
+          result += abs(subprocess_result)
 
         tests_info = self.parse_test_info(batch_output_dir, parse_error_handler, ['classname'])
         for test_name, test_info in tests_info.items():
@@ -479,10 +518,16 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
           test_target = test_registry.get_owning_target(test_item)
           self.report_all_info_for_single_test(self.options_scope, test_target,
                                                test_name, test_info)
+          actual_secs += test_info['time'] or 0.0
 
         if result != 0 and fail_fast:
           break
 
+    if prediction is not None:
+      predicted_secs, makespan_secs = prediction
+      self.report_makespan('Shard {}'.format(self.get_options().test_shard),
+                           predicted_secs, makespan_secs, actual_secs)
+
     if result == 0:
       return TestResult.rc(0)
 
@@ -524,8 +569,14 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
     for properties, tests in sorted(tests_by_properties.items()):
       sorted_tests = sorted(tests)
       stride = min(self._batch_size, len(sorted_tests))
-      for i in range(0, len(sorted_tests), stride):
-        yield properties, sorted_tests[i:i + stride]
+      if self.shard_durations and self._batched:
+        # Fill the same number of batches, but with tests that take about as long in each.
+        nbatches = (len(sorted_tests) + stride - 1) // stride
+        for batch, _ in balance(sorted_tests, nbatches, self._test_secs, capacity=stride):
+          yield properties, sorted(batch)
+      else:
+        for i in range(0, len(sorted_tests), stride):
+          yield properties, sorted_tests[i:i + stride]
 
   def _get_possible_tests_to_run(self):
     buildroot = get_buildroot()
@@ -565,6 +616,11 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
           yield os.path.join(dir_path, filename)
     return list(files_iter())
 
+  @property
+  def supports_concurrent_partitions(self):
+    # Coverage engines instrument and report on classes shared by all partitions.
+    return not CodeCoverage.is_coverage_enabled(self.get_options())
+
   @contextmanager
   def partitions(self, per_target, all_targets, test_targets):
     with self._isolation(per_target, all_targets) as (output_dir, reports, coverage):
@@ -639,7 +695,7 @@ class JUnitRun(PartitionedTestRunnerTaskMixin, JvmToolTaskMixin, JvmTask):
       yield output_dir, reports, coverage
     finally:
       lock_file = '.file_lock'
-      preserve = (run_dir, lock_file)
+      preserve = (run_dir, lock_file, self.DURATIONS_DIR)
       dist_dir = os.path.join(self.get_options().pants_distdir,
                               os.path.relpath(self.workdir, self.get_options().pants_workdir))
 
@@ -0,0 +1,100 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import logging
+import threading
+
+from pants.util.dirutil import safe_concurrent_creation
+
+
+logger = logging.getLogger(__name__)
+
+
+class CompileHistory(object):
+  """Per-target compile durations observed in earlier runs, persisted as a json file.
+
+  Durations are smoothed across runs with an exponentially weighted moving average, so that a
+  single slow or incremental compile doesn't dominate the estimate.
+
+  Each entry also keeps the target's size as estimated by a fallback estimator when it was
+  compiled. Targets without history are estimated by scaling their fallback size with the seconds
+  per unit of size observed over the targets with history, so that both kinds of estimate can be
+  compared when prioritizing work.
+  """
+
+  VERSION = 1
+
+  # The weight of the latest observation in a target's smoothed duration.
+  SMOOTHING = 0.5
+
+  def __init__(self, path):
+    """
+    :param string path: The json file to load history from, and to save it to.
+    """
+    self._path = path
+    self._lock = threading.Lock()
+    self._entries = self._load()
+    self._secs_per_size = self._compute_secs_per_size(self._entries)
+
+  def _load(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        data = json.load(fp)
+    except IOError:
+      return {}
+    except ValueError as e:
+      logger.debug('Ignoring unreadable compile history at {}: {}'.format(self._path, e))
+      return {}
+    if data.get('version') != self.VERSION:
+      return {}
+    return data.get('targets', {})
+
+  @staticmethod
+  def _compute_secs_per_size(entries):
+    total_secs = sum(entry['secs'] for entry in entries.values() if entry['size'] > 0)
+    total_size = sum(entry['size'] for entry in entries.values())
+    return total_secs / total_size if total_size > 0 else None
+
+  def __len__(self):
+    return len(self._entries)
+
+  def estimate(self, key, fallback_size):
+    """Returns the estimated compile time in seconds of the target with the given key.
+
+    :param string key: A key for the target that is stable across runs, such as its address spec.
+    :param fallback_size: The target's size according to the fallback estimator.
+    """
+    with self._lock:
+      entry = self._entries.get(key)
+    if entry is not None:
+      return entry['secs']
+    if self._secs_per_size is None:
+      # Without any history all targets fall back, so their sizes remain comparable.
+      return fallback_size
+    return fallback_size * self._secs_per_size
+
+  def record(self, key, secs, fallback_size):
+    """Records a compile of the target with the given key.
+
+    :param string key: A key for the target that is stable across runs, such as its address spec.
+    :param float secs: How long the compile took.
+    :param fallback_size: The target's size according to the fallback estimator.
+    """
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None:
+        secs = self.SMOOTHING * secs + (1 - self.SMOOTHING) * entry['secs']
+      self._entries[key] = {'secs': secs, 'size': fallback_size}
+
+  def save(self):
+    """Writes the history back to its file, atomically."""
+    with self._lock:
+      data = json.dumps({'version': self.VERSION, 'targets': self._entries}, sort_keys=True)
+    with safe_concurrent_creation(self._path) as tmp_path:
+      with open(tmp_path, 'wb') as fp:
+        fp.write(data)
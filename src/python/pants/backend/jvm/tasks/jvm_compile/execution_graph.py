@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import Queue as queue
 import threading
+import time
 import traceback
 from collections import defaultdict, deque
 from heapq import heappop, heappush
@@ -176,6 +177,7 @@ class ExecutionGraph(object):
       raise NoRootJobError()
 
     self._job_priority = self._compute_job_priorities(job_list)
+    self._job_durations = {}
 
   def format_dependee_graph(self):
     return "\n".join([
@@ -202,14 +204,19 @@ class ExecutionGraph(object):
     """Walks the dependency graph breadth-first, starting from the most dependent tasks,
      and computes the job priority as the sum of the jobs sizes along the critical path."""
 
-    job_size = {job.key: job.size for job in job_list}
+    return self._compute_path_weights({job.key: job.size for job in job_list})
+
+  def _compute_path_weights(self, job_size):
+    """Computes, for each job, the heaviest sum of job sizes along a path from it to a job with no
+    dependees."""
+
     job_priority = defaultdict(int)
 
     bfs_queue = deque()
-    for job in job_list:
-      if len(self._dependees[job.key]) == 0:
-        job_priority[job.key] = job_size[job.key]
-        bfs_queue.append(job.key)
+    for job_key in self._job_keys_as_scheduled:
+      if len(self._dependees[job_key]) == 0:
+        job_priority[job_key] = job_size.get(job_key, 0)
+        bfs_queue.append(job_key)
 
     satisfied_dependees_count = defaultdict(int)
     while len(bfs_queue) > 0:
@@ -217,18 +224,55 @@ class ExecutionGraph(object):
       for dependency_key in self._dependencies[job_key]:
         job_priority[dependency_key] = \
           max(job_priority[dependency_key],
-              job_size[dependency_key] + job_priority[job_key])
+              job_size.get(dependency_key, 0) + job_priority[job_key])
         satisfied_dependees_count[dependency_key] += 1
         if satisfied_dependees_count[dependency_key] == len(self._dependees[dependency_key]):
           bfs_queue.append(dependency_key)
 
     return job_priority
 
-  def execute(self, pool, log):
+  def _critical_path(self, job_size):
+    path_weight = self._compute_path_weights(job_size)
+    # The heaviest path always starts from a job with no dependencies, and continues through the
+    # dependee with the heaviest remaining path.
+    job_key = max(self._job_keys_with_no_dependencies, key=lambda k: path_weight[k])
+    total = path_weight[job_key]
+    path = [job_key]
+    while self._dependees[job_key]:
+      job_key = max(self._dependees[job_key], key=lambda k: path_weight[k])
+      path.append(job_key)
+    return path, total
+
+  def predicted_critical_path(self):
+    """Returns the critical path of the graph according to the estimated job sizes.
+
+    :returns: A tuple of the list of job keys along the path, and the sum of their sizes.
+    """
+    return self._critical_path({key: job.size for key, job in self._jobs.items()})
+
+  def realized_critical_path(self):
+    """Returns the critical path of the graph according to the durations of executed jobs.
+
+    Jobs that did not run, because they were canceled or because the graph was not executed yet,
+    count as taking no time.
+
+    :returns: A tuple of the list of job keys along the path, and the sum of their durations in
+              seconds.
+    """
+    return self._critical_path(self.job_durations)
+
+  @property
+  def job_durations(self):
+    """A dict from job key to the time in seconds spent running that job, for executed jobs."""
+    return dict(self._job_durations)
+
+  def execute(self, pool, log, admission=None):
     """Runs scheduled work, ensuring all dependencies for each element are done before execution.
 
     :param pool: A WorkerPool to run jobs on
     :param log: logger for logging debug information and progress
+    :param admission: An optional object whose `workers(jobs_in_flight)` method further limits the
+                      number of jobs to run concurrently, below the number of workers of the pool
 
     submits all the work without any dependencies to the worker pool
     when a unit of work finishes,
@@ -259,17 +303,24 @@ class ExecutionGraph(object):
         # minus because jobs with larger priority should go first
         heappush(heap, (-self._job_priority[job_key], job_key))
 
+    def max_jobs_in_flight():
+      if admission is None:
+        return pool.num_workers
+      return min(pool.num_workers, admission.workers(jobs_in_flight.get()))
+
     def try_to_submit_jobs_from_heap():
       def worker(worker_key, work):
+        start = time.time()
         try:
           work()
           result = (worker_key, SUCCESSFUL, None)
         except Exception as e:
           result = (worker_key, FAILED, e)
+        self._job_durations[worker_key] = time.time() - start
         finished_queue.put(result)
         jobs_in_flight.decrement()
 
-      while len(heap) > 0 and jobs_in_flight.get() < pool.num_workers:
+      while len(heap) > 0 and jobs_in_flight.get() < max_jobs_in_flight():
         priority, job_key = heappop(heap)
         jobs_in_flight.increment()
         status_table.mark_queued(job_key)
@@ -13,6 +13,7 @@ from multiprocessing import cpu_count
 
 from twitter.common.collections import OrderedSet
 
+from pants.backend.jvm.subsystems.jar_contents_index import JarContentsIndex
 from pants.backend.jvm.subsystems.java import Java
 from pants.backend.jvm.subsystems.jvm_platform import JvmPlatform
 from pants.backend.jvm.subsystems.scala_platform import ScalaPlatform
@@ -24,10 +25,13 @@ from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.backend.jvm.tasks.jvm_compile.class_not_found_error_patterns import \
   CLASS_NOT_FOUND_ERROR_PATTERNS
 from pants.backend.jvm.tasks.jvm_compile.compile_context import CompileContext, DependencyContext
+from pants.backend.jvm.tasks.jvm_compile.compile_history import CompileHistory
 from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
                                                                  Job)
 from pants.backend.jvm.tasks.jvm_compile.missing_dependency_finder import (CompileErrorExtractor,
                                                                            MissingDependencyFinder)
+from pants.backend.jvm.tasks.jvm_compile.worker_admission import (AdaptiveWorkerAdmission,
+                                                                  parse_max_heap_bytes)
 from pants.backend.jvm.tasks.jvm_dependency_analyzer import JvmDependencyAnalyzer
 from pants.backend.jvm.tasks.nailgun_task import NailgunTaskBase
 from pants.base.build_environment import get_buildroot
@@ -162,12 +166,37 @@ class JvmCompile(NailgunTaskBase):
                   'compiling with {task}. Defaults to the '
                   'current machine\'s CPU count.'.format(task=cls._name))
 
+    register('--adaptive-worker-count', advanced=True, type=bool,
+             help='Scale the number of concurrent workers, up to --worker-count, to the free '
+                  'memory and the load of the machine.')
+
+    register('--worker-memory-mb', advanced=True, type=int, default=None,
+             help='The estimated peak memory use of each concurrent worker, in megabytes, when '
+                  '--adaptive-worker-count. Defaults to the maximum heap size in --jvm-options, '
+                  'or else 1024.')
+
+    register('--reserved-memory-mb', advanced=True, type=int, default=1024,
+             help='Memory to leave free for other processes, in megabytes, when '
+                  '--adaptive-worker-count.')
+
+    register('--max-load-per-core', advanced=True, type=float, default=1.0,
+             help='The load average per core up to which concurrent workers are added, when '
+                  '--adaptive-worker-count.')
+
     register('--size-estimator', advanced=True,
-             choices=list(cls.size_estimators.keys()), default='filesize',
+             choices=list(cls.size_estimators.keys()) + ['history'], default='filesize',
              help='The method of target size estimation. The size estimator estimates the size '
                   'of targets in order to build the largest targets first (subject to dependency '
                   'constraints). Choose \'random\' to choose random sizes for each target, which '
-                  'may be useful for distributed builds.')
+                  'may be useful for distributed builds. Choose \'history\' to estimate targets '
+                  'by how long they took to compile in previous runs, falling back to '
+                  '--history-fallback-size-estimator for targets that have not been compiled yet.')
+
+    register('--history-fallback-size-estimator', advanced=True,
+             choices=list(cls.size_estimators.keys()), default='filesize',
+             help='The method of target size estimation for targets without a compile history, '
+                  'when --size-estimator=history. Their sizes are scaled to compile times by the '
+                  'compile times per unit of size of the targets with a history.')
 
     register('--capture-log', advanced=True, type=bool,
              fingerprint=True,
@@ -227,7 +256,8 @@ class JvmCompile(NailgunTaskBase):
 
   @classmethod
   def subsystem_dependencies(cls):
-    return super(JvmCompile, cls).subsystem_dependencies() + (Java, JvmPlatform, ScalaPlatform)
+    return super(JvmCompile, cls).subsystem_dependencies() + (JarContentsIndex, Java, JvmPlatform,
+                                                              ScalaPlatform)
 
   @classmethod
   def name(cls):
@@ -370,7 +400,16 @@ class JvmCompile(NailgunTaskBase):
       worker_count = 1
     self._worker_count = worker_count
 
-    self._size_estimator = self.size_estimator_by_name(self.get_options().size_estimator)
+    size_estimator = self.get_options().size_estimator
+    self._history_fallback_size_estimator = self.size_estimator_by_name(
+      self.get_options().history_fallback_size_estimator)
+    if size_estimator == 'history':
+      self._size_estimator = None
+    else:
+      self._size_estimator = self.size_estimator_by_name(size_estimator)
+    # Compile times are always recorded, so that they are available once the history estimator is
+    # chosen.
+    self._compile_history = CompileHistory(os.path.join(self.workdir, 'compile_history.json'))
 
     self._analysis_tools = self.create_analysis_tools()
 
@@ -386,7 +425,8 @@ class JvmCompile(NailgunTaskBase):
   def _dep_analyzer(self):
     return JvmDependencyAnalyzer(get_buildroot(),
                                  self.context.products.get_data('runtime_classpath'),
-                                 self.context.products.get_data('product_deps_by_src'))
+                                 self.context.products.get_data('product_deps_by_src'),
+                                 jar_index=JarContentsIndex.global_instance())
 
   @memoized_property
   def _missing_deps_finder(self):
@@ -548,9 +588,54 @@ class JvmCompile(NailgunTaskBase):
 
     exec_graph = ExecutionGraph(jobs)
     try:
-      exec_graph.execute(worker_pool, self.context.log)
+      exec_graph.execute(worker_pool, self.context.log, admission=self._create_worker_admission())
     except ExecutionFailure as e:
       raise TaskError("Compilation failure: {}".format(e))
+    finally:
+      self._compile_history.save()
+    self._report_critical_path(exec_graph)
+
+  def _create_worker_admission(self):
+    if not self.get_options().adaptive_worker_count:
+      return None
+
+    memory_mb = self.get_options().worker_memory_mb
+    if memory_mb is None:
+      max_heap_bytes = parse_max_heap_bytes(self.get_options().jvm_options)
+      job_memory_bytes = max_heap_bytes if max_heap_bytes is not None else 1024 << 20
+    else:
+      job_memory_bytes = memory_mb << 20
+
+    def on_decision(decision):
+      self.context.log.debug('Admitting up to {workers} concurrent workers, limited by '
+                             '{limited_by}.'.format(**decision))
+      stats = self.context.run_tracker.worker_admission_stats
+      if stats is not None:
+        stats.record_decision(self.options_scope, decision)
+
+    reserved_memory_bytes = self.get_options().reserved_memory_mb << 20
+    return AdaptiveWorkerAdmission(self._worker_count,
+                                   job_memory_bytes,
+                                   reserved_memory_bytes=reserved_memory_bytes,
+                                   max_load_per_core=self.get_options().max_load_per_core,
+                                   on_decision=on_decision)
+
+  def _report_critical_path(self, exec_graph):
+    """Logs at debug how the critical path of the compile jobs compared to the predicted one."""
+    predicted_path, predicted_size = exec_graph.predicted_critical_path()
+    realized_path, realized_secs = exec_graph.realized_critical_path()
+    job_durations = exec_graph.job_durations
+    predicted_secs = sum(job_durations.get(key, 0) for key in predicted_path)
+    shared = len(set(predicted_path) & set(realized_path))
+    self.context.log.debug(
+      'Critical path: {} targets compiled in {:.3f}s. Predicted critical path: {} targets of '
+      'estimated size {:.3f}, compiled in {:.3f}s, {} of them on the critical path.'
+      .format(len(realized_path), realized_secs, len(predicted_path), predicted_size,
+              predicted_secs, shared))
+    self.context.log.debug('Critical path:\n  {}'.format('\n  '.join(
+      '{}: {:.3f}s'.format(key, job_durations.get(key, 0)) for key in realized_path)))
+    self.context.log.debug('Predicted critical path:\n  {}'.format('\n  '.join(
+      '{}: {:.3f}s'.format(key, job_durations.get(key, 0)) for key in predicted_path)))
 
   def _record_compile_classpath(self, classpath, targets, outdir):
     relative_classpaths = [fast_relpath(path, self.get_options().pants_workdir) for path in classpath]
@@ -668,14 +753,15 @@ class JvmCompile(NailgunTaskBase):
           logs.append(outpath)
     return logs
 
-  def check_artifact_cache(self, vts):
+  def check_artifact_cache(self, vts, prefetch=None):
     """Localizes the fetched analysis for targets we found in the cache."""
     def post_process(cached_vts):
       for vt in cached_vts:
         cc = self._compile_context(vt.target, vt.results_dir)
         safe_delete(cc.analysis_file)
         self._analysis_tools.localize(cc.portable_analysis_file, cc.analysis_file)
-    return self.do_check_artifact_cache(vts, post_process_cached_vts=post_process)
+    return self.do_check_artifact_cache(vts, post_process_cached_vts=post_process,
+                                        prefetch=prefetch)
 
   def _create_empty_products(self):
     if self.context.products.is_required_data('classes_by_source'):
@@ -875,7 +961,7 @@ class JvmCompile(NailgunTaskBase):
         return True
       return os.path.exists(ctx.analysis_file)
 
-    def work_for_vts(vts, ctx):
+    def work_for_vts(vts, ctx, fallback_size):
       progress_message = ctx.target.address.spec
 
       # Capture a compilation log if requested.
@@ -928,7 +1014,8 @@ class JvmCompile(NailgunTaskBase):
                                   len(cp_entries),
                                   len(ctx.sources),
                                   timer.elapsed,
-                                  is_incremental)
+                                  is_incremental,
+                                  fallback_size)
         self._analysis_tools.relativize(ctx.analysis_file, ctx.portable_analysis_file)
 
         # Write any additional resources for this target to the target workdir.
@@ -953,23 +1040,33 @@ class JvmCompile(NailgunTaskBase):
       invalid_dependencies = self._collect_invalid_compile_dependencies(compile_target,
                                                                         invalid_target_set)
 
+      fallback_size = self._history_fallback_size_estimator(compile_context.sources)
+      if self._size_estimator is None:
+        size = self._compile_history.estimate(compile_target.address.spec, fallback_size)
+      elif self._size_estimator is self._history_fallback_size_estimator:
+        size = fallback_size
+      else:
+        size = self._size_estimator(compile_context.sources)
+
       jobs.append(Job(self.exec_graph_key_for_target(compile_target),
-                      functools.partial(work_for_vts, ivts, compile_context),
+                      functools.partial(work_for_vts, ivts, compile_context, fallback_size),
                       [self.exec_graph_key_for_target(target) for target in invalid_dependencies],
-                      self._size_estimator(compile_context.sources),
+                      size,
                       # If compilation and analysis work succeeds, validate the vts.
                       # Otherwise, fail it.
                       on_success=ivts.update,
                       on_failure=ivts.force_invalidate))
     return jobs
 
-  def _record_target_stats(self, target, classpath_len, sources_len, compiletime, is_incremental):
+  def _record_target_stats(self, target, classpath_len, sources_len, compiletime, is_incremental,
+                           fallback_size):
     def record(k, v):
       self.context.run_tracker.report_target_info(self.options_scope, target, ['compile', k], v)
     record('time', compiletime)
     record('classpath_len', classpath_len)
     record('sources_len', sources_len)
     record('incremental', is_incremental)
+    self._compile_history.record(target.address.spec, compiletime, fallback_size)
 
   def _collect_invalid_compile_dependencies(self, compile_target, invalid_target_set):
     # Collects all invalid dependencies that are not dependencies of other invalid dependencies
@@ -0,0 +1,112 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import re
+import time
+from multiprocessing import cpu_count
+
+import psutil
+
+
+_MAX_HEAP_RE = re.compile(r'^-Xmx(\d+)([kKmMgGtT]?)$')
+_UNIT_BYTES = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+
+def parse_max_heap_bytes(jvm_options):
+  """Returns the maximum heap size set by the given JVM options in bytes, or None if it isn't set.
+
+  As with the JVM, the last -Xmx option wins.
+  """
+  max_heap_bytes = None
+  for option in jvm_options:
+    match = _MAX_HEAP_RE.match(option)
+    if match:
+      max_heap_bytes = int(match.group(1)) * _UNIT_BYTES[match.group(2).lower()]
+  return max_heap_bytes
+
+
+def available_memory_bytes():
+  return psutil.virtual_memory().available
+
+
+def load_average():
+  """Returns the one minute load average, or None if the platform doesn't provide it."""
+  try:
+    return os.getloadavg()[0]
+  except OSError:
+    return None
+
+
+class AdaptiveWorkerAdmission(object):
+  """Limits the number of jobs an ExecutionGraph runs concurrently by free memory and load.
+
+  The machine is sampled at most once per `sample_interval_secs`, and the limit derived from a
+  sample holds until the next one: the jobs admitted in between are charged their estimated memory
+  against the memory that was free at the time of the sample, since a JVM only grows its heap
+  after starting. Jobs that were already running when the sample was taken are assumed to be
+  accounted for by it.
+
+  Load from other processes, estimated as the load average in excess of the jobs in flight, is
+  subtracted from the number of cores the jobs may use.
+  """
+
+  def __init__(self, max_workers, job_memory_bytes, reserved_memory_bytes=0,
+               max_load_per_core=1.0, sample_interval_secs=2.0, on_decision=None):
+    """
+    :param int max_workers: The upper bound on the number of concurrent jobs.
+    :param int job_memory_bytes: The estimated peak memory use of a single job.
+    :param int reserved_memory_bytes: Memory to leave free for everything else on the machine.
+    :param float max_load_per_core: The load average per core up to which jobs are admitted.
+    :param float sample_interval_secs: The minimum time between samples of the machine.
+    :param on_decision: A function called with a dict describing each change of the limit, and
+                        the measurements it was based on.
+    """
+    self._max_workers = max_workers
+    self._job_memory_bytes = max(job_memory_bytes, 1)
+    self._reserved_memory_bytes = reserved_memory_bytes
+    self._max_load = cpu_count() * max_load_per_core
+    self._sample_interval_secs = sample_interval_secs
+    self._on_decision = on_decision
+    self._start_time = time.time()
+    self._sample_time = None
+    self._limit = None
+
+  def _sample(self, jobs_in_flight):
+    available = available_memory_bytes()
+    load = load_average()
+
+    limits = {'max_workers': self._max_workers}
+    headroom = available - self._reserved_memory_bytes
+    limits['memory'] = jobs_in_flight + headroom // self._job_memory_bytes
+    if load is not None:
+      limits['load'] = int(self._max_load - max(load - jobs_in_flight, 0))
+    limited_by = min(sorted(limits), key=lambda k: limits[k])
+    # Always allow one job, so that the graph makes progress.
+    limit = max(limits[limited_by], 1)
+
+    if limit != self._limit and self._on_decision:
+      self._on_decision({
+        'secs': time.time() - self._start_time,
+        'workers': limit,
+        'limited_by': limited_by,
+        'jobs_in_flight': jobs_in_flight,
+        'available_memory_bytes': available,
+        'load_average': load,
+      })
+    self._limit = limit
+
+  def workers(self, jobs_in_flight):
+    """Returns the number of jobs that may currently run concurrently.
+
+    :param int jobs_in_flight: The number of jobs currently running.
+    """
+    now = time.time()
+    if self._sample_time is None or now - self._sample_time >= self._sample_interval_secs:
+      self._sample_time = now
+      self._sample(jobs_in_flight)
+    return self._limit
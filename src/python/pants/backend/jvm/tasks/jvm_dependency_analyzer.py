@@ -30,10 +30,14 @@ class JvmDependencyAnalyzer(object):
   determining which targets correspond to the actual source dependencies of any given target.
   """
 
-  def __init__(self, buildroot, runtime_classpath, product_deps_by_src):
+  def __init__(self, buildroot, runtime_classpath, product_deps_by_src, jar_index=None):
+    """
+    :param jar_index: An optional `JarContentsIndex` to list the contents of jars with.
+    """
     self.buildroot = buildroot
     self.runtime_classpath = runtime_classpath
     self.product_deps_by_src = product_deps_by_src
+    self.jar_index = jar_index
 
   @memoized_method
   def files_for_target(self, target):
@@ -54,7 +58,8 @@ class JvmDependencyAnalyzer(object):
             yield os.path.join(self.buildroot, src)
 
       # Compute classfile -> target and jar -> target.
-      files = ClasspathUtil.classpath_contents((target,), self.runtime_classpath)
+      files = ClasspathUtil.classpath_contents((target,), self.runtime_classpath,
+                                               jar_index=self.jar_index)
       # And jars; for binary deps, zinc doesn't emit precise deps (yet).
       cp_entries = ClasspathUtil.classpath((target,), self.runtime_classpath)
       jars = [cpe for cpe in cp_entries if ClasspathUtil.is_jar(cpe)]
@@ -97,7 +102,8 @@ class JvmDependencyAnalyzer(object):
     Call at the target level is to memoize efficiently.
     """
     target_classes = set()
-    contents = ClasspathUtil.classpath_contents((target,), self.runtime_classpath)
+    contents = ClasspathUtil.classpath_contents((target,), self.runtime_classpath,
+                                                jar_index=self.jar_index)
     for f in contents:
       classname = ClasspathUtil.classname_for_rel_classfile(f)
       if classname:
@@ -106,12 +112,13 @@ class JvmDependencyAnalyzer(object):
 
   def _jar_classfiles(self, jar_file):
     """Returns an iterator over the classfiles inside jar_file."""
-    for cls in ClasspathUtil.classpath_entries_contents([jar_file]):
+    for cls in ClasspathUtil.classpath_entries_contents([jar_file], jar_index=self.jar_index):
       if cls.endswith(b'.class'):
         yield cls
 
   def count_products(self, target):
-    contents = ClasspathUtil.classpath_contents((target,), self.runtime_classpath)
+    contents = ClasspathUtil.classpath_contents((target,), self.runtime_classpath,
+                                                jar_index=self.jar_index)
     # Generators don't implement len.
     return sum(1 for _ in contents)
 
@@ -10,6 +10,7 @@ from collections import defaultdict
 
 from twitter.common.collections import OrderedSet
 
+from pants.backend.jvm.subsystems.jar_contents_index import JarContentsIndex
 from pants.backend.jvm.targets.scala_library import ScalaLibrary
 from pants.backend.jvm.tasks.jvm_dependency_analyzer import JvmDependencyAnalyzer
 from pants.base.build_environment import get_buildroot
@@ -21,6 +22,10 @@ from pants.task.task import Task
 class JvmDependencyCheck(Task):
   """Checks true dependencies of a JVM target and ensures that they are consistent with BUILD files."""
 
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(JvmDependencyCheck, cls).subsystem_dependencies() + (JarContentsIndex,)
+
   @classmethod
   def register_options(cls, register):
     super(JvmDependencyCheck, cls).register_options(register)
@@ -176,7 +181,8 @@ class JvmDependencyCheck(Task):
     """
     analyzer = JvmDependencyAnalyzer(get_buildroot(),
                                      self.context.products.get_data('runtime_classpath'),
-                                     self.context.products.get_data('product_deps_by_src'))
+                                     self.context.products.get_data('product_deps_by_src'),
+                                     jar_index=JarContentsIndex.global_instance())
     def must_be_explicit_dep(dep):
       # We don't require explicit deps on the java runtime, so we shouldn't consider that
       # a missing dep.
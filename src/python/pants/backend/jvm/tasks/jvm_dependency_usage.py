@@ -10,6 +10,7 @@ import os
 import sys
 from collections import defaultdict, namedtuple
 
+from pants.backend.jvm.subsystems.jar_contents_index import JarContentsIndex
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.backend.jvm.tasks.jvm_dependency_analyzer import JvmDependencyAnalyzer
 from pants.base.build_environment import get_buildroot
@@ -41,6 +42,10 @@ class JvmDependencyUsage(Task):
 
   size_estimators = create_size_estimators()
 
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(JvmDependencyUsage, cls).subsystem_dependencies() + (JarContentsIndex,)
+
   @classmethod
   def register_options(cls, register):
     super(JvmDependencyUsage, cls).register_options(register)
@@ -157,7 +162,8 @@ class JvmDependencyUsage(Task):
     `classes_by_source`, `runtime_classpath`, `product_deps_by_src` parameters and
     stores the result to the build cache.
     """
-    analyzer = JvmDependencyAnalyzer(get_buildroot(), runtime_classpath, product_deps_by_src)
+    analyzer = JvmDependencyAnalyzer(get_buildroot(), runtime_classpath, product_deps_by_src,
+                                     jar_index=JarContentsIndex.global_instance())
     targets = self.context.targets()
     targets_by_file = analyzer.targets_by_file(targets)
     transitive_deps_by_target = analyzer.compute_transitive_deps_by_target(targets)
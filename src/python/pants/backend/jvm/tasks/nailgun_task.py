@@ -14,7 +14,9 @@ from pants.java import util
 from pants.java.executor import SubprocessExecutor
 from pants.java.jar.jar_dependency import JarDependency
 from pants.java.nailgun_executor import NailgunExecutor, NailgunProcessGroup
+from pants.java.nailgun_pool import NailgunPool
 from pants.task.task import Task, TaskBase
+from pants.util.memo import memoized_property
 
 
 class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
@@ -29,6 +31,14 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
              help='Timeout (secs) for nailgun startup.')
     register('--nailgun-connect-attempts', advanced=True, default=5, type=int,
              help='Max attempts for nailgun connects.')
+    register('--nailgun-pool-size', advanced=True, default=1, type=int,
+             help='The number of nailgun servers to keep warm for this task. With more than one, '
+                  'servers are kept for each distinct classpath and set of JVM options rather '
+                  'than restarted when they change, and concurrent invocations each use a server '
+                  'of their own.')
+    register('--nailgun-pool-memory-budget-mb', advanced=True, type=int, default=None,
+             help='The resident memory of this task\'s pooled nailgun servers, in megabytes, above '
+                  'which idle servers are terminated, least recently used first.')
     cls.register_jvm_tool(register,
                           'nailgun-server',
                           classpath=[
@@ -69,18 +79,45 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     else:
       return SubprocessExecutor(self.dist)
 
+  @memoized_property
+  def _nailgun_pool(self):
+    def on_checkout(hit, evictions):
+      stats = self.context.run_tracker.nailgun_pool_stats
+      if stats is not None:
+        stats.record_checkout(self._identity, hit, evictions)
+
+    memory_budget_mb = self.get_options().nailgun_pool_memory_budget_mb
+    memory_budget_bytes = None if memory_budget_mb is None else memory_budget_mb << 20
+    return NailgunPool(self._identity,
+                       self._executor_workdir,
+                       os.pathsep.join(self.tool_classpath('nailgun-server')),
+                       self.dist,
+                       self.get_options().nailgun_pool_size,
+                       memory_budget_bytes=memory_budget_bytes,
+                       connect_timeout=self.get_options().nailgun_timeout_seconds,
+                       connect_attempts=self.get_options().nailgun_connect_attempts,
+                       on_checkout=on_checkout)
+
   def runjava(self, classpath, main, jvm_options=None, args=None, workunit_name=None,
               workunit_labels=None, workunit_log_config=None):
     """Runs the java main using the given classpath and args.
 
     If --no-use-nailgun is specified then the java main is run in a freshly spawned subprocess,
     otherwise a persistent nailgun server dedicated to this Task subclass is used to speed up
-    amortized run times.
+    amortized run times. With a --nailgun-pool-size above one, the server is checked out from a
+    pool of them for the duration of the run.
 
     :API: public
     """
-    executor = self.create_java_executor()
-
+    if self.get_options().use_nailgun and self.get_options().nailgun_pool_size > 1:
+      with self._nailgun_pool.checkout(classpath, jvm_options) as executor:
+        return self._runjava(executor, classpath, main, jvm_options, args, workunit_name,
+                             workunit_labels, workunit_log_config)
+    return self._runjava(self.create_java_executor(), classpath, main, jvm_options, args,
+                         workunit_name, workunit_labels, workunit_log_config)
+
+  def _runjava(self, executor, classpath, main, jvm_options, args, workunit_name, workunit_labels,
+               workunit_log_config):
     # Creating synthetic jar to work around system arg length limit is not necessary
     # when `NailgunExecutor` is used because args are passed through socket, therefore turning off
     # creating synthetic jar if nailgun is used.
@@ -0,0 +1,118 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import copy
+import errno
+import os
+import shutil
+import stat
+
+from pex.pex_builder import PEXBuilder
+from pex.util import CacheHelper
+
+from pants.base.hash_utils import hash_file
+from pants.subsystem.subsystem import Subsystem
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_walk
+
+
+class PexChrootStore(Subsystem):
+  """A content-addressed store of the files and distributions that python pexes are built from.
+
+  Pexes built for different sets of targets mostly share the same sources and distributions. With
+  each stored once, a pex is assembled by hard-linking its contents from the store rather than by
+  copying them. Stored files are made read-only, since every pex linked to them shares them.
+
+  :API: public
+  """
+  options_scope = 'pex-chroot-store'
+
+  @classmethod
+  def register_options(cls, register):
+    super(PexChrootStore, cls).register_options(register)
+    register('--dir', advanced=True,
+             default=os.path.join(register.bootstrap.pants_bootstrapdir, 'pex_chroot_store'),
+             help='The directory to store the contents of pexes in.')
+
+  def __init__(self, *args, **kwargs):
+    super(PexChrootStore, self).__init__(*args, **kwargs)
+    self._dir = self.get_options().dir
+
+  def _path(self, kind, key):
+    return os.path.join(self._dir, kind, key[:2], key)
+
+  @staticmethod
+  def _make_read_only(path):
+    os.chmod(path, stat.S_IMODE(os.stat(path).st_mode) & ~(stat.S_IWUSR | stat.S_IWGRP |
+                                                            stat.S_IWOTH))
+
+  @staticmethod
+  def _publish(tmp_path, stored_path):
+    """Moves the file or directory at `tmp_path` to `stored_path`, unless it is already stored.
+
+    A stored path is never replaced, since pexes may be linked to its contents: if another process
+    stored it first, `tmp_path` is left for the caller to discard.
+    """
+    safe_mkdir_for(stored_path)
+    try:
+      if os.path.isdir(tmp_path):
+        os.rename(tmp_path, stored_path)
+      else:
+        # NB: Unlike rename, link does not replace an existing file.
+        os.link(tmp_path, stored_path)
+    except OSError as e:
+      if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+        raise
+
+  def file(self, path):
+    """Returns the path of a stored file with the same contents as the given one.
+
+    :param string path: The path of a file to store.
+    :rtype: string
+    """
+    executable = os.stat(path).st_mode & stat.S_IXUSR
+    key = '{}{}'.format(hash_file(path), '.x' if executable else '')
+    stored_path = self._path('files', key)
+    if not os.path.exists(stored_path):
+      safe_mkdir(self._dir)
+      with temporary_dir(root_dir=self._dir) as scratch:
+        tmp_path = os.path.join(scratch, key)
+        shutil.copy(path, tmp_path)
+        self._make_read_only(tmp_path)
+        self._publish(tmp_path, stored_path)
+    return stored_path
+
+  def distribution(self, dist):
+    """Returns a distribution located at the stored, unpacked contents of the given one.
+
+    The contents are laid out as `PEXBuilder.add_distribution` lays out a distribution in a pex,
+    so that adding the stored distribution to a pex only links its files.
+
+    :param dist: A resolved distribution.
+    :type dist: :class:`pkg_resources.Distribution`
+    :rtype: :class:`pkg_resources.Distribution`
+    """
+    if os.path.isdir(dist.location):
+      key = CacheHelper.dir_hash(dist.location)
+    else:
+      key = hash_file(dist.location)
+    stored_path = self._path('distributions', key)
+    if not os.path.isdir(stored_path):
+      dist_name = os.path.basename(dist.location)
+      # NB: Unpack the distribution in the store, so it can be renamed into place.
+      safe_mkdir(self._dir)
+      with temporary_dir(root_dir=self._dir) as scratch:
+        builder = PEXBuilder(path=scratch, copy=True)
+        builder.add_distribution(dist, dist_name=dist_name)
+        tmp_path = os.path.join(scratch, builder.info.internal_cache, dist_name)
+        for root, _, files in safe_walk(tmp_path):
+          for f in files:
+            self._make_read_only(os.path.join(root, f))
+        self._publish(tmp_path, stored_path)
+    stored_dist = copy.copy(dist)
+    stored_dist.location = stored_path
+    return stored_dist
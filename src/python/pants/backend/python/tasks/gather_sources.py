@@ -12,6 +12,7 @@ from pex.pex import PEX
 from pex.pex_builder import PEXBuilder
 from twitter.common.collections import OrderedSet
 
+from pants.backend.python.subsystems.pex_chroot_store import PexChrootStore
 from pants.backend.python.tasks.pex_build_util import (dump_sources, has_python_sources,
                                                        has_resources, is_python_target)
 from pants.invalidation.cache_manager import VersionedTargetSet
@@ -24,7 +25,8 @@ class GatherSources(Task):
 
   Creates an (unzipped) PEX on disk containing the local Python sources. This PEX can be merged
   with a requirements PEX to create a unified Python environment for running the relevant python
-  code.
+  code. The sources are hard-linked from a content-addressed store, so PEXes of overlapping sets
+  of targets share them.
   """
 
   PYTHON_SOURCES = 'python_sources'
@@ -33,6 +35,10 @@ class GatherSources(Task):
   def implementation_version(cls):
     return super(GatherSources, cls).implementation_version() + [('GatherSources', 5)]
 
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(GatherSources, cls).subsystem_dependencies() + (PexChrootStore,)
+
   @classmethod
   def product_types(cls):
     return [cls.PYTHON_SOURCES]
@@ -83,7 +89,8 @@ class GatherSources(Task):
     return PEX(source_pex_path, interpreter=interpreter)
 
   def _build_pex(self, interpreter, path, targets):
-    builder = PEXBuilder(path=path, interpreter=interpreter, copy=True)
+    builder = PEXBuilder(path=path, interpreter=interpreter)
+    store = PexChrootStore.global_instance()
     for target in targets:
-      dump_sources(builder, target, self.context.log)
+      dump_sources(builder, target, self.context.log, store=store)
     builder.freeze()
@@ -46,7 +46,7 @@ def has_python_requirements(tgt):
   return isinstance(tgt, PythonRequirementLibrary)
 
 
-def _create_source_dumper(builder, tgt):
+def _create_source_dumper(builder, tgt, store=None):
   if type(tgt) == Files:
     # Loose `Files` as opposed to `Resources` or `PythonTarget`s have no (implied) package structure
     # and so we chroot them relative to the build root so that they can be accessed via the normal
@@ -60,11 +60,20 @@ def _create_source_dumper(builder, tgt):
 
   dump = builder.add_resource if has_resources(tgt) else builder.add_source
   buildroot = get_buildroot()
-  return lambda relpath: dump(os.path.join(buildroot, relpath), chroot_path(relpath))
+  stored_path = store.file if store else lambda path: path
+  return lambda relpath: dump(stored_path(os.path.join(buildroot, relpath)), chroot_path(relpath))
 
 
-def dump_sources(builder, tgt, log):
-  dump_source = _create_source_dumper(builder, tgt)
+def dump_sources(builder, tgt, log, store=None):
+  """Dump the sources of a target into a PEX builder.
+
+  :param builder: Dump the sources into this builder.
+  :param tgt: The target whose sources to dump.
+  :param log: Use this logger.
+  :param store: A :class:`pants.backend.python.subsystems.pex_chroot_store.PexChrootStore` to add
+                the sources from, or `None` to add them from the buildroot.
+  """
+  dump_source = _create_source_dumper(builder, tgt, store)
   log.debug('  Dumping sources: {}'.format(tgt))
   for relpath in tgt.sources_relative_to_buildroot():
     try:
@@ -81,7 +90,7 @@ def dump_sources(builder, tgt, log):
                     'Depend on resources() targets instead.'.format(tgt.address.spec))
 
 
-def dump_requirement_libs(builder, interpreter, req_libs, log, platforms=None):
+def dump_requirement_libs(builder, interpreter, req_libs, log, platforms=None, store=None):
   """Multi-platform dependency resolution for PEX files.
 
   :param builder: Dump the requirements into this builder.
@@ -90,12 +99,14 @@ def dump_requirement_libs(builder, interpreter, req_libs, log, platforms=None):
   :param log: Use this logger.
   :param platforms: A list of :class:`Platform`s to resolve requirements for.
                     Defaults to the platforms specified by PythonSetup.
+  :param store: A :class:`pants.backend.python.subsystems.pex_chroot_store.PexChrootStore` to add
+                the resolved distributions from, or `None` to add them from the resolver cache.
   """
   reqs = [req for req_lib in req_libs for req in req_lib.requirements]
-  dump_requirements(builder, interpreter, reqs, log, platforms)
+  dump_requirements(builder, interpreter, reqs, log, platforms, store)
 
 
-def dump_requirements(builder, interpreter, reqs, log, platforms=None):
+def dump_requirements(builder, interpreter, reqs, log, platforms=None, store=None):
   """Multi-platform dependency resolution for PEX files.
 
   :param builder: Dump the requirements into this builder.
@@ -104,6 +115,8 @@ def dump_requirements(builder, interpreter, reqs, log, platforms=None):
   :param log: Use this logger.
   :param platforms: A list of :class:`Platform`s to resolve requirements for.
                     Defaults to the platforms specified by PythonSetup.
+  :param store: A :class:`pants.backend.python.subsystems.pex_chroot_store.PexChrootStore` to add
+                the resolved distributions from, or `None` to add them from the resolver cache.
   """
   deduped_reqs = OrderedSet(reqs)
   find_links = OrderedSet()
@@ -119,8 +132,9 @@ def dump_requirements(builder, interpreter, reqs, log, platforms=None):
   for platform, dists in distributions.items():
     for dist in dists:
       if dist.location not in locations:
-        log.debug('  Dumping distribution: .../{}'.format(os.path.basename(dist.location)))
-        builder.add_distribution(dist)
+        dist_name = os.path.basename(dist.location)
+        log.debug('  Dumping distribution: .../{}'.format(dist_name))
+        builder.add_distribution(store.distribution(dist) if store else dist, dist_name=dist_name)
       locations.add(dist.location)
 
 
@@ -8,10 +8,16 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 
 import pkg_resources
+from pex.interpreter import PythonInterpreter
+from pex.pex import PEX
 from pex.pex_info import PexInfo
 
 from pants.backend.python.subsystems.pytest import PyTest
 from pants.backend.python.tasks.python_execution_task_base import PythonExecutionTaskBase
+from pants.backend.python.tasks.resolve_requirements import ResolveRequirements
+from pants.backend.python.tasks.wrapped_pex import WrappedPEX
+from pants.base.hash_utils import hash_all
+from pants.util.memo import memoized_property
 
 
 class PytestPrep(PythonExecutionTaskBase):
@@ -21,9 +27,11 @@ class PytestPrep(PythonExecutionTaskBase):
     """A `py.test` PEX binary with an embedded default (empty) `pytest.ini` config file."""
 
     _COVERAGE_PLUGIN_MODULE_NAME = '__{}__'.format(__name__.replace('.', '_'))
+    _WORKER_MODULE_NAME = '__{}_worker__'.format(__name__.replace('.', '_'))
 
-    def __init__(self, pex):
+    def __init__(self, pex, worker_pex_factory=None):
       self._pex = pex
+      self._worker_pex_factory = worker_pex_factory
 
     @property
     def pex(self):
@@ -33,6 +41,17 @@ class PytestPrep(PythonExecutionTaskBase):
       """
       return self._pex
 
+    @memoized_property
+    def worker_pex(self):
+      """Return the py.test worker PEX, which holds py.test and requirements but no sources.
+
+      The worker PEX only changes with the requirements, so a worker spawned from it can be re-used
+      to run the tests of any targets with the same requirements. It is built on first use.
+
+      :rtype: :class:`pants.backend.python.tasks.wrapped_pex.WrappedPEX`
+      """
+      return self._worker_pex_factory() if self._worker_pex_factory else None
+
     @property
     def config_path(self):
       """Return the absolute path of the `pytest.ini` config file in this py.test binary.
@@ -49,6 +68,14 @@ class PytestPrep(PythonExecutionTaskBase):
       """
       return cls._COVERAGE_PLUGIN_MODULE_NAME
 
+    @classmethod
+    def worker_module(cls):
+      """Return the name of the worker module that is the entry point of the worker PEX.
+
+      :rtype: str
+      """
+      return cls._WORKER_MODULE_NAME
+
   @classmethod
   def implementation_version(cls):
     return super(PytestPrep, cls).implementation_version() + [('PytestPrep', 2)]
@@ -69,8 +96,33 @@ class PytestPrep(PythonExecutionTaskBase):
     yield self.ExtraFile(path='{}.py'.format(self.PytestBinary.coverage_plugin_module()),
                          content=pkg_resources.resource_string(__name__, 'coverage/plugin.py'))
 
+  def _create_worker_pex(self):
+    interpreter = self.context.products.get_data(PythonInterpreter)
+    pexes = [
+      self.resolve_requirement_strings(interpreter, self.extra_requirements()),
+      self.context.products.get_data(ResolveRequirements.REQUIREMENTS_PEX)
+    ]
+    worker_module = self.PytestBinary.worker_module()
+    worker = self.ExtraFile(path='{}.py'.format(worker_module),
+                            content=pkg_resources.resource_string(__name__,
+                                                                  'pytest_worker/worker.py'))
+
+    # The pexes are at paths specific to their contents, so their paths identify the worker pex.
+    worker_id = hash_all([pex.path() for pex in pexes] + [worker.content])
+    path = os.path.realpath(os.path.join(self.workdir, 'workers', str(interpreter.identity),
+                                         worker_id))
+    if not os.path.isdir(path):
+      pex_info = PexInfo.default()
+      pex_info.entry_point = worker_module
+      with self.merged_pex(path, pex_info, interpreter, pexes) as builder:
+        worker.add_to(builder)
+        builder.freeze()
+    return WrappedPEX(PEX(path, interpreter), interpreter)
+
   def execute(self):
     pex_info = PexInfo.default()
     pex_info.entry_point = 'pytest'
     pytest_binary = self.create_pex(pex_info)
-    self.context.products.register_data(self.PytestBinary, self.PytestBinary(pytest_binary))
+    # NB: The worker pex is only built if `test.pytest` runs tests in workers.
+    binary = self.PytestBinary(pytest_binary, worker_pex_factory=self._create_worker_pex)
+    self.context.products.register_data(self.PytestBinary, binary)
@@ -22,12 +22,14 @@ from six.moves import configparser
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.tasks.gather_sources import GatherSources
 from pants.backend.python.tasks.pytest_prep import PytestPrep
+from pants.backend.python.tasks.pytest_worker_executor import PytestWorkerExecutor
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import ErrorWhileTesting, TaskError
 from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
 from pants.base.hash_utils import Sharder
 from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.target import Target
+from pants.init.subprocess import Subprocess
 from pants.task.task import Task
 from pants.task.testrunner_task_mixin import PartitionedTestRunnerTaskMixin, TestResult
 from pants.util.contextutil import environment_as, pushd, temporary_dir, temporary_file
@@ -128,6 +130,23 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
              help='Subset of tests to run, in the form M/N, 0 <= M < N. For example, 1/3 means '
                   'run tests number 2, 5, 8, 11, ...')
 
+    register('--workers', type=bool, default=False,
+             help='Run py.test in forks of warm worker processes, which have already imported '
+                  'py.test and the requirements of the tests, rather than in a new interpreter. '
+                  'A worker is shared by all test targets with the same requirements and '
+                  'interpreter, across pants runs. Each run still happens in its own process. '
+                  'Ignored when running with --coverage.')
+    register('--worker-idle-timeout', type=int, advanced=True, default=3600,
+             help='The number of seconds a py.test worker waits for a run before it exits.')
+    register('--worker-preload', type=list, advanced=True,
+             help='Modules that py.test workers import ahead of any run. Naming the heavy '
+                  'third party modules imported by the tests here spares each run from importing '
+                  'them.')
+
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(PytestRun, cls).subsystem_dependencies() + (Subprocess.Factory,)
+
   @classmethod
   def supports_passthru_args(cls):
     return True
@@ -352,7 +371,7 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
             coverage_xml = os.path.join(coverage_workdir, 'coverage.xml')
             coverage_run('xml', ['-i', '--rcfile', coverage_rc, '-o', coverage_xml])
 
-  def _get_shard_conftest_content(self):
+  def _get_shard_conftest_content(self, shard_report_path):
     shard_spec = self.get_options().test_shard
     if shard_spec is None:
       return ''
@@ -361,6 +380,8 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
       sharder = Sharder(shard_spec)
       if sharder.nshards < 2:
         return ''
+      if self.shard_durations:
+        return self._get_balanced_shard_conftest_content(sharder, shard_report_path)
       return dedent("""
 
         ### GENERATED BY PANTS ###
@@ -385,7 +406,68 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
     except Sharder.InvalidShardSpec as e:
       raise self.InvalidShardSpecification(e)
 
-  def _get_conftest_content(self, sources_map, rootdir_comm_path):
+  def _get_balanced_shard_conftest_content(self, sharder, shard_report_path):
+    # NB: Tests are keyed as `test_key` keys the tests of the junit xml report, whose class names
+    # py.test derives from the renamed node ids. The shards are balanced the same way as
+    # `pants.task.duration_history.balance` does, which isn't importable from the py.test pex.
+    return dedent("""
+
+      ### GENERATED BY PANTS ###
+
+      import json
+
+      from _pytest.junitxml import mangle_test_address
+
+
+      # The test durations to balance shards by.
+      _SHARD_DURATIONS_PATH = {durations_path!r}
+
+      # The path to write out the predicted durations of the shards to.
+      _SHARD_REPORT_PATH = {shard_report_path!r}
+
+
+      def pytest_report_header(config):
+        return 'shard: {shard} of {nshards} (0-based shard numbering, balanced by durations)'
+
+      def pytest_collection_modifyitems(session, config, items):
+        with open(_SHARD_DURATIONS_PATH, 'r') as fp:
+          durations = json.load(fp).get('durations', {{}})
+        renamer = config.pluginmanager.getplugin('pants_test_renamer')
+
+        def test_key(item):
+          names = mangle_test_address(renamer.fixed_nodeid(item.nodeid))
+          classname = '.'.join(names[:-1])
+          return '{{}}#{{}}'.format(classname, names[-1]) if classname else names[-1]
+
+        def is_conftest(itm):
+          return itm.fspath and itm.fspath.basename == 'conftest.py'
+        tests = [i for i, item in enumerate(items) if not is_conftest(item)]
+        estimates = {{i: durations.get(test_key(items[i])) for i in tests}}
+        known = [secs for secs in estimates.values() if secs is not None]
+        default = float(sum(known)) / len(known) if known else 1.0
+        estimates = {{i: default if secs is None else secs for i, secs in estimates.items()}}
+
+        loads = [0.0] * {nshards}
+        removed = set()
+        for i in sorted(tests, key=lambda i: (-estimates[i], i)):
+          shard = min(range({nshards}), key=lambda s: (loads[s], s))
+          loads[shard] += estimates[i]
+          if shard != {shard}:
+            removed.add(i)
+        items[:] = [item for i, item in enumerate(items) if i not in removed]
+
+        with open(_SHARD_REPORT_PATH, 'w') as fp:
+          json.dump(loads, fp)
+        reporter = config.pluginmanager.getplugin('terminalreporter')
+        reporter.write_line('Only executing {{}} of {{}} total tests in shard {shard} of '
+                            '{nshards}'.format(len(items), len(items) + len(removed)),
+                            bold=True, invert=True, yellow=True)
+      """.format(durations_path=self.shard_durations_path,
+                 shard_report_path=shard_report_path,
+                 shard=sharder.shard,
+                 nshards=sharder.nshards))
+
+  def _get_conftest_content(self, sources_map, rootdir_comm_path, shard_report_path):
     # A conftest hook to modify the console output, replacing the chroot-based
     # source paths with the source-tree based ones, which are more readable to the end user.
     # Note that python stringifies a dict to its source representation, so we can use sources_map
@@ -420,15 +502,17 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
           self._sources_map = {{rootdir_relative(k): rootdir_relative(v)
                                 for k, v in self._SOURCES_MAP.items()}}
 
+        def fixed_nodeid(self, real_nodeid):
+          real_path = real_nodeid.split('::', 1)[0]
+          fixed_path = self._sources_map.get(real_path, real_path)
+          return fixed_path + real_nodeid[len(real_path):]
+
         @pytest.hookimpl(hookwrapper=True)
         def pytest_runtest_protocol(self, item, nextitem):
           # Temporarily change the nodeid, which pytest uses for display.
           real_nodeid = item.nodeid
-          real_path = real_nodeid.split('::', 1)[0]
-          fixed_path = self._sources_map.get(real_path, real_path)
-          fixed_nodeid = fixed_path + real_nodeid[len(real_path):]
           try:
-            item._nodeid = fixed_nodeid
+            item._nodeid = self.fixed_nodeid(real_nodeid)
             yield
           finally:
             item._nodeid = real_nodeid
@@ -447,7 +531,7 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
 
     """.format(sources_map=dict(sources_map), rootdir_comm_path=rootdir_comm_path))
     # Add in the sharding conftest, if any.
-    shard_conftest_content = self._get_shard_conftest_content()
+    shard_conftest_content = self._get_shard_conftest_content(shard_report_path)
     return (console_output_conftest_content + shard_conftest_content).encode('utf8')
 
   @contextmanager
@@ -463,22 +547,32 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
         with open(rootdir_comm_path, 'r') as fp:
           return fp.read()
 
+      shard_report_path = os.path.join(conftest_dir, 'pytest_shard_report.json')
+
+      def get_shard_loads():
+        # Only written when sharding by durations.
+        if not os.path.exists(shard_report_path):
+          return None
+        with open(shard_report_path, 'r') as fp:
+          return json.load(fp)
+
       conftest_content = self._get_conftest_content(sources_map,
-                                                    rootdir_comm_path=rootdir_comm_path)
+                                                    rootdir_comm_path=rootdir_comm_path,
+                                                    shard_report_path=shard_report_path)
 
       conftest = os.path.join(conftest_dir, 'conftest.py')
       with open(conftest, 'w') as fp:
         fp.write(conftest_content)
-      yield conftest, get_pytest_rootdir
+      yield conftest, get_pytest_rootdir, get_shard_loads
 
   @contextmanager
   def _test_runner(self, workdirs, test_targets, sources_map):
     pytest_binary = self.context.products.get_data(PytestPrep.PytestBinary)
-    with self._conftest(sources_map) as (conftest, get_pytest_rootdir):
+    with self._conftest(sources_map) as (conftest, get_pytest_rootdir, get_shard_loads):
       with self._maybe_emit_coverage_data(workdirs,
                                           test_targets,
                                           pytest_binary.pex) as coverage_args:
-        yield pytest_binary, [conftest] + coverage_args, get_pytest_rootdir
+        yield pytest_binary, [conftest] + coverage_args, get_pytest_rootdir, get_shard_loads
 
   def _do_run_tests_with_args(self, pex, args):
     try:
@@ -510,7 +604,8 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
       with self.context.new_workunit(name='run',
                                      cmd=pex.cmdline(args),
                                      labels=[WorkUnitLabel.TOOL, WorkUnitLabel.TEST]) as workunit:
-        rc = self._spawn_and_wait(pex, workunit=workunit, args=args, setsid=True, env=env)
+        rc = self._spawn_and_wait(pex, workunit=workunit, args=args, setsid=True, env=env,
+                                  worker=self._worker)
         return PytestResult.rc(rc)
     except ErrorWhileTesting:
       # _spawn_and_wait wraps the test runner in a timeout, so it could
@@ -569,6 +664,11 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
     relsrc = os.path.join(buildroot_relpath, pytest_relpath)
     return relsrc_to_target.get(relsrc)
 
+  @property
+  def supports_concurrent_partitions(self):
+    # Coverage data is written to the shared working directory of the test runs.
+    return self.get_options().coverage is None
+
   @contextmanager
   def partitions(self, per_target, all_targets, test_targets):
     if per_target:
@@ -580,6 +680,8 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
         yield tuple(test_targets)
 
     workdir = self.workdir
+    # NB: The worker is used from the threads that run partitions, so it is set up before any run.
+    self._worker = self._create_worker()
 
     def iter_partitions_with_args():
       for partition in iter_partitions():
@@ -654,7 +756,8 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
 
     with self._test_runner(workdirs, test_targets, sources_map) as (pytest_binary,
                                                                     test_args,
-                                                                    get_pytest_rootdir):
+                                                                    get_pytest_rootdir,
+                                                                    get_shard_loads):
       # Validate that the user didn't provide any passthru args that conflict
       # with those we must set ourselves.
       for arg in self.get_passthru_args():
@@ -686,8 +789,7 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
       if os.path.exists(junitxml_path):
         os.unlink(junitxml_path)
 
-      with self._maybe_run_in_chroot():
-        result = self._do_run_tests_with_args(pytest_binary.pex, args)
+      result = self._do_run_tests_with_args(pytest_binary.pex, args)
 
       # There was a problem prior to test execution preventing junit xml file creation so just let
       # the failure result bubble.
@@ -710,6 +812,13 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
         test_target = self._get_target_from_test(test_info, test_targets, pytest_rootdir)
         self.report_all_info_for_single_test(self.options_scope, test_target, test_name, test_info)
 
+      shard_loads = get_shard_loads()
+      if shard_loads:
+        sharder = Sharder(self.get_options().test_shard)
+        actual_secs = sum(test_info['time'] or 0.0 for test_info in all_tests_info.values())
+        self.report_makespan('Shard {}'.format(self.get_options().test_shard),
+                             shard_loads[sharder.shard], max(shard_loads), actual_secs)
+
       return result.with_failed_targets(failed_targets)
 
   @memoized_property
@@ -731,13 +840,45 @@ class PytestRun(PartitionedTestRunnerTaskMixin, Task):
     else:
       yield
 
-  def _spawn(self, pex, workunit, args, setsid=False, env=None):
+  # The executor of the py.test worker that partitions run in, if any.
+  _worker = None
+
+  def _create_worker(self):
+    if not self.get_options().workers:
+      return None
+    if self.get_options().coverage:
+      self.context.log.debug('Not running py.test in workers, since coverage is enabled.')
+      return None
+    pytest_binary = self.context.products.get_data(PytestPrep.PytestBinary)
+    return PytestWorkerExecutor(pytest_binary.worker_pex,
+                                idle_timeout=self.get_options().worker_idle_timeout,
+                                preload=self.get_options().worker_preload)
+
+  def _spawn(self, pex, workunit, args, setsid=False, env=None, worker=None):
     env = env or {}
-    process = pex.run(args,
-                      with_chroot=False,  # We handle chrooting ourselves.
-                      blocking=False,
-                      setsid=setsid,
-                      env=env,
-                      stdout=workunit.output('stdout'),
-                      stderr=workunit.output('stderr'))
+    if worker is not None:
+      # The worker pex has no sources, so the run finds them on its `sys.path`, much as py.test
+      # finds them on the PEX_PATH of the pex.
+      cwd = self._source_chroot_path if self.run_tests_in_chroot else get_buildroot()
+      workunit.output('stdout')
+      workunit.output('stderr')
+      output_paths = workunit.output_paths()
+      try:
+        return worker.run(args,
+                          cwd=cwd,
+                          env=env,
+                          sys_path=[self._source_chroot_path],
+                          stdout_path=output_paths['stdout'],
+                          stderr_path=output_paths['stderr'])
+      except PytestWorkerExecutor.Error as e:
+        self.context.log.warn('{}; running py.test in a new process instead.'.format(e))
+    # NB: The chroot is only entered to spawn pytest, which inherits it as its working directory.
+    with self._maybe_run_in_chroot():
+      process = pex.run(args,
+                        with_chroot=False,  # We handle chrooting ourselves.
+                        blocking=False,
+                        setsid=setsid,
+                        env=env,
+                        stdout=workunit.output('stdout'),
+                        stderr=workunit.output('stderr'))
     return SubprocessProcessHandler(process)
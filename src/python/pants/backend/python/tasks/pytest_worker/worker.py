@@ -0,0 +1,125 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import importlib
+import json
+import os
+import random
+import signal
+import socket
+import sys
+
+
+# NB: This module is run as the entry point of a py.test worker pex, which contains py.test and the
+# requirements of the tests but none of their sources. It can't import anything from pants.
+
+TOKEN_ENV_VAR = '_PANTS_PYTEST_WORKER_TOKEN'
+
+
+def _preload(modules):
+  # Importing py.test and the given (third party) modules once here spares each run that forks
+  # from this process from importing them again.
+  import pytest  # noqa
+  for module in modules:
+    try:
+      importlib.import_module(module)
+    except Exception as e:
+      sys.stderr.write('Failed to preload {}: {}\n'.format(module, e))
+
+
+def _send(conn, message):
+  conn.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def _receive(conn):
+  data = b''
+  while not data.endswith(b'\n'):
+    chunk = conn.recv(4096)
+    if not chunk:
+      return None
+    data += chunk
+  return json.loads(data.decode('utf-8'))
+
+
+def _redirect(fd, path):
+  out = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+  os.dup2(out, fd)
+  os.close(out)
+
+
+def _run(conn, request):
+  """Runs py.test for the given request in this freshly forked child, and exits with its result.
+
+  The child starts from the state of the worker, which has never imported the code under test, so
+  no state of the modules tested by one run is seen by another.
+  """
+  rc = -1
+  try:
+    os.setsid()
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    # Forked children would otherwise all share the random state of the worker.
+    random.seed()
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with open(os.devnull, 'rb') as devnull:
+      os.dup2(devnull.fileno(), 0)
+    _redirect(1, request['stdout'])
+    _redirect(2, request['stderr'])
+
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    sys.path.extend(request['sys_path'])
+    sys.argv = ['pytest'] + request['args']
+
+    _send(conn, {'pid': os.getpid()})
+
+    import pytest
+    rc = int(pytest.main(request['args']))
+  finally:
+    try:
+      sys.stdout.flush()
+      sys.stderr.flush()
+      _send(conn, {'rc': rc})
+    finally:
+      os._exit(0)
+
+
+def main(port_path, idle_timeout, preload):
+  token = os.environ.pop(TOKEN_ENV_VAR)
+  _preload(preload)
+
+  server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+  server.bind(('127.0.0.1', 0))
+  server.listen(16)
+  server.settimeout(idle_timeout)
+
+  # The port is written atomically, since the client polls for it.
+  tmp_port_path = '{}.tmp'.format(port_path)
+  with open(tmp_port_path, 'w') as fp:
+    fp.write(str(server.getsockname()[1]))
+  os.rename(tmp_port_path, port_path)
+
+  # Children are reaped automatically; their results are reported over their connections.
+  signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+  while True:
+    try:
+      conn, _ = server.accept()
+    except socket.timeout:
+      break
+    conn.settimeout(None)
+    request = _receive(conn)
+    if request is not None and request.get('token') == token:
+      if os.fork() == 0:
+        server.close()
+        _run(conn, request)
+    conn.close()
+
+
+if __name__ == '__main__':
+  main(sys.argv[1], float(sys.argv[2]), sys.argv[3:])
@@ -0,0 +1,240 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import threading
+import time
+import uuid
+
+from pants.base.hash_utils import hash_all
+from pants.pantsd.process_manager import ProcessManager
+from pants.util.dirutil import safe_open
+from pants.util.process_handler import ProcessHandler, subprocess
+
+
+logger = logging.getLogger(__name__)
+
+
+class PytestWorkerExecutor(ProcessManager):
+  """Runs py.test in forks of a warm worker process.
+
+  The worker is spawned from a pex holding py.test and the requirements of the tests, and imports
+  them once. It outlives the pants run that spawned it, so that later runs (and other pantsd
+  clients) with the same worker pex re-use it until it has been idle for a while. Each py.test run
+  happens in a fresh fork of the worker, which has never imported the code under test, so runs are
+  isolated from each other just as separate processes are.
+  """
+
+  class Error(Exception):
+    """Indicates a failure to spawn or to communicate with a worker."""
+
+  TOKEN_ENV_VAR = '_PANTS_PYTEST_WORKER_TOKEN'
+
+  _SPAWN_LOCK = threading.Lock()
+  _RUN_ATTEMPTS = 2
+
+  def __init__(self, pex, idle_timeout, preload=(), connect_timeout=30, metadata_base_dir=None):
+    """
+    :param pex: The worker pex, whose entry point is the worker.
+    :type pex: :class:`pants.backend.python.tasks.wrapped_pex.WrappedPEX`
+    :param int idle_timeout: The number of seconds the worker waits for a run before exiting.
+    :param list preload: Names of modules the worker imports ahead of any run.
+    :param int connect_timeout: The number of seconds to wait for a spawned worker to listen.
+    :param str metadata_base_dir: The overridden base directory for process metadata.
+    """
+    self._pex = pex
+    self._idle_timeout = idle_timeout
+    self._preload = list(preload)
+    self._connect_timeout = connect_timeout
+    identity = hash_all([pex.path(), str(idle_timeout)] + self._preload)[:12]
+    super(PytestWorkerExecutor, self).__init__(name='pytest_worker_{}'.format(identity),
+                                               metadata_base_dir=metadata_base_dir)
+
+  def __str__(self):
+    return 'PytestWorkerExecutor({pex}, pid={pid} socket={socket})'.format(
+      pex=self._pex.path(), pid=self.pid, socket=self.socket)
+
+  @property
+  def _metadata_dir(self):
+    return self._get_metadata_dir_by_name(self.name)
+
+  @property
+  def _port_path(self):
+    return os.path.join(self._metadata_dir, 'socket')
+
+  @property
+  def token(self):
+    """The secret a run request must present to the running worker (or None)."""
+    return self.read_metadata_by_name(self.name, 'token')
+
+  def _check_process_port_path(self, process):
+    """Matches only worker processes writing to our metadata, to guard against re-used pids."""
+    return self._port_path in process.cmdline()
+
+  def is_alive(self):
+    """A ProcessManager.is_alive() override that ensures the process is our worker."""
+    return super(PytestWorkerExecutor, self).is_alive(self._check_process_port_path)
+
+  def _ensure_running(self):
+    with self._SPAWN_LOCK, self.process_lock:
+      if self.is_alive() and self.socket and self.token:
+        return
+      if self.is_alive():
+        self.terminate()
+      token = uuid.uuid4().hex
+      logger.debug('Spawning py.test worker {}'.format(self.name))
+      self.daemon_spawn(post_fork_child_opts=dict(token=token))
+      # NB: Forget any process looked up for a prior pid.
+      self._process = None
+      self.await_pid(self._connect_timeout)
+      self.await_socket(self._connect_timeout)
+      self.write_metadata_by_name(self.name, 'token', token)
+      os.chmod(os.path.join(self._metadata_dir, 'token'), 0o600)
+      logger.debug('Spawned {}'.format(self))
+
+  def post_fork_child(self, token):
+    """Post-fork() child callback for ProcessManager.daemon_spawn()."""
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    env[self.TOKEN_ENV_VAR] = token
+    args = [self._port_path, str(self._idle_timeout)] + self._preload
+    process = self._pex.run(args,
+                            with_chroot=False,
+                            blocking=False,
+                            env=env,
+                            stdin=safe_open(os.devnull, 'r'),
+                            stdout=safe_open(os.path.join(self._metadata_dir, 'stdout'), 'w'),
+                            stderr=safe_open(os.path.join(self._metadata_dir, 'stderr'), 'w'),
+                            close_fds=True)
+    self.write_pid(process.pid)
+
+  def _connect(self):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+      sock.connect(('127.0.0.1', self.socket))
+    except socket.error:
+      sock.close()
+      raise
+    return sock
+
+  def _discard(self):
+    with self._SPAWN_LOCK, self.process_lock:
+      if self.is_alive():
+        self.terminate()
+      else:
+        self.purge_metadata(force=True)
+
+  def _start_run(self, request):
+    self._ensure_running()
+    sock = self._connect()
+    try:
+      request = dict(request, token=self.token)
+      sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+      return PytestWorkerProcessHandler(sock, self._connect_timeout)
+    except Exception:
+      sock.close()
+      raise
+
+  def run(self, args, cwd, env, sys_path, stdout_path, stderr_path):
+    """Runs py.test in a fork of the worker, spawning the worker first if needed.
+
+    :param list args: The arguments to pass to py.test.
+    :param string cwd: The working directory of the run.
+    :param dict env: The environment of the run.
+    :param list sys_path: Entries to add to the `sys.path` of the run.
+    :param string stdout_path: The file to append the stdout of the run to.
+    :param string stderr_path: The file to append the stderr of the run to.
+    :rtype: :class:`PytestWorkerProcessHandler`
+    :raises: :class:`PytestWorkerExecutor.Error` if the worker can't be reached.
+    """
+    request = dict(args=args, cwd=cwd, env=env, sys_path=sys_path,
+                   stdout=stdout_path, stderr=stderr_path)
+    error = None
+    for _ in range(self._RUN_ATTEMPTS):
+      try:
+        return self._start_run(request)
+      except (self.Error, self.Timeout, socket.error, subprocess.TimeoutExpired) as e:
+        # The worker may have exited on its idle timeout after we found it alive, so we replace it.
+        logger.debug('Failed to start a run in {}: {}'.format(self, e))
+        error = e
+        self._discard()
+    raise self.Error('Failed to run py.test in worker {}: {}'.format(self.name, error))
+
+
+class PytestWorkerProcessHandler(ProcessHandler):
+  """A `ProcessHandler` for a py.test run in a fork of a worker.
+
+  The fork reports its pid and then its exit code over the connection it was forked for.
+  """
+
+  def __init__(self, sock, timeout):
+    self._sock = sock
+    self._buffer = b''
+    self._returncode = None
+    message = self._receive(timeout)
+    if message is None:
+      self._close()
+      raise PytestWorkerExecutor.Error('The py.test worker refused the run.')
+    self.pid = message['pid']
+
+  def _close(self):
+    if self._sock is not None:
+      self._sock.close()
+      self._sock = None
+
+  def _receive(self, timeout):
+    """Returns the next message, or None if the connection closed before one arrived.
+
+    :raises: :class:`subprocess.TimeoutExpired` if no message arrived within the timeout.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    while b'\n' not in self._buffer:
+      remaining = None if deadline is None else max(0, deadline - time.time())
+      readable, _, _ = select.select([self._sock], [], [], remaining)
+      if not readable:
+        raise subprocess.TimeoutExpired('pytest', timeout)
+      chunk = self._sock.recv(4096)
+      if not chunk:
+        return None
+      self._buffer += chunk
+    line, self._buffer = self._buffer.split(b'\n', 1)
+    return json.loads(line.decode('utf-8'))
+
+  def wait(self, timeout=None):
+    if self._returncode is None:
+      message = self._receive(timeout)
+      # A fork that dies without reporting, e.g. when killed, exits abnormally.
+      self._returncode = -1 if message is None else message['rc']
+      self._close()
+    return self._returncode
+
+  def poll(self):
+    try:
+      return self.wait(timeout=0)
+    except subprocess.TimeoutExpired:
+      return None
+
+  def _kill(self, sig):
+    # NB: Once the fork has reported, its pid may belong to another process.
+    if self._returncode is not None:
+      return
+    try:
+      os.kill(self.pid, sig)
+    except OSError as e:
+      if e.errno != errno.ESRCH:
+        raise
+
+  def kill(self):
+    self._kill(signal.SIGKILL)
+
+  def terminate(self):
+    self._kill(signal.SIGTERM)
@@ -13,10 +13,10 @@ from pex.pex import PEX
 from pex.pex_builder import PEXBuilder
 
 from pants.backend.python.python_requirement import PythonRequirement
+from pants.backend.python.subsystems.pex_chroot_store import PexChrootStore
 from pants.backend.python.targets.python_requirement_library import PythonRequirementLibrary
 from pants.backend.python.tasks.pex_build_util import dump_requirement_libs, dump_requirements
 from pants.base.hash_utils import hash_all
-from pants.invalidation.cache_manager import VersionedTargetSet
 from pants.task.task import Task
 from pants.util.dirutil import safe_concurrent_creation
 
@@ -26,9 +26,14 @@ class ResolveRequirementsTaskBase(Task):
 
   Creates an (unzipped) PEX on disk containing all the resolved requirements.
   This PEX can be merged with other PEXes to create a unified Python environment
-  for running the relevant python code.
+  for running the relevant python code. The resolved distributions are hard-linked from a
+  content-addressed store, so PEXes of overlapping sets of requirements share them.
   """
 
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(ResolveRequirementsTaskBase, cls).subsystem_dependencies() + (PexChrootStore,)
+
   @classmethod
   def prepare(cls, options, round_manager):
     round_manager.require_data(PythonInterpreter)
@@ -41,24 +46,25 @@ class ResolveRequirementsTaskBase(Task):
     :param req_libs: A list of :class:`PythonRequirementLibrary` targets to resolve.
     :returns: a PEX containing target requirements and any specified python dist targets.
     """
-    with self.invalidated(req_libs) as invalidation_check:
-      # If there are no relevant targets, we still go through the motions of resolving
-      # an empty set of requirements, to prevent downstream tasks from having to check
-      # for this special case.
-      if invalidation_check.all_vts:
-        target_set_id = VersionedTargetSet.from_versioned_targets(
-            invalidation_check.all_vts).cache_key.hash
-      else:
-        target_set_id = 'no_targets'
-
-      path = os.path.realpath(os.path.join(self.workdir, str(interpreter.identity), target_set_id))
-      # Note that we check for the existence of the directory, instead of for invalid_vts,
-      # to cover the empty case.
-      if not os.path.isdir(path):
-        with safe_concurrent_creation(path) as safe_path:
-          builder = PEXBuilder(path=safe_path, interpreter=interpreter, copy=True)
-          dump_requirement_libs(builder, interpreter, req_libs, self.context.log)
-          builder.freeze()
+    # The resolve only depends on the requirements themselves and on the options it runs under, so
+    # it's shared by all sets of targets with the same requirements. NB: Local python dists are
+    # found in a repository whose path is specific to their fingerprint, so a changed dist is a
+    # changed requirement.
+    #
+    # If there are no relevant targets, we still go through the motions of resolving
+    # an empty set of requirements, to prevent downstream tasks from having to check
+    # for this special case.
+    requirement_strings = sorted({'{}@{}'.format(req.requirement, req.repository or '')
+                                  for req_lib in req_libs for req in req_lib.requirements})
+    req_set_id = hash_all([self.fingerprint] + requirement_strings)
+
+    path = os.path.realpath(os.path.join(self.workdir, str(interpreter.identity), req_set_id))
+    if not os.path.isdir(path):
+      with safe_concurrent_creation(path) as safe_path:
+        builder = PEXBuilder(path=safe_path, interpreter=interpreter)
+        dump_requirement_libs(builder, interpreter, req_libs, self.context.log,
+                              store=PexChrootStore.global_instance())
+        builder.freeze()
     return PEX(path, interpreter=interpreter)
 
   def resolve_requirement_strings(self, interpreter, requirement_strings):
@@ -75,8 +81,9 @@ class ResolveRequirementsTaskBase(Task):
     if not os.path.isdir(path):
       reqs = [PythonRequirement(req_str) for req_str in requirement_strings]
       with safe_concurrent_creation(path) as safe_path:
-        builder = PEXBuilder(path=safe_path, interpreter=interpreter, copy=True)
-        dump_requirements(builder, interpreter, reqs, self.context.log)
+        builder = PEXBuilder(path=safe_path, interpreter=interpreter)
+        dump_requirements(builder, interpreter, reqs, self.context.log,
+                          store=PexChrootStore.global_instance())
         builder.freeze()
     return PEX(path, interpreter=interpreter)
 
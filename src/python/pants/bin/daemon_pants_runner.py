@@ -74,7 +74,7 @@ class DaemonPantsRunner(ProcessManager):
   """
 
   def __init__(self, socket, exiter, args, env, target_roots, graph_helper, fork_lock,
-               preceding_graph_size, deferred_exception=None):
+               preceding_graph_size, deferred_exception=None, request_timings=None):
     """
     :param socket socket: A connected socket capable of speaking the nailgun protocol.
     :param Exiter exiter: The Exiter instance for this run.
@@ -88,6 +88,8 @@ class DaemonPantsRunner(ProcessManager):
     :param int preceding_graph_size: The size of the graph pre-warming, for stats.
     :param Exception deferred_exception: A deferred exception from the daemon's graph construction.
                                          If present, this will be re-raised in the client context.
+    :param tuple request_timings: The seconds the request spent queued for a request worker, and
+                                  then setting up before the fork, for stats. (Optional)
     """
     super(DaemonPantsRunner, self).__init__(name=self._make_identity())
     self._socket = socket
@@ -99,6 +101,7 @@ class DaemonPantsRunner(ProcessManager):
     self._fork_lock = fork_lock
     self._preceding_graph_size = preceding_graph_size
     self._deferred_exception = deferred_exception
+    self._request_timings = request_timings
 
   def _make_identity(self):
     """Generate a ProcessManager identity for a given pants run.
@@ -249,6 +252,8 @@ class DaemonPantsRunner(ProcessManager):
         )
         runner.set_start_time(self._maybe_get_client_start_time_from_env(self._env))
         runner.set_preceding_graph_size(self._preceding_graph_size)
+        if self._request_timings:
+          runner.set_request_timings(*self._request_timings)
         runner.run()
       except KeyboardInterrupt:
         self._exiter.exit(1, msg='Interrupted by user.\n')
@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
+import os
 from collections import namedtuple
 
 from pants.base.build_environment import get_buildroot, get_scm
@@ -15,6 +16,7 @@ from pants.engine.build_files import BuildFileAddresses, create_graph_rules
 from pants.engine.fs import create_fs_rules
 from pants.engine.isolated_process import create_process_rules
 from pants.engine.legacy.address_mapper import LegacyAddressMapper
+from pants.engine.legacy.caching_parser import CachingParser
 from pants.engine.legacy.graph import (LegacyBuildGraph, TransitiveHydratedTargets,
                                        create_legacy_graph_tasks)
 from pants.engine.legacy.parser import LegacyPythonCallbacksParser
@@ -124,7 +126,9 @@ class EngineInitializer(object):
                          build_ignore_patterns=None,
                          exclude_target_regexps=None,
                          subproject_roots=None,
-                         include_trace_on_error=True):
+                         include_trace_on_error=True,
+                         build_file_parse_cache=False,
+                         build_file_parse_parallelism=1):
     """Construct and return the components necessary for LegacyBuildGraph construction.
 
     :param list pants_ignore_patterns: A list of path ignore patterns for FileSystemProjectTree,
@@ -144,6 +148,10 @@ class EngineInitializer(object):
                                   under the current build root.
     :param bool include_trace_on_error: If True, when an error occurs, the error message will
                 include the graph trace.
+    :param bool build_file_parse_cache: If True, cache the objects parsed from BUILD files in the
+                                        workdir.
+    :param int build_file_parse_parallelism: The number of processes to parse the BUILD files of a
+                                             spec with. Implies `build_file_parse_cache` if above 1.
     :returns: A tuple of (scheduler, engine, symbol_table, build_graph_cls).
     """
 
@@ -164,6 +172,12 @@ class EngineInitializer(object):
       build_file_aliases,
       build_file_imports_behavior
     )
+    if build_file_parse_cache or build_file_parse_parallelism > 1:
+      parser = CachingParser(parser,
+                             build_file_aliases,
+                             build_root,
+                             os.path.join(workdir, 'build_file_parses'),
+                             parallelism=build_file_parse_parallelism)
     address_mapper = AddressMapper(parser=parser,
                                    build_ignore_patterns=build_ignore_patterns,
                                    exclude_target_regexps=exclude_target_regexps,
@@ -110,7 +110,9 @@ class GoalRunnerFactory(object):
         build_ignore_patterns=build_ignore_patterns,
         exclude_target_regexps=exclude_target_regexps,
         subproject_roots=subproject_build_roots,
-        include_trace_on_error=self._options.for_global_scope().print_exception_stacktrace
+        include_trace_on_error=self._options.for_global_scope().print_exception_stacktrace,
+        build_file_parse_cache=self._global_options.build_file_parse_cache,
+        build_file_parse_parallelism=self._global_options.build_file_parse_parallelism
       )
 
     target_roots = target_roots or TargetRootsCalculator.create(
@@ -263,6 +265,7 @@ class GoalRunner(object):
     try:
       result = self._execute_engine()
       self._context.set_resulting_graph_size_in_runtracker()
+      self._context.set_closure_cache_stats_in_runtracker()
       if result:
         self._run_tracker.set_root_outcome(WorkUnit.FAILURE)
     except KeyboardInterrupt:
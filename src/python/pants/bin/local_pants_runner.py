@@ -35,11 +35,15 @@ class LocalPantsRunner(object):
     self._daemon_build_graph = daemon_build_graph
     self._options_bootstrapper = options_bootstrapper
     self._preceding_graph_size = -1
+    self._request_timings = None
     self._run_start_time = None
 
   def set_preceding_graph_size(self, size):
     self._preceding_graph_size = size
 
+  def set_request_timings(self, queue_secs, setup_secs):
+    self._request_timings = (queue_secs, setup_secs)
+
   def set_start_time(self, start_time):
     self._run_start_time = start_time
 
@@ -83,6 +87,8 @@ class LocalPantsRunner(object):
 
       # Record the preceding product graph size.
       run_tracker.pantsd_stats.set_preceding_graph_size(self._preceding_graph_size)
+      if self._request_timings:
+        run_tracker.pantsd_stats.set_request_timings(*self._request_timings)
 
       # Setup and run GoalRunner.
       goal_runner = GoalRunner.Factory(root_dir,
@@ -0,0 +1,149 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+from array import array
+from collections import defaultdict
+
+
+class AdjacencyIndex(object):
+  """A compact, integer-indexed snapshot of the edges of a graph, for fast traversals.
+
+  Each node is assigned a dense integer index. The dependencies and the dependees of all nodes are
+  stored in compressed sparse row (CSR) form: one flat array of neighbor indices per direction,
+  plus an array of offsets into it per node. Traversals then work on integers and a visited
+  bytearray, rather than on hashable node objects and sets.
+
+  The CSR arrays are frozen when the index is built. Edges added afterwards are kept in small
+  per-node overflow lists, until `needs_compaction` suggests rebuilding the index.
+  """
+
+  # The number of added edges beyond which rebuilding is worthwhile, at minimum.
+  MIN_COMPACTION_EDGES = 1024
+
+  def __init__(self, dependencies_by_node, dependees_by_node):
+    """
+    :param dependencies_by_node: A dict from each node to an iterable of its dependencies.
+    :param dependees_by_node: A dict from each node to an iterable of its dependees.
+
+    Neighbors are traversed in the iteration order of these iterables.
+    """
+    self._nodes = []
+    self._index_of = {}
+    for node, dependencies in dependencies_by_node.items():
+      self.index(node)
+      for dependency in dependencies:
+        self.index(dependency)
+
+    self._frozen_size = len(self._nodes)
+    self._dependency_offsets, self._dependencies = self._to_csr(dependencies_by_node)
+    self._dependee_offsets, self._dependees = self._to_csr(dependees_by_node)
+    self._added_dependencies = defaultdict(list)
+    self._added_dependees = defaultdict(list)
+    self._num_added_edges = 0
+
+  def _to_csr(self, neighbors_by_node):
+    offsets = array(b'i', [0] * (self._frozen_size + 1))
+    neighbors = array(b'i')
+    index_of = self._index_of
+    for i, node in enumerate(self._nodes):
+      neighbors.extend(index_of[neighbor] for neighbor in neighbors_by_node.get(node, ()))
+      offsets[i + 1] = len(neighbors)
+    return offsets, neighbors
+
+  def __len__(self):
+    return len(self._nodes)
+
+  @property
+  def needs_compaction(self):
+    """Whether enough edges were added since this index was built to make rebuilding it worthwhile.
+    """
+    return self._num_added_edges > max(self.MIN_COMPACTION_EDGES, len(self._dependencies) // 8)
+
+  def node(self, index):
+    return self._nodes[index]
+
+  def index(self, node):
+    """Returns the index of `node`, assigning it a new one if the index doesn't have it yet."""
+    index = self._index_of.get(node)
+    if index is None:
+      index = len(self._nodes)
+      self._nodes.append(node)
+      self._index_of[node] = index
+    return index
+
+  def add_edge(self, dependent, dependency):
+    """Records an edge added to the graph after this index was built."""
+    dependent_index = self.index(dependent)
+    dependency_index = self.index(dependency)
+    self._added_dependencies[dependent_index].append(dependency_index)
+    self._added_dependees[dependency_index].append(dependent_index)
+    self._num_added_edges += 1
+
+  def dependencies(self, index):
+    """Returns the indices of the dependencies of the node at `index`, in order."""
+    return self._neighbors(index, self._dependency_offsets, self._dependencies,
+                           self._added_dependencies)
+
+  def dependees(self, index):
+    """Returns the indices of the dependees of the node at `index`."""
+    return self._neighbors(index, self._dependee_offsets, self._dependees, self._added_dependees)
+
+  def _neighbors(self, index, offsets, neighbors, added):
+    if index < self._frozen_size:
+      frozen = neighbors[offsets[index]:offsets[index + 1]]
+    else:
+      frozen = ()
+    if index in added:
+      return list(frozen) + added[index]
+    return frozen
+
+  def walk(self, roots, dependees=False, postorder=False, predicate=None, edge_predicate=None):
+    """Yields the indices of the nodes reachable from `roots` in depth-first order, each once.
+
+    The order is identical to that of a recursive depth-first traversal visiting neighbors in
+    order, but the traversal is iterative, so it is not bounded by the python stack.
+
+    :param roots: The indices to start from, in order.
+    :param bool dependees: Whether to follow edges to dependees, rather than to dependencies.
+    :param bool postorder: Whether to yield nodes after their neighbors, rather than before.
+    :param predicate: An optional function of an index. Nodes failing it are neither yielded nor
+      expanded, and so prune the subgraph only reachable through them.
+    :param edge_predicate: An optional function of a pair of indices. Edges failing it are not
+      followed, but their target may still be reached through another edge.
+    """
+    neighbors = self.dependees if dependees else self.dependencies
+    visited = bytearray(len(self._nodes))
+    for root in roots:
+      if visited[root]:
+        continue
+      visited[root] = 1
+      if predicate and not predicate(root):
+        continue
+      if not postorder:
+        yield root
+      stack = [(root, iter(neighbors(root)))]
+      while stack:
+        if len(visited) < len(self._nodes):
+          # Nodes were added while the walk was suspended.
+          visited.extend(bytearray(len(self._nodes) - len(visited)))
+        index, remaining = stack[-1]
+        for neighbor in remaining:
+          if visited[neighbor]:
+            continue
+          if edge_predicate and not edge_predicate(index, neighbor):
+            continue
+          visited[neighbor] = 1
+          if predicate and not predicate(neighbor):
+            continue
+          if not postorder:
+            yield neighbor
+          stack.append((neighbor, iter(neighbors(neighbor))))
+          break
+        else:
+          stack.pop()
+          if postorder:
+            yield index
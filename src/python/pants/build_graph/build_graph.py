@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import itertools
 import logging
+import threading
 from abc import abstractmethod
 from collections import OrderedDict, defaultdict, deque
 
@@ -15,6 +16,7 @@ from twitter.common.collections import OrderedSet
 from pants.base.deprecated import deprecated_conditional
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
+from pants.build_graph.adjacency_index import AdjacencyIndex
 from pants.build_graph.injectables_mixin import InjectablesMixin
 from pants.build_graph.target import Target
 from pants.util.meta import AbstractClass
@@ -23,6 +25,33 @@ from pants.util.meta import AbstractClass
 logger = logging.getLogger(__name__)
 
 
+class _ReadOnlyOrderedSet(OrderedSet):
+  """An `OrderedSet` that raises on modification, so that it can be shared between callers."""
+
+  def __init__(self, iterable):
+    self._read_only = False
+    super(_ReadOnlyOrderedSet, self).__init__(iterable)
+    self._read_only = True
+
+  def _check_writable(self):
+    if self._read_only:
+      raise TypeError('Memoized closures are shared and may not be modified: copy them with '
+                      '`OrderedSet(closure)` first.')
+
+  def add(self, key):
+    self._check_writable()
+    super(_ReadOnlyOrderedSet, self).add(key)
+
+  def discard(self, key):
+    self._check_writable()
+    super(_ReadOnlyOrderedSet, self).discard(key)
+
+  def __del__(self):
+    # OrderedSet clears itself to break its reference cycles.
+    self._read_only = False
+    super(_ReadOnlyOrderedSet, self).__del__()
+
+
 class BuildGraph(AbstractClass):
   """A directed acyclic graph of Targets and dependencies. Not necessarily connected.
 
@@ -114,6 +143,9 @@ class BuildGraph(AbstractClass):
     def dep_predicate(self, target, dep, level):
       return self._leveled_predicate(dep, level)
 
+  # The most targets that memoized closures hold in total.
+  CLOSURE_CACHE_MAX_TARGETS = 100000
+
   @staticmethod
   def closure(*vargs, **kwargs):
     """See `Target.closure_for_targets` for arguments.
@@ -149,6 +181,15 @@ class BuildGraph(AbstractClass):
     self._derived_from_by_derivative = {}  # Address -> Address.
     self._derivatives_by_derived_from = defaultdict(list)   # Address -> list of Address.
     self.synthetic_addresses = set()
+    # Built on demand by traversals, and kept up to date by `_add_dependency_edge`.
+    self._adjacency_index = None
+    # Memoized closures in least recently used order, cleared whenever a target or dependency is
+    # injected.
+    self._closure_cache = OrderedDict()
+    self._closure_cache_lock = threading.Lock()
+    self._closure_cache_targets = 0
+    self._closure_cache_hits = 0
+    self._closure_cache_misses = 0
 
   def contains_address(self, address):
     """
@@ -291,6 +332,7 @@ class BuildGraph(AbstractClass):
       self.synthetic_addresses.add(address)
 
     self._target_by_address[address] = target
+    self._clear_closure_cache()
 
     for dependency_address in dependencies:
       self.inject_dependency(dependent=address, dependency=dependency_address)
@@ -331,8 +373,96 @@ class BuildGraph(AbstractClass):
       logger.debug('{dependent} already depends on {dependency}'
                    .format(dependent=dependent, dependency=dependency))
     else:
-      self._target_dependencies_by_address[dependent].add(dependency)
-      self._target_dependees_by_address[dependency].add(dependent)
+      self._add_dependency_edge(dependent, dependency)
+
+  def _add_dependency_edge(self, dependent, dependency):
+    """Records that `dependent` depends on `dependency`, without any validation."""
+    self._target_dependencies_by_address[dependent].add(dependency)
+    self._target_dependees_by_address[dependency].add(dependent)
+    if self._adjacency_index is not None:
+      self._adjacency_index.add_edge(dependent, dependency)
+    self._clear_closure_cache()
+
+  def cached_closure(self, key, compute):
+    """Returns the closure memoized under `key`, calling `compute` to create it if needed.
+
+    The returned closure is shared by all callers, and so is read-only. Memoized closures are
+    dropped whenever a target or dependency is injected into the graph, and the least recently used
+    ones are dropped once they hold more than `CLOSURE_CACHE_MAX_TARGETS` targets in total.
+
+    :param key: A hashable identifying the roots of the closure and how it was computed.
+    :param compute: A function of no arguments returning the closure as an `OrderedSet`.
+    :rtype: :class:`twitter.common.collections.OrderedSet`
+    """
+    with self._closure_cache_lock:
+      closure = self._closure_cache.pop(key, None)
+      if closure is not None:
+        self._closure_cache_hits += 1
+        # Re-inserted as the most recently used.
+        self._closure_cache[key] = closure
+        return closure
+      self._closure_cache_misses += 1
+
+    closure = _ReadOnlyOrderedSet(compute())
+    if len(closure) > self.CLOSURE_CACHE_MAX_TARGETS:
+      return closure
+    with self._closure_cache_lock:
+      previous = self._closure_cache.pop(key, None)
+      if previous is not None:
+        self._closure_cache_targets -= len(previous)
+      self._closure_cache[key] = closure
+      self._closure_cache_targets += len(closure)
+      while self._closure_cache_targets > self.CLOSURE_CACHE_MAX_TARGETS:
+        _, evicted = self._closure_cache.popitem(last=False)
+        self._closure_cache_targets -= len(evicted)
+    return closure
+
+  def _clear_closure_cache(self):
+    with self._closure_cache_lock:
+      self._closure_cache.clear()
+      self._closure_cache_targets = 0
+
+  def closure_cache_stats(self):
+    """Returns a dict describing how often `cached_closure` found a memoized closure."""
+    lookups = self._closure_cache_hits + self._closure_cache_misses
+    return {
+      'hits': self._closure_cache_hits,
+      'misses': self._closure_cache_misses,
+      'hit_rate': self._closure_cache_hits / lookups if lookups else None,
+      'size': len(self._closure_cache),
+      'targets': self._closure_cache_targets,
+    }
+
+  def _get_adjacency_index(self):
+    """Returns the `AdjacencyIndex` of the graph, (re)building it if it is missing or sprawling."""
+    if self._adjacency_index is None or self._adjacency_index.needs_compaction:
+      self._adjacency_index = AdjacencyIndex(self._target_dependencies_by_address,
+                                             self._target_dependees_by_address)
+    return self._adjacency_index
+
+  def _walk_indexed(self, addresses, work, predicate=None, postorder=False, dependees=False,
+                    dep_predicate=None):
+    """Walks the transitive closure of `addresses` over the adjacency index.
+
+    See `walk_transitive_dependency_graph` for the meaning of the parameters.
+    """
+    index = self._get_adjacency_index()
+    target_by_address = self._target_by_address
+    roots = [index.index(address) for address in addresses]
+
+    def target_at(i):
+      return target_by_address[index.node(i)]
+
+    index_predicate = None
+    if predicate:
+      index_predicate = lambda i: predicate(target_at(i))
+    edge_predicate = None
+    if dep_predicate:
+      edge_predicate = lambda i, dep_i: dep_predicate(target_at(i), target_at(dep_i))
+
+    for i in index.walk(roots, dependees=dependees, postorder=postorder,
+                        predicate=index_predicate, edge_predicate=edge_predicate):
+      work(target_at(i))
 
   def targets(self, predicate=None):
     """Returns all the targets in the graph in no particular order.
@@ -404,6 +534,11 @@ class BuildGraph(AbstractClass):
       target in the search tree as a second parameter, and it is checked just before a dependency is
       expanded.
     """
+    if not leveled_predicate:
+      # Walks that don't depend on the level of a target run iteratively over the adjacency index.
+      self._walk_indexed(addresses, work, predicate=predicate, postorder=postorder,
+                         dep_predicate=dep_predicate)
+      return
     walk = self._walk_factory(dep_predicate, leveled_predicate)
 
     def _walk_rec(addr, level=0):
@@ -440,21 +575,7 @@ class BuildGraph(AbstractClass):
 
     :API: public
     """
-    walked = set()
-
-    def _walk_rec(addr):
-      if addr not in walked:
-        walked.add(addr)
-        target = self._target_by_address[addr]
-        if not predicate or predicate(target):
-          if not postorder:
-            work(target)
-          for dep_address in self._target_dependees_by_address[addr]:
-            _walk_rec(dep_address)
-          if postorder:
-            work(target)
-    for address in addresses:
-      _walk_rec(address)
+    self._walk_indexed(addresses, work, predicate=predicate, postorder=postorder, dependees=True)
 
   def transitive_dependees_of_addresses(self, addresses, predicate=None, postorder=False):
     """Returns all transitive dependees of `address`.
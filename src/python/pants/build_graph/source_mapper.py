@@ -8,7 +8,10 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 from collections import defaultdict
 
+from twitter.common.collections import OrderedSet
+
 from pants.build_graph.build_file_address_mapper import BuildFileAddressMapper
+from pants.source.filespec import FilespecMatcher, ancestor_dirs
 
 
 class SourceMapper(object):
@@ -18,6 +21,43 @@ class SourceMapper(object):
     raise NotImplementedError
 
 
+class SourceOwnerIndex(object):
+  """A reverse index from source paths to the owners whose filespecs match them.
+
+  Each owner is filed under the literal directory prefixes of its globs, so looking up a path only
+  tests the owners filed under the path's ancestor directories, each with a precompiled
+  `FilespecMatcher`, rather than every owner's every glob.
+  """
+
+  def __init__(self):
+    self._owners_by_dir = defaultdict(list)
+
+  def add(self, owner, filespec):
+    """Indexes `owner` as owning the paths matched by `filespec`.
+
+    :param owner: The owner, typically an address.
+    :param dict filespec: A filespec as generated by `FilesetRelPathWrapper`.
+    """
+    matcher = FilespecMatcher.for_filespec(filespec)
+    for literal_dir in matcher.literal_dirs:
+      self._owners_by_dir[literal_dir].append((owner, matcher))
+
+  def owners_of(self, path):
+    """Returns the owners of `path`.
+
+    Owners filed under nearer ancestor directories of `path` come first, and otherwise owners come
+    in the order they were added.
+
+    :rtype: :class:`twitter.common.collections.OrderedSet`
+    """
+    owners = OrderedSet()
+    for directory in ancestor_dirs(path):
+      for owner, matcher in self._owners_by_dir.get(directory, ()):
+        if owner not in owners and matcher.matches(path):
+          owners.add(owner)
+    return owners
+
+
 # TODO: Kill this in favor of `EngineSourceMapper` once pants/backend/graph_info/tasks/list_owners.py
 # (which consumes LazySourceMapper) is ported to the v2 engine.
 class SpecSourceMapper(SourceMapper):
@@ -101,7 +141,7 @@ class LazySourceMapper(SourceMapper):
     self._stop_after_match = stop_after_match
     self._build_graph = build_graph
     self._address_mapper = address_mapper
-    self._source_to_address = defaultdict(set)
+    self._index = SourceOwnerIndex()
     self._mapped_paths = set()
     self._searched_sources = set()
 
@@ -137,7 +177,7 @@ class LazySourceMapper(SourceMapper):
         return
 
       # See class docstring
-      if self._stop_after_match and source in self._source_to_address:
+      if self._stop_after_match and self._index.owners_of(source):
         return
 
       walking = bool(path)
@@ -146,6 +186,8 @@ class LazySourceMapper(SourceMapper):
   def _map_sources_from_spec_path(self, spec_path):
     """Populate mapping of source to owning addresses with targets from given BUILD files.
 
+    Sources are indexed by their filespecs, so that their globs need not be expanded.
+
     :param spec_path: a spec_path of targets from which to map sources.
     """
     for address in self._address_mapper.addresses_in_spec_path(spec_path):
@@ -153,13 +195,16 @@ class LazySourceMapper(SourceMapper):
       target = self._build_graph.get_target(address)
       if target.has_resources:
         for resource in target.resources:
-          for item in resource.sources_relative_to_buildroot():
-            self._source_to_address[item].add(address)
+          self._index_sources(address, resource)
 
-      for target_source in target.sources_relative_to_buildroot():
-        self._source_to_address[target_source].add(address)
+      self._index_sources(address, target)
       if not target.is_synthetic:
-        self._source_to_address[address.rel_path].add(address)
+        self._index.add(address, {'globs': [address.rel_path]})
+
+  def _index_sources(self, address, target):
+    sources_field = target.payload.get_field('sources')
+    if sources_field:
+      self._index.add(address, sources_field.filespec)
 
   def target_addresses_for_source(self, source):
     """Attempt to find targets which own a source by searching up directory structure to buildroot.
@@ -167,4 +212,4 @@ class LazySourceMapper(SourceMapper):
     :param string source: The source to look up.
     """
     self._find_owners(source)
-    return self._source_to_address[source]
+    return set(self._index.owners_of(source))
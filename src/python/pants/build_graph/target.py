@@ -255,6 +255,8 @@ class Target(AbstractTarget):
     :param bool respect_intransitive: If True, any dependencies which have the 'intransitive' scope
       will not be included unless they are direct dependencies of one of the root targets. (Defaults
       to False).
+    :returns: The closure, which is memoized and shared with other callers, and so is read-only.
+    :rtype: :class:`twitter.common.collections.OrderedSet`
     """
     target_roots = list(target_roots) # Sometimes generators are passed into this function.
     if not target_roots:
@@ -262,28 +264,34 @@ class Target(AbstractTarget):
 
     build_graph = target_roots[0]._build_graph
     addresses = [target.address for target in target_roots]
-    dep_predicate = cls._closure_dep_predicate(target_roots,
-                                               include_scopes=include_scopes,
-                                               exclude_scopes=exclude_scopes,
-                                               respect_intransitive=respect_intransitive)
-    closure = OrderedSet()
-
-    if not bfs:
-      build_graph.walk_transitive_dependency_graph(
-        addresses=addresses,
-        work=closure.add,
-        postorder=postorder,
-        dep_predicate=dep_predicate,
-      )
-    else:
-      closure.update(build_graph.transitive_subgraph_of_addresses_bfs(
-        addresses=addresses,
-        dep_predicate=dep_predicate,
-      ))
 
-    # Make sure all the roots made it into the closure.
-    closure.update(target_roots)
-    return closure
+    def compute_closure():
+      dep_predicate = cls._closure_dep_predicate(target_roots,
+                                                 include_scopes=include_scopes,
+                                                 exclude_scopes=exclude_scopes,
+                                                 respect_intransitive=respect_intransitive)
+      closure = OrderedSet()
+
+      if not bfs:
+        build_graph.walk_transitive_dependency_graph(
+          addresses=addresses,
+          work=closure.add,
+          postorder=postorder,
+          dep_predicate=dep_predicate,
+        )
+      else:
+        closure.update(build_graph.transitive_subgraph_of_addresses_bfs(
+          addresses=addresses,
+          dep_predicate=dep_predicate,
+        ))
+
+      # Make sure all the roots made it into the closure.
+      closure.update(target_roots)
+      return closure
+
+    key = (tuple(addresses), exclude_scopes, include_scopes, bool(bfs), bool(postorder),
+           bool(respect_intransitive))
+    return build_graph.cached_closure(key, compute_closure)
 
   def __init__(self, name, address, build_graph, type_alias=None, payload=None, tags=None,
                description=None, no_cache=False, scope=None, _transitive=None,
@@ -476,6 +484,42 @@ class Target(AbstractTarget):
       fingerprint_map[fingerprint_strategy] = combined_hash
     return fingerprint_map[fingerprint_strategy]
 
+  @classmethod
+  def compute_transitive_invalidation_hashes(cls, targets, fingerprint_strategy=None):
+    """Computes the `transitive_invalidation_hash` of each of `targets` in one pass.
+
+    The dependency closure of the targets is hashed in a single iterative post-order walk, so each
+    target is hashed once, after all of its dependencies, and no hashing recurses. The hashes are
+    memoized on each target exactly as `transitive_invalidation_hash` would memoize them, so deep
+    graphs don't hit the recursion limit.
+
+    :API: public
+
+    :param list targets: The targets to hash.
+    :param FingerprintStrategy fingerprint_strategy: optional fingerprint strategy to use to compute
+    the fingerprints
+    :return: A list of the targets' transitive invalidation hashes, in the order of `targets`.
+    """
+    fingerprint_strategy = fingerprint_strategy or DefaultFingerprintStrategy()
+    visited = set()
+    for root in targets:
+      if fingerprint_strategy.direct(root):
+        # Only the dependencies' own hashes contribute, and those are memoized anyway.
+        continue
+      # Pairs of (target, whether its dependencies have been pushed already).
+      stack = [(root, False)]
+      while stack:
+        target, expanded = stack.pop()
+        if expanded:
+          # NB: A non-zero depth hashes the target as a dependency. That is also how a non-direct
+          # root is hashed, so the root's memoized hash is shared.
+          target.transitive_invalidation_hash(fingerprint_strategy, depth=1)
+        elif target not in visited:
+          visited.add(target)
+          stack.append((target, True))
+          stack.extend((dep, False) for dep in target.dependencies if dep not in visited)
+    return [t.transitive_invalidation_hash(fingerprint_strategy) for t in targets]
+
   def mark_transitive_invalidation_hash_dirty(self):
     """
     :API: public
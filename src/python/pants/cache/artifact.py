@@ -9,9 +9,16 @@ import errno
 import os
 import shutil
 import tarfile
+import time
+from collections import deque
 
-from pants.util.contextutil import open_tar
-from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_walk
+from concurrent.futures import ThreadPoolExecutor
+
+from pants.cache.artifact_codec import (MAX_MAGIC_LENGTH, UnsupportedCodecError, codec_for_file,
+                                        codec_for_header, codec_for_name)
+from pants.cache.cache_timings import CacheTimings
+from pants.util.contextutil import Timer
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_mkdir_for, safe_walk
 
 
 class ArtifactError(Exception):
@@ -81,58 +88,213 @@ class DirectoryArtifact(Artifact):
 
 
 class TarballArtifact(Artifact):
-  """An artifact stored in a tarball."""
+  """An artifact stored in a tarball.
+
+  The tarball is compressed with the given codec when collected. When extracted, the codec is
+  detected from the tarball's leading bytes, so artifacts written with any codec can be read.
+  """
+
+  DEFAULT_EXTRACT_WORKERS = 4
 
   # TODO: Expose `dereference` for tasks.
   # https://github.com/pantsbuild/pants/issues/3961
-  def __init__(self, artifact_root, tarfile_, compression=9, dereference=True):
+  def __init__(self, artifact_root, tarfile_, compression=9, dereference=True, codec='gzip',
+               extract_workers=DEFAULT_EXTRACT_WORKERS):
+    """
+    :param str artifact_root: The path under which the artifact's files live.
+    :param str tarfile_: The path of the tarball.
+    :param int compression: The compression level for the codec, if it has levels.
+    :param bool dereference: Dereference symlinks when collecting.
+    :param str codec: The name of the `ArtifactCodec` to write with.
+    :param int extract_workers: The number of threads writing out files during extraction.
+    """
     super(TarballArtifact, self).__init__(artifact_root)
     self._tarfile = tarfile_
     self._compression = compression
     self._dereference = dereference
+    self._codec = codec
+    self._extract_workers = extract_workers
 
   def exists(self):
     return os.path.isfile(self._tarfile)
 
   def collect(self, paths):
     # In our tests, gzip is slightly less compressive than bzip2 on .class files,
-    # but decompression times are much faster.
-    mode = 'w:gz'
+    # but decompression times are much faster. The lz4 and zstd codecs are faster still.
+    codec = codec_for_name(self._codec)
 
-    tar_kwargs = {'dereference': self._dereference, 'errorlevel': 2, 'compresslevel': self._compression}
+    tar_kwargs = {'dereference': self._dereference, 'errorlevel': 2}
 
-    with open_tar(self._tarfile, mode, **tar_kwargs) as tarout:
-      for path in paths or ():
-        # Adds dirs recursively.
-        relpath = os.path.relpath(path, self._artifact_root)
-        tarout.add(path, relpath)
-        self._relpaths.add(relpath)
+    with Timer() as timer:
+      with codec.open_write(self._tarfile, self._compression, **tar_kwargs) as tarout:
+        for path in paths or ():
+          # Adds dirs recursively.
+          relpath = os.path.relpath(path, self._artifact_root)
+          tarout.add(path, relpath)
+          self._relpaths.add(relpath)
+    CacheTimings.recorder().record('collect', timer.elapsed, os.path.getsize(self._tarfile))
 
   def extract(self):
     try:
-      with open_tar(self._tarfile, 'r', errorlevel=2) as tarin:
-        # Note: We create all needed paths proactively, even though extractall() can do this for us.
-        # This is because we may be called concurrently on multiple artifacts that share directories,
-        # and there will be a race condition inside extractall(): task T1 A) sees that a directory
-        # doesn't exist and B) tries to create it. But in the gap between A) and B) task T2 creates
-        # the same directory, so T1 throws "File exists" in B).
-        # This actually happened, and was very hard to debug.
-        # Creating the paths here up front allows us to squelch that "File exists" error.
-        paths = []
-        dirs = set()
-        for tarinfo in tarin.getmembers():
+      with Timer() as timer:
+        codec = codec_for_file(self._tarfile)
+        with codec.open_read(self._tarfile, errorlevel=2) as tarin:
+          write_wait_secs = self._extract_members(tarin)
+    except (tarfile.TarError, UnsupportedCodecError) as e:
+      raise ArtifactError(str(e))
+    recorder = CacheTimings.recorder()
+    recorder.record('extract', timer.elapsed, os.path.getsize(self._tarfile))
+    recorder.record('extract.write_wait', write_wait_secs)
+
+  def extract_stream(self, chunks, tee=None):
+    """Extract the tarball from an iterator of byte chunks as they arrive, without staging it.
+
+    This tarball's path is not read: it is up to the caller to store the tarball if desired.
+
+    :param chunks: An iterator over the binary data of the tarball.
+    :param tee: An optional file object to which all of the tarball's bytes are also written.
+    """
+    stream = _ChunkStream(chunks, tee=tee)
+    try:
+      with Timer() as timer:
+        codec = codec_for_header(stream.peek(MAX_MAGIC_LENGTH))
+        with codec.open_stream_read(stream, errorlevel=2) as tarin:
+          write_wait_secs = self._extract_members(tarin)
+        # Consume any trailing padding, so that the teed tarball is complete.
+        stream.drain()
+    except (tarfile.TarError, UnsupportedCodecError) as e:
+      raise ArtifactError(str(e))
+    recorder = CacheTimings.recorder()
+    recorder.record('extract', timer.elapsed, stream.bytes_read)
+    # The part of the extraction spent waiting for the tarball's bytes to arrive.
+    recorder.record('extract.fetch', stream.fetch_secs, stream.bytes_read)
+    recorder.record('extract.write_wait', write_wait_secs)
+
+  def _extract_members(self, tarin):
+    """Extract the members of the given stream mode `TarFile`, writing files from a thread pool.
+
+    Member data is read from the archive on this thread, since a tar stream can only be consumed
+    in order, and then handed to the pool to be written out.
+
+    :returns: The number of seconds this thread spent waiting for the pool to write files.
+    """
+    paths = []
+    directories = []
+    created_dirs = set()
+
+    def ensure_dir(relpath):
+      # Note: We create all needed paths proactively, even though tarfile can do this for us.
+      # This is because we may be called concurrently on multiple artifacts that share directories,
+      # and there will be a race condition inside extract(): task T1 A) sees that a directory
+      # doesn't exist and B) tries to create it. But in the gap between A) and B) task T2 creates
+      # the same directory, so T1 throws "File exists" in B).
+      # This actually happened, and was very hard to debug.
+      # Creating the paths here ahead of each member allows us to squelch that "File exists" error.
+      if relpath not in created_dirs:
+        created_dirs.add(relpath)
+        try:
+          os.makedirs(os.path.join(self._artifact_root, relpath))
+        except OSError as e:
+          if e.errno != errno.EEXIST:
+            raise
+
+    # Bound the number of member payloads held in memory while waiting to be written.
+    max_pending = max(1, self._extract_workers) * 4
+    pending = deque()
+    write_wait = [0.0]
+
+    def wait_for(num_pending):
+      if len(pending) <= num_pending:
+        return
+      start = time.time()
+      while len(pending) > num_pending:
+        pending.popleft().result()
+      write_wait[0] += time.time() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, self._extract_workers)) as executor:
+      try:
+        for tarinfo in tarin:
           paths.append(tarinfo.name)
           if tarinfo.isdir():
-            dirs.add(tarinfo.name)
+            ensure_dir(tarinfo.name)
+            directories.append(tarinfo)
+            continue
+          ensure_dir(os.path.dirname(tarinfo.name))
+          if tarinfo.isreg():
+            data = tarin.extractfile(tarinfo).read()
+            pending.append(executor.submit(self._write_member, tarin, tarinfo, data))
+            wait_for(max_pending)
           else:
-            dirs.add(os.path.dirname(tarinfo.name))
-        for d in dirs:
-          try:
-            os.makedirs(os.path.join(self._artifact_root, d))
-          except OSError as e:
-            if e.errno != errno.EEXIST:
-              raise
-        tarin.extractall(self._artifact_root)
-        self._relpaths.update(paths)
-    except tarfile.ReadError as e:
-      raise ArtifactError(str(e))
+            # Links may refer to files still being written, so settle those first.
+            wait_for(0)
+            tarin.extract(tarinfo, self._artifact_root)
+      finally:
+        wait_for(0)
+
+    # As in `TarFile.extractall`, set directory attributes last, deepest first, so that creating
+    # their contents doesn't clobber them.
+    for tarinfo in sorted(directories, key=lambda t: t.name, reverse=True):
+      dirpath = os.path.join(self._artifact_root, tarinfo.name)
+      tarin.chown(tarinfo, dirpath)
+      tarin.utime(tarinfo, dirpath)
+      tarin.chmod(tarinfo, dirpath)
+
+    self._relpaths.update(paths)
+    return write_wait[0]
+
+  def _write_member(self, tarin, tarinfo, data):
+    path = os.path.join(self._artifact_root, tarinfo.name)
+    # Replace rather than overwrite, in case the existing file is a link into some other location.
+    safe_delete(path)
+    with open(path, 'wb') as outfile:
+      outfile.write(data)
+    tarin.chown(tarinfo, path)
+    tarin.chmod(tarinfo, path)
+    tarin.utime(tarinfo, path)
+
+
+class _ChunkStream(object):
+  """A read-only file-like view of an iterator of byte chunks."""
+
+  def __init__(self, chunks, tee=None):
+    self._chunks = iter(chunks)
+    self._tee = tee
+    self._buffer = b''
+    self._position = 0
+    # The number of bytes pulled from the chunk iterator, and the time spent waiting on it.
+    self.bytes_read = 0
+    self.fetch_secs = 0.0
+
+  def _fill(self, size):
+    """Buffer at least `size` unread bytes, if available. A negative size buffers everything."""
+    while size < 0 or len(self._buffer) - self._position < size:
+      start = time.time()
+      try:
+        chunk = next(self._chunks)
+      except StopIteration:
+        return
+      finally:
+        self.fetch_secs += time.time() - start
+      self.bytes_read += len(chunk)
+      if self._tee is not None:
+        self._tee.write(chunk)
+      self._buffer = self._buffer[self._position:] + chunk
+      self._position = 0
+
+  def peek(self, size):
+    self._fill(size)
+    return self._buffer[self._position:self._position + size]
+
+  def read(self, size=-1):
+    self._fill(size)
+    if size < 0:
+      end = len(self._buffer)
+    else:
+      end = self._position + size
+    data = self._buffer[self._position:end]
+    self._position += len(data)
+    return data
+
+  def drain(self):
+    for _ in iter(lambda: self.read(64 * 1024), b''):
+      pass
@@ -114,6 +114,20 @@ class ArtifactCache(object):
   def has(self, cache_key):
     pass
 
+  def prefetch(self, cache_keys):
+    """Start fetching the artifacts for the given keys ahead of calls to `use_cached_files`.
+
+    This is a best-effort optimization for caches that are slow to read from: the fetches proceed
+    in the background and store artifacts locally, so that `use_cached_files` calls for them are
+    local hits. Caches that are already local need not do anything.
+
+    :param list cache_keys: A list of CacheKey objects.
+    :returns: An iterator of `(cache_key, present)` pairs, in the order the fetches complete.
+              `present` is `True` if the artifact is now local, `False` if the cache has no
+              artifact for the key, and `None` if that is not known.
+    """
+    return iter([(cache_key, None) for cache_key in cache_keys])
+
   def use_cached_files(self, cache_key, results_dir=None):
     """Use the files cached for the given key.
 
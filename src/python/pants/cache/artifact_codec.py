@@ -0,0 +1,209 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import importlib
+from contextlib import contextmanager
+
+from pants.util.contextutil import open_tar
+from pants.util.memo import memoized_method
+
+
+class UnsupportedCodecError(Exception):
+  """Indicates that a codec is unknown, or that its optional dependency is not installed."""
+
+
+class ArtifactCodec(object):
+  """The compression format of a tarball artifact.
+
+  Codecs are identified on read by the magic bytes that begin an artifact, so artifacts written
+  with different codecs can live side by side in the same cache.
+  """
+
+  # The name used to select the codec in options.
+  name = None
+
+  # The bytes every artifact written by this codec starts with.
+  magic = None
+
+  # The python module providing the (de)compressor, if it is not part of the standard library.
+  module_name = None
+
+  @classmethod
+  @memoized_method
+  def module(cls):
+    if not cls.module_name:
+      return None
+    try:
+      return importlib.import_module(cls.module_name)
+    except ImportError:
+      return None
+
+  @classmethod
+  def is_available(cls):
+    return cls.module_name is None or cls.module() is not None
+
+  @classmethod
+  def matches(cls, header):
+    return cls.magic is not None and header.startswith(cls.magic)
+
+  @classmethod
+  def open_write(cls, path, compression, **tar_kwargs):
+    """A with-context yielding a `TarFile` that writes a new artifact to `path`.
+
+    :param str path: The path of the artifact to create.
+    :param int compression: The compression level to use, for codecs that have one.
+    """
+    raise NotImplementedError()
+
+  @classmethod
+  @contextmanager
+  def open_read(cls, path, **tar_kwargs):
+    """A with-context yielding a stream mode `TarFile` that reads the artifact at `path`.
+
+    Members of the yielded `TarFile` can only be visited once, in order.
+    """
+    with open(path, 'rb') as infile:
+      with cls.open_stream_read(infile, **tar_kwargs) as tarin:
+        yield tarin
+
+  @classmethod
+  def open_stream_read(cls, fileobj, **tar_kwargs):
+    """A with-context yielding a stream mode `TarFile` that reads an artifact from `fileobj`.
+
+    :param fileobj: A file-like object that need only support `read`.
+    """
+    raise NotImplementedError()
+
+
+class GzipCodec(ArtifactCodec):
+  """Gzip compression: slow to write at high levels, but compact and universally readable."""
+
+  name = 'gzip'
+  magic = b'\x1f\x8b'
+
+  @classmethod
+  def open_write(cls, path, compression, **tar_kwargs):
+    return open_tar(path, 'w:gz', compresslevel=compression, **tar_kwargs)
+
+  @classmethod
+  def open_stream_read(cls, fileobj, **tar_kwargs):
+    return open_tar(fileobj, 'r|gz', **tar_kwargs)
+
+
+class UncompressedCodec(ArtifactCodec):
+  """A plain tar: larger artifacts, but no compression cost at all.
+
+  Tar archives have no leading magic bytes, so this is also the fallback when no codec matches.
+  """
+
+  name = 'none'
+
+  @classmethod
+  def open_write(cls, path, compression, **tar_kwargs):
+    return open_tar(path, 'w:', **tar_kwargs)
+
+  @classmethod
+  def open_stream_read(cls, fileobj, **tar_kwargs):
+    return open_tar(fileobj, 'r|', **tar_kwargs)
+
+
+class _StreamCodec(ArtifactCodec):
+  """A codec that wraps a streaming tar in a compressed file object from an optional module."""
+
+  @classmethod
+  def _compressed_writer(cls, fileobj, compression):
+    raise NotImplementedError()
+
+  @classmethod
+  def _decompressed_reader(cls, fileobj):
+    raise NotImplementedError()
+
+  @classmethod
+  @contextmanager
+  def open_write(cls, path, compression, **tar_kwargs):
+    with open(path, 'wb') as outfile:
+      with cls._compressed_writer(outfile, compression) as compressed:
+        with open_tar(compressed, 'w|', **tar_kwargs) as tarout:
+          yield tarout
+
+  @classmethod
+  @contextmanager
+  def open_stream_read(cls, fileobj, **tar_kwargs):
+    with cls._decompressed_reader(fileobj) as decompressed:
+      with open_tar(decompressed, 'r|', **tar_kwargs) as tarin:
+        yield tarin
+
+
+class Lz4Codec(_StreamCodec):
+  """LZ4 frame compression: several times faster than gzip, at some cost in size."""
+
+  name = 'lz4'
+  magic = b'\x04\x22\x4d\x18'
+  module_name = 'lz4.frame'
+
+  @classmethod
+  def _compressed_writer(cls, fileobj, compression):
+    return cls.module().LZ4FrameFile(fileobj, mode='wb', compression_level=compression)
+
+  @classmethod
+  def _decompressed_reader(cls, fileobj):
+    return cls.module().LZ4FrameFile(fileobj, mode='rb')
+
+
+class ZstdCodec(_StreamCodec):
+  """Zstandard compression: close to gzip's size at much higher speeds."""
+
+  name = 'zstd'
+  magic = b'\x28\xb5\x2f\xfd'
+  module_name = 'zstandard'
+
+  @classmethod
+  def _compressed_writer(cls, fileobj, compression):
+    return cls.module().ZstdCompressor(level=compression).stream_writer(fileobj)
+
+  @classmethod
+  def _decompressed_reader(cls, fileobj):
+    return cls.module().ZstdDecompressor().stream_reader(fileobj)
+
+
+CODECS = (GzipCodec, Lz4Codec, ZstdCodec, UncompressedCodec)
+
+CODEC_NAMES = tuple(codec.name for codec in CODECS)
+
+MAX_MAGIC_LENGTH = max(len(codec.magic or b'') for codec in CODECS)
+
+
+def codec_for_name(name):
+  """Returns the codec with the given name.
+
+  :raises: `UnsupportedCodecError` if the codec is unknown or its dependency is missing.
+  """
+  for codec in CODECS:
+    if codec.name == name:
+      if not codec.is_available():
+        raise UnsupportedCodecError('The {} artifact codec requires the `{}` module.'
+                                    .format(name, codec.module_name))
+      return codec
+  raise UnsupportedCodecError('Unknown artifact codec {}, must be one of {}.'
+                              .format(name, ', '.join(CODEC_NAMES)))
+
+
+def codec_for_header(header):
+  """Returns the codec able to read an artifact that starts with the given bytes."""
+  for codec in CODECS:
+    if codec.matches(header):
+      if not codec.is_available():
+        raise UnsupportedCodecError('Reading a {} artifact requires the `{}` module.'
+                                    .format(codec.name, codec.module_name))
+      return codec
+  return UncompressedCodec
+
+
+def codec_for_file(path):
+  """Returns the codec able to read the artifact at `path`."""
+  with open(path, 'rb') as infile:
+    return codec_for_header(infile.read(MAX_MAGIC_LENGTH))
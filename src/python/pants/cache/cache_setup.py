@@ -13,11 +13,17 @@ from collections import namedtuple
 from six.moves import range
 
 from pants.base.build_environment import get_buildroot
+from pants.cache.artifact import TarballArtifact
 from pants.cache.artifact_cache import ArtifactCacheError
+from pants.cache.artifact_codec import CODEC_NAMES, codec_for_name
+from pants.cache.content_addressed_artifact_cache import BlobStore, ContentAddressedArtifactCache
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
+from pants.cache.local_cache_eviction import LocalCacheEvictor
 from pants.cache.pinger import BestUrlSelector, Pinger
+from pants.cache.requests_session import RequestsSession
 from pants.cache.resolver import NoopResolver, Resolver, RESTfulResolver
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.cache.write_behind import WriteBehindQueue
 from pants.subsystem.subsystem import Subsystem
 from pants.util.memo import memoized_property
 
@@ -75,7 +81,15 @@ class CacheSetup(Subsystem):
                   'alternate caches to choose from. This list is also used as input to '
                   'the resolver. When resolver is \'none\' list is used as is.')
     register('--compression-level', advanced=True, type=int, default=5,
-             help='The gzip compression level (0-9) for created artifacts.')
+             help='The compression level (1-9) for created artifacts.')
+    register('--compression-codec', advanced=True, choices=list(CODEC_NAMES), default='gzip',
+             help='The compression codec for created artifacts. lz4 and zstd require the `lz4` '
+                  'and `zstandard` python modules, respectively. Artifacts are read with '
+                  'whichever codec created them, so the codec can be changed without '
+                  'invalidating existing caches.')
+    register('--extract-workers', advanced=True, type=int,
+             default=TarballArtifact.DEFAULT_EXTRACT_WORKERS,
+             help='Number of threads writing out files while extracting each artifact.')
     register('--dereference-symlinks', type=bool, default=True, fingerprint=True,
              help='Dereference symlinks when creating cache tarball.')
     register('--max-entries-per-target', advanced=True, type=int, default=8,
@@ -86,6 +100,47 @@ class CacheSetup(Subsystem):
              help='number of times pinger tries a cache')
     register('--write-permissions', advanced=True, type=str, default=None,
              help='Permissions to use when writing artifacts to a local cache, in octal.')
+    register('--prefetch', advanced=True, type=bool, default=True,
+             help='Before reading artifacts from a remote cache, concurrently fetch all of them '
+                  'into the local cache, if one is configured.')
+    register('--max-concurrent-requests', advanced=True, type=int,
+             default=RESTfulArtifactCache.DEFAULT_MAX_CONCURRENT_REQUESTS,
+             help='Maximum number of concurrent requests to a remote cache for bulk operations '
+                  'such as prefetching. This many connections per remote host are kept alive '
+                  'for reuse.')
+    register('--http2', advanced=True, type=bool, default=False,
+             help='Multiplex requests to https remote caches over HTTP/2 connections. Requires '
+                  'the `hyper` python module.')
+    register('--write-behind', advanced=True, type=bool, default=False,
+             help='Upload artifacts to remote caches in the background, rather than before the '
+                  'targets that produced them are considered done. Artifacts waiting for upload '
+                  'are kept in the workdir, and any not uploaded by the end of the run (see '
+                  '--write-behind-deadline) are uploaded by a later one.')
+    register('--write-behind-deadline', advanced=True, type=float, default=30.0,
+             help='Number of seconds to wait at the end of a run for background uploads to '
+                  'remote caches to finish.')
+    register('--local-store', advanced=True, choices=['tarball', 'content-addressed'],
+             default='tarball',
+             help='How local caches store artifacts. tarball: one compressed tarball per cache '
+                  'key. content-addressed: a per cache key manifest referencing file content '
+                  'that is stored once, and shared by all tasks using the same cache path.')
+    register('--local-store-link-mode', advanced=True, choices=list(BlobStore.LINK_MODES),
+             default='reflink',
+             help='How files from a content-addressed local cache are placed into the workdir. '
+                  'reflink and hardlink fall back to copy when unsupported by the filesystem. '
+                  'Hardlinked outputs must never be modified in place.')
+    register('--local-store-gc-interval', advanced=True, type=int, default=3600,
+             help='Minimum number of seconds between garbage collections of unreferenced '
+                  'content in a content-addressed local cache. 0 disables collection.')
+    register('--max-local-size', advanced=True, type=int, default=None,
+             help='Maximum total number of bytes stored under each local cache path, across all '
+                  'tasks. Least recently used artifacts are evicted beyond this size.')
+    register('--max-local-entry-age', advanced=True, type=int, default=None,
+             help='Number of seconds after which an unused local cache artifact is evicted.')
+    register('--local-eviction-interval', advanced=True, type=int, default=600,
+             help='Minimum number of seconds between enforcements of --max-local-size and '
+                  '--max-local-entry-age triggered by cache writes. 0 leaves enforcement to the '
+                  'prune-cache goal.')
 
   @classmethod
   def create_cache_factory_for_task(cls, task, **kwargs):
@@ -109,6 +164,10 @@ class CacheFactory(object):
     self._log = log
     self._task = task
 
+    # All remote cache traffic shares one connection pool, sized to the largest request fan-out.
+    RequestsSession.configure(pool_size=self._options.max_concurrent_requests,
+                              http2=self._options.http2)
+
     # Created on-demand.
     self._read_cache = None
     self._write_cache = None
@@ -154,6 +213,34 @@ class CacheFactory(object):
   def overwrite(self):
     return self._options.overwrite
 
+  def prefetch(self):
+    return self._options.prefetch
+
+  def local_cache_paths(self):
+    """Returns the local cache paths configured for reading or writing, in order."""
+    paths = []
+    for spec in self._options.read_from + self._options.write_to:
+      for path in spec.split('|'):
+        if self.is_local(path) and path not in paths:
+          paths.append(path)
+    return paths
+
+  def create_local_evictor(self, path):
+    """Returns a `LocalCacheEvictor` enforcing the configured budget on the local cache `path`."""
+    return LocalCacheEvictor(path,
+                             max_bytes=self._options.max_local_size,
+                             max_age_secs=self._options.max_local_entry_age)
+
+  def _write_behind_spill(self):
+    """Returns the `WriteBehindSpill` for remote caches to hand uploads to, if enabled."""
+    if not self._options.write_behind:
+      return None
+    spill_dir = os.path.join(self._options.pants_workdir, 'write_behind')
+    queue = WriteBehindQueue.for_dir(spill_dir,
+                                     max_concurrent_uploads=self._options.max_concurrent_requests,
+                                     deadline_secs=self._options.write_behind_deadline)
+    return queue.spill
+
   def get_read_cache(self):
     """Returns the read cache for this setup, creating it if necessary.
 
@@ -175,7 +262,8 @@ class CacheFactory(object):
       cache_spec = self._resolve(self._sanitize_cache_spec(self._options.write_to))
       if cache_spec:
         with self._cache_setup_lock:
-          self._write_cache = self._do_create_artifact_cache(cache_spec, 'will write to')
+          self._write_cache = self._do_create_artifact_cache(cache_spec, 'will write to',
+                                                             write_behind=True)
     return self._write_cache
 
   # VisibleForTesting
@@ -256,7 +344,7 @@ class CacheFactory(object):
 
     return available_urls
 
-  def _do_create_artifact_cache(self, spec, action):
+  def _do_create_artifact_cache(self, spec, action, write_behind=False):
     """Returns an artifact cache for the specified spec.
 
     spec can be:
@@ -264,21 +352,51 @@ class CacheFactory(object):
       - a URL of a RESTful cache root.
       - a bar-separated list of URLs, where we'll pick the one with the best ping times.
       - A list or tuple of two specs, local, then remote, each as described above
+
+    If `write_behind` is set and enabled by options, a remote cache uploads in the background.
     """
     compression = self._options.compression_level
     if compression not in range(1, 10):
       raise ValueError('compression_level must be an integer 1-9: {}'.format(compression))
+    codec = self._options.compression_codec
+    # Fail fast if the codec's optional dependency is missing.
+    codec_for_name(codec)
+    extract_workers = self._options.extract_workers
 
     artifact_root = self._options.pants_workdir
+    eviction_interval = self._options.local_eviction_interval
 
     def create_local_cache(parent_path):
+      evictor = self.create_local_evictor(parent_path)
+      if not evictor.enabled:
+        evictor = None
+      if self._options.local_store == 'content-addressed':
+        cas_root = os.path.join(parent_path, ContentAddressedArtifactCache.CAS_DIRNAME)
+        self._log.debug('{0} {1} content-addressed local artifact cache at {2}'
+                        .format(self._task.stable_name(), action, cas_root))
+        return ContentAddressedArtifactCache(artifact_root, cas_root, self._cache_dirname,
+                                             compression,
+                                             self._options.max_entries_per_target,
+                                             permissions=self._options.write_permissions,
+                                             dereference=self._options.dereference_symlinks,
+                                             link_mode=self._options.local_store_link_mode,
+                                             gc_interval_secs=self._options.local_store_gc_interval,
+                                             codec=codec,
+                                             extract_workers=extract_workers,
+                                             evictor=evictor,
+                                             eviction_interval_secs=eviction_interval)
+
       path = os.path.join(parent_path, self._cache_dirname)
       self._log.debug('{0} {1} local artifact cache at {2}'
                       .format(self._task.stable_name(), action, path))
       return LocalArtifactCache(artifact_root, path, compression,
                                 self._options.max_entries_per_target,
                                 permissions=self._options.write_permissions,
-                                dereference=self._options.dereference_symlinks)
+                                dereference=self._options.dereference_symlinks,
+                                codec=codec,
+                                extract_workers=extract_workers,
+                                evictor=evictor,
+                                eviction_interval_secs=eviction_interval)
 
     def create_remote_cache(remote_spec, local_cache):
       urls = self.get_available_urls(remote_spec.split('|'))
@@ -287,8 +405,13 @@ class CacheFactory(object):
         best_url_selector = BestUrlSelector(
           ['{}/{}'.format(url.rstrip('/'), self._cache_dirname) for url in urls]
         )
-        local_cache = local_cache or TempLocalArtifactCache(artifact_root, compression)
-        return RESTfulArtifactCache(artifact_root, best_url_selector, local_cache)
+        local_cache = local_cache or TempLocalArtifactCache(artifact_root, compression,
+                                                            codec=codec,
+                                                            extract_workers=extract_workers)
+        spill = self._write_behind_spill() if write_behind else None
+        return RESTfulArtifactCache(artifact_root, best_url_selector, local_cache,
+                                    max_concurrent_requests=self._options.max_concurrent_requests,
+                                    write_behind=spill)
 
     local_cache = create_local_cache(spec.local) if spec.local else None
     remote_cache = create_remote_cache(spec.remote, local_cache) if spec.remote else None
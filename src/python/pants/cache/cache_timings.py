@@ -0,0 +1,148 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import bisect
+import os
+import threading
+from collections import defaultdict
+
+from pants.cache.requests_session import RequestsSession
+
+
+class LatencyHistogram(object):
+  """Counts of observed durations in power-of-two millisecond buckets, plus totals.
+
+  Histograms are plain data, so they can be pickled back from subprocess workers and merged.
+  """
+
+  # Upper bounds of the buckets, in milliseconds. Slower observations land in a final overflow
+  # bucket.
+  BUCKET_BOUNDS_MS = tuple(2 ** i for i in range(18))
+
+  def __init__(self):
+    self.count = 0
+    self.total_secs = 0.0
+    self.max_secs = 0.0
+    self.total_bytes = 0
+    self.buckets = [0] * (len(self.BUCKET_BOUNDS_MS) + 1)
+
+  def add(self, secs, nbytes=0):
+    self.count += 1
+    self.total_secs += secs
+    self.max_secs = max(self.max_secs, secs)
+    self.total_bytes += nbytes
+    self.buckets[bisect.bisect_left(self.BUCKET_BOUNDS_MS, secs * 1000)] += 1
+
+  def merge(self, other):
+    self.count += other.count
+    self.total_secs += other.total_secs
+    self.max_secs = max(self.max_secs, other.max_secs)
+    self.total_bytes += other.total_bytes
+    for i, bucket_count in enumerate(other.buckets):
+      self.buckets[i] += bucket_count
+
+  def percentile(self, fraction):
+    """Returns the upper bound in milliseconds of the bucket holding the given fraction of counts.
+
+    Returns None for an empty histogram, and infinity for observations beyond the last bucket.
+    """
+    if not self.count:
+      return None
+    threshold = fraction * self.count
+    seen = 0
+    for bound, bucket_count in zip(self.BUCKET_BOUNDS_MS, self.buckets):
+      seen += bucket_count
+      if seen >= threshold:
+        return bound
+    return float('inf')
+
+  def get_all(self):
+    """Returns the histogram as a json-friendly dict."""
+    buckets = [{'le_ms': bound, 'count': bucket_count}
+               for bound, bucket_count in zip(self.BUCKET_BOUNDS_MS, self.buckets) if bucket_count]
+    if self.buckets[-1]:
+      buckets.append({'le_ms': None, 'count': self.buckets[-1]})
+    return {
+      'count': self.count,
+      'total_secs': self.total_secs,
+      'mean_secs': self.total_secs / self.count if self.count else None,
+      'max_secs': self.max_secs,
+      'p50_ms': self.percentile(0.5),
+      'p90_ms': self.percentile(0.9),
+      'p99_ms': self.percentile(0.99),
+      'total_bytes': self.total_bytes,
+      'buckets': buckets,
+    }
+
+
+class CacheTimings(object):
+  """Latency histograms of artifact cache operations, keyed by stage.
+
+  Stages are dotted names such as `remote.get.hit`, `extract` or `extract.fetch`.
+
+  Cache code records into the process-wide `recorder()`. Since artifact cache reads and writes
+  mostly run in subprocess workers, whoever dispatches that work `drain`s the workers' recorders
+  and `merge`s them into the `RunTracker`'s timings.
+  """
+
+  _recorder = None
+  _recorder_lock = threading.Lock()
+
+  @classmethod
+  def recorder(cls):
+    """Returns the process-wide `CacheTimings` that cache operations record into."""
+    with cls._recorder_lock:
+      if cls._recorder is None:
+        cls._recorder = cls()
+      return cls._recorder
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._histograms = defaultdict(LatencyHistogram)
+
+  def record(self, stage, secs, nbytes=0):
+    """Records one operation of the given stage, taking `secs` and transferring `nbytes`."""
+    with self._lock:
+      self._histograms[stage].add(secs, nbytes)
+
+  def merge(self, histograms):
+    """Adds the given dict of stage to `LatencyHistogram`, as returned by `drain`."""
+    with self._lock:
+      for stage, histogram in histograms.items():
+        self._histograms[stage].merge(histogram)
+
+  def drain(self):
+    """Returns a dict of stage to `LatencyHistogram` of everything recorded so far, and resets."""
+    with self._lock:
+      histograms = dict(self._histograms)
+      self._histograms = defaultdict(LatencyHistogram)
+    return histograms
+
+  def get_all(self):
+    """Returns a json-friendly dict from stage to histogram."""
+    with self._lock:
+      return {stage: histogram.get_all() for stage, histogram in self._histograms.items()}
+
+
+def call_recording_timings(tup):
+  """Importable helper that calls `func(args)` and also returns the timings it recorded.
+
+  Wraps helpers like `call_use_cached_files` for `subproc_map`, so that timings recorded in a
+  subprocess worker make it back to the process that dispatched the work. So do the connection
+  counts of the worker's remote cache traffic, for `RequestsSession.merge_worker_connection_counts`.
+
+  :param tup: A tuple of an importable function and its single argument.
+  :returns: A tuple of the function's result, a dict of stage to `LatencyHistogram`, and a tuple
+            of the pid of the process it ran in and the connections opened and requests sent by
+            the call.
+  """
+  func, args = tup
+  connections, requests_sent = RequestsSession.connection_counts()
+  res = func(args)
+  after_connections, after_requests = RequestsSession.connection_counts()
+  connection_counts = (os.getpid(), after_connections - connections, after_requests - requests_sent)
+  return res, CacheTimings.recorder().drain(), connection_counts
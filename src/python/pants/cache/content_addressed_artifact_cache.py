@@ -0,0 +1,439 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import fcntl
+import json
+import logging
+import os
+import shutil
+import stat
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from pants.base.hash_utils import hash_file
+from pants.cache.artifact import TarballArtifact
+from pants.cache.artifact_cache import UnreadableArtifact
+from pants.cache.local_artifact_cache import BaseLocalArtifactCache
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import (safe_concurrent_creation, safe_delete, safe_mkdir, safe_mkdir_for,
+                                safe_rm_oldest_items_in_dir, safe_rmtree, safe_walk, touch)
+
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore(object):
+  """A directory of immutable file blobs, each named by the sha1 of its content.
+
+  Blobs are laid out as `<root>/<digest[:2]>/<digest[2:]>` to keep directory sizes sane. The
+  digest of an executable file has an `.x` suffix, so that its blob keeps its executable bits
+  and hardlinks to it are executable too.
+  """
+
+  # Linux `FICLONE` ioctl, which asks the filesystem (btrfs, xfs, ...) for a copy-on-write clone.
+  _FICLONE = 0x40049409
+
+  LINK_MODES = ('copy', 'hardlink', 'reflink')
+
+  _EXECUTABLE_BITS = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+
+  def __init__(self, root, permissions=None):
+    """
+    :param str root: The directory under which blobs are stored.
+    :param int permissions: File permissions to apply to stored blobs.
+    """
+    self._root = root
+    self._permissions = permissions
+
+  @property
+  def root(self):
+    return self._root
+
+  def path_for(self, digest):
+    return os.path.join(self._root, digest[:2], digest[2:])
+
+  def contains(self, digest):
+    return os.path.isfile(self.path_for(digest))
+
+  def store(self, path):
+    """Store the content of the file at `path`, returning its digest.
+
+    If a blob with the same content is already present it is reused and nothing is copied.
+    """
+    executable_bits = stat.S_IMODE(os.stat(path).st_mode) & self._EXECUTABLE_BITS
+    digest = '{}{}'.format(hash_file(path), '.x' if executable_bits else '')
+    blob = self.path_for(digest)
+    if os.path.isfile(blob):
+      try:
+        # Refresh the blob, so that garbage collection's grace period covers it until the
+        # manifest referencing it is written.
+        os.utime(blob, None)
+        return digest
+      except OSError as e:
+        # The blob was collected since we looked, so we store it anew.
+        if e.errno != errno.ENOENT:
+          raise
+    with safe_concurrent_creation(blob) as tmp_blob:
+      shutil.copyfile(path, tmp_blob)
+      if self._permissions:
+        os.chmod(tmp_blob, self._permissions | executable_bits)
+      elif executable_bits:
+        os.chmod(tmp_blob, stat.S_IMODE(os.stat(tmp_blob).st_mode) | executable_bits)
+    return digest
+
+  def materialize(self, digest, dest, link_mode='copy'):
+    """Place the blob for `digest` at `dest`, replacing any existing file there.
+
+    For `hardlink` and `reflink` modes we fall back to a plain copy if the filesystem can't
+    satisfy the request (e.g. when `dest` lives on a different device).
+    """
+    blob = self.path_for(digest)
+    safe_delete(dest)
+    if link_mode == 'hardlink':
+      try:
+        os.link(blob, dest)
+        return
+      except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+          raise
+    elif link_mode == 'reflink':
+      if self._reflink(blob, dest):
+        return
+    shutil.copyfile(blob, dest)
+
+  def _reflink(self, src, dest):
+    with open(src, 'rb') as infile:
+      with open(dest, 'wb') as outfile:
+        try:
+          fcntl.ioctl(outfile.fileno(), self._FICLONE, infile.fileno())
+          return True
+        except (IOError, OSError):
+          return False
+
+  def iter_digests(self):
+    """Yields `(digest, path)` pairs for every blob in the store."""
+    if not os.path.isdir(self._root):
+      return
+    for prefix in os.listdir(self._root):
+      prefix_dir = os.path.join(self._root, prefix)
+      if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+        continue
+      for name in os.listdir(prefix_dir):
+        # Skip in-flight `safe_concurrent_creation` temp files.
+        if '.tmp.' not in name:
+          yield prefix + name, os.path.join(prefix_dir, name)
+
+  def remove(self, digest):
+    safe_delete(self.path_for(digest))
+
+
+class ContentAddressedArtifactCache(BaseLocalArtifactCache):
+  """A local artifact cache that deduplicates file content across cache entries.
+
+  Each `CacheKey` maps to a small json manifest listing the relative paths in the artifact and
+  the digests of their content; the content itself lives once in a shared `BlobStore`. Inserting
+  an artifact whose files are unchanged from a previous one therefore only writes a manifest.
+
+  Layout under `cas_root`:
+    blobs/<digest[:2]>/<digest[2:]>
+    manifests/<cache dirname>/<cache_key.id>/<cache_key.hash>.json
+
+  Blobs are shared by every task writing to the same `cas_root`, and are only removed by
+  `collect_garbage` once no manifest references them.
+  """
+
+  MANIFEST_VERSION = 2
+
+  # The conventional name of the `cas_root` directory within a local cache path.
+  CAS_DIRNAME = 'cas'
+  BLOBS_DIRNAME = 'blobs'
+  MANIFESTS_DIRNAME = 'manifests'
+
+  def __init__(self, artifact_root, cas_root, cache_dirname, compression,
+               max_entries_per_target=None, permissions=None, dereference=True,
+               link_mode='reflink', gc_interval_secs=3600, gc_grace_period_secs=3600,
+               codec='gzip', extract_workers=TarballArtifact.DEFAULT_EXTRACT_WORKERS,
+               evictor=None, eviction_interval_secs=600):
+    """
+    :param str artifact_root: The path under which cacheable products will be read/written.
+    :param str cas_root: The directory holding the blob store and manifests.
+    :param str cache_dirname: The name of the manifest subdirectory for this cache's task.
+    :param int compression: The compression level for tarballs created for remote caches.
+    :param int max_entries_per_target: The maximum number of old manifests to keep per target.
+    :param str permissions: File permissions to use when creating manifest and blob files.
+    :param bool dereference: Dereference symlinks when collecting artifacts.
+    :param str link_mode: How blobs are placed under the artifact_root when used: one of
+                          `copy`, `hardlink` or `reflink`. Hardlinked outputs share an inode with
+                          the cache, so they must never be modified in place.
+    :param int gc_interval_secs: The minimum number of seconds between automatic garbage
+                                 collections triggered by inserts. 0 disables them.
+    :param int gc_grace_period_secs: Unreferenced blobs younger than this are not collected, since
+                                     they may belong to a concurrent insert.
+    :param str codec: The name of the `ArtifactCodec` for tarballs created for remote caches.
+    :param int extract_workers: The number of threads writing out files when extracting tarballs
+                                fetched from remote caches.
+    :param evictor: An optional `LocalCacheEvictor` enforcing a budget on the whole local cache
+                    path the `cas_root` lives in.
+    :param int eviction_interval_secs: The minimum number of seconds between evictions triggered
+                                       by inserts.
+    """
+    super(ContentAddressedArtifactCache, self).__init__(
+      artifact_root,
+      compression,
+      permissions=int(permissions.strip(), base=8) if permissions else None,
+      dereference=dereference,
+      codec=codec,
+      extract_workers=extract_workers
+    )
+    if link_mode not in BlobStore.LINK_MODES:
+      raise ValueError('link_mode must be one of {}: {}'.format(BlobStore.LINK_MODES, link_mode))
+    self._cas_root = os.path.realpath(os.path.expanduser(cas_root))
+    self._manifest_root = os.path.join(self._cas_root, self.MANIFESTS_DIRNAME)
+    self._cache_root = os.path.join(self._manifest_root, cache_dirname)
+    self._blobs = BlobStore(os.path.join(self._cas_root, self.BLOBS_DIRNAME),
+                            permissions=self._permissions)
+    self._max_entries_per_target = max_entries_per_target
+    self._link_mode = link_mode
+    self._gc_interval_secs = gc_interval_secs
+    self._gc_grace_period_secs = gc_grace_period_secs
+    self._evictor = evictor
+    self._eviction_interval_secs = eviction_interval_secs
+    safe_mkdir(self._cache_root)
+    safe_mkdir(self._blobs.root)
+
+  @property
+  def blob_store(self):
+    return self._blobs
+
+  def prune(self, root):
+    """Prune stale manifests for a target, and periodically collect unreferenced blobs.
+
+    If an evictor is configured, the budget of the whole local cache path is also enforced, at most
+    once per eviction interval.
+
+    :param str root: The manifest directory of a single target.
+    """
+    max_entries_per_target = self._max_entries_per_target
+    if os.path.isdir(root) and max_entries_per_target:
+      safe_rm_oldest_items_in_dir(root, max_entries_per_target)
+    if self._gc_due():
+      self.collect_garbage()
+    if self._evictor:
+      self._evictor.evict_if_due(self._eviction_interval_secs)
+
+  def has(self, cache_key):
+    return os.path.isfile(self._manifest_for_key(cache_key))
+
+  def use_cached_files(self, cache_key, results_dir=None):
+    manifest_path = self._manifest_for_key(cache_key)
+    try:
+      manifest = self.read_manifest(manifest_path)
+      if manifest is None:
+        return False
+      missing = [entry['digest'] for entry in manifest['files']
+                 if not self._blobs.contains(entry['digest'])]
+      if missing:
+        raise ValueError('Missing {} blob(s) referenced by manifest.'.format(len(missing)))
+
+      if results_dir is not None:
+        safe_rmtree(results_dir)
+      for relpath in manifest['dirs']:
+        safe_mkdir(os.path.join(self.artifact_root, relpath))
+      for entry in manifest['files']:
+        dest = os.path.join(self.artifact_root, entry['path'])
+        safe_mkdir_for(dest)
+        self._blobs.materialize(entry['digest'], dest, self._link_mode)
+        if self._link_mode != 'hardlink':
+          os.chmod(dest, entry['mode'])
+      for entry in manifest['symlinks']:
+        dest = os.path.join(self.artifact_root, entry['path'])
+        safe_mkdir_for(dest)
+        safe_delete(dest)
+        os.symlink(entry['target'], dest)
+      # Record the access, so that age-based pruning keeps recently used entries.
+      touch(manifest_path)
+      return True
+    except Exception as e:
+      logger.warn('Error while reading {0} from local artifact cache: {1}'.format(manifest_path, e))
+      safe_delete(manifest_path)
+      return UnreadableArtifact(cache_key, e)
+
+  def try_insert(self, cache_key, paths):
+    self._insert_manifest(cache_key, paths)
+
+  @contextmanager
+  def insert_paths(self, cache_key, paths):
+    """Store paths in the blob store, and yield the path to an equivalent artifact tarball.
+
+    The tarball is temporary: it only exists for the benefit of a remote cache upload.
+    """
+    self._insert_manifest(cache_key, paths)
+    with self._tmpfile(cache_key, 'write') as tmp:
+      self._artifact(tmp.name).collect(paths)
+      yield tmp.name
+
+  def store_artifact(self, cache_key, src):
+    """Ingest the tarball from the given `src` iterator into the store, via a staging directory."""
+    with temporary_dir(root_dir=self._cas_root) as staging_root:
+      artifact = TarballArtifact(staging_root, None, self._compression,
+                                 dereference=self._dereference, codec=self._codec,
+                                 extract_workers=self._extract_workers)
+      artifact.extract_stream(src)
+      self._insert_manifest(cache_key, list(artifact.get_paths()), root=staging_root)
+
+  def store_and_use_artifact(self, cache_key, src, results_dir=None):
+    """Extract the tarball from the given `src` iterator, then ingest its files into the store."""
+    if results_dir is not None:
+      safe_mkdir(results_dir, clean=True)
+    artifact = self._artifact(None)
+    try:
+      artifact.extract_stream(src)
+    except Exception:
+      if results_dir is not None:
+        safe_mkdir(results_dir, clean=True)
+      raise
+
+    self._insert_manifest(cache_key, list(artifact.get_paths()))
+    return True
+
+  def delete(self, cache_key):
+    safe_delete(self._manifest_for_key(cache_key))
+
+  def collect_garbage(self):
+    """Removes blobs that are not referenced by any manifest under the cas_root.
+
+    Reference counts are computed across the manifests of every task sharing the blob store.
+
+    :returns: A tuple of the number of blobs removed and the number of bytes freed.
+    """
+    refcounts = self.reference_counts()
+    cutoff = time.time() - self._gc_grace_period_secs
+    removed = 0
+    freed = 0
+    for digest, path in self._blobs.iter_digests():
+      if refcounts.get(digest, 0) > 0:
+        continue
+      try:
+        st = os.stat(path)
+      except OSError:
+        continue
+      if st.st_mtime > cutoff:
+        continue
+      self._blobs.remove(digest)
+      removed += 1
+      freed += st.st_size
+    touch(self._gc_marker)
+    logger.debug('Collected {} unreferenced blobs ({} bytes) from {}'
+                 .format(removed, freed, self._blobs.root))
+    return removed, freed
+
+  def reference_counts(self):
+    """Returns a dict from blob digest to the number of manifest entries referencing it."""
+    refcounts = defaultdict(int)
+    for dirpath, _, filenames in safe_walk(self._manifest_root):
+      for filename in filenames:
+        if not filename.endswith('.json'):
+          continue
+        manifest_path = os.path.join(dirpath, filename)
+        try:
+          manifest = self.read_manifest(manifest_path)
+        except ValueError as e:
+          # An unreadable manifest can never be used, so its blobs need not be retained for it.
+          logger.debug('Ignoring unreadable manifest {}: {}'.format(manifest_path, e))
+          continue
+        if manifest is None:
+          continue
+        for entry in manifest['files']:
+          refcounts[entry['digest']] += 1
+    return refcounts
+
+  @property
+  def _gc_marker(self):
+    return os.path.join(self._cas_root, 'last_gc')
+
+  def _gc_due(self):
+    if not self._gc_interval_secs:
+      return False
+    try:
+      last_gc = os.path.getmtime(self._gc_marker)
+    except OSError:
+      # Never collected: start the clock now rather than walking the store on the first insert.
+      touch(self._gc_marker)
+      return False
+    return time.time() - last_gc >= self._gc_interval_secs
+
+  def _insert_manifest(self, cache_key, paths, root=None):
+    root = root or self.artifact_root
+    files = {}
+    dirs = set()
+    symlinks = {}
+
+    def add_file(path):
+      relpath = os.path.relpath(path, root)
+      if not self._dereference and os.path.islink(path):
+        symlinks[relpath] = os.readlink(path)
+      else:
+        files[relpath] = {
+          'path': relpath,
+          'digest': self._blobs.store(path),
+          'mode': stat.S_IMODE(os.stat(path).st_mode),
+        }
+
+    for path in paths or ():
+      if os.path.isdir(path) and (self._dereference or not os.path.islink(path)):
+        dirs.add(os.path.relpath(path, root))
+        for dirpath, dirnames, filenames in safe_walk(path, followlinks=self._dereference):
+          for dirname in dirnames:
+            full_dirname = os.path.join(dirpath, dirname)
+            if not self._dereference and os.path.islink(full_dirname):
+              add_file(full_dirname)
+            else:
+              dirs.add(os.path.relpath(full_dirname, root))
+          for filename in filenames:
+            add_file(os.path.join(dirpath, filename))
+      else:
+        add_file(path)
+
+    manifest = {
+      'version': self.MANIFEST_VERSION,
+      'dirs': sorted(dirs),
+      'files': [files[relpath] for relpath in sorted(files)],
+      'symlinks': [{'path': relpath, 'target': symlinks[relpath]} for relpath in sorted(symlinks)],
+    }
+    manifest_path = self._manifest_for_key(cache_key)
+    with safe_concurrent_creation(manifest_path) as tmp_manifest:
+      with open(tmp_manifest, 'w') as outfile:
+        json.dump(manifest, outfile, sort_keys=True)
+      if self._permissions:
+        os.chmod(tmp_manifest, self._permissions)
+    self.prune(os.path.dirname(manifest_path))
+    return manifest_path
+
+  @classmethod
+  def read_manifest(cls, manifest_path):
+    """Returns the parsed manifest at `manifest_path`, or None if there is none.
+
+    :raises: `ValueError` if the manifest is corrupt or of an unsupported version.
+    """
+    try:
+      with open(manifest_path, 'r') as infile:
+        manifest = json.load(infile)
+    except IOError as e:
+      if e.errno == errno.ENOENT:
+        return None
+      raise
+    if manifest.get('version') != cls.MANIFEST_VERSION:
+      raise ValueError('Unsupported manifest version in {}: {}'
+                       .format(manifest_path, manifest.get('version')))
+    return manifest
+
+  def _manifest_for_key(self, cache_key):
+    # Note: as for the tarball cache, both the id and the hash are needed to differentiate targets
+    # that have no sources.
+    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + '.json'
@@ -13,7 +13,7 @@ from pants.cache.artifact import TarballArtifact
 from pants.cache.artifact_cache import ArtifactCache, UnreadableArtifact
 from pants.util.contextutil import temporary_file
 from pants.util.dirutil import (safe_delete, safe_mkdir, safe_mkdir_for,
-                                safe_rm_oldest_items_in_dir, safe_rmtree)
+                                safe_rm_oldest_items_in_dir, safe_rmtree, touch)
 
 
 logger = logging.getLogger(__name__)
@@ -21,22 +21,32 @@ logger = logging.getLogger(__name__)
 
 class BaseLocalArtifactCache(ArtifactCache):
 
-  def __init__(self, artifact_root, compression, permissions=None, dereference=True):
+  # Whether artifacts passed to `store_artifact` and `store_and_use_artifact` are retained.
+  stores_artifacts = True
+
+  def __init__(self, artifact_root, compression, permissions=None, dereference=True, codec='gzip',
+               extract_workers=TarballArtifact.DEFAULT_EXTRACT_WORKERS):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
-    :param int compression: The gzip compression level for created artifacts.
+    :param int compression: The compression level for created artifacts.
                             Valid values are 0-9.
     :param str permissions: File permissions to use when creating artifact files.
     :param bool dereference: Dereference symlinks when creating the cache tarball.
+    :param str codec: The name of the `ArtifactCodec` used to compress created artifacts.
+    :param int extract_workers: The number of threads writing out files during extraction.
     """
     super(BaseLocalArtifactCache, self).__init__(artifact_root)
     self._compression = compression
     self._cache_root = None
     self._permissions = permissions
     self._dereference = dereference
+    self._codec = codec
+    self._extract_workers = extract_workers
 
   def _artifact(self, path):
-    return TarballArtifact(self.artifact_root, path, self._compression, dereference=self._dereference)
+    return TarballArtifact(self.artifact_root, path, self._compression,
+                           dereference=self._dereference, codec=self._codec,
+                           extract_workers=self._extract_workers)
 
   @contextmanager
   def _tmpfile(self, cache_key, use):
@@ -52,40 +62,51 @@ class BaseLocalArtifactCache(ArtifactCache):
       self._artifact(tmp.name).collect(paths)
       yield self._store_tarball(cache_key, tmp.name)
 
-  def store_and_use_artifact(self, cache_key, src, results_dir=None):
-    """Store and then extract the artifact from the given `src` iterator for the given cache_key.
+  def store_artifact(self, cache_key, src):
+    """Store the artifact from the given `src` iterator for the given cache_key, without using it.
 
     :param cache_key: Cache key for the artifact.
     :param src: Iterator over binary data to store for the artifact.
-    :param str results_dir: The path to the expected destination of the artifact extraction: will
-      be cleared both before extraction, and after a failure to extract.
     """
     with self._tmpfile(cache_key, 'read') as tmp:
       for chunk in src:
         tmp.write(chunk)
       tmp.close()
-      tarball = self._store_tarball(cache_key, tmp.name)
-      artifact = self._artifact(tarball)
+      self._store_tarball(cache_key, tmp.name)
 
-      # NOTE(mateo): The two clean=True args passed in this method are likely safe, since the cache will by
-      # definition be dealing with unique results_dir, as opposed to the stable vt.results_dir (aka 'current').
-      # But if by chance it's passed the stable results_dir, safe_makedir(clean=True) will silently convert it
-      # from a symlink to a real dir and cause mysterious 'Operation not permitted' errors until the workdir is cleaned.
-      if results_dir is not None:
-        safe_mkdir(results_dir, clean=True)
+  def store_and_use_artifact(self, cache_key, src, results_dir=None):
+    """Extract and then store the artifact from the given `src` iterator for the given cache_key.
 
+    The artifact is decompressed and unpacked as its bytes arrive, rather than being staged in a
+    temporary file first. It is only stored once it has been extracted successfully.
+
+    :param cache_key: Cache key for the artifact.
+    :param src: Iterator over binary data to store for the artifact.
+    :param str results_dir: The path to the expected destination of the artifact extraction: will
+      be cleared both before extraction, and after a failure to extract.
+    """
+    # NOTE(mateo): The two clean=True args passed in this method are likely safe, since the cache will by
+    # definition be dealing with unique results_dir, as opposed to the stable vt.results_dir (aka 'current').
+    # But if by chance it's passed the stable results_dir, safe_makedir(clean=True) will silently convert it
+    # from a symlink to a real dir and cause mysterious 'Operation not permitted' errors until the workdir is cleaned.
+    if results_dir is not None:
+      safe_mkdir(results_dir, clean=True)
+
+    with self._tmpfile(cache_key, 'read') as tmp:
       try:
-        artifact.extract()
+        self._artifact(tmp.name).extract_stream(src, tee=tmp if self.stores_artifacts else None)
       except Exception:
         # Do our best to clean up after a failed artifact extraction. If a results_dir has been
         # specified, it is "expected" to represent the output destination of the extracted
         # artifact, and so removing it should clear any partially extracted state.
         if results_dir is not None:
           safe_mkdir(results_dir, clean=True)
-        safe_delete(tarball)
         raise
+      tmp.close()
+      if self.stores_artifacts:
+        self._store_tarball(cache_key, tmp.name)
 
-      return True
+    return True
 
   def _store_tarball(self, cache_key, src):
     """Given a src path to an artifact tarball, store it and return stored artifact's path."""
@@ -95,31 +116,46 @@ class BaseLocalArtifactCache(ArtifactCache):
 class LocalArtifactCache(BaseLocalArtifactCache):
   """An artifact cache that stores the artifacts in local files."""
 
+  ARTIFACT_SUFFIX = '.tgz'
+
   def __init__(self, artifact_root, cache_root, compression, max_entries_per_target=None,
-               permissions=None, dereference=True):
+               permissions=None, dereference=True, codec='gzip',
+               extract_workers=TarballArtifact.DEFAULT_EXTRACT_WORKERS, evictor=None,
+               eviction_interval_secs=600):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     :param str cache_root: The locally cached files are stored under this directory.
-    :param int compression: The gzip compression level for created artifacts (1-9 or false-y).
+    :param int compression: The compression level for created artifacts (1-9 or false-y).
     :param int max_entries_per_target: The maximum number of old cache files to leave behind on a cache miss.
     :param str permissions: File permissions to use when creating artifact files.
     :param bool dereference: Dereference symlinks when creating the cache tarball.
+    :param str codec: The name of the `ArtifactCodec` used to compress created artifacts.
+    :param int extract_workers: The number of threads writing out files during extraction.
+    :param evictor: An optional `LocalCacheEvictor` enforcing a budget on the whole local cache
+                    path this cache lives in.
+    :param int eviction_interval_secs: The minimum number of seconds between evictions triggered
+                                       by inserts.
     """
     super(LocalArtifactCache, self).__init__(
       artifact_root,
       compression,
       permissions=int(permissions.strip(), base=8) if permissions else None,
-      dereference=dereference
+      dereference=dereference,
+      codec=codec,
+      extract_workers=extract_workers
     )
     self._cache_root = os.path.realpath(os.path.expanduser(cache_root))
     self._max_entries_per_target = max_entries_per_target
+    self._evictor = evictor
+    self._eviction_interval_secs = eviction_interval_secs
     safe_mkdir(self._cache_root)
 
   def prune(self, root):
     """Prune stale cache files
 
     If the option --cache-target-max-entry is greater than zero, then prune will remove all but n
-    old cache files for each target/task.
+    old cache files for each target/task. If an evictor is configured, the budget of the whole
+    local cache path is also enforced, at most once per eviction interval.
 
     :param str root: The path under which cacheable artifacts will be cleaned
     """
@@ -127,6 +163,8 @@ class LocalArtifactCache(BaseLocalArtifactCache):
     max_entries_per_target = self._max_entries_per_target
     if os.path.isdir(root) and max_entries_per_target:
       safe_rm_oldest_items_in_dir(root, max_entries_per_target)
+    if self._evictor:
+      self._evictor.evict_if_due(self._eviction_interval_secs)
 
   def has(self, cache_key):
     return self._artifact_for(cache_key).exists()
@@ -142,6 +180,8 @@ class LocalArtifactCache(BaseLocalArtifactCache):
         if results_dir is not None:
           safe_rmtree(results_dir)
         artifact.extract()
+        # Record the access, so that eviction keeps recently used artifacts.
+        touch(tarfile)
         return True
     except Exception as e:
       # TODO(davidt): Consider being more granular in what is caught.
@@ -170,7 +210,7 @@ class LocalArtifactCache(BaseLocalArtifactCache):
   def _cache_file_for_key(self, cache_key):
     # Note: it's important to use the id as well as the hash, because two different targets
     # may have the same hash if both have no sources, but we may still want to differentiate them.
-    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + '.tgz'
+    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + self.ARTIFACT_SUFFIX
 
 
 class TempLocalArtifactCache(BaseLocalArtifactCache):
@@ -180,12 +220,16 @@ class TempLocalArtifactCache(BaseLocalArtifactCache):
   actually stores files between calls, but is useful for handling file IO for a remote cache.
   """
 
-  def __init__(self, artifact_root, compression, permissions=None):
+  stores_artifacts = False
+
+  def __init__(self, artifact_root, compression, permissions=None, codec='gzip',
+               extract_workers=TarballArtifact.DEFAULT_EXTRACT_WORKERS):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     """
     super(TempLocalArtifactCache, self).__init__(artifact_root, compression=compression,
-                                                 permissions=permissions)
+                                                 permissions=permissions, codec=codec,
+                                                 extract_workers=extract_workers)
 
   def _store_tarball(self, cache_key, src):
     return src
@@ -0,0 +1,191 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import os
+import time
+from collections import defaultdict, namedtuple
+
+from pants.cache.content_addressed_artifact_cache import BlobStore, ContentAddressedArtifactCache
+from pants.cache.local_artifact_cache import LocalArtifactCache
+from pants.util.dirutil import safe_delete, safe_walk, touch
+
+
+logger = logging.getLogger(__name__)
+
+
+class EvictionResult(namedtuple('EvictionResult', ['removed', 'freed', 'remaining'])):
+  """The outcome of a `LocalCacheEvictor.evict` run.
+
+  - removed is the number of cache entries and blobs deleted.
+  - freed is the number of bytes deleted.
+  - remaining is the number of bytes the cache holds after eviction.
+  """
+
+
+class LocalCacheEvictor(object):
+  """Enforces a size and age budget on everything stored under a local artifact cache path.
+
+  A local cache path is shared by the caches of every task, and holds both tarball artifacts
+  (`<task>/<id>/<hash>.tgz`) and, under `cas/`, the manifests and blobs of content-addressed
+  caches. Entries are evicted least recently used first, where use is recorded as the modification
+  time of the tarball or manifest: local caches touch an entry each time they read it.
+
+  Blobs of the content-addressed store count against the budget, and are removed as soon as the
+  last manifest referencing them is evicted.
+  """
+
+  _MARKER_NAME = '.last_eviction'
+
+  def __init__(self, root, max_bytes=None, max_age_secs=None, gc_grace_period_secs=3600):
+    """
+    :param str root: The local cache path, as given in the cache `--read-from`/`--write-to` options.
+    :param int max_bytes: The total number of bytes to trim the cache path to, or None for no limit.
+    :param int max_age_secs: Entries unused for longer than this are evicted regardless of size,
+                             or None for no limit.
+    :param int gc_grace_period_secs: Unreferenced blobs younger than this are not collected, since
+                                     they may belong to a concurrent insert.
+    """
+    self._root = os.path.realpath(os.path.expanduser(root))
+    self._max_bytes = max_bytes
+    self._max_age_secs = max_age_secs
+    self._gc_grace_period_secs = gc_grace_period_secs
+
+  @property
+  def root(self):
+    return self._root
+
+  @property
+  def enabled(self):
+    return self._max_bytes is not None or bool(self._max_age_secs)
+
+  def evict_if_due(self, interval_secs):
+    """Runs `evict` if it has not run in the last `interval_secs` seconds, by any process.
+
+    Checking costs a single stat, so this is cheap enough to call on every cache insert.
+
+    :returns: An `EvictionResult`, or None if eviction was not due.
+    """
+    if not self.enabled or not interval_secs:
+      return None
+    try:
+      last_eviction = os.path.getmtime(self._marker)
+    except OSError:
+      # Never evicted: start the clock now rather than walking the cache on the first insert.
+      touch(self._marker)
+      return None
+    if time.time() - last_eviction < interval_secs:
+      return None
+    # Claim this round before walking the cache, so that concurrent inserts don't all pile in.
+    touch(self._marker)
+    return self.evict()
+
+  def evict(self):
+    """Deletes least recently used entries until the cache path is within budget.
+
+    :returns: An `EvictionResult`.
+    """
+    now = time.time()
+    # Tuples of (last use, path, size, referenced blob digests), for tarballs and manifests alike.
+    entries = []
+    total = 0
+
+    cas_root = os.path.join(self._root, ContentAddressedArtifactCache.CAS_DIRNAME)
+    for dirpath, dirnames, filenames in safe_walk(self._root):
+      if dirpath == self._root and ContentAddressedArtifactCache.CAS_DIRNAME in dirnames:
+        dirnames.remove(ContentAddressedArtifactCache.CAS_DIRNAME)
+      for filename in filenames:
+        if filename.endswith(LocalArtifactCache.ARTIFACT_SUFFIX):
+          path = os.path.join(dirpath, filename)
+          st = self._stat(path)
+          if st:
+            entries.append((st.st_mtime, path, st.st_size, ()))
+            total += st.st_size
+
+    blobs = BlobStore(os.path.join(cas_root, ContentAddressedArtifactCache.BLOBS_DIRNAME))
+    blob_stats = {}
+    for digest, path in blobs.iter_digests():
+      st = self._stat(path)
+      if st:
+        blob_stats[digest] = st
+        total += st.st_size
+
+    refcounts = defaultdict(int)
+    manifest_root = os.path.join(cas_root, ContentAddressedArtifactCache.MANIFESTS_DIRNAME)
+    for dirpath, _, filenames in safe_walk(manifest_root):
+      for filename in filenames:
+        if not filename.endswith('.json'):
+          continue
+        path = os.path.join(dirpath, filename)
+        st = self._stat(path)
+        if not st:
+          continue
+        try:
+          manifest = ContentAddressedArtifactCache.read_manifest(path)
+        except ValueError:
+          # An unreadable manifest can never be used, so it is the first to go.
+          entries.append((0, path, st.st_size, ()))
+          total += st.st_size
+          continue
+        if manifest is None:
+          continue
+        digests = tuple(entry['digest'] for entry in manifest['files'])
+        for digest in digests:
+          refcounts[digest] += 1
+        entries.append((st.st_mtime, path, st.st_size, digests))
+        total += st.st_size
+
+    removed = 0
+    freed = 0
+
+    def remove_blob(digest):
+      blobs.remove(digest)
+      return blob_stats[digest].st_size
+
+    grace_cutoff = now - self._gc_grace_period_secs
+    for digest, st in blob_stats.items():
+      if refcounts[digest] == 0 and st.st_mtime <= grace_cutoff:
+        size = remove_blob(digest)
+        removed += 1
+        freed += size
+        total -= size
+
+    entries.sort()
+    for last_used, path, size, digests in entries:
+      expired = self._max_age_secs and now - last_used > self._max_age_secs
+      over_budget = self._max_bytes is not None and total > self._max_bytes
+      if not expired and not over_budget:
+        # Entries are in least recently used order, so all of the rest are within budget too.
+        break
+      safe_delete(path)
+      removed += 1
+      freed += size
+      total -= size
+      for digest in digests:
+        refcounts[digest] -= 1
+        if refcounts[digest] == 0 and digest in blob_stats:
+          blob_size = remove_blob(digest)
+          removed += 1
+          freed += blob_size
+          total -= blob_size
+
+    touch(self._marker)
+    logger.debug('Evicted {} entries ({} bytes) from {}, leaving {} bytes.'
+                 .format(removed, freed, self._root, total))
+    return EvictionResult(removed=removed, freed=freed, remaining=total)
+
+  @property
+  def _marker(self):
+    return os.path.join(self._root, self._MARKER_NAME)
+
+  @staticmethod
+  def _stat(path):
+    try:
+      return os.stat(path)
+    except OSError:
+      # Removed concurrently.
+      return None
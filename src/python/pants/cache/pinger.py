@@ -10,10 +10,10 @@ from collections import Counter, deque
 from contextlib import contextmanager
 from multiprocessing.pool import ThreadPool
 
-import requests
 from six.moves import range
 
 from pants.cache.artifact_cache import ArtifactCacheError
+from pants.cache.requests_session import RequestsSession
 from pants.util.contextutil import Timer
 from pants.util.memo import memoized_method
 
@@ -31,8 +31,9 @@ class Pinger(object):
   def _try_ping(cls, url, timeout):
     try:
       with Timer() as timer:
-        # We just want to see if we can get the headers.
-        requests.head(url, timeout=timeout)
+        # We just want to see if we can get the headers. Pinging through the shared session also
+        # leaves a warm connection behind for the cache requests that follow.
+        RequestsSession.instance().head(url, timeout=timeout)
       return timer.elapsed
     except Exception:
       return Pinger.UNREACHABLE
@@ -65,6 +66,8 @@ class Pinger(object):
     return self._get_ping_time(url, self._timeout, self._tries)
 
   def pings(self, urls):
+    if len(urls) == 1:
+      return [(urls[0], self.ping(urls[0]))]
     pool = ThreadPool(processes=len(urls))
     rt_secs = pool.map(self.ping, urls, chunksize=1)
     pool.close()
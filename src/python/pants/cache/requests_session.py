@@ -0,0 +1,198 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import importlib
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Http2UnavailableError(Exception):
+  """Indicates that HTTP/2 was requested, but the `hyper` module providing it is not installed."""
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+  """An `HTTPAdapter` that keeps track of how often it had to open a new connection.
+
+  Counts for connection pools the adapter discards (when it talks to more hosts than it keeps
+  pools for) are retained, so `connection_counts` covers the adapter's whole lifetime.
+  """
+
+  def __init__(self, *args, **kwargs):
+    self._retired_connections = 0
+    self._retired_requests = 0
+    super(PooledHTTPAdapter, self).__init__(*args, **kwargs)
+
+  def init_poolmanager(self, *args, **kwargs):
+    super(PooledHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+    self.poolmanager.pools.dispose_func = self._dispose_pool
+
+  def _dispose_pool(self, pool):
+    self._retired_connections += pool.num_connections
+    self._retired_requests += pool.num_requests
+    pool.close()
+
+  def connection_counts(self):
+    """Returns a tuple of the number of connections opened and the number of requests sent."""
+    connections = self._retired_connections
+    requests_sent = self._retired_requests
+    pools = self.poolmanager.pools
+    # NB: The pool container only supports thread-safe iteration over its keys.
+    for key in pools.keys():
+      pool = pools.get(key)
+      if pool is None:
+        continue
+      connections += pool.num_connections
+      requests_sent += pool.num_requests
+    return connections, requests_sent
+
+
+class RequestsSession(object):
+  """The process-wide `requests.Session` shared by all remote cache traffic.
+
+  Remote caches, the `Pinger` and the `RESTfulResolver` all send their requests through this one
+  session, so that connections (and their TLS handshakes) are kept alive and reused across
+  requests, tasks and hosts.
+
+  The connection pool for each host is sized by `configure` to the largest number of concurrent
+  requests any caller asked for: with fewer pooled connections than concurrent requests, the
+  surplus connections would be opened and closed again for every request.
+
+  Each subprocess worker has its own copy of the session. Connections opened by workers are counted
+  by the process that dispatched their work, via `merge_worker_connection_counts`.
+  """
+
+  DEFAULT_POOL_SIZE = 16
+
+  # The number of hosts to keep connection pools for.
+  NUM_POOLS = 10
+
+  _lock = threading.Lock()
+  _session = None
+  _session_config = None
+  _pool_size = DEFAULT_POOL_SIZE
+  _http2 = False
+  # Every adapter ever created, so that connection reuse can be reported across reconfigurations.
+  _adapters = []
+  # The connections opened and requests sent by subprocess workers on behalf of this process.
+  _worker_connections = 0
+  _worker_requests = 0
+
+  @classmethod
+  def configure(cls, pool_size=DEFAULT_POOL_SIZE, http2=False):
+    """Requests a connection pool of at least `pool_size` connections per host.
+
+    :param int pool_size: The number of connections to keep alive per host.
+    :param bool http2: Whether to multiplex requests to https urls over a single HTTP/2
+                       connection per host.
+    :raises: `Http2UnavailableError` if `http2` is requested but the `hyper` module is missing.
+    """
+    if http2:
+      cls._http2_adapter_type()
+    with cls._lock:
+      cls._pool_size = max(cls._pool_size, pool_size)
+      cls._http2 = cls._http2 or http2
+
+  @classmethod
+  def instance(cls):
+    """Returns the shared session, (re)creating it if its configuration has grown."""
+    with cls._lock:
+      config = (cls._pool_size, cls._http2)
+      if cls._session is None or cls._session_config != config:
+        cls._session = cls._create_session(*config)
+        cls._session_config = config
+      return cls._session
+
+  @classmethod
+  def mount_retrying(cls, prefix, max_retries):
+    """Mounts an adapter on the shared session that retries requests for urls under `prefix`."""
+    session = cls.instance()
+    with cls._lock:
+      if prefix not in session.adapters:
+        session.mount(prefix, cls._create_adapter(cls._pool_size, max_retries=max_retries))
+    return session
+
+  @classmethod
+  def connection_counts(cls):
+    """Returns the connections opened and requests sent by the session in this process.
+
+    :returns: A tuple of the number of connections opened and the number of requests sent.
+    """
+    with cls._lock:
+      adapters = list(cls._adapters)
+    connections = 0
+    requests_sent = 0
+    for adapter in adapters:
+      adapter_connections, adapter_requests = adapter.connection_counts()
+      connections += adapter_connections
+      requests_sent += adapter_requests
+    return connections, requests_sent
+
+  @classmethod
+  def merge_worker_connection_counts(cls, pid, connections, requests_sent):
+    """Adds the connections opened and requests sent by a subprocess worker to `connection_stats`.
+
+    Counts measured in this process (as when work runs in-process) are already included, and are
+    ignored.
+
+    :param int pid: The pid of the process the counts were measured in.
+    :param int connections: The number of connections the worker opened.
+    :param int requests_sent: The number of requests the worker sent.
+    """
+    if pid == os.getpid():
+      return
+    with cls._lock:
+      cls._worker_connections += connections
+      cls._worker_requests += requests_sent
+
+  @classmethod
+  def connection_stats(cls):
+    """Returns a dict describing how well connections were reused by the shared session.
+
+    Covers the requests sent from this process and from the subprocess workers whose counts were
+    merged in.
+    """
+    connections, requests_sent = cls.connection_counts()
+    with cls._lock:
+      connections += cls._worker_connections
+      requests_sent += cls._worker_requests
+    reused = max(0, requests_sent - connections)
+    return {
+      'connections_opened': connections,
+      'requests_sent': requests_sent,
+      'reuse_rate': reused / requests_sent if requests_sent else None,
+      'pool_size': cls._pool_size,
+      'http2': cls._http2,
+    }
+
+  @classmethod
+  def _create_session(cls, pool_size, http2):
+    session = requests.Session()
+    session.mount('http://', cls._create_adapter(pool_size))
+    if http2:
+      # NB: HTTP/2 multiplexes concurrent requests over one connection per host, so it has no pool
+      # to size, and its connections are not included in `connection_stats`.
+      session.mount('https://', cls._http2_adapter_type()())
+    else:
+      session.mount('https://', cls._create_adapter(pool_size))
+    return session
+
+  @classmethod
+  def _create_adapter(cls, pool_size, max_retries=0):
+    adapter = PooledHTTPAdapter(pool_connections=cls.NUM_POOLS, pool_maxsize=pool_size,
+                                max_retries=max_retries)
+    cls._adapters.append(adapter)
+    return adapter
+
+  @staticmethod
+  def _http2_adapter_type():
+    try:
+      return importlib.import_module('hyper.contrib').HTTP20Adapter
+    except ImportError:
+      raise Http2UnavailableError('HTTP/2 support for remote caches requires the `hyper` module.')
@@ -12,6 +12,7 @@ from abc import abstractmethod
 import requests
 
 from pants.base.validation import assert_list
+from pants.cache.requests_session import RequestsSession
 from pants.util.meta import AbstractClass
 
 
@@ -121,8 +122,7 @@ class RESTfulResolver(Resolver):
     """
     :API: public
     """
-    session = requests.Session()
-    session.mount(resolve_from, requests.adapters.HTTPAdapter(max_retries=self._tries))
+    session = RequestsSession.mount_retrying(resolve_from, max_retries=self._tries)
     content = self._safe_get_content(session, resolve_from)
     try:
       parsed_urls = self._response_parser.parse(content)
@@ -7,13 +7,17 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import logging
 import multiprocessing
+import os
 import Queue
 import threading
+from multiprocessing.pool import ThreadPool
 
-import requests
 from requests import RequestException
 
 from pants.cache.artifact_cache import ArtifactCache, NonfatalArtifactCacheError, UnreadableArtifact
+from pants.cache.cache_timings import CacheTimings
+from pants.cache.requests_session import RequestsSession
+from pants.util.contextutil import Timer
 
 
 logger = logging.getLogger(__name__)
@@ -23,48 +27,92 @@ logger = logging.getLogger(__name__)
 logging.getLogger('requests').setLevel(logging.WARNING)
 
 
-class RequestsSession(object):
-  _session = None
-
-  @classmethod
-  def instance(cls):
-    if cls._session is None:
-      cls._session = requests.Session()
-    return cls._session
-
-
 class RESTfulArtifactCache(ArtifactCache):
   """An artifact cache that stores the artifacts on a RESTful service."""
 
   READ_SIZE_BYTES = 4 * 1024 * 1024
 
-  def __init__(self, artifact_root, best_url_selector, local):
+  DEFAULT_MAX_CONCURRENT_REQUESTS = 16
+
+  def __init__(self, artifact_root, best_url_selector, local,
+               max_concurrent_requests=DEFAULT_MAX_CONCURRENT_REQUESTS, write_behind=None):
     """
     :param string artifact_root: The path under which cacheable products will be read/written.
     :param BestUrlSelector best_url_selector: Url selector that supports fail-over. Each returned
       url represents prefix for some RESTful service. We must be able to PUT and GET to any path
       under this base.
     :param BaseLocalArtifactCache local: local cache instance for storing and creating artifacts
+    :param int max_concurrent_requests: The maximum number of requests in flight at once when
+      prefetching.
+    :param WriteBehindSpill write_behind: If set, inserted artifacts are spilled for a background
+      `WriteBehindQueue` to upload, rather than uploaded before `insert` returns.
     """
     super(RESTfulArtifactCache, self).__init__(artifact_root)
 
     self.best_url_selector = best_url_selector
     self._timeout_secs = 4.0
     self._localcache = local
+    self._max_concurrent_requests = max_concurrent_requests
+    self._write_behind = write_behind
 
   def try_insert(self, cache_key, paths):
     # Delegate creation of artifact to local cache.
     with self._localcache.insert_paths(cache_key, paths) as tarfile:
-      # Upload local artifact to remote cache.
-      with open(tarfile, 'rb') as infile:
-        if not self._request('PUT', cache_key, body=infile):
-          raise NonfatalArtifactCacheError('Failed to PUT {0}.'.format(cache_key))
+      if self._write_behind:
+        urls = [url.geturl() for url in self.best_url_selector.parsed_urls]
+        self._write_behind.spill(urls, cache_key, tarfile)
+      else:
+        self.upload(cache_key, tarfile)
+
+  def upload(self, cache_key, tarfile):
+    """Uploads the artifact at `tarfile` to the remote cache under `cache_key`."""
+    with open(tarfile, 'rb') as infile:
+      if not self._request('PUT', cache_key, body=infile):
+        raise NonfatalArtifactCacheError('Failed to PUT {0}.'.format(cache_key))
 
   def has(self, cache_key):
     if self._localcache.has(cache_key):
       return True
     return self._request('HEAD', cache_key) is not None
 
+  def prefetch(self, cache_keys):
+    """Concurrently stream the artifacts for keys missing locally into the local cache.
+
+    The fetches start right away, and their outcomes are yielded as they complete. Errors are
+    logged and reported as unknown: `use_cached_files` will simply retry the fetch.
+    """
+    if not cache_keys or not self._localcache.stores_artifacts:
+      # Nowhere to put prefetched artifacts.
+      return super(RESTfulArtifactCache, self).prefetch(cache_keys)
+
+    # NB: The url selector's failure accounting is not synchronized, so under concurrent failures
+    # fail-over may happen a little earlier or later than `max_failures` would suggest.
+    pool = ThreadPool(processes=min(len(cache_keys), self._max_concurrent_requests))
+    outcomes = pool.imap_unordered(self._fetch_to_local, cache_keys)
+    pool.close()
+
+    def iter_outcomes():
+      try:
+        for outcome in outcomes:
+          yield outcome
+      finally:
+        pool.join()
+    return iter_outcomes()
+
+  def _fetch_to_local(self, cache_key):
+    if self._localcache.has(cache_key):
+      return cache_key, True
+    try:
+      response = self._request('GET', cache_key)
+      if response is None:
+        return cache_key, False
+      self._localcache.store_artifact(cache_key, response.iter_content(self.READ_SIZE_BYTES))
+      return cache_key, True
+    except Exception as e:
+      logger.debug('Error while prefetching {0} from remote artifact cache: {1}'
+                   .format(cache_key, e))
+      return cache_key, None
+
   def use_cached_files(self, cache_key, results_dir=None):
     if self._localcache.has(cache_key):
       return self._localcache.use_cached_files(cache_key, results_dir)
@@ -106,30 +154,49 @@ class RESTfulArtifactCache(ArtifactCache):
       url = self._url_for_key(best_url, cache_key)
       logger.debug('Sending {0} request to {1}'.format(method, url))
       try:
-        if 'PUT' == method:
-          response = session.put(url, data=body, timeout=self._timeout_secs)
-        elif 'GET' == method:
-          response = session.get(url, timeout=self._timeout_secs, stream=True)
-        elif 'HEAD' == method:
-          response = session.head(url, timeout=self._timeout_secs)
-        elif 'DELETE' == method:
-          response = session.delete(url, timeout=self._timeout_secs)
-        else:
-          raise ValueError('Unknown request method {0}'.format(method))
+        with Timer() as timer:
+          if 'PUT' == method:
+            response = session.put(url, data=body, timeout=self._timeout_secs)
+          elif 'GET' == method:
+            response = session.get(url, timeout=self._timeout_secs, stream=True)
+          elif 'HEAD' == method:
+            response = session.head(url, timeout=self._timeout_secs)
+          elif 'DELETE' == method:
+            response = session.delete(url, timeout=self._timeout_secs)
+          else:
+            raise ValueError('Unknown request method {0}'.format(method))
       except RequestException as e:
+        self._record_request(method, 'error', timer.elapsed)
         raise NonfatalArtifactCacheError('Failed to {0} {1}. Error: {2}'
                                          .format(method, url, e))
       # Allow all 2XX responses. E.g., nginx returns 201 on PUT. HEAD may return 204.
       if int(response.status_code / 100) == 2:
+        self._record_request(method, 'hit', timer.elapsed, response=response, body=body)
         return response
       elif response.status_code == 404:
+        self._record_request(method, 'miss', timer.elapsed)
         logger.debug('404 returned for {0} request to {1}'.format(method, url))
         return None
       else:
+        self._record_request(method, 'error', timer.elapsed)
         raise NonfatalArtifactCacheError('Failed to {0} {1}. Error: {2} {3}'
                                          .format(method, url,
                                                  response.status_code, response.reason))
 
+  @staticmethod
+  def _record_request(method, outcome, secs, response=None, body=None):
+    """Records a request's latency under the `remote.<method>.<outcome>` stage.
+
+    For GETs the latency is the time to the response headers: the body is streamed, and its
+    transfer time is recorded by the extraction that consumes it.
+    """
+    nbytes = 0
+    if body is not None and hasattr(body, 'fileno'):
+      nbytes = os.fstat(body.fileno()).st_size
+    elif response is not None and method == 'GET':
+      nbytes = int(response.headers.get('content-length') or 0)
+    CacheTimings.recorder().record('remote.{}.{}'.format(method.lower(), outcome), secs, nbytes)
+
   def _url_suffix_for_key(self, cache_key):
     return '{0}/{1}.tgz'.format(cache_key.id, cache_key.hash)
 
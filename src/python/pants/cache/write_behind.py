@@ -0,0 +1,244 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import Queue
+import shutil
+import threading
+import time
+
+from pants.cache.artifact_cache import NonfatalArtifactCacheError
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.dirutil import safe_delete, safe_file_dump, safe_mkdir
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindSpill(object):
+  """Hands artifacts destined for a remote cache to a `WriteBehindQueue` via a spill directory.
+
+  Spilling is just a local file operation, so it is cheap enough to do on the build's critical
+  path, and it works from subprocess workers: instances are picklable, and the queue picks spilled
+  artifacts up from disk.
+
+  Each spilled artifact is a tarball plus a json file naming the remote cache urls and cache key
+  it is to be uploaded under. The json file is written last, so its presence marks a complete
+  entry.
+  """
+
+  ARTIFACT_SUFFIX = '.tgz'
+  ENTRY_SUFFIX = '.json'
+
+  def __init__(self, spill_dir):
+    self.spill_dir = spill_dir
+
+  def spill(self, urls, cache_key, tarfile):
+    """Queues the artifact at `tarfile` for upload under `cache_key` to the remote cache at `urls`.
+
+    :param list urls: The remote cache urls to choose from, best first, as given to a
+                      `BestUrlSelector`.
+    :param CacheKey cache_key: The key to upload the artifact under.
+    :param str tarfile: The artifact, which may be deleted as soon as this returns.
+    """
+    safe_mkdir(self.spill_dir)
+    # Artifacts are named for their destination, so spilling one again while it is still queued
+    # replaces the queued copy rather than uploading it twice.
+    name = hashlib.sha1(json.dumps([urls, cache_key.id, cache_key.hash])).hexdigest()
+    artifact_path = os.path.join(self.spill_dir, name + self.ARTIFACT_SUFFIX)
+    tmp_path = '{}.{}.tmp'.format(artifact_path, os.getpid())
+    try:
+      os.link(tarfile, tmp_path)
+    except OSError:
+      # Across filesystems, or onto an existing temp file left by a crash.
+      safe_delete(tmp_path)
+      shutil.copyfile(tarfile, tmp_path)
+    os.rename(tmp_path, artifact_path)
+
+    entry = json.dumps({'urls': urls, 'id': cache_key.id, 'hash': cache_key.hash})
+    entry_path = os.path.join(self.spill_dir, name + self.ENTRY_SUFFIX)
+    safe_file_dump('{}.{}.tmp'.format(entry_path, os.getpid()), entry)
+    os.rename('{}.{}.tmp'.format(entry_path, os.getpid()), entry_path)
+
+
+class WriteBehindQueue(object):
+  """Uploads artifacts spilled by `WriteBehindSpill` to their remote caches in the background.
+
+  With write-behind, inserting into a remote cache only spills the artifact, and the upload
+  latency stays off the build's critical path. Uploads run in a bounded pool of threads in the
+  pants process, and at the end of the run `drain_all` waits for the remaining ones, up to a
+  deadline.
+
+  Uploads that fail or miss the deadline stay in the spill directory, and are picked up by the
+  next run's queue. The upload threads are daemon threads that nothing joins, so an upload still
+  running at the deadline never holds up the exit of the process.
+  """
+
+  # Seconds between scans of the spill directory for newly spilled artifacts.
+  POLL_INTERVAL_SECS = 0.2
+
+  _instances = {}
+  _instances_lock = threading.Lock()
+
+  @classmethod
+  def for_dir(cls, spill_dir, max_concurrent_uploads, deadline_secs):
+    """Returns the started queue uploading artifacts spilled to `spill_dir`, creating it if needed.
+
+    :param str spill_dir: The spill directory of the `WriteBehindSpill` feeding the queue.
+    :param int max_concurrent_uploads: The maximum number of uploads in flight at once.
+    :param float deadline_secs: How long `drain_all` waits for outstanding uploads.
+    """
+    with cls._instances_lock:
+      queue = cls._instances.get(spill_dir)
+      if queue is None:
+        queue = cls(spill_dir, max_concurrent_uploads, deadline_secs)
+        queue.start()
+        cls._instances[spill_dir] = queue
+      return queue
+
+  @classmethod
+  def drain_all(cls):
+    """Stops all queues, once each has uploaded everything spilled or has reached its deadline.
+
+    :returns: The number of artifacts left for a future run to upload.
+    """
+    with cls._instances_lock:
+      queues = cls._instances.values()
+      cls._instances = {}
+    return sum(queue.drain() for queue in queues)
+
+  @classmethod
+  def has_queues(cls):
+    with cls._instances_lock:
+      return bool(cls._instances)
+
+  def __init__(self, spill_dir, max_concurrent_uploads, deadline_secs):
+    self._spill_dir = spill_dir
+    self._deadline_secs = deadline_secs
+    self._lock = threading.Lock()
+    # Signalled whenever an upload finishes.
+    self._upload_done = threading.Condition(self._lock)
+    # Entry names queued or being uploaded.
+    self._in_flight = set()
+    # Entry names whose upload failed in this run, to be retried by the next one.
+    self._failed = set()
+    self._uploads = Queue.Queue()
+    self._stopped = threading.Event()
+    self._drained = threading.Event()
+    self._poller = threading.Thread(target=self._poll, name='write-behind-poller')
+    self._poller.daemon = True
+    self._uploaders = []
+    for i in range(max(1, max_concurrent_uploads)):
+      uploader = threading.Thread(target=self._upload_loop,
+                                  name='write-behind-uploader-{}'.format(i))
+      uploader.daemon = True
+      self._uploaders.append(uploader)
+    self.uploaded = 0
+
+  @property
+  def spill(self):
+    """The `WriteBehindSpill` that feeds this queue."""
+    return WriteBehindSpill(self._spill_dir)
+
+  def start(self):
+    for uploader in self._uploaders:
+      uploader.start()
+    self._poller.start()
+
+  def drain(self):
+    """Waits up to the deadline for all spilled artifacts to be uploaded, and stops the queue.
+
+    :returns: The number of artifacts left in the spill directory.
+    """
+    self._stopped.set()
+    if self._poller.is_alive():
+      self._poller.join()
+    self._schedule()
+    deadline = time.time() + self._deadline_secs
+    with self._lock:
+      while self._in_flight and any(uploader.is_alive() for uploader in self._uploaders):
+        remaining_secs = deadline - time.time()
+        if remaining_secs <= 0:
+          break
+        self._upload_done.wait(remaining_secs)
+    # Queued uploads are dropped, and uploads already running are abandoned rather than waited for:
+    # their entries stay spilled.
+    self._drained.set()
+    for _ in self._uploaders:
+      self._uploads.put(None)
+    remaining = len(self._entry_names())
+    if remaining:
+      logger.warn('{} artifacts were not uploaded to the remote cache in time, and will be '
+                  'uploaded by a later run.'.format(remaining))
+    return remaining
+
+  def _poll(self):
+    while not self._stopped.is_set():
+      self._schedule()
+      self._stopped.wait(self.POLL_INTERVAL_SECS)
+
+  def _schedule(self):
+    for name in self._entry_names():
+      with self._lock:
+        if name in self._in_flight or name in self._failed:
+          continue
+        self._in_flight.add(name)
+      self._uploads.put(name)
+
+  def _upload_loop(self):
+    while True:
+      name = self._uploads.get()
+      if name is None or self._drained.is_set():
+        return
+      try:
+        self._upload(name)
+      finally:
+        with self._lock:
+          self._in_flight.discard(name)
+          self._upload_done.notify_all()
+
+  def _entry_names(self):
+    try:
+      filenames = os.listdir(self._spill_dir)
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return []
+    return [filename[:-len(WriteBehindSpill.ENTRY_SUFFIX)] for filename in filenames
+            if filename.endswith(WriteBehindSpill.ENTRY_SUFFIX)]
+
+  def _upload(self, name):
+    entry_path = os.path.join(self._spill_dir, name + WriteBehindSpill.ENTRY_SUFFIX)
+    artifact_path = os.path.join(self._spill_dir, name + WriteBehindSpill.ARTIFACT_SUFFIX)
+    start = time.time()
+    try:
+      with open(entry_path, 'rb') as infile:
+        entry = json.load(infile)
+      cache_key = CacheKey(entry['id'], entry['hash'])
+      # NB: The artifact root is only used for reads, so the remote cache needs neither it nor a
+      # local cache to upload.
+      cache = RESTfulArtifactCache(None, BestUrlSelector(entry['urls']), None)
+      cache.upload(cache_key, artifact_path)
+    except (IOError, OSError, ValueError, NonfatalArtifactCacheError) as e:
+      logger.warn('Failed to upload spilled artifact {} to the remote cache: {}'.format(name, e))
+      with self._lock:
+        self._failed.add(name)
+      return False
+    # Remove the entry first, so that a concurrent scan never sees an entry without its artifact.
+    safe_delete(entry_path)
+    safe_delete(artifact_path)
+    logger.debug('Uploaded spilled artifact {} in {:.3f} secs.'
+                 .format(cache_key, time.time() - start))
+    with self._lock:
+      self.uploaded += 1
+    return True
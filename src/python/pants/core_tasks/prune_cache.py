@@ -0,0 +1,31 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+
+from pants.cache.cache_setup import CacheSetup
+from pants.task.task import Task
+
+
+class PruneCache(Task):
+  """Evict least recently used artifacts from local caches, to fit the configured budget.
+
+  The budget is set with the --cache-max-local-size and --cache-max-local-entry-age options.
+  """
+
+  def execute(self):
+    cache_factory = CacheSetup.create_cache_factory_for_task(self)
+    for path in cache_factory.local_cache_paths():
+      evictor = cache_factory.create_local_evictor(path)
+      if not evictor.enabled:
+        self.context.log.info('No local cache budget configured, not pruning {}.'.format(path))
+        continue
+      if not os.path.isdir(evictor.root):
+        continue
+      result = evictor.evict()
+      self.context.log.info('Evicted {} entries ({} bytes) from {}, {} bytes remain.'
+                            .format(result.removed, result.freed, path, result.remaining))
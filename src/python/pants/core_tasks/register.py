@@ -13,6 +13,7 @@ from pants.core_tasks.invalidate import Invalidate
 from pants.core_tasks.list_goals import ListGoals
 from pants.core_tasks.noop import NoopCompile, NoopTest
 from pants.core_tasks.pantsd_kill import PantsDaemonKill
+from pants.core_tasks.prune_cache import PruneCache
 from pants.core_tasks.reporting_server_kill import ReportingServerKill
 from pants.core_tasks.reporting_server_run import ReportingServerRun
 from pants.core_tasks.roots import ListRoots
@@ -57,6 +58,7 @@ def register_goals():
   # Cleaning.
   task(name='invalidate', action=Invalidate).install()
   task(name='clean-all', action=Clean).install('clean-all')
+  task(name='prune-cache', action=PruneCache).install()
 
   # Pantsd.
   kill_pantsd = task(name='kill-pantsd', action=PantsDaemonKill)
@@ -279,6 +279,9 @@ def filter_build_dirs(address_mapper, snapshot):
   dirnames = set(dirname(f.stat.path) for f in snapshot.files)
   ignored_dirnames = address_mapper.build_ignore_patterns.match_files('{}/'.format(dirname) for dirname in dirnames)
   ignored_dirnames = set(d.rstrip('/') for d in ignored_dirnames)
+  paths = [f.stat.path for f in snapshot.files if dirname(f.stat.path) not in ignored_dirnames]
+  ignored_paths = set(address_mapper.build_ignore_patterns.match_files(paths))
+  address_mapper.parser.preload([p for p in paths if p not in ignored_paths])
   return BuildDirs(tuple(Dir(d) for d in dirnames if d not in ignored_dirnames))
 
 
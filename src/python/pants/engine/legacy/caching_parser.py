@@ -0,0 +1,194 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import logging
+import multiprocessing
+import os
+import re
+import sys
+from hashlib import sha1
+
+from six.moves import cPickle as pickle
+
+from pants.engine.parser import Parser
+from pants.util.dirutil import read_file, safe_concurrent_creation, safe_delete
+from pants.version import VERSION
+
+
+logger = logging.getLogger(__name__)
+
+
+def aliases_fingerprint(aliases):
+  """Returns a fingerprint of the given aliases, changing whenever what they expose might change.
+
+  Besides the version of pants, the alias names and the qualified names of the objects they
+  expose, this covers the modification times of the modules defining those objects, so that editing
+  a plugin invalidates the BUILD files parsed with it.
+
+  :param aliases: The registered aliases BUILD files are parsed with.
+  :type aliases: :class:`pants.build_graph.build_file_aliases.BuildFileAliases`
+  :rtype: string
+  """
+  hasher = sha1()
+  hasher.update(VERSION.encode('utf-8'))
+  for category in (aliases.target_types,
+                   aliases.target_macro_factories,
+                   aliases.objects,
+                   aliases.context_aware_object_factories):
+    for alias, obj in sorted(category.items()):
+      module_name = getattr(obj, '__module__', None) or type(obj).__module__
+      name = getattr(obj, '__name__', None) or type(obj).__name__
+      hasher.update('\0{}\0{}.{}'.format(alias, module_name, name).encode('utf-8'))
+      hasher.update(_module_stamp(module_name).encode('utf-8'))
+  return hasher.hexdigest()
+
+
+def _module_stamp(module_name):
+  module = sys.modules.get(module_name)
+  path = getattr(module, '__file__', None)
+  if not path:
+    return ''
+  try:
+    return '{!r}'.format(os.path.getmtime(path))
+  except OSError:
+    return ''
+
+
+# The parser used by preload workers, which inherit it when they are forked.
+_preload_parser = None
+
+
+def _preload_one(args):
+  filepath, filecontent = args
+  try:
+    _preload_parser.parse(filepath, filecontent)
+  except Exception as e:
+    # The BUILD file is parsed again when the engine asks for it, which reports the error.
+    logger.debug('Failed to preload {}: {}'.format(filepath, e))
+
+
+class CachingParser(Parser):
+  """A Parser that caches the objects parsed from BUILD files on disk.
+
+  A cached parse is keyed by the BUILD file's path and content and by a fingerprint of the
+  registered aliases, so an unchanged BUILD file is executed once rather than by every run. Only
+  the latest parse of each BUILD file is kept.
+
+  BUILD files that use import statements or context-aware object factories (like
+  `python_requirements`) may read other files, so they are always parsed. So are BUILD files whose
+  objects cannot be pickled.
+
+  With a parallelism above 1, the BUILD files of a spec are parsed across a pool of processes into
+  the cache before the engine asks for them.
+  """
+
+  def __init__(self, parser, aliases, build_root, cache_dir, parallelism=1):
+    """
+    :param parser: The parser to parse BUILD files with on a cache miss.
+    :type parser: :class:`pants.engine.parser.Parser`
+    :param aliases: The registered aliases the parser parses BUILD files with.
+    :type aliases: :class:`pants.build_graph.build_file_aliases.BuildFileAliases`
+    :param string build_root: The build root preloaded BUILD files are read relative to.
+    :param string cache_dir: The directory to store cached parses in.
+    :param int parallelism: The number of processes to preload BUILD files with.
+    """
+    super(CachingParser, self).__init__()
+    self._parser = parser
+    self._build_root = build_root
+    self._cache_dir = cache_dir
+    self._parallelism = parallelism
+    self._fingerprint = aliases_fingerprint(aliases)
+    uncacheable = ['import'] + sorted(aliases.context_aware_object_factories)
+    self._uncacheable_re = re.compile(r'\b(?:{})\b'.format('|'.join(map(re.escape, uncacheable))))
+
+  def _is_cacheable(self, filecontent):
+    return self._uncacheable_re.search(filecontent) is None
+
+  def _key(self, filepath, filecontent):
+    hasher = sha1()
+    hasher.update(self._fingerprint.encode('utf-8'))
+    hasher.update('\0{}\0'.format(filepath).encode('utf-8'))
+    hasher.update(filecontent)
+    return hasher.hexdigest().encode('utf-8')
+
+  def _path(self, filepath):
+    digest = sha1(filepath.encode('utf-8')).hexdigest()
+    return os.path.join(self._cache_dir, digest[:2], digest[2:])
+
+  def _read(self, filepath, key, load=True):
+    """Returns the parse of `filepath` cached under `key`, or None if there is none.
+
+    With `load=False`, returns True rather than the parse if there is one.
+    """
+    path = self._path(filepath)
+    try:
+      with open(path, 'rb') as infile:
+        if infile.readline().rstrip(b'\n') != key:
+          return None
+        return pickle.load(infile) if load else True
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        logger.debug('Failed to read the cached parse of {}: {}'.format(filepath, e))
+      return None
+    except Exception as e:
+      # Unpickling may raise just about anything for a corrupt entry, or for one referencing a type
+      # that no longer exists.
+      logger.debug('Discarding the cached parse of {}: {}'.format(filepath, e))
+      safe_delete(path)
+      return None
+
+  def _write(self, filepath, key, objects):
+    try:
+      pickled = pickle.dumps(objects, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+      # Pickling raises PicklingError, TypeError or AttributeError depending on the object at fault.
+      logger.debug('The objects parsed from {} cannot be cached: {}'.format(filepath, e))
+      return
+    with safe_concurrent_creation(self._path(filepath)) as tmp_path:
+      with open(tmp_path, 'wb') as outfile:
+        outfile.write(key + b'\n')
+        outfile.write(pickled)
+
+  def parse(self, filepath, filecontent):
+    if not self._is_cacheable(filecontent):
+      return self._parser.parse(filepath, filecontent)
+    key = self._key(filepath, filecontent)
+    objects = self._read(filepath, key)
+    if objects is None:
+      objects = self._parser.parse(filepath, filecontent)
+      self._write(filepath, key, objects)
+    return objects
+
+  def preload(self, filepaths):
+    if self._parallelism < 2:
+      return
+    pending = []
+    for filepath in filepaths:
+      try:
+        filecontent = read_file(os.path.join(self._build_root, filepath))
+      except IOError:
+        continue
+      if self._is_cacheable(filecontent):
+        key = self._key(filepath, filecontent)
+        if not self._read(filepath, key, load=False):
+          pending.append((filepath, filecontent))
+    if len(pending) < 2:
+      return
+
+    global _preload_parser
+    _preload_parser = self
+    try:
+      pool = multiprocessing.Pool(min(self._parallelism, len(pending)))
+      try:
+        chunksize = max(1, len(pending) // (self._parallelism * 4))
+        pool.map(_preload_one, pending, chunksize=chunksize)
+      finally:
+        pool.close()
+        pool.join()
+    finally:
+      _preload_parser = None
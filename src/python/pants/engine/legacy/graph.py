@@ -139,8 +139,7 @@ class LegacyBuildGraph(BuildGraph):
           .format(spec=dependency.spec, target=address.spec)
         )
       # Link its declared dependencies, which will be indexed independently.
-      self._target_dependencies_by_address[address].add(dependency)
-      self._target_dependees_by_address[dependency].add(address)
+      self._add_dependency_edge(address, dependency)
     return target
 
   def _instantiate_target(self, target_adaptor):
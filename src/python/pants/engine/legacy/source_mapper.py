@@ -8,13 +8,13 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 
 import six
+from twitter.common.collections import OrderedSet
 
 from pants.base.specs import AscendantAddresses, SingleAddress
 from pants.build_graph.address import parse_spec
-from pants.build_graph.source_mapper import SourceMapper
+from pants.build_graph.source_mapper import SourceMapper, SourceOwnerIndex
 from pants.engine.legacy.address_mapper import LegacyAddressMapper
 from pants.engine.legacy.graph import HydratedTargets
-from pants.source.filespec import any_matches_filespec
 
 
 def iter_resolve_and_parse_specs(rel_path, specs):
@@ -50,15 +50,8 @@ class EngineSourceMapper(SourceMapper):
   def target_addresses_for_source(self, source):
     return list(self.iter_target_addresses_for_sources([source]))
 
-  def _match_sources(self, sources_set, fileset):
-    # NB: Deleted files can only be matched against the 'filespec' (ie, `PathGlobs`) for a target,
-    # so we don't actually call `fileset.matches` here.
-    # TODO: This call should be pushed down into the engine to match directly against
-    # `PathGlobs` as we erode the `AddressMapper`/`SourceMapper` split.
-    return any_matches_filespec(sources_set, fileset.filespec)
-
   def _owns_any_source(self, sources_set, legacy_target):
-    """Given a `HydratedTarget` instance, check if it owns the given source file."""
+    """Given a `HydratedTarget` instance, check if it owns the given source file by `source`."""
     target_kwargs = legacy_target.adaptor.kwargs()
 
     # Handle targets like `python_binary` which have a singular `source='main.py'` declaration.
@@ -68,11 +61,6 @@ class EngineSourceMapper(SourceMapper):
       if path_from_build_root in sources_set:
         return True
 
-    # Handle `sources`-declaring targets.
-    target_sources = target_kwargs.get('sources', [])
-    if target_sources and self._match_sources(sources_set, target_sources):
-      return True
-
     return False
 
   def iter_target_addresses_for_sources(self, sources):
@@ -88,8 +76,25 @@ class EngineSourceMapper(SourceMapper):
         if hydrated_target not in hydrated_target_to_address:
           hydrated_target_to_address[hydrated_target] = hydrated_target.adaptor.address
 
+    # Handle `sources`-declaring targets via an index, rather than matching every changed source
+    # against every target.
+    # NB: Deleted files can only be matched against the 'filespec' (ie, `PathGlobs`) for a target,
+    # so we don't actually call `fileset.matches` here.
+    # TODO: This matching should be pushed down into the engine to match directly against
+    # `PathGlobs` as we erode the `AddressMapper`/`SourceMapper` split.
+    index = SourceOwnerIndex()
     for hydrated_target, legacy_address in six.iteritems(hydrated_target_to_address):
       # Handle BUILD files.
       if (LegacyAddressMapper.any_is_declaring_file(legacy_address, sources_set) or
           self._owns_any_source(sources_set, hydrated_target)):
         yield legacy_address
+        continue
+      target_sources = hydrated_target.adaptor.kwargs().get('sources')
+      if target_sources:
+        index.add(legacy_address, target_sources.filespec)
+
+    owners = OrderedSet()
+    for source in sources_set:
+      owners.update(index.owners_of(source))
+    for legacy_address in owners:
+      yield legacy_address
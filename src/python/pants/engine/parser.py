@@ -46,3 +46,11 @@ class Parser(AbstractClass):
               raise :class:`ParseError` if there were any problems encountered parsing the filecontent.
     :rtype: :class:`collections.Callable`
     """
+
+  def preload(self, filepaths):
+    """Prepares to parse the given files, which are about to be parsed.
+
+    Parsers may use this to parse them ahead of time, all at once. By default, does nothing.
+
+    :param list filepaths: The paths of the files, relative to the build root.
+    """
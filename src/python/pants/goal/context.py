@@ -161,6 +161,12 @@ class Context(object):
     self.run_tracker.pantsd_stats.set_resulting_graph_size(node_count)
     return node_count
 
+  def set_closure_cache_stats_in_runtracker(self):
+    """Sets the build graph's closure cache hit rates in the run tracker."""
+    stats = self.build_graph.closure_cache_stats()
+    self.run_tracker.closure_cache_stats = stats
+    return stats
+
   def submit_background_work_chain(self, work_chain, parent_workunit_name=None):
     """
     :API: public
@@ -211,6 +217,34 @@ class Context(object):
       SubprocPool.shutdown(True)
       raise
 
+  def subproc_map_as_produced(self, f, items):
+    """Map function `f` over `items` in subprocesses, starting on each item as it is produced.
+
+    Unlike `subproc_map`, `items` may be a generator that blocks (e.g. on network fetches): work on
+    the items it has already produced proceeds meanwhile.
+
+      :API: public
+
+      :param f: A multiproc-friendly (importable) work function.
+      :param items: A iterable of pickleable arguments to f.
+      :returns: The results, in the order of `items`.
+    """
+    try:
+      pool = SubprocPool.foreground()
+      pending = [pool.apply_async(f, (item,)) for item in items]
+      results = []
+      for res in pending:
+        # See the note on SIGINT in `subproc_map`.
+        while not res.ready():
+          res.wait(60)
+          if not res.ready():
+            self.log.debug('subproc_map_as_produced result still not ready...')
+        results.append(res.get())
+      return results
+    except KeyboardInterrupt:
+      SubprocPool.shutdown(True)
+      raise
+
   @contextmanager
   def new_workunit(self, name, labels=None, cmd='', log_config=None):
     """Create a new workunit under the calling thread's current workunit.
@@ -314,7 +348,10 @@ class Context(object):
     for synthetic_address in self.build_graph.synthetic_addresses:
       if self.build_graph.get_concrete_derived_from(synthetic_address) in target_set:
         synthetics.add(self.build_graph.get_target(synthetic_address))
-    target_set.update(self._collect_targets(synthetics, **kwargs))
+    if synthetics:
+      # The closure is memoized and shared, and so read-only.
+      target_set = OrderedSet(target_set)
+      target_set.update(self._collect_targets(synthetics, **kwargs))
 
     return filter(predicate, target_set)
 
@@ -0,0 +1,36 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+from collections import defaultdict
+
+
+class NailgunPoolStats(object):
+  """Tracks how often pooled nailgun servers were warm when checked out, per pool identity."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'evictions': 0})
+
+  def record_checkout(self, identity, hit, evictions):
+    """Records a checkout of a server from a pool.
+
+    :param string identity: The identity of the pool.
+    :param bool hit: Whether a warm server was found for the invocation.
+    :param int evictions: The number of servers terminated by the checkout.
+    """
+    with self._lock:
+      stats = self._stats[identity]
+      stats['hits' if hit else 'misses'] += 1
+      stats['evictions'] += evictions
+
+  def get_all(self):
+    with self._lock:
+      return {
+        identity: dict(stats, hit_rate=stats['hits'] / (stats['hits'] + stats['misses']))
+        for identity, stats in self._stats.items()
+      }
@@ -12,6 +12,8 @@ class PantsDaemonStats(object):
   def __init__(self):
     self.preceding_graph_size = None
     self.resulting_graph_size = None
+    self.request_queue_secs = None
+    self.request_setup_secs = None
 
   def set_preceding_graph_size(self, size):
     self.preceding_graph_size = size
@@ -19,8 +21,20 @@ class PantsDaemonStats(object):
   def set_resulting_graph_size(self, size):
     self.resulting_graph_size = size
 
+  def set_request_timings(self, queue_secs, setup_secs):
+    """Records the latency of the daemon's handling of this run's request.
+
+    :param float queue_secs: The time the request waited for a free request worker.
+    :param float setup_secs: The time from then until the fork, parsing options and warming the
+                             graph.
+    """
+    self.request_queue_secs = queue_secs
+    self.request_setup_secs = setup_secs
+
   def get_all(self):
     return {
       'preceding_graph_size': self.preceding_graph_size,
       'resulting_graph_size': self.resulting_graph_size,
+      'request_queue_secs': self.request_queue_secs,
+      'request_setup_secs': self.request_setup_secs,
     }
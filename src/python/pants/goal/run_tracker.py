@@ -23,9 +23,14 @@ from pants.base.run_info import RunInfo
 from pants.base.worker_pool import SubprocPool, WorkerPool
 from pants.base.workunit import WorkUnit
 from pants.build_graph.target import Target
+from pants.cache.cache_timings import CacheTimings
+from pants.cache.requests_session import RequestsSession
+from pants.cache.write_behind import WriteBehindQueue
 from pants.goal.aggregated_timings import AggregatedTimings
 from pants.goal.artifact_cache_stats import ArtifactCacheStats
+from pants.goal.nailgun_pool_stats import NailgunPoolStats
 from pants.goal.pantsd_stats import PantsDaemonStats
+from pants.goal.worker_admission_stats import WorkerAdmissionStats
 from pants.reporting.report import Report
 from pants.stats.statsdb import StatsDBFactory
 from pants.subsystem.subsystem import Subsystem
@@ -93,7 +98,13 @@ class RunTracker(Subsystem):
     self.cumulative_timings = None
     self.self_timings = None
     self.artifact_cache_stats = None
+    self.artifact_cache_timings = None
     self.pantsd_stats = None
+    self.worker_admission_stats = None
+    self.nailgun_pool_stats = None
+
+    # Set by the `Context` once goals have run.
+    self.closure_cache_stats = None
 
     # Initialized in `start()`.
     self.report = None
@@ -189,9 +200,18 @@ class RunTracker(Subsystem):
     self.artifact_cache_stats = ArtifactCacheStats(os.path.join(self.run_info_dir,
                                                                 'artifact_cache_stats'))
 
+    # Latency histograms for artifact cache operations.
+    self.artifact_cache_timings = CacheTimings()
+
     # Daemon stats.
     self.pantsd_stats = PantsDaemonStats()
 
+    # Decisions of tasks that scale their concurrency to the machine's free memory and load.
+    self.worker_admission_stats = WorkerAdmissionStats()
+
+    # Warm server hit rates of pooled nailguns.
+    self.nailgun_pool_stats = NailgunPoolStats()
+
     return run_id
 
   def start(self, report, run_start_time=None):
@@ -345,12 +365,20 @@ class RunTracker(Subsystem):
     if target_data:
       run_information['target_data'] = ast.literal_eval(target_data)
 
+    # Pick up whatever cache operations ran in this process rather than in subprocess workers.
+    self.artifact_cache_timings.merge(CacheTimings.recorder().drain())
+
     stats = {
       'run_info': run_information,
       'cumulative_timings': self.cumulative_timings.get_all(),
       'self_timings': self.self_timings.get_all(),
       'artifact_cache_stats': self.artifact_cache_stats.get_all(),
+      'remote_cache_connection_stats': RequestsSession.connection_stats(),
+      'artifact_cache_timings': self.artifact_cache_timings.get_all(),
       'pantsd_stats': self.pantsd_stats.get_all(),
+      'worker_admission_stats': self.worker_admission_stats.get_all(),
+      'nailgun_pool_stats': self.nailgun_pool_stats.get_all(),
+      'closure_cache_stats': self.closure_cache_stats,
       'outcomes': self.outcomes
     }
     # Dump individual stat file.
@@ -390,6 +418,11 @@ class RunTracker(Subsystem):
         self._background_worker_pool.shutdown()
       self.end_workunit(self._background_root_workunit)
 
+    if WriteBehindQueue.has_queues():
+      # NB: Even an aborted run waits out the deadline here, since uploads are already in flight.
+      self.log(Report.INFO, "Waiting for background artifact cache uploads to finish.")
+      WriteBehindQueue.drain_all()
+
     self.shutdown_worker_pool()
 
     # Run a dummy work unit to write out one last timestamp.
@@ -0,0 +1,30 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+from collections import defaultdict
+
+
+class WorkerAdmissionStats(object):
+  """Tracks the decisions of adaptive worker admission, per task scope."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._decisions = defaultdict(list)
+
+  def record_decision(self, scope, decision):
+    """Records a change in the number of workers a task allows to run concurrently.
+
+    :param string scope: The options scope of the task.
+    :param dict decision: The new number of workers, and the measurements it was based on.
+    """
+    with self._lock:
+      self._decisions[scope].append(decision)
+
+  def get_all(self):
+    with self._lock:
+      return {scope: list(decisions) for scope, decisions in self._decisions.items()}
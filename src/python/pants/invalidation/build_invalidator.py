@@ -8,8 +8,11 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import errno
 import hashlib
 import os
+import sqlite3
+import threading
 from abc import abstractmethod
 from collections import namedtuple
+from contextlib import closing, contextmanager
 
 from pants.base.hash_utils import hash_all
 from pants.build_graph.target import Target
@@ -84,6 +87,15 @@ class CacheKeyGeneratorInterface(AbstractClass):
       fingerprinting of a given Target.
     """
 
+  def keys_for_targets(self, targets, transitive=False, fingerprint_strategy=None):
+    """Get keys for several targets at once, as `key_for_target` would for each.
+
+    :returns: A list of CacheKeys (or None for targets with no fingerprint), parallel to `targets`.
+    """
+    return [self.key_for_target(target, transitive=transitive,
+                                fingerprint_strategy=fingerprint_strategy)
+            for target in targets]
+
 
 class CacheKeyGenerator(CacheKeyGeneratorInterface):
   def __init__(self, *base_fingerprint_inputs):
@@ -98,12 +110,25 @@ class CacheKeyGenerator(CacheKeyGeneratorInterface):
     self._base_hasher = hasher
 
   def key_for_target(self, target, transitive=False, fingerprint_strategy=None):
-    hasher = self._base_hasher.copy()
-    key_suffix = hasher.hexdigest()[:12]
     if transitive:
       target_key = target.transitive_invalidation_hash(fingerprint_strategy)
     else:
       target_key = target.invalidation_hash(fingerprint_strategy)
+    return self._key_for_hash(target, target_key)
+
+  def keys_for_targets(self, targets, transitive=False, fingerprint_strategy=None):
+    if not transitive:
+      return [self.key_for_target(target, fingerprint_strategy=fingerprint_strategy)
+              for target in targets]
+    # Hash all of the targets' dependency closures together, so that shared subgraphs are hashed
+    # only once.
+    target_keys = Target.compute_transitive_invalidation_hashes(targets, fingerprint_strategy)
+    return [self._key_for_hash(target, target_key)
+            for target, target_key in zip(targets, target_keys)]
+
+  def _key_for_hash(self, target, target_key):
+    hasher = self._base_hasher.copy()
+    key_suffix = hasher.hexdigest()[:12]
     if target_key is not None:
       full_key = '{target_key}_{key_suffix}'.format(target_key=target_key, key_suffix=key_suffix)
       return CacheKey(target.id, full_key)
@@ -118,15 +143,132 @@ class UncacheableCacheKeyGenerator(CacheKeyGeneratorInterface):
     return CacheKey.uncacheable(target.id)
 
 
+class FingerprintStore(AbstractClass):
+  """Persists the hash of the last successful build of each target set, keyed by target set id."""
+
+  # Whether writes to this store are expensive enough one at a time that callers should batch them.
+  batched = False
+
+  def __init__(self, root):
+    """
+    :param str root: The directory holding the fingerprints of one invalidator scope.
+    """
+    self._root = root
+
+  @abstractmethod
+  def read(self, ids):
+    """Returns a dict from each of the given ids that has a stored hash to that hash."""
+
+  @abstractmethod
+  def write(self, updates, deletes):
+    """Stores the `updates` dict of id to hash and removes the hashes of the `deletes` ids."""
+
+  def clear(self):
+    """Removes all stored hashes."""
+    safe_mkdir(self._root, clean=True)
+
+
+class FileFingerprintStore(FingerprintStore):
+  """Stores each hash in its own `<id>.hash` file."""
+
+  def read(self, ids):
+    hashes = {}
+    for id in ids:
+      try:
+        with open(self._sha_file_by_id(id), 'rb') as fd:
+          hashes[id] = fd.read().strip()
+      except IOError as e:
+        if e.errno != errno.ENOENT:
+          raise
+    return hashes
+
+  def write(self, updates, deletes):
+    for id in deletes:
+      try:
+        os.unlink(self._sha_file_by_id(id))
+      except OSError as e:
+        if e.errno != errno.ENOENT:
+          raise
+    for id, hash in updates.items():
+      with open(self._sha_file_by_id(id), 'w') as fd:
+        fd.write(hash)
+
+  def _sha_file_by_id(self, id):
+    return os.path.join(self._root, safe_filename(id, extension='.hash'))
+
+
+class SqliteFingerprintStore(FingerprintStore):
+  """Stores all hashes of a scope in a single indexed sqlite database file.
+
+  Reads for any number of ids cost a handful of queries against one file, and a batch of writes
+  is committed in a single transaction, so either all of it or none of it is durable.
+  """
+
+  batched = True
+
+  DB_NAME = 'fingerprints.db'
+
+  # Stay well under sqlite's default limit of 999 host parameters per statement.
+  _MAX_QUERY_PARAMS = 500
+
+  def __init__(self, root):
+    super(SqliteFingerprintStore, self).__init__(root)
+    self._db_path = os.path.join(root, self.DB_NAME)
+
+  @contextmanager
+  def _connection(self):
+    # The scope directory may be wiped by `force_invalidate_all` on another invalidator, so we
+    # connect per operation instead of holding on to a connection to a possibly unlinked file.
+    safe_mkdir(self._root)
+    with closing(sqlite3.connect(self._db_path, timeout=60)) as conn:
+      conn.execute('CREATE TABLE IF NOT EXISTS fingerprints (id TEXT PRIMARY KEY, hash TEXT)')
+      with conn:
+        yield conn
+
+  def read(self, ids):
+    ids = list(ids)
+    if not ids:
+      return {}
+    hashes = {}
+    with self._connection() as conn:
+      for i in range(0, len(ids), self._MAX_QUERY_PARAMS):
+        chunk = ids[i:i + self._MAX_QUERY_PARAMS]
+        query = 'SELECT id, hash FROM fingerprints WHERE id IN ({})'.format(
+          ', '.join('?' * len(chunk)))
+        hashes.update(conn.execute(query, chunk))
+    return hashes
+
+  def write(self, updates, deletes):
+    if not updates and not deletes:
+      return
+    with self._connection() as conn:
+      conn.executemany('DELETE FROM fingerprints WHERE id = ?', ((id,) for id in deletes))
+      conn.executemany('INSERT OR REPLACE INTO fingerprints (id, hash) VALUES (?, ?)',
+                       updates.items())
+
+
 # A persistent map from target set to cache key, which is a fingerprint of all
 # the inputs to the current version of that target set. That cache key can then be used
 # to look up build artifacts in an artifact cache.
 class BuildInvalidator(object):
   """Invalidates build targets based on the SHA1 hash of source files and other inputs."""
 
+  STORES = {
+    'files': FileFingerprintStore,
+    'sqlite': SqliteFingerprintStore,
+  }
+
   class Factory(Subsystem):
     options_scope = 'build-invalidator'
 
+    @classmethod
+    def register_options(cls, register):
+      super(BuildInvalidator.Factory, cls).register_options(register)
+      register('--store', advanced=True, choices=sorted(BuildInvalidator.STORES), default='files',
+               help='How to persist target fingerprints. `files` keeps one small file per target; '
+                    '`sqlite` keeps a single indexed database per task, read in bulk for each '
+                    'invalidation check and written in one transaction when the task finishes.')
+
     @classmethod
     def create(cls, build_task=None):
       """Creates a build invalidator optionally scoped to a task.
@@ -135,8 +277,9 @@ class BuildInvalidator(object):
                              supplied the build invalidator will act globally across all build
                              tasks.
       """
-      root = os.path.join(cls.global_instance().get_options().pants_workdir, 'build_invalidator')
-      return BuildInvalidator(root, scope=build_task)
+      options = cls.global_instance().get_options()
+      root = os.path.join(options.pants_workdir, 'build_invalidator')
+      return BuildInvalidator(root, scope=build_task, store=options.store)
 
   @staticmethod
   def cacheable(cache_key):
@@ -147,17 +290,33 @@ class BuildInvalidator(object):
     """
     return cache_key.cacheable
 
-  def __init__(self, root, scope=None):
+  def __init__(self, root, scope=None, store='files'):
     """Create a build invalidator using the given root fingerprint database directory.
 
     :param str root: The root directory to use for storing build invalidation fingerprints.
     :param str scope: The scope of this invalidator; if `None` then this invalidator will be global.
+    :param str store: The name of the `FingerprintStore` to persist fingerprints with.
     """
     root = os.path.join(root, GLOBAL_CACHE_KEY_GEN_VERSION)
     if scope:
       root = os.path.join(root, scope)
     self._root = root
     safe_mkdir(self._root)
+    self._store = self.STORES[store](self._root)
+
+    # Hashes read up front by `preload`, with None recording a known absence.
+    self._preloaded_hashes = {}
+    # Writes held back by `batched_writes`, with None recording a pending delete. Batches are per
+    # thread, so that a batch closed on one thread never drops writes made concurrently on another.
+    self._batch = threading.local()
+
+  @property
+  def _pending(self):
+    return getattr(self._batch, 'pending', None)
+
+  @_pending.setter
+  def _pending(self, pending):
+    self._batch.pending = pending
 
   def previous_key(self, cache_key):
     """If there was a previous successful build for the given key, return the previous key.
@@ -192,39 +351,64 @@ class BuildInvalidator(object):
     :param cache_key: A CacheKey object (typically returned by CacheKeyGenerator.key_for()).
     """
     if self.cacheable(cache_key):
-      self._write_sha(cache_key)
+      self._write_sha(cache_key.id, cache_key.hash)
 
   def force_invalidate_all(self):
     """Force-invalidates all cached items."""
-    safe_mkdir(self._root, clean=True)
+    self._preloaded_hashes.clear()
+    if self._pending is not None:
+      self._pending.clear()
+    self._store.clear()
 
   def force_invalidate(self, cache_key):
     """Force-invalidate the cached item."""
-    try:
-      if self.cacheable(cache_key):
-        os.unlink(self._sha_file(cache_key))
-    except OSError as e:
-      if e.errno != errno.ENOENT:
-        raise
+    if self.cacheable(cache_key):
+      self._write_sha(cache_key.id, None)
 
-  def _sha_file(self, cache_key):
-    return self._sha_file_by_id(cache_key.id)
+  def preload(self, cache_keys):
+    """Reads the previous hashes of all the given keys from the store at once.
 
-  def _sha_file_by_id(self, id):
-    return os.path.join(self._root, safe_filename(id, extension='.hash'))
+    Subsequent `previous_key` and `needs_update` calls for these keys are served from memory until
+    the key is next written.
+    """
+    ids = set(cache_key.id for cache_key in cache_keys if self.cacheable(cache_key))
+    hashes = self._store.read(ids)
+    for id in ids:
+      self._preloaded_hashes[id] = hashes.get(id)
+
+  @contextmanager
+  def batched_writes(self):
+    """A with-context in which updates and invalidations are written as one batch on exit.
 
-  def _write_sha(self, cache_key):
-    with open(self._sha_file(cache_key), 'w') as fd:
-      fd.write(cache_key.hash)
+    Only writes made on the calling thread join the batch. Stores that are cheap to write one hash
+    at a time are written through as usual.
+    """
+    if not self._store.batched or self._pending is not None:
+      yield
+      return
+    self._pending = {}
+    try:
+      yield
+    finally:
+      pending, self._pending = self._pending, None
+      self._store.write({id: hash for id, hash in pending.items() if hash is not None},
+                        [id for id, hash in pending.items() if hash is None])
+
+  def _write_sha(self, id, hash):
+    self._preloaded_hashes.pop(id, None)
+    if self._pending is not None:
+      self._pending[id] = hash
+    elif hash is None:
+      self._store.write({}, [id])
+    else:
+      self._store.write({id: hash}, [])
 
   def _read_sha(self, cache_key):
     return self._read_sha_by_id(cache_key.id)
 
   def _read_sha_by_id(self, id):
-    try:
-      with open(self._sha_file_by_id(id), 'rb') as fd:
-        return fd.read().strip()
-    except IOError as e:
-      if e.errno != errno.ENOENT:
-        raise
-      return None  # File doesn't exist.
+    if self._pending and id in self._pending:
+      return self._pending[id]
+    if id in self._preloaded_hashes:
+      return self._preloaded_hashes[id]
+    return self._store.read([id]).get(id)
@@ -82,6 +82,11 @@ class VersionedTargetSet(object):
     """
     return self._cache_manager.cacheable(self.cache_key)
 
+  @property
+  def cache_manager(self):
+    """The cache manager that tracks the validity of these targets."""
+    return self._cache_manager
+
   def update(self):
     self._cache_manager.update(self)
 
@@ -308,6 +313,13 @@ class InvalidationCacheManager(object):
       vts.valid = True
       self._artifact_write_callback(vts)
 
+  def batched_writes(self):
+    """A with-context in which the updates and invalidations of target sets are written as a batch.
+
+    See `BuildInvalidator.batched_writes`.
+    """
+    return self._invalidator.batched_writes()
+
   def force_invalidate(self, vts):
     """Force invalidation of a VersionedTargetSet."""
     for vt in vts.versioned_targets:
@@ -358,17 +370,19 @@ class InvalidationCacheManager(object):
 
     Returns a list of VersionedTargets, each representing one input target.
     """
-    def vt_iter():
+    def keyed_targets_iter():
       if topological_order:
         target_set = set(targets)
         sorted_targets = [t for t in reversed(sort_targets(targets)) if t in target_set]
       else:
         sorted_targets = sorted(targets)
-      for target in sorted_targets:
-        target_key = self._key_for(target)
+      for target, target_key in zip(sorted_targets, self._keys_for(sorted_targets)):
         if target_key is not None:
-          yield VersionedTarget(self, target, target_key)
-    return list(vt_iter())
+          yield target, target_key
+    keyed_targets = list(keyed_targets_iter())
+    # Read all previous keys in one go rather than once per VersionedTarget.
+    self._invalidator.preload(target_key for _, target_key in keyed_targets)
+    return [VersionedTarget(self, target, target_key) for target, target_key in keyed_targets]
 
   def cacheable(self, cache_key):
     """Indicates whether artifacts associated with the given `cache_key` should be cached.
@@ -381,6 +395,17 @@ class InvalidationCacheManager(object):
   def previous_key(self, cache_key):
     return self._invalidator.previous_key(cache_key)
 
+  def _keys_for(self, targets):
+    try:
+      return self._cache_key_generator.keys_for_targets(targets,
+                                                        transitive=self._invalidate_dependents,
+                                                        fingerprint_strategy=self._fingerprint_strategy)
+    except Exception:
+      # Key the targets one by one, to report the target that failed.
+      for target in targets:
+        self._key_for(target)
+      raise
+
   def _key_for(self, target):
     try:
       return self._cache_key_generator.key_for_target(target,
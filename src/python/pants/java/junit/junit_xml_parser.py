@@ -68,6 +68,14 @@ class RegistryOfTests(object):
     """
     return len(self._test_to_target) == 0
 
+  @property
+  def tests(self):
+    """Return the registered tests.
+
+    :rtype: list of :class:`Test`
+    """
+    return list(self._test_to_target.keys())
+
   def get_owning_target(self, test):
     """Return the target that owns the given test.
 
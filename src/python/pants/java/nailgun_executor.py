@@ -125,6 +125,15 @@ class NailgunExecutor(Executor, FingerprintedProcessManager):
                                       repr(java_version))]
     return digest.hexdigest()
 
+  def invocation_fingerprint(self, jvm_options, classpath):
+    """Returns the fingerprint of the nailgun server that would run the given java invocation.
+
+    :param list jvm_options: JVM options passed to the java invocation
+    :param list classpath: The -cp arguments passed to the java invocation
+    """
+    return self._fingerprint(jvm_options, self._nailgun_classpath + classpath,
+                             self._distribution.version)
+
   def _runner(self, classpath, main, jvm_options, args, cwd=None):
     """Runner factory. Called via Executor.execute()."""
     command = self._create_command(classpath, main, jvm_options, args)
@@ -163,8 +172,8 @@ class NailgunExecutor(Executor, FingerprintedProcessManager):
   def _get_nailgun_client(self, jvm_options, classpath, stdout, stderr, stdin):
     """This (somewhat unfortunately) is the main entrypoint to this class via the Runner. It handles
        creation of the running nailgun server as well as creation of the client."""
+    new_fingerprint = self.invocation_fingerprint(jvm_options, classpath)
     classpath = self._nailgun_classpath + classpath
-    new_fingerprint = self._fingerprint(jvm_options, classpath, self._distribution.version)
 
     with self._NAILGUN_SPAWN_LOCK:
       running, updated = self._check_nailgun_state(new_fingerprint)
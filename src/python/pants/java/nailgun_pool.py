@@ -0,0 +1,169 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+from twitter.common.collections import maybe_list
+
+from pants.java.nailgun_executor import NailgunExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class NailgunPool(object):
+  """A pool of warm nailgun servers for a task, keyed by the fingerprints of their invocations.
+
+  A single `NailgunExecutor` restarts its server whenever the fingerprint of its invocation changes,
+  so alternating between tool versions or JVM options pays for JVM warmup every time. The servers
+  of a pool instead keep running with their own fingerprints, and are reused by the invocations
+  that match them. When all servers are in use or running for other invocations, the least
+  recently used idle server is restarted for the new invocation.
+
+  Each server is checked out by a single invocation at a time, so concurrent workers each get a
+  server of their own. Idle servers are terminated, least recently used first, while the resident
+  memory of the pool's servers exceeds the memory budget.
+
+  The first server of the pool has the identity of the task's unpooled nailgun, and the last use of
+  every server is recorded in its process metadata, so that servers are reused across runs.
+  """
+
+  LAST_USED_KEY = 'last_used'
+
+  def __init__(self, identity, workdir, nailgun_classpath, distribution, size,
+               memory_budget_bytes=None, connect_timeout=10, connect_attempts=5,
+               metadata_base_dir=None, on_checkout=None):
+    """
+    :param string identity: The identity of the pool's first server; the others are suffixed.
+    :param string workdir: The workdir of the pool's first server; the others are suffixed.
+    :param nailgun_classpath: The classpath of the nailgun server.
+    :param distribution: The java distribution to run the servers with.
+    :param int size: The maximum number of servers to keep running.
+    :param int memory_budget_bytes: The resident memory above which idle servers are terminated, or
+                                    None for no budget.
+    :param on_checkout: A function called with whether each checkout found a warm server, and the
+                        number of servers it terminated.
+    """
+    self._identity = identity
+    self._workdir = workdir
+    self._nailgun_classpath = nailgun_classpath
+    self._distribution = distribution
+    self._size = max(size, 1)
+    self._memory_budget_bytes = memory_budget_bytes
+    self._connect_timeout = connect_timeout
+    self._connect_attempts = connect_attempts
+    self._metadata_base_dir = metadata_base_dir
+    self._on_checkout = on_checkout
+    self._condition = threading.Condition()
+    self._checked_out = set()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def _executor(self, slot):
+    # NB: Executors cache the process of their server, so a new one is created for every checkout,
+    # like the unpooled executors of a task are.
+    suffix = '' if slot == 0 else '_{}'.format(slot)
+    return NailgunExecutor(self._identity + suffix,
+                           self._workdir + suffix,
+                           self._nailgun_classpath,
+                           self._distribution,
+                           connect_timeout=self._connect_timeout,
+                           connect_attempts=self._connect_attempts,
+                           metadata_base_dir=self._metadata_base_dir)
+
+  def _last_used(self, executor):
+    return executor.read_metadata_by_name(executor.name, self.LAST_USED_KEY, float) or 0
+
+  @staticmethod
+  def _rss(executor):
+    try:
+      return executor._as_process().memory_info().rss
+    except (AttributeError, psutil.NoSuchProcess, psutil.AccessDenied):
+      return 0
+
+  def _select(self, idle, fingerprint):
+    """Returns the idle slot to use for the fingerprint, and whether its server is already warm.
+
+    :param dict idle: The executors of the idle slots, by slot.
+    """
+    alive = {slot for slot, executor in idle.items() if executor.is_alive()}
+    for slot in sorted(alive):
+      if idle[slot].fingerprint == fingerprint:
+        return slot, True
+    for slot in sorted(idle):
+      if slot not in alive:
+        return slot, False
+    # The executor restarts the server of a different fingerprint when it's run.
+    return min(alive, key=lambda slot: self._last_used(idle[slot])), False
+
+  def _enforce_memory_budget(self, idle, busy):
+    """Terminates idle servers, least recently used first, while the pool is over its budget."""
+    if self._memory_budget_bytes is None:
+      return 0
+    total = sum(self._rss(executor) for executor in busy)
+    alive = [executor for executor in idle if executor.is_alive()]
+    rss = {executor.name: self._rss(executor) for executor in alive}
+    total += sum(rss.values())
+    evictions = 0
+    for executor in sorted(alive, key=self._last_used):
+      if total <= self._memory_budget_bytes:
+        break
+      logger.debug('Terminating idle nailgun {} to keep the pool under its memory budget.'
+                   .format(executor.name))
+      executor.terminate()
+      total -= rss[executor.name]
+      evictions += 1
+    return evictions
+
+  @contextmanager
+  def checkout(self, classpath, jvm_options=None):
+    """Checks out an executor of the pool to run the given java invocation with.
+
+    Blocks while all of the pool's executors are checked out.
+
+    :param list classpath: The classpath of the invocation.
+    :param list jvm_options: The JVM options of the invocation.
+    :yields: A :class:`pants.java.nailgun_executor.NailgunExecutor`.
+    """
+    classpath = maybe_list(classpath)
+    jvm_options = maybe_list(jvm_options or ())
+    with self._condition:
+      while len(self._checked_out) == self._size:
+        self._condition.wait()
+      idle = {slot: self._executor(slot) for slot in range(self._size)
+              if slot not in self._checked_out}
+      fingerprint = next(iter(idle.values())).invocation_fingerprint(jvm_options, classpath)
+      slot, hit = self._select(idle, fingerprint)
+      self._checked_out.add(slot)
+      executor = idle.pop(slot)
+
+      evictions = 0 if hit or not executor.is_alive() else 1
+      busy = [self._executor(s) for s in self._checked_out]
+      evictions += self._enforce_memory_budget(idle.values(), busy)
+      if hit:
+        self.hits += 1
+      else:
+        self.misses += 1
+      self.evictions += evictions
+    logger.debug('Checked out nailgun {} for fingerprint={}, warm={}.'
+                 .format(executor.name, fingerprint, hit))
+    if self._on_checkout:
+      self._on_checkout(hit, evictions)
+
+    try:
+      yield executor
+    finally:
+      # NB: Recorded once the invocation is done, since restarting a server purges its metadata.
+      executor.write_metadata_by_name(executor.name, self.LAST_USED_KEY, repr(time.time()))
+      with self._condition:
+        self._checked_out.discard(slot)
+        self._condition.notify()
@@ -187,6 +187,12 @@ class GlobalOptionsRegistrar(SubsystemClientMixin, Optionable):
              help='The host to bind the pants nailgun server to.')
     register('--pantsd-pailgun-port', advanced=True, type=int, default=0,
              help='The port to bind the pants nailgun server to. Defaults to a random port.')
+    register('--pantsd-pailgun-request-workers', advanced=True, type=int, default=4,
+             help='The number of pants nailgun requests to set up concurrently. Requests share the '
+                  'resident graph, and each still forks exclusively.')
+    register('--pantsd-pailgun-request-queue-size', advanced=True, type=int, default=16,
+             help='The number of accepted pants nailgun requests that may wait for a free request '
+                  'worker before the daemon stops accepting new ones.')
     register('--pantsd-log-dir', advanced=True, default=None,
              help='The directory to log pantsd output to.')
     register('--pantsd-fs-event-workers', advanced=True, type=int, default=4,
@@ -212,6 +218,16 @@ class GlobalOptionsRegistrar(SubsystemClientMixin, Optionable):
     # all caches), and needs to be parsed out early, so we make it a bootstrap option.
     register('--build-file-imports', choices=['allow', 'warn', 'error'], default='warn',
       help='Whether to allow import statements in BUILD files')
+    register('--build-file-parse-cache', advanced=True, type=bool, default=False,
+             help='Cache the targets parsed from each BUILD file in the workdir, keyed by the '
+                  'BUILD file and the registered BUILD file aliases, so that unchanged BUILD '
+                  'files are not executed again by later runs. BUILD files with import '
+                  'statements or context-aware object factories, which may read other files, are '
+                  'always executed.')
+    register('--build-file-parse-parallelism', advanced=True, type=int, default=1,
+             help='Parse the BUILD files matched by a spec, eg: `::`, across this many processes '
+                  'before building the graph. Parses are handed over through the parse cache, so '
+                  'a value above 1 implies --build-file-parse-cache.')
 
   @classmethod
   def register_options(cls, register):
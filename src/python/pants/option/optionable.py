@@ -73,9 +73,13 @@ class Optionable(AbstractClass):
   def register_options_on_scope(cls, options):
     """Trigger registration of this optionable's options.
 
+    Registration is deferred until the options of this optionable's scope are first needed.
+
     Subclasses should not generally need to override this method.
     """
-    cls.register_options(options.registration_function_for_optionable(cls))
+    def register_options():
+      cls.register_options(options.registration_function_for_optionable(cls))
+    options.defer_registration(cls.options_scope, register_options)
 
   def __init__(self):
     # Check that the instance's class defines options_scope.
@@ -243,6 +243,19 @@ class Options(object):
     if deprecated_scope:
       self.get_parser(deprecated_scope).register(*args, **kwargs)
 
+  def defer_registration(self, scope, registration):
+    """Defers a function registering options in the given scope until they are first needed.
+
+    Runs that only read the options of a few scopes then don't pay for registering every known
+    option.
+    """
+    parser = self.get_parser(scope)
+    parser.defer_registration(registration)
+    deprecated_scope = self.known_scope_to_info[scope].deprecated_scope
+    if deprecated_scope:
+      # The registration registers on the deprecated scope too, so reading that scope must run it.
+      self.get_parser(deprecated_scope).defer_registration(parser.run_deferred_registrations)
+
   def registration_function_for_optionable(self, optionable_class):
     """Returns a function for registering options on the given scope."""
     # TODO(benjy): Make this an instance of a class that implements __call__, so we can
@@ -64,6 +64,7 @@ class OptionsBootstrapper(object):
     self._args = sys.argv if args is None else args
     self._bootstrap_options = None  # We memoize the bootstrap options here.
     self._full_options = {}  # We memoize the full options here.
+    self._config_file_candidates = None  # Will be set later.
     self._option_tracker = OptionTracker()
 
   def get_bootstrap_options(self):
@@ -120,8 +121,10 @@ class OptionsBootstrapper(object):
       if bootstrap_option_values.config_override:
         full_configpaths.extend(bootstrap_option_values.config_override)
 
+      self._config_file_candidates = list(full_configpaths)
       if bootstrap_option_values.pantsrc:
         rcfiles = [os.path.expanduser(rcfile) for rcfile in bootstrap_option_values.pantsrc_files]
+        self._config_file_candidates.extend(rcfiles)
         existing_rcfiles = filter(os.path.exists, rcfiles)
         full_configpaths.extend(existing_rcfiles)
 
@@ -133,6 +136,16 @@ class OptionsBootstrapper(object):
       self._bootstrap_options = bootstrap_options_from_config(self._post_bootstrap_config)
     return self._bootstrap_options
 
+  def get_config_file_candidates(self):
+    """Returns the paths of all config files the options depend on, including absent rcfiles.
+
+    Creating, editing or deleting any of these files may change the options.
+
+    :rtype: list of string
+    """
+    self.get_bootstrap_options()
+    return list(self._config_file_candidates)
+
   def get_full_options(self, known_scope_infos):
     """Get the full Options instance bootstrapped by this object for the given known scopes.
 
@@ -100,6 +100,9 @@ class Parser(object):
     # List of (args, kwargs) registration pairs, exactly as captured at registration time.
     self._option_registrations = []
 
+    # Functions that register options on this parser, deferred until the options are first needed.
+    self._deferred_registrations = []
+
     # A Parser instance, or None for the global scope parser.
     self._parent_parser = parent_parser
 
@@ -119,6 +122,26 @@ class Parser(object):
     for child in self._child_parsers:
       child.walk(callback)
 
+  def defer_registration(self, registration):
+    """Defers a function that registers options on this parser until they are first needed.
+
+    The function is run before this parser's options are next registered, parsed or iterated over,
+    and after any deferred registrations on enclosing parsers.
+
+    :param registration: A function of no arguments.
+    """
+    self._deferred_registrations.append(registration)
+
+  def run_deferred_registrations(self):
+    """Runs the registrations deferred on this parser and on its enclosing parsers, in order."""
+    if self._parent_parser:
+      self._parent_parser.run_deferred_registrations()
+    if self._deferred_registrations:
+      # N.B. The registrations register on this parser, so they must not find themselves pending.
+      registrations, self._deferred_registrations = self._deferred_registrations, []
+      for registration in registrations:
+        registration()
+
   def _create_flag_value_map(self, flags):
     """Returns a map of flag -> list of values, based on the given flag strings.
 
@@ -143,6 +166,7 @@ class Parser(object):
 
   def parse_args(self, flags, namespace):
     """Set values for this parser's options on the namespace object."""
+    self.run_deferred_registrations()
     flag_value_map = self._create_flag_value_map(flags)
 
     mutex_map = defaultdict(list)
@@ -240,6 +264,7 @@ class Parser(object):
     Note that recursive options we inherit from a parent will also be yielded here, with
     the correctly-scoped default value.
     """
+    self.run_deferred_registrations()
     def normalize_kwargs(args, orig_kwargs):
       nkwargs = copy.copy(orig_kwargs)
       dest = self.parse_dest(*args, **nkwargs)
@@ -270,6 +295,7 @@ class Parser(object):
 
     Note that recursive options we inherit from a parent will also be yielded here.
     """
+    self.run_deferred_registrations()
     # First yield any recursive options we inherit from our parent.
     if self._parent_parser:
       for args, kwargs in self._parent_parser._recursive_option_registration_args():
@@ -285,6 +311,7 @@ class Parser(object):
 
     Includes all the options we inherit recursively from our ancestors.
     """
+    self.run_deferred_registrations()
     if self._parent_parser:
       for args, kwargs in self._parent_parser._recursive_option_registration_args():
         yield args, kwargs
@@ -297,6 +324,9 @@ class Parser(object):
 
   def register(self, *args, **kwargs):
     """Register an option."""
+    # Registrations deferred on this and enclosing parsers come first, as they were made first.
+    self.run_deferred_registrations()
+
     if self._frozen:
       raise FrozenRegistration(self.scope, args[0])
 
@@ -391,6 +421,7 @@ class Parser(object):
       validate_removal_semver(removal_version)
 
   def _existing_scope(self, arg):
+    self.run_deferred_registrations()
     if arg in self._known_args:
       return self._scope
     elif self._parent_parser:
@@ -0,0 +1,107 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from pants.init.options_initializer import OptionsInitializer
+from pants.option.options_bootstrapper import OptionsBootstrapper
+from pants.subsystem.subsystem import Subsystem
+
+
+logger = logging.getLogger(__name__)
+
+
+class OptionsCache(object):
+  """A daemon-side cache of the options parsed for pailgun requests.
+
+  Parsing options means loading the whole config file chain and registering every known scope,
+  which is a significant fixed cost per request. Requests usually repeat the same command lines, so
+  the parsed `Options` are cached by argv and by the `PANTS_*` environment variables.
+
+  Each entry records the modification times and sizes of the config files it was parsed from, as
+  well as of any absent rcfiles that would have been read, and is only used while those match.
+  Watchman events on config files under the build root drop entries eagerly, via
+  `invalidate_files`.
+
+  Like `OptionsInitializer.setup`, this installs the options for `Subsystem`s, so callers must
+  serialize their calls to `create`.
+  """
+
+  _Entry = namedtuple('_Entry', ['options', 'config_stamps'])
+
+  def __init__(self, build_root, max_entries=32):
+    """
+    :param string build_root: The build root, that watchman event paths are relative to.
+    :param int max_entries: The number of distinct command lines to keep options for.
+    """
+    self._build_root = os.path.realpath(build_root)
+    self._max_entries = max_entries
+    self._lock = threading.Lock()
+    self._entries = OrderedDict()
+    self.hits = 0
+    self.misses = 0
+
+  @staticmethod
+  def _key(args, env):
+    pants_env = tuple(sorted((k, v) for k, v in env.items() if k.startswith('PANTS_')))
+    return tuple(args), pants_env
+
+  @staticmethod
+  def _stamp(path):
+    try:
+      stat = os.stat(path)
+    except OSError:
+      return None
+    return stat.st_mtime, stat.st_size
+
+  @classmethod
+  def _config_stamps(cls, paths):
+    return tuple((path, cls._stamp(path)) for path in paths)
+
+  def create(self, args, env=None):
+    """Returns the options for a run with the given args, from the cache if they are still valid.
+
+    :param list args: The run's arguments, as in `sys.argv`.
+    :param dict env: The environment to parse options with; defaults to `os.environ`.
+    :rtype: :class:`pants.option.options.Options`
+    """
+    env = os.environ.copy() if env is None else env
+    key = self._key(args, env)
+    with self._lock:
+      entry = self._entries.pop(key, None)
+      if entry and all(self._stamp(path) == stamp for path, stamp in entry.config_stamps):
+        # Re-insert, to keep the entries in least recently used order.
+        self._entries[key] = entry
+        self.hits += 1
+        Subsystem.set_options(entry.options)
+        return entry.options
+      self.misses += 1
+
+    options_bootstrapper = OptionsBootstrapper(env=env, args=args)
+    config_stamps = self._config_stamps(options_bootstrapper.get_config_file_candidates())
+    options, _ = OptionsInitializer(options_bootstrapper).setup(init_logging=False)
+
+    with self._lock:
+      self._entries[key] = self._Entry(options, config_stamps)
+      while len(self._entries) > self._max_entries:
+        self._entries.popitem(last=False)
+    return options
+
+  def invalidate_files(self, files):
+    """Drops the cached options parsed from any of the given files.
+
+    :param list files: Changed paths, relative to the build root.
+    """
+    changed = {os.path.join(self._build_root, f) for f in files}
+    with self._lock:
+      for key, entry in self._entries.items():
+        if any(os.path.realpath(path) in changed for path, _ in entry.config_stamps):
+          logger.debug('config files changed, invalidating the cached options for: %s', key[0])
+          del self._entries[key]
@@ -7,8 +7,12 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import logging
 import socket
+import threading
+import time
 import traceback
 
+from six.moves import queue
+
 from six.moves.socketserver import BaseRequestHandler, BaseServer, TCPServer
 
 from pants.java.nailgun_protocol import NailgunProtocol
@@ -30,6 +34,8 @@ class PailgunHandlerBase(BaseRequestHandler):
     self.client_address = client_address
     self.server = server
     self.logger = logging.getLogger(__name__)
+    # The time the request spent queued for a free request worker, set by the server.
+    self.queue_secs = None
 
   def handle_request(self):
     """Handle a request (the equivalent of the latter half of BaseRequestHandler.__init__()).
@@ -54,7 +60,7 @@ class PailgunHandler(PailgunHandlerBase):
 
   def _run_pants(self, sock, arguments, environment):
     """Execute a given run with a pants runner."""
-    runner = self.server.runner_factory(sock, arguments, environment)
+    runner = self.server.runner_factory(sock, arguments, environment, queue_secs=self.queue_secs)
     runner.run()
 
   def handle(self):
@@ -85,10 +91,16 @@ class PailgunHandler(PailgunHandlerBase):
 
 
 class PailgunServer(TCPServer):
-  """A (forking) pants nailgun server."""
+  """A (forking) pants nailgun server.
+
+  Accepted requests are handled by a pool of request worker threads, fed through a bounded queue:
+  when all workers are busy and the queue is full, the server stops accepting connections until a
+  worker frees up, leaving further clients waiting in the listen backlog.
+  """
 
   def __init__(self, server_address, runner_factory, lifecycle_lock,
-               handler_class=None, bind_and_activate=True):
+               handler_class=None, bind_and_activate=True, request_workers=1,
+               request_queue_size=16):
     """Override of TCPServer.__init__().
 
     N.B. the majority of this function is copied verbatim from TCPServer.__init__().
@@ -96,12 +108,16 @@ class PailgunServer(TCPServer):
     :param tuple server_address: An address tuple of (hostname, port) for socket.bind().
     :param class runner_factory: A factory function for creating a DaemonPantsRunner for each run.
     :param threading.RLock lifecycle_lock: A lock used to guard against abrupt teardown of the servers
-                                           execution thread during handling. All pailgun request handling
-                                           will take place under care of this lock, which would be shared with
-                                           a `PailgunServer`-external lifecycle manager to guard teardown.
+                                           execution thread during handling. Accepting pailgun
+                                           requests will take place under care of this lock, which
+                                           would be shared with a `PailgunServer`-external
+                                           lifecycle manager to guard teardown.
     :param class handler_class: The request handler class to use for each request. (Optional)
     :param bool bind_and_activate: If True, binds and activates networking at __init__ time.
                                    (Optional)
+    :param int request_workers: The number of requests to handle concurrently. (Optional)
+    :param int request_queue_size: The number of accepted requests that may wait for a free
+                                   request worker. (Optional)
     """
     # Old-style class, so we must invoke __init__() this way.
     BaseServer.__init__(self, server_address, handler_class or PailgunHandler)
@@ -111,6 +127,11 @@ class PailgunServer(TCPServer):
     self.allow_reuse_address = True           # Allow quick reuse of TCP_WAIT sockets.
     self.server_port = None                   # Set during server_bind() once the port is bound.
 
+    self._logger = logging.getLogger(__name__)
+    self._request_workers = max(1, request_workers)
+    self._request_queue = queue.Queue(maxsize=max(1, request_queue_size))
+    self._worker_threads = []
+
     if bind_and_activate:
       try:
         self.server_bind()
@@ -125,7 +146,8 @@ class PailgunServer(TCPServer):
     _, self.server_port = self.socket.getsockname()[:2]
 
   def handle_request(self):
-    """Override of TCPServer.handle_request() that provides locking.
+    """Override of TCPServer.handle_request() that provides locking and queues requests for the
+    request workers.
 
     N.B. Most of this is copied verbatim from SocketServer.py in the stdlib.
     """
@@ -139,16 +161,64 @@ class PailgunServer(TCPServer):
       self.handle_timeout()
       return
 
-    # After select tells us we can safely accept, guard the accept and request
-    # handling with the lifecycle lock to avoid abrupt teardown mid-request.
+    # After select tells us we can safely accept, guard the accept with the lifecycle lock to
+    # avoid abrupt teardown mid-accept. Teardown waits for accepted requests in `server_close()`.
     with self.lifecycle_lock():
-      self._handle_request_noblock()
+      try:
+        request, client_address = self.get_request()
+      except socket.error:
+        return
+      if not self.verify_request(request, client_address):
+        self.shutdown_request(request)
+        return
+      self._start_request_workers()
+
+    if self._request_queue.full():
+      self._logger.warning('all {} pailgun request workers are busy and {} requests are queued, '
+                           'waiting for a free slot'
+                           .format(self._request_workers, self._request_queue.qsize()))
+    self._request_queue.put((request, client_address, time.time()))
+
+  def _start_request_workers(self):
+    while len(self._worker_threads) < self._request_workers:
+      thread = threading.Thread(target=self._request_worker,
+                                name='pailgun-request-worker-{}'.format(len(self._worker_threads)))
+      thread.daemon = True
+      thread.start()
+      self._worker_threads.append(thread)
+
+  def _request_worker(self):
+    while True:
+      item = self._request_queue.get()
+      if item is None:
+        return
+      request, client_address, enqueued_at = item
+      queue_secs = time.time() - enqueued_at
+      self._logger.debug('pailgun request from {} was queued for {:.3f} secs'
+                         .format(client_address, queue_secs))
+      try:
+        self.process_request(request, client_address, queue_secs=queue_secs)
+      except Exception:
+        # `process_request` handles errors from the request handler, so this is unexpected. Keep the
+        # worker alive regardless.
+        self.handle_error(request, client_address)
+        self.shutdown_request(request)
+
+  def server_close(self):
+    """Override of TCPServer.server_close() that also waits for queued and running requests."""
+    TCPServer.server_close(self)
+    workers, self._worker_threads = self._worker_threads, []
+    for _ in workers:
+      self._request_queue.put(None)
+    for thread in workers:
+      thread.join()
 
-  def process_request(self, request, client_address):
+  def process_request(self, request, client_address, queue_secs=None):
     """Override of TCPServer.process_request() that provides for forking request handlers and
     delegates error handling to the request handler."""
     # Instantiate the request handler.
     handler = self.RequestHandlerClass(request, client_address, self)
+    handler.queue_secs = queue_secs
     try:
       # Attempt to handle a request with the handler.
       handler.handle_request()
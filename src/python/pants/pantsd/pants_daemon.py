@@ -23,6 +23,7 @@ from pants.logging.setup import setup_logging
 from pants.option.arg_splitter import GLOBAL_SCOPE
 from pants.option.options_bootstrapper import OptionsBootstrapper
 from pants.option.options_fingerprinter import OptionsFingerprinter
+from pants.pantsd.options_cache import OptionsCache
 from pants.pantsd.process_manager import FingerprintedProcessManager
 from pants.pantsd.service.fs_event_service import FSEventService
 from pants.pantsd.service.pailgun_service import PailgunService
@@ -32,6 +33,7 @@ from pants.pantsd.watchman_launcher import WatchmanLauncher
 from pants.util.collections import combined_dict
 from pants.util.contextutil import stdio_as
 from pants.util.memo import memoized_property
+from pants.util.rwlock import ReadWriteLock
 
 
 class _LoggerStream(object):
@@ -121,6 +123,8 @@ class PantsDaemon(FingerprintedProcessManager):
         build_ignore_patterns=bootstrap_options.build_ignore,
         exclude_target_regexps=bootstrap_options.exclude_target_regexp,
         subproject_roots=bootstrap_options.subproject_roots,
+        build_file_parse_cache=bootstrap_options.build_file_parse_cache,
+        build_file_parse_parallelism=bootstrap_options.build_file_parse_parallelism,
       )
 
     @staticmethod
@@ -147,7 +151,10 @@ class PantsDaemon(FingerprintedProcessManager):
         exiter_class=DaemonExiter,
         runner_class=DaemonPantsRunner,
         target_roots_calculator=TargetRootsCalculator,
-        scheduler_service=scheduler_service
+        scheduler_service=scheduler_service,
+        request_workers=bootstrap_options.pantsd_pailgun_request_workers,
+        request_queue_size=bootstrap_options.pantsd_pailgun_request_queue_size,
+        options_cache=OptionsCache(build_root)
       )
 
       store_gc_service = StoreGCService(legacy_graph_helper.scheduler)
@@ -184,8 +191,9 @@ class PantsDaemon(FingerprintedProcessManager):
     # to safeguard daemon-synchronous sections that should be protected from abrupt teardown.
     self._lifecycle_lock = threading.RLock()
     # A lock to guard pantsd->runner forks. This can be used by services to safeguard resources
-    # held by threads at fork time, so that we can fork without deadlocking.
-    self._fork_lock = threading.RLock()
+    # held by threads at fork time, so that we can fork without deadlocking. Forks hold it
+    # exclusively, so that pailgun requests can be set up concurrently under shared holds.
+    self._fork_lock = ReadWriteLock()
     # N.B. This Event is used as nothing more than a convenient atomic flag - nothing waits on it.
     self._kill_switch = threading.Event()
     self._exiter = Exiter()
@@ -8,6 +8,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import select
 import sys
+import threading
+import time
 import traceback
 from contextlib import contextmanager
 
@@ -20,7 +22,8 @@ from pants.pantsd.service.pants_service import PantsService
 class PailgunService(PantsService):
   """A service that runs the Pailgun server."""
 
-  def __init__(self, bind_addr, exiter_class, runner_class, target_roots_calculator, scheduler_service):
+  def __init__(self, bind_addr, exiter_class, runner_class, target_roots_calculator, scheduler_service,
+               request_workers=1, request_queue_size=16, options_cache=None):
     """
     :param tuple bind_addr: The (hostname, port) tuple to bind the Pailgun server to.
     :param class exiter_class: The `Exiter` class to be used for Pailgun runs.
@@ -29,6 +32,11 @@ class PailgunService(PantsService):
       root parsing.
     :param SchedulerService scheduler_service: The SchedulerService instance for access to the
                                                resident scheduler.
+    :param int request_workers: The number of Pailgun requests to handle concurrently.
+    :param int request_queue_size: The number of accepted Pailgun requests that may wait for a
+                                   free request worker.
+    :param OptionsCache options_cache: A cache of the options parsed for earlier requests.
+                                       (Optional)
     """
     super(PailgunService, self).__init__()
     self._bind_addr = bind_addr
@@ -36,6 +44,10 @@ class PailgunService(PantsService):
     self._runner_class = runner_class
     self._target_roots_calculator = target_roots_calculator
     self._scheduler_service = scheduler_service
+    self._request_workers = request_workers
+    self._request_queue_size = request_queue_size
+    self._options_lock = threading.Lock()
+    self._options_cache = options_cache
 
     self._logger = logging.getLogger(__name__)
     self._pailgun = None
@@ -50,10 +62,24 @@ class PailgunService(PantsService):
   def pailgun_port(self):
     return self.pailgun.server_port
 
+  def setup(self, lifecycle_lock, fork_lock):
+    """Service setup."""
+    super(PailgunService, self).setup(lifecycle_lock, fork_lock)
+    if self._options_cache:
+      # Drop cached options as soon as watchman reports a change to a config file.
+      self._scheduler_service.add_file_change_listener(self._options_cache.invalidate_files)
+
+  def _parse_options(self, arguments):
+    if self._options_cache:
+      return self._options_cache.create(arguments)
+    options, _ = OptionsInitializer(OptionsBootstrapper(args=arguments)).setup(init_logging=False)
+    return options
+
   def _setup_pailgun(self):
     """Sets up a PailgunServer instance."""
     # Constructs and returns a runnable PantsRunner.
-    def runner_factory(sock, arguments, environment):
+    def runner_factory(sock, arguments, environment, queue_secs=None):
+      start_time = time.time()
       exiter = self._exiter_class(sock)
       graph_helper = None
       deferred_exc = None
@@ -63,23 +89,33 @@ class PailgunService(PantsService):
       self._logger.debug('resident graph size: %s', preceding_graph_size)
 
       self._logger.debug('execution commandline: %s', arguments)
-      options, _ = OptionsInitializer(OptionsBootstrapper(args=arguments)).setup(init_logging=False)
-      target_roots = self._target_roots_calculator.create(
-        options,
-        change_calculator=self._scheduler_service.change_calculator
-      )
-
-      try:
-        self._logger.debug('warming the product graph via %s', self._scheduler_service)
-        # N.B. This call is made in the pre-fork daemon context for reach and reuse of the
-        # resident scheduler.
-        graph_helper = self._scheduler_service.warm_product_graph(target_roots)
-      except Exception:
-        deferred_exc = sys.exc_info()
-        self._logger.warning(
-          'encountered exception during SchedulerService.warm_product_graph(), deferring:\n%s',
-          ''.join(traceback.format_exception(*deferred_exc))
-        )
+      # N.B. Requests are handled concurrently up to the fork, which is exclusive: this setup runs
+      # under a shared hold of the fork lock, so that a concurrent request's fork never snapshots
+      # this thread mid-way. Options setup installs global state and the scheduler supports a single
+      # scheduling thread, so both are still serialized, each by its own lock.
+      with self.fork_lock.shared():
+        with self._options_lock:
+          options = self._parse_options(arguments)
+          target_roots = self._target_roots_calculator.create(
+            options,
+            change_calculator=self._scheduler_service.change_calculator
+          )
+
+        try:
+          self._logger.debug('warming the product graph via %s', self._scheduler_service)
+          # N.B. This call is made in the pre-fork daemon context for reach and reuse of the
+          # resident scheduler.
+          graph_helper = self._scheduler_service.warm_product_graph(target_roots)
+        except Exception:
+          deferred_exc = sys.exc_info()
+          self._logger.warning(
+            'encountered exception during SchedulerService.warm_product_graph(), deferring:\n%s',
+            ''.join(traceback.format_exception(*deferred_exc))
+          )
+
+      setup_secs = time.time() - start_time
+      self._logger.debug('request setup took %.3f secs, after %s secs queued', setup_secs,
+                         queue_secs)
 
       return self._runner_class(
         sock,
@@ -90,7 +126,8 @@ class PailgunService(PantsService):
         graph_helper,
         self.fork_lock,
         preceding_graph_size,
-        deferred_exc
+        deferred_exc,
+        request_timings=(queue_secs, setup_secs)
       )
 
     # Plumb the daemon's lifecycle lock to the `PailgunServer` to safeguard teardown.
@@ -99,7 +136,11 @@ class PailgunService(PantsService):
       with self.lifecycle_lock:
         yield
 
-    return PailgunServer(self._bind_addr, runner_factory, lifecycle_lock)
+    return PailgunServer(self._bind_addr,
+                         runner_factory,
+                         lifecycle_lock,
+                         request_workers=self._request_workers,
+                         request_queue_size=self._request_queue_size)
 
   def run(self):
     """Main service entrypoint. Called via Thread.start() via PantsDaemon.run()."""
@@ -45,6 +45,9 @@ class SchedulerService(PantsService):
     self._event_queue = Queue.Queue(maxsize=self.QUEUE_SIZE)
     self._watchman_is_running = threading.Event()
     self._invalidating_files = set()
+    self._file_change_listeners = []
+    # The scheduler supports exactly one scheduling thread, so concurrent requests warm in turn.
+    self._warm_lock = threading.Lock()
 
   @property
   def change_calculator(self):
@@ -70,6 +73,13 @@ class SchedulerService(PantsService):
       )
     self._logger.info('watching invalidating files: {}'.format(self._invalidating_files))
 
+  def add_file_change_listener(self, listener):
+    """Registers a function to call with the buildroot-relative paths of each batch of changes.
+
+    Listeners are called from the service thread, after the scheduler is invalidated.
+    """
+    self._file_change_listeners.append(listener)
+
   def _enqueue_fs_event(self, event):
     """Watchman filesystem event handler for BUILD/requirements.txt updates. Called via a thread."""
     self._logger.info('enqueuing {} changes for subscription {}'
@@ -91,6 +101,9 @@ class SchedulerService(PantsService):
     with self.fork_lock:
       self._scheduler.invalidate_files(files)
 
+    for listener in self._file_change_listeners:
+      listener(files)
+
   def _process_event_queue(self):
     """File event notification queue processor."""
     try:
@@ -137,7 +150,8 @@ class SchedulerService(PantsService):
       self._logger.debug('graph len was {}, waiting for initial watchman event'.format(graph_len))
       self._watchman_is_running.wait()
 
-    with self.fork_lock:
+    # N.B. The shared hold of the fork lock keeps a concurrent request from forking mid-warm.
+    with self.fork_lock.shared(), self._warm_lock:
       self._graph_helper.warm_product_graph(spec_roots)
       return self._graph_helper
 
@@ -19,6 +19,7 @@ from six.moves import range
 from pants.base.build_environment import get_buildroot
 from pants.base.mustache import MustacheRenderer
 from pants.base.workunit import WorkUnit, WorkUnitLabel
+from pants.cache.cache_timings import LatencyHistogram
 from pants.reporting.linkify import linkify
 from pants.reporting.report import Report
 from pants.reporting.reporter import Reporter
@@ -304,6 +305,38 @@ class HtmlReporter(Reporter):
                     lambda: render_cache_stats(self.run_tracker.artifact_cache_stats),
                     force=force_overwrite)
 
+    # Update the artifact cache latency histograms.
+    def render_cache_timings(artifact_cache_timings):
+      def fmt_ms(ms):
+        if ms is None:
+          return '-'
+        if ms == float('inf'):
+          return '&gt;{}'.format(LatencyHistogram.BUCKET_BOUNDS_MS[-1])
+        return '&le;{}'.format(ms)
+
+      timings_dict = artifact_cache_timings.get_all()
+      if not timings_dict:
+        return self._render_message('No artifact cache timings.')
+      res = ['<table><tr><th>stage</th><th>count</th><th>p50 ms</th><th>p90 ms</th>'
+             '<th>p99 ms</th><th>max ms</th><th>bytes</th></tr>']
+      for stage, histogram in sorted(timings_dict.items()):
+        res.append("""<tr><td class="timing-label">{stage}</td><td>{count}</td><td>{p50}</td>
+                          <td>{p90}</td><td>{p99}</td><td>{max:.1f}</td><td>{bytes}</td></tr>""".format(
+          stage=stage,
+          count=histogram['count'],
+          p50=fmt_ms(histogram['p50_ms']),
+          p90=fmt_ms(histogram['p90_ms']),
+          p99=fmt_ms(histogram['p99_ms']),
+          max=histogram['max_secs'] * 1000,
+          bytes=histogram['total_bytes']
+        ))
+      res.append('</table>')
+      return ''.join(res)
+
+    self._overwrite('artifact_cache_timings',
+                    lambda: render_cache_timings(self.run_tracker.artifact_cache_timings),
+                    force=force_overwrite)
+
     for f in self._output_files[workunit.id].values():
       f.close()
 
@@ -120,6 +120,7 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
       self_timings_path = os.path.join(report_dir, 'self_timings')
       cumulative_timings_path = os.path.join(report_dir, 'cumulative_timings')
       artifact_cache_stats_path = os.path.join(report_dir, 'artifact_cache_stats')
+      artifact_cache_timings_path = os.path.join(report_dir, 'artifact_cache_timings')
       run_info['timestamp_text'] = \
         datetime.fromtimestamp(float(run_info['timestamp'])).strftime('%H:%M:%S on %A, %B %d %Y')
 
@@ -129,7 +130,9 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
         self._collapsible_fmt_string.format(id='self-timings-collapsible',
                                             title='Self timings', class_prefix='aggregated-timings'),
         self._collapsible_fmt_string.format(id='artifact-cache-stats-collapsible',
-                                            title='Artifact cache stats', class_prefix='artifact-cache-stats')
+                                            title='Artifact cache stats', class_prefix='artifact-cache-stats'),
+        self._collapsible_fmt_string.format(id='artifact-cache-timings-collapsible',
+                                            title='Artifact cache timings', class_prefix='artifact-cache-timings')
       ])
 
       args.update({'run_info': run_info,
@@ -137,6 +140,7 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
                    'self_timings_path': self_timings_path,
                    'cumulative_timings_path': cumulative_timings_path,
                    'artifact_cache_stats_path': artifact_cache_stats_path,
+                   'artifact_cache_timings_path': artifact_cache_timings_path,
                    'timings_and_stats': timings_and_stats})
       if run_id == 'latest':
         args['is_latest'] = run_info['id']
@@ -5,7 +5,10 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import os
 import re
+import threading
+from collections import OrderedDict
 
 
 def glob_to_regex(pattern):
@@ -30,7 +33,7 @@ def glob_to_regex(pattern):
         raise ValueError('Invalid usage of "**", use "*" instead.')
 
       if not doublestar:
-        out.append('(([^/]+/)*)')
+        out.append('(?:(?:[^/]+/)*)')
         doublestar = True
     else:
       out.append(component.replace('*', '[^/]*'))
@@ -44,18 +47,111 @@ def glob_to_regex(pattern):
   return ''.join(out)
 
 
+# Globs free of the characters `glob_to_regex` would translate into (or pass through as) regex
+# syntax, and that so match exactly one path.
+_LITERAL_GLOB = re.compile(r'^[^*?\[\]{}()+^$|\\]*$')
+
+
+class FilespecMatcher(object):
+  """Matches paths against a set of globs, less a set of excluded globs.
+
+  Globs are compiled once, up front: literal globs into a set of paths, and all others into a
+  single regex alternation. Use `for_globs` or `for_filespec` to share matchers between identical
+  filespecs.
+  """
+
+  # The number of matchers shared by `for_globs`, which drops the least recently used one beyond it.
+  # This bounds the matchers held by a long-lived process, like pantsd, as BUILD files change.
+  MAX_SHARED_MATCHERS = 10000
+
+  _shared_matchers = OrderedDict()
+  _shared_matchers_lock = threading.Lock()
+
+  @classmethod
+  def for_filespec(cls, spec):
+    """Returns the shared matcher for a filespec, as generated by `FilesetRelPathWrapper`."""
+    exclude_globs = []
+    for exclude_spec in spec.get('exclude', []):
+      exclude_globs.extend(exclude_spec.get('globs', []))
+    return cls.for_globs(tuple(spec.get('globs', [])), tuple(exclude_globs))
+
+  @classmethod
+  def for_globs(cls, globs, exclude_globs=()):
+    """Returns the shared matcher for the given tuples of globs."""
+    key = (cls, globs, exclude_globs)
+    with cls._shared_matchers_lock:
+      matcher = cls._shared_matchers.pop(key, None)
+      if matcher is None:
+        matcher = cls(globs, exclude_globs)
+      cls._shared_matchers[key] = matcher
+      if len(cls._shared_matchers) > cls.MAX_SHARED_MATCHERS:
+        cls._shared_matchers.popitem(last=False)
+      return matcher
+
+  def __init__(self, globs, exclude_globs=()):
+    """
+    :param globs: The globs of the paths to match.
+    :param exclude_globs: The globs of the paths not to match, even if matched by `globs`.
+    """
+    self._literals, self._regex = self._compile(globs)
+    self._exclude_literals, self._exclude_regex = self._compile(exclude_globs)
+    self._literal_dirs = frozenset(self._literal_dir(glob) for glob in globs)
+
+  @staticmethod
+  def _compile(globs):
+    literals = set()
+    regexes = []
+    for glob in globs:
+      if _LITERAL_GLOB.match(glob):
+        literals.add(('/' if glob.startswith('/') else '') + glob.strip('/'))
+      else:
+        regexes.append(glob_to_regex(glob))
+    regex = re.compile('|'.join('(?:{})'.format(r) for r in regexes)) if regexes else None
+    return frozenset(literals), regex
+
+  @staticmethod
+  def _literal_dir(glob):
+    literal_components = []
+    for i, component in enumerate((glob.rstrip('/') or glob).split('/')[:-1]):
+      if (i and not component) or not _LITERAL_GLOB.match(component):
+        break
+      literal_components.append(component)
+    return '/'.join(literal_components)
+
+  @property
+  def literal_dirs(self):
+    """The directories every matched path is under: the literal directory prefixes of the globs.
+
+    The empty string stands for the build root.
+    """
+    return self._literal_dirs
+
+  def _matches_any(self, path, literals, regex):
+    return path in literals or (regex is not None and regex.match(path) is not None)
+
+  def matches(self, path):
+    """Returns True if `path` matches one of the globs, but none of the excluded globs."""
+    return (self._matches_any(path, self._literals, self._regex) and
+            not self._matches_any(path, self._exclude_literals, self._exclude_regex))
+
+  def any_matches(self, paths):
+    """Returns True if any of `paths` `matches`."""
+    return any(self.matches(path) for path in paths)
+
+
+def ancestor_dirs(path):
+  """Yields the directories `path` is under, from its parent up to the build root, as ''."""
+  directory = os.path.dirname(path)
+  while directory and directory != '/':
+    yield directory
+    directory = os.path.dirname(directory)
+  if directory:
+    yield directory
+  yield ''
+
+
 def globs_matches(paths, patterns, exclude_patterns):
-  def excluded(path):
-    if excluded.regexes is None:
-      excluded.regexes = [re.compile(glob_to_regex(ex)) for ex in exclude_patterns]
-    return any(ex.match(path) for ex in excluded.regexes)
-  excluded.regexes = None
-  for pattern in patterns:
-    regex = re.compile(glob_to_regex(pattern))
-    for path in paths:
-      if regex.match(path) and not excluded(path):
-        return True
-  return False
+  return FilespecMatcher.for_globs(tuple(patterns), tuple(exclude_patterns)).any_matches(paths)
 
 
 def matches_filespec(path, spec):
@@ -65,7 +161,4 @@ def matches_filespec(path, spec):
 def any_matches_filespec(paths, spec):
   if not paths or not spec:
     return False
-  exclude_patterns = []
-  for exclude_spec in spec.get('exclude', []):
-    exclude_patterns.extend(exclude_spec.get('globs', []))
-  return globs_matches(paths, spec.get('globs', []), exclude_patterns)
+  return FilespecMatcher.for_filespec(spec).any_matches(paths)
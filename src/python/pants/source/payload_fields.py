@@ -8,7 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 from hashlib import sha1
 
 from pants.base.payload_field import PayloadField
-from pants.source.filespec import matches_filespec
+from pants.source.filespec import FilespecMatcher
 from pants.source.source_root import SourceRootConfig
 from pants.source.wrapped_globs import FilesetWithSpec
 from pants.util.memo import memoized_property
@@ -41,7 +41,12 @@ class SourcesField(PayloadField):
     return SourceRootConfig.global_instance().get_source_roots().find_by_path(self.rel_path)
 
   def matches(self, path):
-    return self.sources.matches(path) or matches_filespec(path, self.filespec)
+    # NB: Matching the filespec is cheaper than matching the sources, which may need to be globbed.
+    return self._filespec_matcher.matches(path) or self.sources.matches(path)
+
+  @memoized_property
+  def _filespec_matcher(self):
+    return FilespecMatcher.for_filespec(self.filespec)
 
   @property
   def filespec(self):
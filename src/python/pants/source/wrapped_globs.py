@@ -133,8 +133,12 @@ class LazyFilesetWithSpec(FilesetWithSpec):
         h.update(f.read())
     return h.digest()
 
+  @memoized_property
+  def _paths_from_buildroot(self):
+    return frozenset(self.paths_from_buildroot_iter())
+
   def matches(self, path_from_buildroot):
-    return any(path_from_buildroot == path_in_spec for path_in_spec in self.paths_from_buildroot_iter())
+    return path_from_buildroot in self._paths_from_buildroot
 
 
 class FilesetRelPathWrapper(AbstractClass):
@@ -0,0 +1,121 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import logging
+import threading
+
+from pants.util.dirutil import safe_concurrent_creation
+
+
+logger = logging.getLogger(__name__)
+
+
+class DurationHistory(object):
+  """Durations of units of work observed in earlier runs, persisted as a json file.
+
+  Durations are smoothed across runs with an exponentially weighted moving average, so that a
+  single unusually slow or fast run doesn't dominate the estimate.
+  """
+
+  VERSION = 1
+
+  # The weight of the latest observation in a smoothed duration.
+  SMOOTHING = 0.5
+
+  def __init__(self, path):
+    """
+    :param string path: The json file to load history from, and to save it to.
+    """
+    self._path = path
+    self._lock = threading.Lock()
+    self._durations = self._load()
+
+  def _load(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        data = json.load(fp)
+    except IOError:
+      return {}
+    except ValueError as e:
+      logger.debug('Ignoring unreadable duration history at {}: {}'.format(self._path, e))
+      return {}
+    if data.get('version') != self.VERSION:
+      return {}
+    return data.get('durations', {})
+
+  def __len__(self):
+    return len(self._durations)
+
+  def __contains__(self, key):
+    with self._lock:
+      return key in self._durations
+
+  def get(self, key, default=None):
+    """Returns the smoothed duration in seconds recorded for the given key.
+
+    :param string key: A key that is stable across runs, such as a target address spec.
+    :param default: The value to return if no duration has been recorded for the key.
+    """
+    with self._lock:
+      return self._durations.get(key, default)
+
+  def items(self):
+    """Returns the recorded (key, secs) pairs."""
+    with self._lock:
+      return list(self._durations.items())
+
+  def record(self, key, secs):
+    """Records an observed duration for the given key.
+
+    :param string key: A key that is stable across runs, such as a target address spec.
+    :param float secs: The observed duration.
+    """
+    with self._lock:
+      previous = self._durations.get(key)
+      if previous is not None:
+        secs = self.SMOOTHING * secs + (1 - self.SMOOTHING) * previous
+      self._durations[key] = secs
+
+  def save(self):
+    """Writes the history back to its file, atomically."""
+    with self._lock:
+      data = json.dumps({'version': self.VERSION, 'durations': self._durations}, sort_keys=True)
+    with safe_concurrent_creation(self._path) as tmp_path:
+      with open(tmp_path, 'wb') as fp:
+        fp.write(data)
+
+
+def balance(items, nbins, secs, capacity=None):
+  """Assigns items to bins so that the total estimated durations of the bins are balanced.
+
+  Items are assigned longest first, each to the bin with the least total duration so far that has
+  room for it. Items without an estimate are assumed to take the mean of those with one.
+
+  :param items: The items to assign; they must be sortable, which breaks ties deterministically.
+  :param int nbins: The number of bins.
+  :param secs: A function from an item to its estimated duration in seconds, or `None` if unknown.
+  :param int capacity: The maximum number of items per bin, or `None` for no maximum.
+  :returns: The items of each bin and their predicted total duration in seconds.
+  :rtype: list of (list, float) tuples
+  """
+  estimates = {item: secs(item) for item in items}
+  known = [estimate for estimate in estimates.values() if estimate is not None]
+  default = sum(known) / len(known) if known else 1.0
+  for item, estimate in estimates.items():
+    if estimate is None:
+      estimates[item] = default
+
+  bins = [([], 0.0) for _ in range(nbins)]
+  for item in sorted(estimates, key=lambda item: (-estimates[item], item)):
+    candidates = [i for i, (assigned, _) in enumerate(bins)
+                  if capacity is None or len(assigned) < capacity]
+    index = min(candidates, key=lambda i: (bins[i][1], i))
+    assigned, total = bins[index]
+    assigned.append(item)
+    bins[index] = (assigned, total + estimates[item])
+  return bins
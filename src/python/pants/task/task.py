@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 from abc import abstractmethod
+from collections import defaultdict
 from contextlib import contextmanager
 from hashlib import sha1
 from itertools import repeat
@@ -15,6 +16,8 @@ from pants.base.exceptions import TaskError
 from pants.base.worker_pool import Work
 from pants.cache.artifact_cache import UnreadableArtifact, call_insert, call_use_cached_files
 from pants.cache.cache_setup import CacheSetup
+from pants.cache.cache_timings import call_recording_timings
+from pants.cache.requests_session import RequestsSession
 from pants.invalidation.build_invalidator import (BuildInvalidator, CacheKeyGenerator,
                                                   UncacheableCacheKeyGenerator)
 from pants.invalidation.cache_manager import InvalidationCacheManager, InvalidationCheck
@@ -362,17 +365,26 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
     :returns: Yields an InvalidationCheck object reflecting the targets.
     :rtype: InvalidationCheck
     """
-    invalidation_check = self._do_invalidation_check(fingerprint_strategy,
-                                                     invalidate_dependents,
-                                                     targets,
-                                                     topological_order)
+    cache_manager, invalidation_check = self._do_invalidation_check(fingerprint_strategy,
+                                                                    invalidate_dependents,
+                                                                    targets,
+                                                                    topological_order)
+
+    check_artifact_cache = (invalidation_check.invalid_vts and
+                            self.artifact_cache_reads_enabled())
+    if check_artifact_cache:
+      cache_check_vts = self.check_artifact_cache_for(invalidation_check)
+      # Start fetching right away, so that the fetches overlap the set up of results dirs and the
+      # reads of the artifacts fetched first. The prefetch belongs to this call alone, since
+      # partitions may be checked concurrently.
+      prefetch = self.prefetch_artifacts(cache_check_vts)
 
     self._maybe_create_results_dirs(invalidation_check.all_vts)
 
-    if invalidation_check.invalid_vts and self.artifact_cache_reads_enabled():
+    if check_artifact_cache:
       with self.context.new_workunit('cache'):
-        cached_vts, uncached_vts, uncached_causes = \
-          self.check_artifact_cache(self.check_artifact_cache_for(invalidation_check))
+        cached_vts, uncached_vts, uncached_causes = self.check_artifact_cache(cache_check_vts,
+                                                                             prefetch=prefetch)
       if cached_vts:
         cached_targets = [vt.target for vt in cached_vts]
         self.context.run_tracker.artifact_cache_stats.add_hits(self._task_name, cached_targets)
@@ -423,16 +435,18 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
     #
     # Deleting the file ensures that if a task fails, there is no key for which we might think
     # we're in a valid state.
-    for vts in invalidation_check.invalid_vts:
-      vts.force_invalidate()
+    with cache_manager.batched_writes():
+      for vts in invalidation_check.invalid_vts:
+        vts.force_invalidate()
 
     # Yield the result, and then mark the targets as up to date.
     yield invalidation_check
 
     self._update_invalidation_report(invalidation_check, 'post-check')
 
-    for vt in invalidation_check.invalid_vts:
-      vt.update()
+    with cache_manager.batched_writes():
+      for vt in invalidation_check.invalid_vts:
+        vt.update()
 
     # Background work to clean up previous builds.
     if self.context.options.for_global_scope().workdir_max_build_entries is not None:
@@ -473,7 +487,7 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
       self.invalidate()
       self._force_invalidated = True
 
-    return cache_manager.check(targets, topological_order=topological_order)
+    return cache_manager, cache_manager.check(targets, topological_order=topological_order)
 
   def maybe_write_artifact(self, vt):
     if self._should_cache_target_dir(vt):
@@ -519,17 +533,33 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
     """
     return invalidation_check.invalid_vts
 
-  def check_artifact_cache(self, vts):
+  def prefetch_artifacts(self, vts):
+    """Starts fetching the artifacts for the given VersionedTargetSets into the local cache.
+
+    This lets a remote cache fetch every artifact concurrently in the background, rather than one
+    per worker process as `check_artifact_cache` reads them. Passing the returned prefetch to
+    `check_artifact_cache` reads each artifact as soon as its fetch completes.
+
+    :returns: An iterator over the prefetched cache keys, or None if nothing is prefetched.
+    """
+    if not vts or not self._cache_factory.prefetch():
+      return None
+    read_cache = self._cache_factory.get_read_cache()
+    return read_cache.prefetch([vt.cache_key for vt in vts])
+
+  def check_artifact_cache(self, vts, prefetch=None):
     """Checks the artifact cache for the specified list of VersionedTargetSets.
 
     Returns a tuple (cached, uncached, uncached_causes) of VersionedTargets that were
     satisfied/unsatisfied from the cache. Uncached VTS are also attached with their
     causes for the miss: `False` indicates a legit miss while `UnreadableArtifact`
     is due to either local or remote cache failures.
+
+    :param prefetch: The prefetch `prefetch_artifacts` started for `vts`, if any.
     """
-    return self.do_check_artifact_cache(vts)
+    return self.do_check_artifact_cache(vts, prefetch=prefetch)
 
-  def do_check_artifact_cache(self, vts, post_process_cached_vts=None):
+  def do_check_artifact_cache(self, vts, post_process_cached_vts=None, prefetch=None):
     """Checks the artifact cache for the specified list of VersionedTargetSets.
 
     Returns a pair (cached, uncached) of VersionedTargets that were
@@ -541,7 +571,10 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
     read_cache = self._cache_factory.get_read_cache()
     items = [(read_cache, vt.cache_key, vt.current_results_dir if self.cache_target_dirs else None)
              for vt in vts]
-    res = self.context.subproc_map(call_use_cached_files, items)
+    if prefetch is None:
+      res = self._cache_subproc_map(call_use_cached_files, items)
+    else:
+      res = self._use_prefetched_files(prefetch, items)
 
     cached_vts = []
     uncached_vts = []
@@ -562,8 +595,12 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
 
     if post_process_cached_vts:
       post_process_cached_vts(cached_vts)
-    for vt in cached_vts:
-      vt.update()
+    if cached_vts:
+      # The target sets checked together all come from one invalidation check, and so share a
+      # cache manager.
+      with cached_vts[0].cache_manager.batched_writes():
+        for vt in cached_vts:
+          vt.update()
     return cached_vts, uncached_vts, uncached_causes
 
   def update_artifact_cache(self, vts_artifactfiles_pairs):
@@ -609,10 +646,58 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
         overwrite = always_overwrite or vts.cache_key in self._cache_key_errors
         args_tuples.append((cache, vts.cache_key, artifactfiles, overwrite))
 
-      return Work(lambda x: self.context.subproc_map(call_insert, x), [(args_tuples,)], 'insert')
+      return Work(lambda x: self._cache_subproc_map(call_insert, x), [(args_tuples,)], 'insert')
     else:
       return None
 
+  def _use_prefetched_files(self, prefetch, items):
+    """Uses the cached files for each of the `call_use_cached_files` items as they are prefetched.
+
+    Items are read in the order their fetches complete, and those the prefetch found to be absent
+    from the cache are misses without further requests.
+    """
+    res = [None] * len(items)
+    indices = defaultdict(list)
+    for index, (_, cache_key, _) in enumerate(items):
+      indices[cache_key].append(index)
+    read_indices = []
+
+    def iter_reads():
+      for cache_key, present in prefetch:
+        for index in indices.pop(cache_key, ()):
+          if present is False:
+            res[index] = False
+          else:
+            read_indices.append(index)
+            yield items[index]
+      # Read any items the prefetch didn't cover.
+      for index in sorted(index for remaining in indices.values() for index in remaining):
+        read_indices.append(index)
+        yield items[index]
+
+    reads = self._cache_subproc_map(call_use_cached_files, iter_reads(), as_produced=True)
+    for index, was_in_cache in zip(read_indices, reads):
+      res[index] = was_in_cache
+    return res
+
+  def _cache_subproc_map(self, f, items, as_produced=False):
+    """Maps an artifact cache helper over `items` in subprocesses, collecting their timings and
+    connection counts.
+
+    If `as_produced`, `items` may be a blocking iterator, and each item is started on as soon as it
+    is produced.
+    """
+    results = []
+    timings = self.context.run_tracker.artifact_cache_timings
+    subproc_map = self.context.subproc_map_as_produced if as_produced else self.context.subproc_map
+    items = ((f, item) for item in items)
+    for res, histograms, connection_counts in subproc_map(call_recording_timings, items):
+      results.append(res)
+      if timings is not None:
+        timings.merge(histograms)
+      RequestsSession.merge_worker_connection_counts(*connection_counts)
+    return results
+
   def _report_targets(self, prefix, targets, suffix, logger=None):
     target_address_references = [t.address.reference() for t in targets]
     msg_elements = [
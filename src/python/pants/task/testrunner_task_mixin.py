@@ -7,13 +7,21 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 import re
+import threading
+import time
 import xml.etree.ElementTree as ET
 from abc import abstractmethod
+from collections import defaultdict
 from threading import Timer
 
+from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import ErrorWhileTesting, TaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.build_graph.files import Files
+from pants.build_graph.target import Target
 from pants.invalidation.cache_manager import VersionedTargetSet
+from pants.option.custom_types import file_option
+from pants.task.duration_history import DurationHistory
 from pants.task.task import Task
 from pants.util.memo import memoized_method, memoized_property
 from pants.util.process_handler import subprocess
@@ -95,6 +103,10 @@ class TestRunnerTaskMixin(object):
   expressed can support both languages, and any additional languages that are added to pants.
   """
 
+  # Guards spawning test runner processes, since mixees may alter the environment or the working
+  # directory of this process to spawn them.
+  _spawn_lock = threading.Lock()
+
   @classmethod
   def register_options(cls, register):
     super(TestRunnerTaskMixin, cls).register_options(register)
@@ -257,7 +269,8 @@ class TestRunnerTaskMixin(object):
     test_targets = self._get_test_targets_for_spawn()
     timeout = self._timeout_for_targets(test_targets)
 
-    process_handler = self._spawn(*args, **kwargs)
+    with self._spawn_lock:
+      process_handler = self._spawn(*args, **kwargs)
 
     def maybe_terminate(wait_time):
       if process_handler.poll() < 0:
@@ -290,6 +303,9 @@ class TestRunnerTaskMixin(object):
   def _spawn(self, *args, **kwargs):
     """Spawn the actual test runner process.
 
+    Spawns are serialized, so any changes to the environment or working directory of this process
+    that are needed to spawn the test runner should be made here and undone before returning.
+
     :rtype: ProcessHandler
     """
 
@@ -399,6 +415,10 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
   correct successful test result caching.
   """
 
+  # The directory in the workdir that durations of partitions, test targets and individual tests
+  # are recorded in across runs.
+  DURATIONS_DIR = 'durations'
+
   @classmethod
   def register_options(cls, register):
     super(PartitionedTestRunnerTaskMixin, cls).register_options(register)
@@ -414,6 +434,15 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
              help='Run tests in a chroot. Any loose files tests depend on via `{}` dependencies '
                   'will be copied to the chroot.'
              .format(Files.alias()))
+    register('--parallelism', type=int, default=1,
+             help='The maximum number of test partitions to run concurrently. With --no-fast each '
+                  'target is its own partition. Partitions that took the longest in earlier runs '
+                  'are started first.')
+    register('--shard-durations', type=file_option,
+             help='A file of test durations, as recorded in {} of the workdir of an earlier run. '
+                  'If set, tests are split across shards and batches by these durations so that '
+                  'each takes about as long, rather than by hash or by name.'
+             .format(os.path.join(cls.DURATIONS_DIR, 'tests.json')))
 
   @staticmethod
   def _vts_for_partition(invalidation_check):
@@ -436,6 +465,98 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
     """
     return self.get_options().chroot
 
+  @property
+  def supports_concurrent_partitions(self):
+    """Return `True` if partitions may be run concurrently when `--parallelism` is above 1.
+
+    Concurrent partitions are run by threads of this process, so mixees should only return `True`
+    when `run_tests` writes to directories specific to its partition and does not alter the
+    environment or working directory of this process other than in `_spawn`.
+
+    :rtype: bool
+    """
+    return False
+
+  def _duration_history(self, name):
+    return DurationHistory(os.path.join(self.workdir, self.DURATIONS_DIR, '{}.json'.format(name)))
+
+  def _init_durations(self):
+    # NB: These are used from the threads that run partitions, so they are created before any run.
+    self._partition_durations = self._duration_history('partitions')
+    self._test_durations = self._duration_history('tests')
+    self._target_durations = self._duration_history('targets')
+    # The summed durations of the tests of each target observed in this run.
+    self._target_secs = defaultdict(float)
+    self._target_secs_lock = threading.Lock()
+
+  @memoized_property
+  def shard_durations_path(self):
+    """Return the absolute path of the test durations to balance shards and batches by, if any.
+
+    A relative `--shard-durations` is relative to the buildroot, so that it holds for test runners
+    that run elsewhere, like in a chroot.
+
+    :rtype: string
+    """
+    path = self.get_options().shard_durations
+    return os.path.join(get_buildroot(), path) if path else None
+
+  @memoized_property
+  def shard_durations(self):
+    """Return the test durations to balance shards and batches by, if any.
+
+    Tests are keyed by `test_key`.
+
+    :rtype: :class:`pants.task.duration_history.DurationHistory`
+    """
+    path = self.shard_durations_path
+    return DurationHistory(path) if path else None
+
+  @staticmethod
+  def _partition_key(partition):
+    return Target.maybe_readable_identify(partition)
+
+  @staticmethod
+  def test_key(classname, test_name):
+    """Return the key durations of the given test are recorded under.
+
+    :param string classname: The test's class name as found in its junit xml report, if any.
+    :param string test_name: The test's name.
+    :rtype: string
+    """
+    return '{}#{}'.format(classname, test_name) if classname else test_name
+
+  def report_all_info_for_single_test(self, scope, target, test_name, test_info):
+    super(PartitionedTestRunnerTaskMixin, self).report_all_info_for_single_test(scope, target,
+                                                                                test_name,
+                                                                                test_info)
+    secs = test_info.get('time')
+    if secs is None:
+      return
+    self._test_durations.record(self.test_key(test_info.get('classname'), test_name), secs)
+    if target is not None:
+      with self._target_secs_lock:
+        self._target_secs[target.address.spec] += secs
+
+  def report_makespan(self, description, predicted_secs, makespan_secs, actual_secs):
+    """Log how long a shard or batch was predicted to take against how long it took.
+
+    :param string description: What was run; eg: `shard 1 of 4`.
+    :param float predicted_secs: The predicted duration of what was run.
+    :param float makespan_secs: The predicted duration of the longest of its siblings.
+    :param float actual_secs: The actual duration of what was run.
+    """
+    self.context.log.info('{}: predicted {:.3f}s of a {:.3f}s makespan, took {:.3f}s.'
+                          .format(description, predicted_secs, makespan_secs, actual_secs))
+
+  def _parallelism(self):
+    parallelism = self.get_options().parallelism
+    if parallelism > 1 and not self.supports_concurrent_partitions:
+      self.context.log.warn('Partitions cannot be run concurrently with the current options of '
+                            '{}; running them serially.'.format(self.options_scope))
+      return 1
+    return parallelism
+
   def _execute(self, all_targets):
     test_targets = self._get_test_targets()
     if not test_targets:
@@ -445,21 +566,30 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
 
     per_target = not self.get_options().fast
     fail_fast = self.get_options().fail_fast
+    parallelism = self._parallelism()
+
+    self._init_durations()
 
     results = {}
     failure = False
     with self.partitions(per_target, all_targets, test_targets) as partitions:
-      for (partition, args) in partitions():
-        try:
-          rv = self._run_partition(fail_fast, partition, *args)
-        except ErrorWhileTesting as e:
-          rv = self.result_class.from_error(e)
-
-        results[partition] = rv
-        if not rv.success:
-          failure = True
-          if fail_fast:
-            break
+      try:
+        if parallelism > 1:
+          results = self._run_partitions_concurrently(fail_fast, partitions(), parallelism)
+          failure = any(not rv.success for rv in results.values())
+        else:
+          for (partition, args) in partitions():
+            rv = self._run_partition_for_result(fail_fast, partition, args)
+            results[partition] = rv
+            if not rv.success:
+              failure = True
+              if fail_fast:
+                break
+      finally:
+        for target_spec, secs in self._target_secs.items():
+          self._target_durations.record(target_spec, secs)
+        for history in (self._partition_durations, self._test_durations, self._target_durations):
+          history.save()
 
       for partition in sorted(results):
         rv = results[partition]
@@ -483,6 +613,49 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
         # A low-level test execution failure occurred before tests were run.
         raise TaskError()
 
+  def _run_partitions_concurrently(self, fail_fast, partitions, parallelism):
+    """Runs partitions on a pool of workers, longest first according to their recorded durations.
+
+    Partitions without a recorded duration are started before all others. With `fail_fast`, no
+    more partitions are started once one has failed, but those already running are completed.
+
+    :returns: The result of each partition that was run.
+    :rtype: dict
+    """
+    def recorded_secs(partition_and_args):
+      secs = self._partition_durations.get(self._partition_key(partition_and_args[0]))
+      return float('inf') if secs is None else secs
+    queue = sorted(partitions, key=recorded_secs, reverse=True)
+    if not queue:
+      return {}
+
+    results = {}
+    results_lock = threading.Lock()
+    failed = threading.Event()
+
+    def run(partition, args):
+      if fail_fast and failed.is_set():
+        return
+      rv = self._run_partition_for_result(fail_fast, partition, args)
+      with results_lock:
+        results[partition] = rv
+      if not rv.success:
+        failed.set()
+
+    with self.context.new_workunit(name='partitions') as workunit:
+      worker_pool = WorkerPool(workunit, self.context.run_tracker, min(parallelism, len(queue)))
+      try:
+        worker_pool.submit_work_and_wait(Work(run, queue))
+      finally:
+        worker_pool.shutdown()
+    return results
+
+  def _run_partition_for_result(self, fail_fast, partition, args):
+    try:
+      return self._run_partition(fail_fast, partition, *args)
+    except ErrorWhileTesting as e:
+      return self.result_class.from_error(e)
+
   # Some notes on invalidation vs caching as used in `run_partition` below. Here invalidation
   # refers to executing task work in `Task.invalidated` blocks against invalid targets. Caching
   # refers to storing the results of that work in the artifact cache using
@@ -533,7 +706,13 @@ class PartitionedTestRunnerTaskMixin(TestRunnerTaskMixin, Task):
       # 3.) [iff invalid == 0 and all > 0] cache -> workdir: Done transparently by `invalidated`.
 
       # 1.) Write all results that will be potentially cached to output_dir.
-      result = self.run_tests(fail_fast, invalid_test_tgts, *args).checked()
+      start = time.time()
+      try:
+        result = self.run_tests(fail_fast, invalid_test_tgts, *args).checked()
+      finally:
+        # Only runs of the full partition are representative of how long it takes.
+        if invalid_test_tgts and invalidation_check.all_vts == invalidation_check.invalid_vts:
+          self._partition_durations.record(self._partition_key(test_targets), time.time() - start)
 
       cache_vts = self._vts_for_partition(invalidation_check)
       if invalidation_check.all_vts == invalidation_check.invalid_vts:
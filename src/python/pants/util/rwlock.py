@@ -0,0 +1,97 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock(object):
+  """A reentrant lock that may be held either exclusively by one thread, or shared by many.
+
+  Used as a context manager, the lock is acquired exclusively, as with a `threading.RLock`, so it
+  can stand in for one. The `shared` context manager acquires it for any number of concurrent
+  readers instead.
+
+  Waiting exclusive acquirers take precedence over new shared ones, so that a steady stream of
+  readers can't starve them. A thread may re-acquire the lock in either mode while holding it, and
+  the exclusive holder may also acquire it shared, but a thread holding the lock only shared must
+  not try to acquire it exclusively.
+  """
+
+  def __init__(self):
+    self._cond = threading.Condition(threading.Lock())
+    self._owner = None
+    self._owner_depth = 0
+    self._waiting_writers = 0
+    # Shared acquisitions, by thread ident.
+    self._readers = {}
+
+  def acquire(self):
+    """Acquires the lock exclusively, blocking until no other thread holds it."""
+    me = threading.current_thread().ident
+    with self._cond:
+      if self._owner == me:
+        self._owner_depth += 1
+        return
+      assert me not in self._readers, 'Cannot upgrade a shared hold of a ReadWriteLock.'
+      self._waiting_writers += 1
+      try:
+        while self._owner is not None or self._readers:
+          self._cond.wait()
+      finally:
+        self._waiting_writers -= 1
+      self._owner = me
+      self._owner_depth = 1
+
+  def release(self):
+    """Releases one exclusive acquisition of the lock."""
+    with self._cond:
+      if self._owner != threading.current_thread().ident:
+        raise RuntimeError('Cannot release a ReadWriteLock not held exclusively by this thread.')
+      self._owner_depth -= 1
+      if self._owner_depth == 0:
+        self._owner = None
+        self._cond.notify_all()
+
+  def __enter__(self):
+    self.acquire()
+    return self
+
+  def __exit__(self, exc_type, exc_val, exc_tb):
+    self.release()
+
+  def acquire_shared(self):
+    """Acquires the lock shared, blocking while another thread holds or awaits it exclusively."""
+    me = threading.current_thread().ident
+    with self._cond:
+      if self._owner != me and me not in self._readers:
+        while self._owner is not None or self._waiting_writers:
+          self._cond.wait()
+      self._readers[me] = self._readers.get(me, 0) + 1
+
+  def release_shared(self):
+    """Releases one shared acquisition of the lock."""
+    me = threading.current_thread().ident
+    with self._cond:
+      depth = self._readers.get(me)
+      if not depth:
+        raise RuntimeError('Cannot release a ReadWriteLock not held shared by this thread.')
+      if depth == 1:
+        del self._readers[me]
+        if not self._readers:
+          self._cond.notify_all()
+      else:
+        self._readers[me] = depth - 1
+
+  @contextmanager
+  def shared(self):
+    """A context manager that holds the lock shared."""
+    self.acquire_shared()
+    try:
+      yield
+    finally:
+      self.release_shared()
@@ -0,0 +1,128 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+import unittest
+import zlib
+
+from pants.backend.jvm.subsystems.jar_contents_index import JarContentsIndex, JarEntry
+from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.subsystem.subsystem import Subsystem
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import safe_mkdir, safe_mkdtemp, safe_rmtree
+from pants_test.subsystem.subsystem_util import global_subsystem_instance
+
+
+class JarContentsIndexTest(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = safe_mkdtemp()
+    self.addCleanup(safe_rmtree, self.tmpdir)
+    self.index_dir = os.path.join(self.tmpdir, 'index')
+
+  def tearDown(self):
+    Subsystem.reset()
+
+  def new_index(self, pants_workdir=None):
+    # NB: A new global instance for each call, so that only the on-disk index is shared.
+    Subsystem.reset()
+    options = {'jar-contents-index': {'dir': self.index_dir}}
+    if pants_workdir:
+      options[''] = {'pants_workdir': pants_workdir}
+    return global_subsystem_instance(JarContentsIndex, options=options)
+
+  def indexed(self):
+    return sorted(filename for _, _, filenames in os.walk(self.index_dir)
+                  for filename in filenames if filename.endswith('.json'))
+
+  @staticmethod
+  def crc(content):
+    return zlib.crc32(content) & 0xffffffff
+
+  def create_jar(self, name, entries):
+    path = os.path.join(self.tmpdir, name)
+    with open_zip(path, 'w') as jar:
+      for entry_name, content in entries:
+        jar.writestr(entry_name, content)
+    return path
+
+  def test_entries(self):
+    jar = self.create_jar('a.jar', [('org/pantsbuild/A.class', b'0xCAFEBABE'),
+                                    ('META-INF/MANIFEST.MF', b'Manifest-Version: 1.0')])
+    index = self.new_index()
+    self.assertEqual([JarEntry('org/pantsbuild/A.class', 10, self.crc(b'0xCAFEBABE')),
+                      JarEntry('META-INF/MANIFEST.MF', 21, self.crc(b'Manifest-Version: 1.0'))],
+                     index.entries(jar))
+    self.assertEqual(['org/pantsbuild/A.class', 'META-INF/MANIFEST.MF'], index.names(jar))
+
+  def test_index_is_persisted(self):
+    jar = self.create_jar('a.jar', [('org/pantsbuild/A.class', b'0xCAFEBABE')])
+    self.assertEqual(['org/pantsbuild/A.class'], self.new_index().names(jar))
+
+    # The jar is no longer read once it has been indexed.
+    index = self.new_index()
+    index._read = None
+    self.assertEqual(['org/pantsbuild/A.class'], index.names(jar))
+
+  def test_changed_jar_is_reindexed(self):
+    jar = self.create_jar('a.jar', [('org/pantsbuild/A.class', b'0xCAFEBABE')])
+    self.assertEqual(['org/pantsbuild/A.class'], self.new_index().names(jar))
+
+    self.create_jar('a.jar', [('org/pantsbuild/A.class', b'0xCAFEBABE'),
+                              ('org/pantsbuild/B.class', b'0xCAFEBABE')])
+    stat = os.stat(jar)
+    os.utime(jar, (stat.st_atime, stat.st_mtime + 10))
+    self.assertEqual(['org/pantsbuild/A.class', 'org/pantsbuild/B.class'],
+                     self.new_index().names(jar))
+
+  def test_workdir_jars_are_not_persisted(self):
+    workdir = os.path.join(self.tmpdir, 'workdir')
+    safe_mkdir(workdir)
+    jar = self.create_jar(os.path.join('workdir', 'a.jar'), [('org/pantsbuild/A.class', b'')])
+    index = self.new_index(pants_workdir=workdir)
+    self.assertEqual(['org/pantsbuild/A.class'], index.names(jar))
+    self.assertEqual([], self.indexed())
+
+  def test_unused_entries_are_pruned(self):
+    jar_a = self.create_jar('a.jar', [('org/pantsbuild/A.class', b'0xCAFEBABE')])
+    jar_b = self.create_jar('b.jar', [('org/pantsbuild/B.class', b'0xCAFEBABE')])
+    self.new_index().names(jar_a)
+    self.new_index().names(jar_b)
+    self.assertEqual(2, len(self.indexed()))
+
+    # Age the entries, and the last pruning.
+    old = time.time() - 60 * 24 * 60 * 60
+    for root, _, filenames in os.walk(self.index_dir):
+      for filename in filenames:
+        os.utime(os.path.join(root, filename), (old, old))
+
+    # Using the entry of `a.jar` keeps it, and the next store prunes the entry of `b.jar`.
+    index = self.new_index()
+    index.names(jar_a)
+    index.names(self.create_jar('c.jar', [('org/pantsbuild/C.class', b'0xCAFEBABE')]))
+    self.assertEqual(2, len(self.indexed()))
+    index = self.new_index()
+    index._read = None
+    self.assertEqual(['org/pantsbuild/A.class'], index.names(jar_a))
+    with self.assertRaises(TypeError):
+      index.names(jar_b)
+
+  def test_entries_by_jar(self):
+    jar_a = self.create_jar('a.jar', [('org/pantsbuild/A.class', b'0xCAFEBABE')])
+    jar_b = self.create_jar('b.jar', [('org/pantsbuild/B.class', b'0xCAFEBABE')])
+    entries_by_jar = self.new_index().entries_by_jar([jar_b, jar_a])
+    self.assertEqual([jar_b, jar_a], list(entries_by_jar.keys()))
+    self.assertEqual(['org/pantsbuild/B.class'], [e.name for e in entries_by_jar[jar_b]])
+
+  def test_classpath_entries_contents(self):
+    jar = self.create_jar('a.jar', [('org/pantsbuild/', b''),
+                                    ('org/pantsbuild/A.class', b'0xCAFEBABE')])
+    classes_dir = os.path.join(self.tmpdir, 'classes')
+    safe_mkdir(classes_dir)
+    self.assertEqual(list(ClasspathUtil.classpath_entries_contents([jar, classes_dir])),
+                     list(ClasspathUtil.classpath_entries_contents([jar, classes_dir],
+                                                                   jar_index=self.new_index())))
@@ -0,0 +1,62 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.backend.jvm.tasks.jvm_compile.compile_history import CompileHistory
+from pants.util.contextutil import temporary_dir
+
+
+class CompileHistoryTest(unittest.TestCase):
+
+  def test_no_history_uses_fallback(self):
+    with temporary_dir() as tmpdir:
+      history = CompileHistory(os.path.join(tmpdir, 'history.json'))
+      self.assertEqual(0, len(history))
+      self.assertEqual(42, history.estimate('a:a', 42))
+
+  def test_roundtrip(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'history.json')
+      history = CompileHistory(path)
+      history.record('a:a', 3.0, 100)
+      history.save()
+
+      history = CompileHistory(path)
+      self.assertEqual(1, len(history))
+      self.assertEqual(3.0, history.estimate('a:a', 7))
+
+  def test_smoothing(self):
+    with temporary_dir() as tmpdir:
+      history = CompileHistory(os.path.join(tmpdir, 'history.json'))
+      history.record('a:a', 4.0, 100)
+      history.record('a:a', 2.0, 100)
+      self.assertEqual(3.0, history.estimate('a:a', 100))
+
+  def test_fallback_is_scaled_by_history(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'history.json')
+      history = CompileHistory(path)
+      history.record('a:a', 2.0, 100)
+      history.record('b:b', 4.0, 300)
+      history.save()
+
+      history = CompileHistory(path)
+      # 6 seconds over a fallback size of 400.
+      self.assertEqual(3.0, history.estimate('c:c', 200))
+
+  def test_unreadable_history_is_ignored(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'history.json')
+      with open(path, 'wb') as fp:
+        fp.write(b'{not json')
+      history = CompileHistory(path)
+      self.assertEqual(0, len(history))
+      history.record('a:a', 1.0, 1)
+      history.save()
+      self.assertEqual(1, len(CompileHistory(path)))
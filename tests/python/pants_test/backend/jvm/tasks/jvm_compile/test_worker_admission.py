@@ -0,0 +1,91 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import unittest
+
+import mock
+
+from pants.backend.jvm.tasks.jvm_compile.worker_admission import (AdaptiveWorkerAdmission,
+                                                                  parse_max_heap_bytes)
+
+
+GB = 1 << 30
+
+
+class ParseMaxHeapBytesTest(unittest.TestCase):
+
+  def test_units(self):
+    self.assertEqual(2 * GB, parse_max_heap_bytes(['-Xmx2g']))
+    self.assertEqual(512 << 20, parse_max_heap_bytes(['-Xmx512M']))
+    self.assertEqual(1024, parse_max_heap_bytes(['-Xmx1024']))
+
+  def test_last_wins(self):
+    self.assertEqual(4 * GB, parse_max_heap_bytes(['-Xmx2g', '-Dfoo=bar', '-Xmx4g']))
+
+  def test_unset(self):
+    self.assertIsNone(parse_max_heap_bytes(['-Xms2g', '-Dfoo=-Xmx2g']))
+
+
+class AdaptiveWorkerAdmissionTest(unittest.TestCase):
+
+  def setUp(self):
+    self.available_memory = 16 * GB
+    self.load = 0.0
+    for name, fn in (('available_memory_bytes', lambda: self.available_memory),
+                     ('load_average', lambda: self.load),
+                     ('cpu_count', lambda: 8)):
+      patcher = mock.patch('pants.backend.jvm.tasks.jvm_compile.worker_admission.{}'.format(name),
+                           side_effect=fn)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+    self.decisions = []
+
+  def admission(self, max_workers=8, **kwargs):
+    kwargs.setdefault('sample_interval_secs', 0)
+    return AdaptiveWorkerAdmission(max_workers, 2 * GB, on_decision=self.decisions.append,
+                                   **kwargs)
+
+  def test_max_workers(self):
+    self.assertEqual(4, self.admission(max_workers=4).workers(0))
+    self.assertEqual('max_workers', self.decisions[-1]['limited_by'])
+
+  def test_memory(self):
+    self.available_memory = 7 * GB
+    admission = self.admission(reserved_memory_bytes=GB)
+    self.assertEqual(3, admission.workers(0))
+    self.assertEqual('memory', self.decisions[-1]['limited_by'])
+
+    # Running jobs are accounted for by the memory they already use.
+    self.available_memory = 3 * GB
+    self.assertEqual(4, admission.workers(3))
+
+  def test_load_from_other_processes(self):
+    self.load = 7.0
+    admission = self.admission()
+    self.assertEqual(1, admission.workers(0))
+    self.assertEqual('load', self.decisions[-1]['limited_by'])
+    # Load from our own jobs doesn't count against us.
+    self.assertEqual(6, admission.workers(5))
+
+  def test_at_least_one_worker(self):
+    self.available_memory = 0
+    self.assertEqual(1, self.admission().workers(0))
+
+  def test_limit_holds_between_samples(self):
+    self.available_memory = 6 * GB
+    admission = self.admission(sample_interval_secs=3600)
+    self.assertEqual(3, admission.workers(0))
+    self.available_memory = 0
+    self.assertEqual(3, admission.workers(3))
+
+  def test_decisions_only_record_changes(self):
+    admission = self.admission()
+    admission.workers(0)
+    admission.workers(0)
+    self.load = 7.0
+    admission.workers(0)
+    self.assertEqual([8, 1], [decision['workers'] for decision in self.decisions])
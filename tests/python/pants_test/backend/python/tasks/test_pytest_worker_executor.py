@@ -0,0 +1,122 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+from contextlib import contextmanager
+from textwrap import dedent
+
+import pkg_resources
+from pex.interpreter import PythonInterpreter
+from pex.pex import PEX
+from pex.pex_builder import PEXBuilder
+
+from pants.backend.python.tasks.pytest_prep import PytestPrep
+from pants.backend.python.tasks.pytest_worker_executor import PytestWorkerExecutor
+from pants.backend.python.tasks.wrapped_pex import WrappedPEX
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+from pants.util.process_handler import subprocess
+
+
+class PytestWorkerExecutorTest(unittest.TestCase):
+
+  @contextmanager
+  def worker(self, idle_timeout=60):
+    with temporary_dir() as root:
+      # NB: The worker pex inherits the py.test we're running under, rather than resolving one.
+      module = PytestPrep.PytestBinary.worker_module()
+      worker_py = os.path.join(root, 'worker.py')
+      safe_file_dump(worker_py, pkg_resources.resource_string(
+        'pants.backend.python.tasks', 'pytest_worker/worker.py'))
+      interpreter = PythonInterpreter.get()
+      builder = PEXBuilder(path=os.path.join(root, 'pex'), interpreter=interpreter)
+      builder.info.inherit_path = 'fallback'
+      builder.add_source(worker_py, '{}.py'.format(module))
+      builder.set_entry_point(module)
+      builder.freeze()
+
+      sources = os.path.join(root, 'sources')
+      executor = PytestWorkerExecutor(WrappedPEX(PEX(builder.path(), interpreter), interpreter),
+                                      idle_timeout=idle_timeout,
+                                      metadata_base_dir=os.path.join(root, 'pids'))
+      try:
+        yield executor, sources, os.path.join(root, 'stdout'), os.path.join(root, 'stderr')
+      finally:
+        executor.terminate()
+
+  def run_tests(self, executor, sources, stdout, stderr, *args):
+    handler = executor.run(list(args) + ['-p', 'no:cacheprovider'],
+                           cwd=sources,
+                           env=dict(os.environ),
+                           sys_path=[sources],
+                           stdout_path=stdout,
+                           stderr_path=stderr)
+    return handler.wait(timeout=60)
+
+  def test_run(self):
+    with self.worker() as (executor, sources, stdout, stderr):
+      safe_file_dump(os.path.join(sources, 'test_a.py'), dedent("""
+        def test_pass():
+          pass
+
+        def test_fail():
+          assert False
+        """))
+      self.assertEqual(1, self.run_tests(executor, sources, stdout, stderr, 'test_a.py'))
+      with open(stdout) as fp:
+        self.assertIn('1 failed, 1 passed', fp.read())
+
+      self.assertEqual(0, self.run_tests(executor, sources, stdout, stderr,
+                                         'test_a.py::test_pass'))
+
+  def test_worker_reused_and_runs_isolated(self):
+    with self.worker() as (executor, sources, stdout, stderr):
+      safe_file_dump(os.path.join(sources, 'lib.py'), 'touched = []\n')
+      safe_file_dump(os.path.join(sources, 'test_b.py'), dedent("""
+        import lib
+
+        def test_first_to_touch():
+          assert lib.touched == []
+          lib.touched.append(1)
+        """))
+      self.assertEqual(0, self.run_tests(executor, sources, stdout, stderr, 'test_b.py'))
+      pid = executor.pid
+
+      # A second run sees neither the modules nor the state of the first.
+      self.assertEqual(0, self.run_tests(executor, sources, stdout, stderr, 'test_b.py'))
+      self.assertEqual(pid, executor.pid)
+
+  def test_idle_worker_replaced(self):
+    with self.worker(idle_timeout=1) as (executor, sources, stdout, stderr):
+      safe_file_dump(os.path.join(sources, 'test_c.py'), 'def test_pass():\n  pass\n')
+      self.assertEqual(0, self.run_tests(executor, sources, stdout, stderr, 'test_c.py'))
+      pid = executor.pid
+      executor._deadline_until(executor.is_dead, 'idle worker to exit', timeout=30)
+
+      self.assertEqual(0, self.run_tests(executor, sources, stdout, stderr, 'test_c.py'))
+      self.assertNotEqual(pid, executor.pid)
+
+  def test_terminate(self):
+    with self.worker() as (executor, sources, stdout, stderr):
+      safe_file_dump(os.path.join(sources, 'test_d.py'), dedent("""
+        import time
+
+        def test_hang():
+          time.sleep(60)
+        """))
+      handler = executor.run(['test_d.py'],
+                             cwd=sources,
+                             env=dict(os.environ),
+                             sys_path=[sources],
+                             stdout_path=stdout,
+                             stderr_path=stderr)
+      self.assertIsNone(handler.poll())
+      with self.assertRaises(subprocess.TimeoutExpired):
+        handler.wait(timeout=0.1)
+      handler.terminate()
+      self.assertEqual(-1, handler.wait(timeout=30))
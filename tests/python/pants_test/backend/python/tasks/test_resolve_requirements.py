@@ -108,6 +108,17 @@ class ResolveRequirementsTest(TaskTestBase):
     # Check that the path is under the test's build root, so we know the pex was created there.
     self.assertTrue(path.startswith(os.path.realpath(get_buildroot())))
 
+  def test_resolve_keyed_by_options(self):
+    noreqs_tgt = self._fake_target('noreqs', [])
+    pex = self._resolve_requirements([noreqs_tgt])
+    self.assertEqual(pex.path(), self._resolve_requirements([noreqs_tgt]).path())
+
+    # A resolve under other resolver options is not reused.
+    prereleases_pex = self._resolve_requirements([noreqs_tgt], {
+      'python-setup': {'resolver_allow_prereleases': True}
+    })
+    self.assertNotEqual(pex.path(), prereleases_pex.path())
+
   def _fake_target(self, spec, requirement_strs):
     requirements = [PythonRequirement(r) for r in requirement_strs]
     return self.make_target(spec=spec, target_type=PythonRequirementLibrary,
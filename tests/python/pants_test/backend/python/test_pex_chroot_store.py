@@ -0,0 +1,101 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import stat
+import unittest
+
+from pex.pex_builder import PEXBuilder
+from pkg_resources import Distribution
+
+from pants.backend.python.subsystems.pex_chroot_store import PexChrootStore
+from pants.subsystem.subsystem import Subsystem
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import safe_file_dump, safe_mkdtemp, safe_rmtree
+from pants_test.subsystem.subsystem_util import global_subsystem_instance
+
+
+class PexChrootStoreTest(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = safe_mkdtemp()
+    self.addCleanup(safe_rmtree, self.tmpdir)
+    Subsystem.reset()
+    self.store = global_subsystem_instance(
+      PexChrootStore, options={'pex-chroot-store': {'dir': os.path.join(self.tmpdir, 'store')}})
+
+  def tearDown(self):
+    Subsystem.reset()
+
+  def create_file(self, relpath, content):
+    path = os.path.join(self.tmpdir, relpath)
+    safe_file_dump(path, content)
+    return path
+
+  def assert_linked(self, path, stored_path):
+    self.assertEqual(os.stat(path).st_ino, os.stat(stored_path).st_ino)
+
+  def test_file(self):
+    stored_a = self.store.file(self.create_file('a.py', 'a = 1'))
+    stored_b = self.store.file(self.create_file('b.py', 'a = 1'))
+    stored_c = self.store.file(self.create_file('c.py', 'c = 1'))
+    self.assertEqual(stored_a, stored_b)
+    self.assertNotEqual(stored_a, stored_c)
+    with open(stored_a) as fp:
+      self.assertEqual('a = 1', fp.read())
+    self.assertEqual(0, os.stat(stored_a).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+  def test_stored_file_not_replaced(self):
+    stored_path = self.store.file(self.create_file('a.py', 'a = 1'))
+    inode = os.stat(stored_path).st_ino
+    # Another process stored the same file meanwhile.
+    self.store._publish(self.create_file('tmp/a.py', 'a = 1'), stored_path)
+    self.assertEqual(inode, os.stat(stored_path).st_ino)
+
+  def test_stored_dist_not_replaced(self):
+    self.create_file('dists/foo-1.0-py2.7.egg/foo/__init__.py', 'foo = 1')
+    dist = Distribution(location=os.path.join(self.tmpdir, 'dists', 'foo-1.0-py2.7.egg'),
+                        project_name='foo', version='1.0')
+    stored_path = os.path.join(self.store.distribution(dist).location, 'foo', '__init__.py')
+    inode = os.stat(stored_path).st_ino
+    # Another process stored the same distribution meanwhile.
+    self.store._publish(os.path.join(self.tmpdir, 'dists', 'foo-1.0-py2.7.egg'),
+                        os.path.dirname(os.path.dirname(stored_path)))
+    self.assertEqual(inode, os.stat(stored_path).st_ino)
+
+  def test_sources_are_linked(self):
+    stored_path = self.store.file(self.create_file('src/a.py', 'a = 1'))
+    builder = PEXBuilder(path=os.path.join(self.tmpdir, 'pex'))
+    builder.add_source(stored_path, 'a.py')
+    self.assert_linked(os.path.join(builder.path(), 'a.py'), stored_path)
+
+  def test_dist_dir(self):
+    self.create_file('dists/foo-1.0-py2.7.egg/foo/__init__.py', 'foo = 1')
+    dist = Distribution(location=os.path.join(self.tmpdir, 'dists', 'foo-1.0-py2.7.egg'),
+                        project_name='foo', version='1.0')
+    self.assert_distribution(dist)
+
+  def test_dist_zip(self):
+    location = os.path.join(self.tmpdir, 'dists', 'foo-1.0-py2.7.egg')
+    os.makedirs(os.path.dirname(location))
+    with open_zip(location, 'w') as zf:
+      zf.writestr('foo/__init__.py', 'foo = 1')
+    dist = Distribution(location=location, project_name='foo', version='1.0')
+    self.assert_distribution(dist)
+
+  def assert_distribution(self, dist):
+    stored_dist = self.store.distribution(dist)
+    self.assertEqual(stored_dist, self.store.distribution(dist))
+    self.assertEqual('foo', stored_dist.project_name)
+    stored_path = os.path.join(stored_dist.location, 'foo', '__init__.py')
+    with open(stored_path) as fp:
+      self.assertEqual('foo = 1', fp.read())
+
+    builder = PEXBuilder(path=os.path.join(self.tmpdir, 'pex'))
+    builder.add_distribution(stored_dist, dist_name='foo-1.0-py2.7.egg')
+    self.assert_linked(os.path.join(builder.path(), builder.info.internal_cache,
+                                    'foo-1.0-py2.7.egg', 'foo', '__init__.py'),
+                       stored_path)
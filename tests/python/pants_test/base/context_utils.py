@@ -54,8 +54,12 @@ class TestContext(Context):
 
     artifact_cache_stats = DummyArtifactCacheStats()
 
+    artifact_cache_timings = None
+
     def report_target_info(self, scope, target, keys, val): pass
 
+    def register_thread(self, parent_workunit): pass
+
 
   class TestLogger(logging.getLoggerClass()):
     """A logger that converts our structured records into flat ones.
@@ -109,6 +113,13 @@ class TestContext(Context):
     # Just execute in-process.
     return map(f, items)
 
+  def subproc_map_as_produced(self, f, items):
+    """
+    :API: public
+    """
+    # Just execute in-process.
+    return map(f, items)
+
 
 def create_context_from_options(options, target_roots=None, build_graph=None,
                                 build_file_parser=None, address_mapper=None, console_outstream=None,
@@ -0,0 +1,74 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import unittest
+from collections import OrderedDict, defaultdict
+
+from pants.build_graph.adjacency_index import AdjacencyIndex
+
+
+class AdjacencyIndexTest(unittest.TestCase):
+
+  def create_index(self, edges):
+    dependencies = OrderedDict()
+    dependees = defaultdict(list)
+    for node, deps in edges:
+      dependencies[node] = deps
+      for dep in deps:
+        dependees[dep].append(node)
+    return AdjacencyIndex(dependencies, dependees)
+
+  def walk(self, index, roots, **kwargs):
+    return [index.node(i) for i in index.walk([index.index(root) for root in roots], **kwargs)]
+
+  def setUp(self):
+    # e -> d -> c -> b -> a, and d -> a.
+    self.index = self.create_index([('a', []),
+                                    ('b', ['a']),
+                                    ('c', ['b']),
+                                    ('d', ['c', 'a']),
+                                    ('e', ['d'])])
+
+  def test_neighbors(self):
+    index = self.index
+    self.assertEqual(['c', 'a'], [index.node(i) for i in index.dependencies(index.index('d'))])
+    self.assertEqual({'b', 'd'}, {index.node(i) for i in index.dependees(index.index('a'))})
+    self.assertEqual([], list(index.dependees(index.index('e'))))
+
+  def test_walk(self):
+    self.assertEqual(['e', 'd', 'c', 'b', 'a'], self.walk(self.index, ['e']))
+    self.assertEqual(['a', 'b', 'c', 'd', 'e'], self.walk(self.index, ['e'], postorder=True))
+    self.assertEqual(['c', 'b', 'a', 'd'], self.walk(self.index, ['c', 'd']))
+    self.assertEqual({'b', 'c', 'd', 'e'}, set(self.walk(self.index, ['b'], dependees=True)))
+
+  def test_walk_predicates(self):
+    index = self.index
+    c = index.index('c')
+    self.assertEqual(['e', 'd', 'a'], self.walk(index, ['e'], predicate=lambda i: i != c))
+
+    d = index.index('d')
+    self.assertEqual(['e', 'd', 'a'],
+                     self.walk(index, ['e'], edge_predicate=lambda i, dep: i != d or dep != c))
+
+  def test_added_edges(self):
+    index = self.index
+    index.add_edge('a', 'f')
+    index.add_edge('g', 'e')
+    self.assertEqual(['g', 'e', 'd', 'c', 'b', 'a', 'f'], self.walk(index, ['g']))
+    self.assertEqual({'f', 'a', 'b', 'c', 'd', 'e', 'g'},
+                     set(self.walk(index, ['f'], dependees=True)))
+    self.assertEqual(['h'], self.walk(index, ['h']))
+    self.assertFalse(index.needs_compaction)
+
+    for i in range(AdjacencyIndex.MIN_COMPACTION_EDGES):
+      index.add_edge('h', i)
+    self.assertTrue(index.needs_compaction)
+
+  def test_deep_walk(self):
+    depth = 10000
+    index = self.create_index([(i, [i - 1] if i else []) for i in range(depth)])
+    self.assertEqual(list(range(depth)), self.walk(index, [depth - 1], postorder=True))
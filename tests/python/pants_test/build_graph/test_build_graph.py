@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 from collections import defaultdict
 
 import six
+from twitter.common.collections import OrderedSet
 
 from pants.backend.jvm.targets.jar_library import JarLibrary
 from pants.build_graph.address import Address, parse_spec
@@ -89,6 +90,27 @@ class BuildGraphTest(BaseTest):
     result = self.build_graph.get_target_from_spec(':b', relative_to='foo')
     self.assertEquals(b, result)
 
+  def test_walk_graph_after_injection(self):
+    a = self.make_target('a')
+    b = self.make_target('b', dependencies=[a])
+    self.assertEqual([b, a], list(self.build_graph.transitive_subgraph_of_addresses([b.address])))
+
+    # Targets and dependencies injected after a traversal are seen by the next one.
+    c = self.make_target('c', dependencies=[b])
+    self.build_graph.inject_dependency(a.address, self.make_target('d').address)
+    self.assertEqual([c, b, a, self.build_graph.get_target_from_spec('d')],
+                     list(self.build_graph.transitive_subgraph_of_addresses([c.address])))
+    self.assertEqual({a, b, c},
+                     set(self.build_graph.transitive_dependees_of_addresses([a.address])))
+
+  def test_walk_deep_graph(self):
+    target = self.make_target('t0')
+    for i in range(1, 2000):
+      target = self.make_target('t{}'.format(i), dependencies=[target])
+    closure = self.build_graph.transitive_subgraph_of_addresses([target.address], postorder=True)
+    self.assertEqual(2000, len(closure))
+    self.assertEqual('t0', list(closure)[0].address.target_name)
+
   def test_walk_graph(self):
     # Make sure that BuildGraph.walk_transitive_dependency_graph() and
     # BuildGraph.walk_transitive_dependee_graph() return DFS preorder (or postorder) traversal.
@@ -194,6 +216,63 @@ class BuildGraphTest(BaseTest):
         [str(six.unichr(x)) for x in six.moves.xrange(ord('a'), ord('o') + 1)],
     )
 
+  def test_closure_cache(self):
+    a = self.make_target('a')
+    b = self.make_target('b', dependencies=[a])
+    self.assertEquals([b, a], b.closure())
+    self.assertEquals([b, a], b.closure())
+    self.assertEquals([a, b], b.closure(postorder=True))
+    stats = self.build_graph.closure_cache_stats()
+    self.assertEquals(1, stats['hits'])
+    self.assertEquals(2, stats['misses'])
+    self.assertEquals(2, stats['size'])
+
+    # Closures are shared rather than copied, and so are read-only.
+    self.assertIs(b.closure(), b.closure())
+    with self.assertRaises(TypeError):
+      b.closure().discard(a)
+    closure = OrderedSet(b.closure())
+    closure.discard(a)
+    self.assertEquals([b], closure)
+    self.assertEquals([b, a], b.closure())
+
+  def test_closure_cache_bounded(self):
+    self.build_graph.CLOSURE_CACHE_MAX_TARGETS = 3
+    a = self.make_target('a')
+    b = self.make_target('b', dependencies=[a])
+    c = self.make_target('c')
+    self.assertEquals([b, a], b.closure())
+    self.assertEquals([c], c.closure())
+    self.assertEquals([b, a], b.closure())
+    # The closure of `a` evicts the least recently used closure, of `c`.
+    self.assertEquals([a], a.closure())
+    self.assertEquals([c], c.closure())
+    stats = self.build_graph.closure_cache_stats()
+    self.assertEquals(1, stats['hits'])
+    self.assertEquals(4, stats['misses'])
+    self.assertEquals(2, stats['size'])
+    self.assertEquals(2, stats['targets'])
+
+    # Closures larger than the whole cache are not memoized.
+    self.build_graph.CLOSURE_CACHE_MAX_TARGETS = 1
+    self.assertEquals([b, a], b.closure())
+    self.assertEquals([b, a], b.closure())
+    self.assertEquals(1, self.build_graph.closure_cache_stats()['hits'])
+
+  def test_closure_cache_invalidation(self):
+    a = self.make_target('a')
+    b = self.make_target('b', dependencies=[a])
+    self.assertEquals([b, a], b.closure())
+
+    c = self.make_target('c')
+    self.build_graph.inject_dependency(b.address, c.address)
+    self.assertEquals([b, a, c], b.closure())
+
+    d = self.make_target('d')
+    self.build_graph.inject_dependency(c.address, d.address)
+    self.assertEquals([b, a, c, d], b.closure())
+    self.assertEquals(0, self.build_graph.closure_cache_stats()['hits'])
+
   def test_transitive_subgraph_of_addresses_bfs(self):
     root = self.inject_graph('a', {
       'a': ['b', 'c'],
@@ -5,12 +5,13 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import unittest
 from textwrap import dedent
 
 # TODO: Create a dummy target type in this test and remove this dep.
 from pants.backend.jvm.targets.java_library import JavaLibrary
 from pants.build_graph.build_file_aliases import BuildFileAliases
-from pants.build_graph.source_mapper import LazySourceMapper, SpecSourceMapper
+from pants.build_graph.source_mapper import LazySourceMapper, SourceOwnerIndex, SpecSourceMapper
 from pants_test.base_test import BaseTest
 
 
@@ -122,3 +123,23 @@ class LazySourceMapperTest(SourceMapperTest, BaseTest):
 class SpecSourceMapperTest(SourceMapperTest, BaseTest):
   def set_mapper(self, fast=False):
     self._mapper = SpecSourceMapper(self.address_mapper, self.build_graph, fast)
+
+
+class SourceOwnerIndexTest(unittest.TestCase):
+  def test_owners_of(self):
+    index = SourceOwnerIndex()
+    index.add('top', {'globs': ['**/*.py']})
+    index.add('lib', {'globs': ['lib/*.py'], 'exclude': [{'globs': ['lib/excluded.py']}]})
+    index.add('rpc', {'globs': ['lib/rpc/err.py', 'lib/rpc/http.py']})
+
+    self.assertEqual(['lib', 'top'], list(index.owners_of('lib/a.py')))
+    self.assertEqual(['rpc', 'top'], list(index.owners_of('lib/rpc/err.py')))
+    self.assertEqual(['top'], list(index.owners_of('lib/rpc/json.py')))
+    self.assertEqual(['top'], list(index.owners_of('lib/excluded.py')))
+    self.assertEqual([], list(index.owners_of('lib/a.java')))
+
+  def test_owner_added_twice(self):
+    index = SourceOwnerIndex()
+    index.add('lib', {'globs': ['lib/*.py']})
+    index.add('lib', {'globs': ['lib/a.py']})
+    self.assertEqual(['lib'], list(index.owners_of('lib/a.py')))
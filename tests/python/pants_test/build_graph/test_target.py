@@ -221,6 +221,45 @@ class TargetTest(BaseTest):
     hash_value = '{}.{}'.format(target_hash, dep_hash)
     self.assertEqual(hash_value, target_c.transitive_invalidation_hash(fingerprint_strategy=fingerprint_strategy))
 
+  def test_compute_transitive_invalidation_hashes(self):
+    target_a = self.make_target('a', Target)
+    target_b = self.make_target('b', Target, dependencies=[target_a])
+    target_c = self.make_target('c', Target, dependencies=[target_a, target_b])
+    target_d = self.make_target('d', Target, dependencies=[target_c])
+
+    hashes = Target.compute_transitive_invalidation_hashes([target_d, target_b])
+    for target in (target_a, target_b, target_c, target_d):
+      target.mark_transitive_invalidation_hash_dirty()
+    self.assertEqual([target_d.transitive_invalidation_hash(),
+                      target_b.transitive_invalidation_hash()],
+                     hashes)
+
+    class TestFingerprintStrategy(DefaultFingerprintStrategy):
+      def direct(self, target):
+        return target is target_c
+
+    fingerprint_strategy = TestFingerprintStrategy()
+    hashes = Target.compute_transitive_invalidation_hashes([target_c, target_d],
+                                                           fingerprint_strategy=fingerprint_strategy)
+    for target in (target_a, target_b, target_c, target_d):
+      target.mark_transitive_invalidation_hash_dirty()
+    self.assertEqual(
+      [target_c.transitive_invalidation_hash(fingerprint_strategy=fingerprint_strategy),
+       target_d.transitive_invalidation_hash(fingerprint_strategy=fingerprint_strategy)],
+      hashes)
+
+  def test_compute_transitive_invalidation_hashes_deep_graph(self):
+    depth = Target._MAX_RECURSION_DEPTH * 2
+    target = self.make_target('t0', Target)
+    for i in range(1, depth):
+      target = self.make_target('t{}'.format(i), Target, dependencies=[target])
+
+    with self.assertRaises(Target.RecursiveDepthError):
+      target.transitive_invalidation_hash()
+    hashes = Target.compute_transitive_invalidation_hashes([target])
+    self.assertIsNotNone(hashes[0])
+    self.assertEqual(hashes[0], target.transitive_invalidation_hash())
+
   def test_has_sources(self):
     def sources(rel_path, *args):
       return Globs.create_fileset_with_spec(rel_path, *args)
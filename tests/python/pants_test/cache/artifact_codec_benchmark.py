@@ -0,0 +1,98 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import os
+import random
+import struct
+
+from pants.cache.artifact import TarballArtifact
+from pants.cache.artifact_codec import CODECS
+from pants.util.contextutil import Timer, temporary_dir
+from pants.util.dirutil import safe_delete, safe_mkdir_for
+
+
+# Identifiers that show up repeatedly in real constant pools, which is what makes .class files
+# compressible.
+_WORDS = ['java/lang/Object', 'java/lang/String', 'scala/collection/immutable/List', '<init>',
+          'Code', 'LineNumberTable', 'LocalVariableTable', 'StackMapTable', 'SourceFile',
+          'scala/Function1', 'apply', 'org/pantsbuild/example', 'Lscala/reflect/ScalaSignature;']
+
+
+def create_classes_dir(root, num_files, mean_file_size, seed=0):
+  """Write `num_files` synthetic .class files under `root`, spread over a package hierarchy."""
+  rng = random.Random(seed)
+  for i in range(num_files):
+    path = os.path.join(root, 'org', 'pantsbuild', 'pkg{}'.format(i % 50), 'Class{}.class'.format(i))
+    safe_mkdir_for(path)
+    size = max(64, int(rng.gauss(mean_file_size, mean_file_size / 4)))
+    chunks = [b'\xca\xfe\xba\xbe\x00\x00\x00\x34']
+    written = len(chunks[0])
+    while written < size:
+      if rng.random() < 0.7:
+        chunk = rng.choice(_WORDS).encode('utf-8')
+      else:
+        chunk = struct.pack(b'>I', rng.getrandbits(32))
+      chunks.append(chunk)
+      written += len(chunk)
+    with open(path, 'wb') as fp:
+      fp.write(b''.join(chunks))
+
+
+def benchmark(classes_root, tarball, codec, compression, repeats):
+  insert_times = []
+  extract_times = []
+  for _ in range(repeats):
+    artifact = TarballArtifact(classes_root, tarball, compression=compression, codec=codec.name)
+    with Timer() as timer:
+      artifact.collect([os.path.join(classes_root, 'org')])
+    insert_times.append(timer.elapsed)
+
+    with temporary_dir() as extract_root:
+      with Timer() as timer:
+        TarballArtifact(extract_root, tarball).extract()
+      extract_times.append(timer.elapsed)
+  return os.path.getsize(tarball), min(insert_times), min(extract_times)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Compares artifact size, insert time and extract time for each available '
+                'artifact codec on a synthetic classes directory.')
+  parser.add_argument('--files', type=int, default=2000, help='Number of .class files.')
+  parser.add_argument('--file-size', type=int, default=4096, help='Mean .class file size.')
+  parser.add_argument('--levels', type=int, nargs='+', default=[1, 5, 9],
+                      help='Compression levels to try.')
+  parser.add_argument('--repeats', type=int, default=3, help='Best-of repetitions per codec.')
+  args = parser.parse_args()
+
+  with temporary_dir() as tmpdir:
+    classes_root = os.path.join(tmpdir, 'classes')
+    create_classes_dir(classes_root, args.files, args.file_size)
+    raw_size = sum(os.path.getsize(os.path.join(dirpath, f))
+                   for dirpath, _, files in os.walk(classes_root) for f in files)
+    print('{} files, {} bytes uncompressed.'.format(args.files, raw_size))
+    print('{:<8} {:>5} {:>12} {:>7} {:>11} {:>11}'
+          .format('codec', 'level', 'size', 'ratio', 'insert (s)', 'extract (s)'))
+
+    for codec in CODECS:
+      if not codec.is_available():
+        print('{:<8} skipped: requires the `{}` module.'.format(codec.name, codec.module_name))
+        continue
+      levels = args.levels if codec.name != 'none' else args.levels[:1]
+      for level in levels:
+        tarball = os.path.join(tmpdir, 'artifact.{}.{}'.format(codec.name, level))
+        size, insert_time, extract_time = benchmark(classes_root, tarball, codec, level,
+                                                    args.repeats)
+        print('{:<8} {:>5} {:>12} {:>7.3f} {:>11.3f} {:>11.3f}'
+              .format(codec.name, level if codec.name != 'none' else '-', size,
+                      size / raw_size, insert_time, extract_time))
+        safe_delete(tarball)
+
+
+if __name__ == '__main__':
+  main()
@@ -8,9 +8,10 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 import unittest
 
-from pants.cache.artifact import DirectoryArtifact, TarballArtifact
+from pants.cache.artifact import ArtifactError, DirectoryArtifact, TarballArtifact
+from pants.cache.artifact_codec import CODECS, codec_for_file
 from pants.util.contextutil import temporary_dir
-from pants.util.dirutil import safe_mkdir, safe_open
+from pants.util.dirutil import safe_mkdir, safe_open, safe_rmtree
 
 
 class TarballArtifactTest(unittest.TestCase):
@@ -49,6 +50,74 @@ class TarballArtifactTest(unittest.TestCase):
 
       self.assertTrue(artifact.exists())
 
+  def test_codecs_round_trip(self):
+    for codec in CODECS:
+      if not codec.is_available():
+        continue
+      with temporary_dir() as tmpdir:
+        artifact_root = os.path.join(tmpdir, 'artifacts')
+        tarball = os.path.join(tmpdir, 'some.tar')
+        file_path = os.path.join(artifact_root, 'a', 'b', 'some.file')
+        with safe_open(file_path, 'w') as f:
+          f.write('content')
+
+        TarballArtifact(artifact_root, tarball, compression=1, codec=codec.name).collect(
+          [os.path.join(artifact_root, 'a')])
+        self.assertEquals(codec, codec_for_file(tarball))
+
+        safe_rmtree(artifact_root)
+        # Reading detects the codec, regardless of the codec the artifact is configured with.
+        artifact = TarballArtifact(artifact_root, tarball, codec='gzip')
+        artifact.extract()
+        with open(file_path) as f:
+          self.assertEquals('content', f.read())
+        self.assertIn(file_path, list(artifact.get_paths()))
+
+  def test_extract_stream(self):
+    for codec in CODECS:
+      if not codec.is_available():
+        continue
+      with temporary_dir() as tmpdir:
+        artifact_root = os.path.join(tmpdir, 'artifacts')
+        tarball = os.path.join(tmpdir, 'some.tar')
+        files = {os.path.join(artifact_root, 'a', 'f{}'.format(i)): 'content{}'.format(i) * i
+                 for i in range(50)}
+        for path, content in files.items():
+          with safe_open(path, 'w') as f:
+            f.write(content)
+        TarballArtifact(artifact_root, tarball, codec=codec.name).collect(
+          [os.path.join(artifact_root, 'a')])
+        safe_rmtree(artifact_root)
+
+        with open(tarball, 'rb') as f:
+          data = f.read()
+        # Feed the tarball in small, uneven chunks to exercise buffering across member boundaries.
+        chunks = (data[i:i + 333] for i in range(0, len(data), 333))
+        teed = os.path.join(tmpdir, 'teed.tar')
+        artifact = TarballArtifact(artifact_root, None, extract_workers=3)
+        with open(teed, 'wb') as tee:
+          artifact.extract_stream(chunks, tee=tee)
+
+        for path, content in files.items():
+          with open(path) as f:
+            self.assertEquals(content, f.read())
+        self.assertEquals(set(files), set(artifact.get_paths()) - {os.path.join(artifact_root, 'a')})
+        with open(teed, 'rb') as f:
+          self.assertEquals(data, f.read())
+
+  def test_extract_stream_corrupt(self):
+    with temporary_dir() as tmpdir:
+      with self.assertRaises(ArtifactError):
+        TarballArtifact(tmpdir, None).extract_stream(iter([b'\x1f\x8b', b'not really gzip']))
+
+  def test_extract_corrupt_tarball(self):
+    with temporary_dir() as tmpdir:
+      tarball = os.path.join(tmpdir, 'some.tar')
+      with open(tarball, 'w') as f:
+        f.write('not a tarball')
+      with self.assertRaises(ArtifactError):
+        TarballArtifact(os.path.join(tmpdir, 'artifacts'), tarball).extract()
+
   def touch_file_in(self, artifact_root):
     path = os.path.join(artifact_root, 'some.file')
     with safe_open(path, 'w') as f:
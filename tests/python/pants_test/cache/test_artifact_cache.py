@@ -11,6 +11,7 @@ from contextlib import contextmanager
 
 from pants.cache.artifact_cache import (NonfatalArtifactCacheError, call_insert,
                                         call_use_cached_files)
+from pants.cache.cache_timings import CacheTimings
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
 from pants.cache.pinger import BestUrlSelector, InvalidRESTfulCacheProtoError
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
@@ -179,6 +180,20 @@ class TestArtifactCache(unittest.TestCase):
             self.assertTrue(os.path.exists(results_dir))
             self.assertTrue(len(os.listdir(results_dir)) == 0)
 
+  def test_restful_cache_records_timings(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    CacheTimings.recorder().drain()
+
+    with self.setup_rest_cache() as cache:
+      cache.use_cached_files(key)
+      with self.setup_test_file(cache.artifact_root) as path:
+        cache.insert(key, [path])
+
+    histograms = CacheTimings.recorder().drain()
+    self.assertEqual(1, histograms['remote.get.miss'].count)
+    self.assertEqual(1, histograms['remote.put.hit'].count)
+    self.assertGreater(histograms['remote.put.hit'].total_bytes, 0)
+
   def test_multiproc(self):
     key = CacheKey('muppet_key', 'fake_hash')
 
@@ -254,3 +269,44 @@ class TestArtifactCache(unittest.TestCase):
 
         self.assertFalse(artifact_cache.use_cached_files(key))
         self.assertFalse(os.path.exists(tarfile))
+
+  def test_restful_cache_prefetch(self):
+    keys = [CacheKey('muppet_key', 'fake_hash{}'.format(i)) for i in range(3)]
+    with self.setup_server() as server:
+      with self.setup_local_cache() as local:
+        tmp = TempLocalArtifactCache(local.artifact_root, 0)
+        remote = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), tmp)
+        combined = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), local,
+                                        max_concurrent_requests=2)
+
+        with self.setup_test_file(local.artifact_root) as path:
+          remote.insert(keys[0], [path])
+          remote.insert(keys[2], [path])
+
+          # Prefetching via a cache without a persistent local cache fetches nothing.
+          self.assertEquals({key: None for key in keys}, dict(remote.prefetch(keys)))
+          self.assertEquals([False] * 3, [local.has(key) for key in keys])
+
+          # Only the artifacts present remotely are fetched, and they land in the local cache.
+          self.assertEquals({keys[0]: True, keys[1]: False, keys[2]: True},
+                            dict(combined.prefetch(keys)))
+          self.assertEquals([True, False, True], [local.has(key) for key in keys])
+
+          # Artifacts already local are not fetched again.
+          self.assertEquals({keys[0]: True, keys[1]: False, keys[2]: True},
+                            dict(combined.prefetch(keys)))
+
+          # Stomp it, and then recover it from the local cache.
+          with open(path, 'w') as outfile:
+            outfile.write(TEST_CONTENT2)
+          self.assertTrue(bool(local.use_cached_files(keys[0])))
+          with open(path, 'r') as infile:
+            self.assertEquals(TEST_CONTENT1, infile.read())
+
+  def test_restful_cache_prefetch_failure(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    with self.setup_local_cache() as local:
+      with self.setup_rest_cache(local=local, return_failed=True) as artifact_cache:
+        # A failed fetch is not a known miss: reading the artifact will be retried.
+        self.assertEquals([(key, None)], list(artifact_cache.prefetch([key])))
+        self.assertFalse(local.has(key))
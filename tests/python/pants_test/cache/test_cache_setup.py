@@ -13,6 +13,7 @@ from pants.cache.cache_setup import (CacheFactory, CacheSetup, CacheSpec, CacheS
                                      EmptyCacheSpecError, InvalidCacheSpecError,
                                      LocalCacheSpecRequiredError, RemoteCacheSpecRequiredError,
                                      TooManyCacheSpecsError)
+from pants.cache.content_addressed_artifact_cache import ContentAddressedArtifactCache
 from pants.cache.local_artifact_cache import LocalArtifactCache
 from pants.cache.resolver import Resolver
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
@@ -83,9 +84,22 @@ class TestCacheSetup(BaseTest):
       'write_to': [self.EMPTY_URI],
       'write': False,
       'compression_level': 1,
+      'compression_codec': 'gzip',
       'max_entries_per_target': 1,
       'write_permissions': None,
       'dereference_symlinks': True,
+      'extract_workers': 4,
+      'prefetch': True,
+      'max_concurrent_requests': 16,
+      'http2': False,
+      'write_behind': False,
+      'write_behind_deadline': 30.0,
+      'local_store': 'tarball',
+      'local_store_link_mode': 'reflink',
+      'local_store_gc_interval': 3600,
+      'max_local_size': None,
+      'max_local_entry_age': None,
+      'local_eviction_interval': 600,
       # Usually read from global scope.
       'pants_workdir': self.pants_workdir
     }
@@ -220,3 +234,12 @@ class TestCacheSetup(BaseTest):
                      .write_cache_available())
     self.assertIsNone(self.cache_factory(ignore=False, write=True, write_to=[self.EMPTY_URI])
                       .write_cache_available())
+
+  def test_content_addressed_local_store(self):
+    with temporary_dir() as cache_root:
+      cache_factory = self.cache_factory(read=True, read_from=[cache_root],
+                                         local_store='content-addressed')
+      cache = cache_factory.get_read_cache()
+      self.assertIsInstance(cache, ContentAddressedArtifactCache)
+      self.assertEquals(os.path.join(os.path.realpath(cache_root), 'cas', 'blobs'),
+                        cache.blob_store.root)
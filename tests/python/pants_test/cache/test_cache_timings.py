@@ -0,0 +1,111 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import pickle
+import unittest
+
+from pants.cache.artifact import TarballArtifact
+from pants.cache.cache_timings import CacheTimings, LatencyHistogram, call_recording_timings
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_open, safe_rmtree
+
+
+def _double(x):
+  CacheTimings.recorder().record('double', 0.002, nbytes=x)
+  return 2 * x
+
+
+class LatencyHistogramTest(unittest.TestCase):
+  def test_empty(self):
+    histogram = LatencyHistogram()
+    self.assertIsNone(histogram.percentile(0.5))
+    self.assertEqual(0, histogram.get_all()['count'])
+    self.assertIsNone(histogram.get_all()['mean_secs'])
+
+  def test_percentiles(self):
+    histogram = LatencyHistogram()
+    for _ in range(90):
+      histogram.add(0.0015, nbytes=10)
+    for _ in range(9):
+      histogram.add(0.1)
+    histogram.add(1000)
+
+    self.assertEqual(2, histogram.percentile(0.5))
+    self.assertEqual(2, histogram.percentile(0.9))
+    self.assertEqual(128, histogram.percentile(0.99))
+    self.assertEqual(float('inf'), histogram.percentile(1.0))
+
+    stats = histogram.get_all()
+    self.assertEqual(100, stats['count'])
+    self.assertEqual(900, stats['total_bytes'])
+    self.assertEqual(1000, stats['max_secs'])
+    self.assertEqual([{'le_ms': 2, 'count': 90}, {'le_ms': 128, 'count': 9},
+                      {'le_ms': None, 'count': 1}],
+                     stats['buckets'])
+
+  def test_merge(self):
+    a = LatencyHistogram()
+    a.add(0.001, nbytes=1)
+    b = LatencyHistogram()
+    b.add(0.5, nbytes=2)
+    b.add(0.25)
+    a.merge(pickle.loads(pickle.dumps(b)))
+
+    self.assertEqual(3, a.count)
+    self.assertEqual(3, a.total_bytes)
+    self.assertEqual(0.5, a.max_secs)
+    self.assertAlmostEqual(0.751, a.total_secs)
+    self.assertEqual(512, a.percentile(1.0))
+
+
+class CacheTimingsTest(unittest.TestCase):
+  def setUp(self):
+    CacheTimings.recorder().drain()
+
+  def test_drain(self):
+    timings = CacheTimings()
+    timings.record('remote.get.hit', 0.01, nbytes=100)
+    timings.record('remote.get.hit', 0.02, nbytes=50)
+    timings.record('remote.get.miss', 0.01)
+
+    histograms = timings.drain()
+    self.assertEqual({'remote.get.hit', 'remote.get.miss'}, set(histograms))
+    self.assertEqual(150, histograms['remote.get.hit'].total_bytes)
+    self.assertEqual({}, timings.get_all())
+
+    merged = CacheTimings()
+    merged.merge(histograms)
+    merged.merge(histograms)
+    self.assertEqual(4, merged.get_all()['remote.get.hit']['count'])
+
+  def test_call_recording_timings(self):
+    res, histograms, connection_counts = call_recording_timings((_double, 21))
+    self.assertEqual(42, res)
+    self.assertEqual((os.getpid(), 0, 0), connection_counts)
+    self.assertEqual(1, histograms['double'].count)
+    self.assertEqual(21, histograms['double'].total_bytes)
+    # The recorder is drained, so timings are only shipped back once.
+    self.assertEqual({}, CacheTimings.recorder().get_all())
+
+  def test_tarball_artifact_stages(self):
+    with temporary_dir() as tmpdir:
+      artifact_root = os.path.join(tmpdir, 'artifacts')
+      path = os.path.join(artifact_root, 'some_file')
+      with safe_open(path, 'w') as f:
+        f.write('contents')
+      tarball = os.path.join(tmpdir, 'artifact.tgz')
+      artifact = TarballArtifact(artifact_root, tarball, compression=1)
+      artifact.collect([path])
+      safe_rmtree(artifact_root)
+      artifact.extract()
+
+    stats = CacheTimings.recorder().get_all()
+    self.assertEqual(1, stats['collect']['count'])
+    self.assertEqual(1, stats['extract']['count'])
+    self.assertEqual(stats['collect']['total_bytes'], stats['extract']['total_bytes'])
+    self.assertIn('extract.write_wait', stats)
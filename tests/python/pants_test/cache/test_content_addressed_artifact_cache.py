@@ -0,0 +1,186 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import stat
+import time
+import unittest
+from contextlib import contextmanager
+
+from pants.cache.content_addressed_artifact_cache import ContentAddressedArtifactCache
+from pants.cache.local_artifact_cache import TempLocalArtifactCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir, safe_rmtree
+from pants_test.cache.cache_server import cache_server
+
+
+class ContentAddressedArtifactCacheTest(unittest.TestCase):
+
+  @contextmanager
+  def cas_cache(self, **kwargs):
+    with temporary_dir() as artifact_root:
+      with temporary_dir() as cas_root:
+        kwargs.setdefault('gc_grace_period_secs', 0)
+        yield ContentAddressedArtifactCache(artifact_root, cas_root, 'task', compression=1, **kwargs)
+
+  def write_results(self, cache, name, files):
+    results_dir = os.path.join(cache.artifact_root, name)
+    safe_mkdir(results_dir, clean=True)
+    for relpath, content in files.items():
+      safe_file_dump(os.path.join(results_dir, relpath), content)
+    return results_dir
+
+  def assert_results(self, results_dir, files):
+    for relpath, content in files.items():
+      with open(os.path.join(results_dir, relpath), 'rb') as fp:
+        self.assertEquals(content, fp.read())
+
+  def blob_count(self, cache):
+    return len(list(cache.blob_store.iter_digests()))
+
+  def test_insert_and_use(self):
+    for link_mode in ('copy', 'hardlink', 'reflink'):
+      with self.cas_cache(link_mode=link_mode) as cache:
+        key = CacheKey('a', 'hash1')
+        files = {'A.class': b'a', 'sub/B.class': b'b'}
+        results_dir = self.write_results(cache, 'a', files)
+
+        self.assertFalse(cache.has(key))
+        self.assertFalse(bool(cache.use_cached_files(key)))
+        cache.insert(key, [results_dir])
+        self.assertTrue(cache.has(key))
+
+        safe_rmtree(results_dir)
+        self.assertTrue(bool(cache.use_cached_files(key, results_dir)))
+        self.assert_results(results_dir, files)
+
+        cache.delete(key)
+        self.assertFalse(cache.has(key))
+
+  def test_executable_files(self):
+    for link_mode in ('copy', 'hardlink', 'reflink'):
+      with self.cas_cache(link_mode=link_mode) as cache:
+        key = CacheKey('a', 'hash1')
+        results_dir = self.write_results(cache, 'a', {'run.sh': b'#!/bin/sh', 'data': b'#!/bin/sh'})
+        os.chmod(os.path.join(results_dir, 'run.sh'), 0o755)
+        cache.insert(key, [results_dir])
+        # The same content is stored once per executable bit.
+        self.assertEquals(2, self.blob_count(cache))
+
+        safe_rmtree(results_dir)
+        self.assertTrue(bool(cache.use_cached_files(key, results_dir)))
+        self.assertTrue(os.stat(os.path.join(results_dir, 'run.sh')).st_mode & stat.S_IXUSR)
+        self.assertFalse(os.stat(os.path.join(results_dir, 'data')).st_mode & stat.S_IXUSR)
+
+  def test_unchanged_files_are_stored_once(self):
+    with self.cas_cache() as cache:
+      results_dir = self.write_results(cache, 'a', {'A.class': b'a', 'B.class': b'b'})
+      cache.insert(CacheKey('a', 'hash1'), [results_dir])
+      self.assertEquals(2, self.blob_count(cache))
+
+      # A new key with one changed file only adds one blob.
+      results_dir = self.write_results(cache, 'a', {'A.class': b'a', 'B.class': b'b2'})
+      cache.insert(CacheKey('a', 'hash2'), [results_dir])
+      self.assertEquals(3, self.blob_count(cache))
+
+      # Identical content under another target is shared too.
+      results_dir = self.write_results(cache, 'b', {'A.class': b'a'})
+      cache.insert(CacheKey('b', 'hash1'), [results_dir])
+      self.assertEquals(3, self.blob_count(cache))
+
+  def test_collect_garbage(self):
+    with self.cas_cache() as cache:
+      key1 = CacheKey('a', 'hash1')
+      key2 = CacheKey('a', 'hash2')
+      cache.insert(key1, [self.write_results(cache, 'a', {'A.class': b'a', 'B.class': b'b'})])
+      cache.insert(key2, [self.write_results(cache, 'a', {'A.class': b'a', 'B.class': b'b2'})])
+
+      self.assertEquals((0, 0), cache.collect_garbage())
+      self.assertEquals(2, cache.reference_counts()[cache.blob_store.store(
+        os.path.join(cache.artifact_root, 'a', 'A.class'))])
+
+      cache.delete(key1)
+      self.assertEquals((1, 1), cache.collect_garbage())
+      self.assertEquals(2, self.blob_count(cache))
+      self.assertTrue(bool(cache.use_cached_files(key2)))
+
+  def test_grace_period(self):
+    with self.cas_cache(gc_grace_period_secs=3600) as cache:
+      key = CacheKey('a', 'hash1')
+      cache.insert(key, [self.write_results(cache, 'a', {'A.class': b'a'})])
+      cache.delete(key)
+      self.assertEquals((0, 0), cache.collect_garbage())
+      self.assertEquals(1, self.blob_count(cache))
+
+  def test_reused_blob_is_refreshed(self):
+    with self.cas_cache(gc_grace_period_secs=3600) as cache:
+      path = os.path.join(self.write_results(cache, 'a', {'A.class': b'a'}), 'A.class')
+      digest = cache.blob_store.store(path)
+      blob = cache.blob_store.path_for(digest)
+      stale = time.time() - 7200
+      os.utime(blob, (stale, stale))
+
+      # An insert re-using the unreferenced blob protects it from collection until its manifest
+      # is written.
+      self.assertEquals(digest, cache.blob_store.store(path))
+      self.assertEquals((0, 0), cache.collect_garbage())
+      self.assertTrue(cache.blob_store.contains(digest))
+
+  def test_missing_blob_is_unreadable(self):
+    with self.cas_cache() as cache:
+      key = CacheKey('a', 'hash1')
+      cache.insert(key, [self.write_results(cache, 'a', {'A.class': b'a'})])
+      for digest, _ in list(cache.blob_store.iter_digests()):
+        cache.blob_store.remove(digest)
+      result = cache.use_cached_files(key)
+      self.assertFalse(bool(result))
+      self.assertIsNotNone(result)
+      self.assertFalse(cache.has(key))
+
+  def test_backs_restful_cache(self):
+    with self.cas_cache() as local:
+      with cache_server() as server:
+        remote_only = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]),
+                                           TempLocalArtifactCache(local.artifact_root, 0))
+        combined = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), local)
+
+        key = CacheKey('a', 'hash1')
+        files = {'A.class': b'a'}
+        results_dir = self.write_results(local, 'a', files)
+        remote_only.insert(key, [results_dir])
+        self.assertFalse(local.has(key))
+
+        safe_rmtree(results_dir)
+        self.assertTrue(bool(combined.use_cached_files(key)))
+        self.assert_results(results_dir, files)
+        # Using via the combined cache backfills the content-addressed store.
+        self.assertTrue(local.has(key))
+        self.assertEquals(1, self.blob_count(local))
+
+  def test_prefetch_into_store(self):
+    with self.cas_cache() as local:
+      with cache_server() as server:
+        remote_only = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]),
+                                           TempLocalArtifactCache(local.artifact_root, 0))
+        combined = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), local)
+
+        key = CacheKey('a', 'hash1')
+        files = {'A.class': b'a', 'sub/B.class': b'b'}
+        results_dir = self.write_results(local, 'a', files)
+        remote_only.insert(key, [results_dir])
+        safe_rmtree(results_dir)
+
+        self.assertEquals([(key, True)], list(combined.prefetch([key])))
+        self.assertTrue(local.has(key))
+        # Prefetching stores without extracting under the artifact_root.
+        self.assertFalse(os.path.exists(results_dir))
+
+        self.assertTrue(bool(local.use_cached_files(key)))
+        self.assert_results(results_dir, files)
@@ -0,0 +1,140 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+import unittest
+from contextlib import contextmanager
+
+from pants.cache.content_addressed_artifact_cache import ContentAddressedArtifactCache
+from pants.cache.local_artifact_cache import LocalArtifactCache
+from pants.cache.local_cache_eviction import LocalCacheEvictor
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir
+
+
+class LocalCacheEvictorTest(unittest.TestCase):
+
+  @contextmanager
+  def setup(self):
+    with temporary_dir() as artifact_root:
+      with temporary_dir() as cache_path:
+        yield artifact_root, cache_path
+
+  def insert(self, cache, key, content):
+    results_dir = os.path.join(cache.artifact_root, key.id)
+    safe_mkdir(results_dir, clean=True)
+    safe_file_dump(os.path.join(results_dir, 'A.class'), content)
+    cache.insert(key, [results_dir], overwrite=True)
+
+  def age(self, path, secs_ago):
+    then = time.time() - secs_ago
+    os.utime(path, (then, then))
+
+  def tarball_cache(self, artifact_root, cache_path, task='task', **kwargs):
+    return LocalArtifactCache(artifact_root, os.path.join(cache_path, task), compression=1,
+                              **kwargs)
+
+  def test_evicts_least_recently_used_tarballs(self):
+    with self.setup() as (artifact_root, cache_path):
+      caches = [self.tarball_cache(artifact_root, cache_path, task) for task in ('t1', 't2')]
+      keys = [CacheKey('a', 'h1'), CacheKey('b', 'h2'), CacheKey('c', 'h3')]
+      for i, key in enumerate(keys):
+        cache = caches[i % 2]
+        self.insert(cache, key, os.urandom(1000))
+        self.age(cache._cache_file_for_key(key), 1000 - i)
+
+      sizes = [os.path.getsize(caches[i % 2]._cache_file_for_key(k)) for i, k in enumerate(keys)]
+      result = LocalCacheEvictor(cache_path, max_bytes=sizes[1] + sizes[2]).evict()
+
+      self.assertEqual(1, result.removed)
+      self.assertEqual(sizes[0], result.freed)
+      self.assertEqual(sizes[1] + sizes[2], result.remaining)
+      self.assertFalse(caches[0].has(keys[0]))
+      self.assertTrue(caches[1].has(keys[1]))
+      self.assertTrue(caches[0].has(keys[2]))
+
+  def test_use_refreshes_tarball(self):
+    with self.setup() as (artifact_root, cache_path):
+      cache = self.tarball_cache(artifact_root, cache_path)
+      old_key = CacheKey('a', 'h1')
+      new_key = CacheKey('b', 'h2')
+      self.insert(cache, old_key, os.urandom(1000))
+      self.insert(cache, new_key, os.urandom(1000))
+      self.age(cache._cache_file_for_key(old_key), 100)
+      self.age(cache._cache_file_for_key(new_key), 50)
+
+      self.assertTrue(cache.use_cached_files(old_key))
+      size = os.path.getsize(cache._cache_file_for_key(old_key))
+      LocalCacheEvictor(cache_path, max_bytes=size).evict()
+      self.assertTrue(cache.has(old_key))
+      self.assertFalse(cache.has(new_key))
+
+  def test_max_age(self):
+    with self.setup() as (artifact_root, cache_path):
+      cache = self.tarball_cache(artifact_root, cache_path)
+      old_key = CacheKey('a', 'h1')
+      new_key = CacheKey('b', 'h2')
+      self.insert(cache, old_key, b'old')
+      self.insert(cache, new_key, b'new')
+      self.age(cache._cache_file_for_key(old_key), 7200)
+
+      LocalCacheEvictor(cache_path, max_age_secs=3600).evict()
+      self.assertFalse(cache.has(old_key))
+      self.assertTrue(cache.has(new_key))
+
+  def test_content_addressed_blobs_count_against_budget(self):
+    with self.setup() as (artifact_root, cache_path):
+      cas_root = os.path.join(cache_path, ContentAddressedArtifactCache.CAS_DIRNAME)
+      cache = ContentAddressedArtifactCache(artifact_root, cas_root, 'task', compression=1)
+      shared = os.urandom(1000)
+      old_key = CacheKey('a', 'h1')
+      new_key = CacheKey('b', 'h2')
+      self.insert(cache, old_key, shared)
+      self.age(cache._manifest_for_key(old_key), 100)
+      results_dir = os.path.join(artifact_root, new_key.id)
+      safe_mkdir(results_dir, clean=True)
+      safe_file_dump(os.path.join(results_dir, 'A.class'), shared)
+      safe_file_dump(os.path.join(results_dir, 'B.class'), os.urandom(1000))
+      cache.insert(new_key, [results_dir])
+
+      # Evicting the old manifest frees no blobs, since its content is shared with the new one.
+      total = LocalCacheEvictor(cache_path, max_bytes=10 ** 9).evict().remaining
+      result = LocalCacheEvictor(cache_path, max_bytes=total - 1).evict()
+      self.assertEqual(1, result.removed)
+      self.assertFalse(cache.has(old_key))
+      self.assertTrue(cache.has(new_key))
+      self.assertEqual(2, len(list(cache.blob_store.iter_digests())))
+
+      # Evicting the last manifest takes its blobs with it.
+      result = LocalCacheEvictor(cache_path, max_bytes=0).evict()
+      self.assertEqual(3, result.removed)
+      self.assertEqual(0, result.remaining)
+      self.assertEqual([], list(cache.blob_store.iter_digests()))
+
+  def test_evict_if_due(self):
+    with self.setup() as (artifact_root, cache_path):
+      evictor = LocalCacheEvictor(cache_path, max_bytes=0)
+      cache = self.tarball_cache(artifact_root, cache_path, evictor=evictor,
+                                 eviction_interval_secs=60)
+      key = CacheKey('a', 'h1')
+
+      # The first insert only starts the clock.
+      self.insert(cache, key, b'a')
+      self.assertTrue(cache.has(key))
+
+      self.assertIsNone(evictor.evict_if_due(60))
+      self.age(evictor._marker, 120)
+      self.insert(cache, key, b'a')
+      self.assertFalse(cache.has(key))
+
+  def test_disabled(self):
+    with self.setup() as (artifact_root, cache_path):
+      evictor = LocalCacheEvictor(cache_path)
+      self.assertFalse(evictor.enabled)
+      self.assertIsNone(evictor.evict_if_due(1))
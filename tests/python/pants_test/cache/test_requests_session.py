@@ -0,0 +1,104 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import BaseHTTPServer
+import os
+import SocketServer
+import threading
+import unittest
+from contextlib import contextmanager
+
+from pants.cache.cache_timings import call_recording_timings
+from pants.cache.requests_session import Http2UnavailableError, RequestsSession
+
+
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'
+
+  def do_HEAD(self):
+    self.send_response(200)
+    self.send_header('Content-Length', '0')
+    self.end_headers()
+
+  def log_message(self, *args):
+    pass
+
+
+class ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+  daemon_threads = True
+
+
+@contextmanager
+def keep_alive_server():
+  httpd = ThreadingHTTPServer(('localhost', 0), KeepAliveHandler)
+  thread = threading.Thread(target=httpd.serve_forever)
+  thread.daemon = True
+  thread.start()
+  try:
+    yield 'http://localhost:{}'.format(httpd.server_address[1])
+  finally:
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _head_twice(url):
+  session = RequestsSession.instance()
+  for _ in range(2):
+    session.head(url, timeout=5)
+
+
+class RequestsSessionTest(unittest.TestCase):
+
+  def test_connections_are_reused(self):
+    with keep_alive_server() as url:
+      before = RequestsSession.connection_stats()
+      session = RequestsSession.instance()
+      for _ in range(5):
+        self.assertEqual(200, session.head(url, timeout=5).status_code)
+      after = RequestsSession.connection_stats()
+
+    self.assertEqual(5, after['requests_sent'] - before['requests_sent'])
+    self.assertEqual(1, after['connections_opened'] - before['connections_opened'])
+    self.assertIsNotNone(after['reuse_rate'])
+
+  def test_worker_connection_counts(self):
+    with keep_alive_server() as url:
+      _, _, connection_counts = call_recording_timings((_head_twice, url))
+    self.assertEqual((os.getpid(), 1, 2), connection_counts)
+
+    # Counts measured in this process are already included.
+    before = RequestsSession.connection_stats()
+    RequestsSession.merge_worker_connection_counts(*connection_counts)
+    self.assertEqual(before, RequestsSession.connection_stats())
+
+    # Counts from a worker are added.
+    RequestsSession.merge_worker_connection_counts(os.getpid() + 1, 1, 2)
+    after = RequestsSession.connection_stats()
+    self.assertEqual(1, after['connections_opened'] - before['connections_opened'])
+    self.assertEqual(2, after['requests_sent'] - before['requests_sent'])
+
+  def test_configure_only_grows_the_pool(self):
+    RequestsSession.configure(pool_size=RequestsSession.DEFAULT_POOL_SIZE + 8)
+    session = RequestsSession.instance()
+    RequestsSession.configure(pool_size=1)
+    self.assertIs(session, RequestsSession.instance())
+    self.assertEqual(RequestsSession.DEFAULT_POOL_SIZE + 8,
+                     RequestsSession.connection_stats()['pool_size'])
+
+  def test_mount_retrying(self):
+    session = RequestsSession.mount_retrying('http://resolver.example', max_retries=3)
+    self.assertIs(session, RequestsSession.instance())
+    self.assertEqual(3, session.get_adapter('http://resolver.example/urls').max_retries.total)
+
+  def test_http2_requires_hyper(self):
+    try:
+      import hyper  # noqa
+      self.skipTest('The `hyper` module is installed.')
+    except ImportError:
+      pass
+    with self.assertRaises(Http2UnavailableError):
+      RequestsSession.configure(http2=True)
@@ -0,0 +1,122 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import pickle
+import sys
+import time
+import unittest
+from contextlib import contextmanager
+from textwrap import dedent
+
+from pants.cache.local_artifact_cache import TempLocalArtifactCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.cache.write_behind import WriteBehindQueue, WriteBehindSpill
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_rmtree
+from pants.util.process_handler import subprocess
+from pants_test.cache.cache_server import cache_server
+
+
+class WriteBehindTest(unittest.TestCase):
+
+  def tearDown(self):
+    WriteBehindQueue.drain_all()
+
+  @contextmanager
+  def setup(self, return_failed=False, deadline_secs=10):
+    with temporary_dir() as artifact_root:
+      with temporary_dir() as spill_dir:
+        with cache_server(return_failed=return_failed) as server:
+          queue = WriteBehindQueue(spill_dir, max_concurrent_uploads=2, deadline_secs=deadline_secs)
+          cache = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]),
+                                       TempLocalArtifactCache(artifact_root, compression=1),
+                                       write_behind=queue.spill)
+          yield cache, queue
+
+  def insert(self, cache, key, content):
+    path = os.path.join(cache.artifact_root, key.id, 'output')
+    safe_file_dump(path, content)
+    cache.insert(key, [path], overwrite=True)
+    safe_rmtree(os.path.dirname(path))
+    return path
+
+  def spilled(self, queue):
+    return sorted(os.listdir(queue.spill.spill_dir))
+
+  def test_insert_spills_without_uploading(self):
+    with self.setup() as (cache, queue):
+      key = CacheKey('some_target', 'some_hash')
+      self.insert(cache, key, 'some content')
+
+      self.assertEqual(2, len(self.spilled(queue)))
+      self.assertFalse(cache.has(key))
+
+  def test_drain_uploads(self):
+    with self.setup() as (cache, queue):
+      keys = [CacheKey('target{}'.format(i), 'hash{}'.format(i)) for i in range(5)]
+      paths = [self.insert(cache, key, 'content {}'.format(i)) for i, key in enumerate(keys)]
+      # Inserting the same key again replaces its queued upload.
+      self.insert(cache, keys[0], 'content 0')
+      self.assertEqual(10, len(self.spilled(queue)))
+
+      queue.start()
+      self.assertEqual(0, queue.drain())
+      self.assertEqual(5, queue.uploaded)
+      self.assertEqual([], self.spilled(queue))
+
+      for i, (key, path) in enumerate(zip(keys, paths)):
+        self.assertTrue(cache.use_cached_files(key))
+        with open(path) as infile:
+          self.assertEqual('content {}'.format(i), infile.read())
+
+  def test_failed_uploads_stay_spilled(self):
+    with self.setup(return_failed=True) as (cache, queue):
+      self.insert(cache, CacheKey('some_target', 'some_hash'), 'some content')
+      queue.start()
+      self.assertEqual(1, queue.drain())
+      self.assertEqual(0, queue.uploaded)
+      self.assertEqual(2, len(self.spilled(queue)))
+
+  def test_slow_upload_does_not_delay_exit(self):
+    with temporary_dir() as spill_dir:
+      script = os.path.join(spill_dir, 'drain.py')
+      safe_file_dump(script, dedent("""
+        import sys
+        import time
+
+        from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+        from pants.cache.write_behind import WriteBehindQueue
+        from pants.invalidation.build_invalidator import CacheKey
+
+        RESTfulArtifactCache.upload = lambda self, cache_key, path: time.sleep(60)
+        queue = WriteBehindQueue(sys.argv[1], max_concurrent_uploads=1, deadline_secs=0.5)
+        queue.spill.spill(['http://localhost:1'], CacheKey('some_target', 'some_hash'), sys.argv[0])
+        queue.start()
+        sys.exit(queue.drain())
+        """))
+      start = time.time()
+      returncode = subprocess.call([sys.executable, script, os.path.join(spill_dir, 'spill')],
+                                   env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+      self.assertEqual(1, returncode)
+      self.assertLess(time.time() - start, 30)
+
+  def test_spill_is_picklable(self):
+    with temporary_dir() as spill_dir:
+      spill = pickle.loads(pickle.dumps(WriteBehindSpill(spill_dir)))
+      self.assertEqual(spill_dir, spill.spill_dir)
+
+  def test_for_dir(self):
+    with temporary_dir() as spill_dir:
+      queue = WriteBehindQueue.for_dir(spill_dir, max_concurrent_uploads=1, deadline_secs=1)
+      self.assertIs(queue, WriteBehindQueue.for_dir(spill_dir, max_concurrent_uploads=1,
+                                                    deadline_secs=1))
+      self.assertTrue(WriteBehindQueue.has_queues())
+      self.assertEqual(0, WriteBehindQueue.drain_all())
+      self.assertFalse(WriteBehindQueue.has_queues())
@@ -0,0 +1,138 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import tempfile
+import unittest
+
+from pants.bin.engine_initializer import LegacySymbolTable
+from pants.build_graph.build_file_aliases import BuildFileAliases
+from pants.build_graph.target import Target
+from pants.engine.legacy.caching_parser import CachingParser
+from pants.engine.legacy.parser import LegacyPythonCallbacksParser
+from pants.engine.parser import Parser
+from pants.util.dirutil import safe_file_dump, safe_rmtree
+
+
+class CountingParser(Parser):
+
+  def __init__(self, parser):
+    super(CountingParser, self).__init__()
+    self._parser = parser
+    self.parsed = []
+
+  def parse(self, filepath, filecontent):
+    self.parsed.append(filepath)
+    return self._parser.parse(filepath, filecontent)
+
+
+class CachingParserTest(unittest.TestCase):
+
+  class Requirements(object):
+    def __init__(self, parse_context):
+      self._parse_context = parse_context
+
+    def __call__(self):
+      pass
+
+  def aliases(self, **kwargs):
+    return BuildFileAliases(targets=dict(kwargs, target=Target),
+                            context_aware_object_factories={'requirements': self.Requirements})
+
+  def setUp(self):
+    self.build_root = tempfile.mkdtemp()
+    self.addCleanup(safe_rmtree, self.build_root)
+    self.cache_dir = os.path.join(self.build_root, '.pants.d', 'build_file_parses')
+
+  def parser(self, aliases=None, parallelism=1):
+    aliases = aliases or self.aliases()
+    counting = CountingParser(LegacyPythonCallbacksParser(LegacySymbolTable(aliases), aliases,
+                                                          build_file_imports_behavior='allow'))
+    return counting, CachingParser(counting, aliases, self.build_root, self.cache_dir,
+                                   parallelism=parallelism)
+
+  def names(self, objects):
+    return sorted(obj.name for obj in objects)
+
+  def test_unchanged_build_file_parsed_once(self):
+    counting, parser = self.parser()
+    self.assertEqual(['a', 'b'], self.names(parser.parse('src/BUILD', "target(name='a')\n"
+                                                                      "target(name='b')\n")))
+    self.assertEqual(['src/BUILD'], counting.parsed)
+
+    counting, parser = self.parser()
+    self.assertEqual(['a', 'b'], self.names(parser.parse('src/BUILD', "target(name='a')\n"
+                                                                      "target(name='b')\n")))
+    self.assertEqual([], counting.parsed)
+
+  def test_changed_build_file_parsed_again(self):
+    _, parser = self.parser()
+    parser.parse('src/BUILD', "target(name='a')")
+
+    counting, parser = self.parser()
+    self.assertEqual(['b'], self.names(parser.parse('src/BUILD', "target(name='b')")))
+    self.assertEqual(['src/BUILD'], counting.parsed)
+    # The same content at another path has the default names of that path.
+    self.assertEqual(['other'], self.names(parser.parse('other/BUILD', 'target()')))
+    self.assertEqual(['src/BUILD', 'other/BUILD'], counting.parsed)
+
+  def test_changed_aliases_parse_again(self):
+    _, parser = self.parser()
+    parser.parse('src/BUILD', "target(name='a')")
+
+    counting, parser = self.parser(aliases=self.aliases(other_target=Target))
+    parser.parse('src/BUILD', "target(name='a')")
+    self.assertEqual(['src/BUILD'], counting.parsed)
+
+  def test_build_files_that_may_read_other_files_not_cached(self):
+    for content in ("requirements()\ntarget(name='a')", "import os\ntarget(name='a')"):
+      for _ in range(2):
+        counting, parser = self.parser()
+        self.assertEqual(['a'], self.names(parser.parse('src/BUILD', content)))
+        self.assertEqual(['src/BUILD'], counting.parsed)
+
+  def test_unpicklable_objects_not_cached(self):
+    for _ in range(2):
+      counting, parser = self.parser()
+      objects = parser.parse('src/BUILD', "target(name='a', callback=lambda: 42)")
+      self.assertEqual(42, objects[0].callback())
+      self.assertEqual(['src/BUILD'], counting.parsed)
+
+  def test_preload(self):
+    paths = ['a/BUILD', 'b/BUILD', 'c/BUILD.tools']
+    for path in paths:
+      safe_file_dump(os.path.join(self.build_root, path), 'target()')
+
+    counting, parser = self.parser(parallelism=2)
+    parser.preload(paths)
+    # The BUILD files were parsed in other processes, which filled the cache.
+    self.assertEqual([], counting.parsed)
+    self.assertEqual([['a'], ['b'], ['c']],
+                     [self.names(parser.parse(path, 'target()')) for path in paths])
+    self.assertEqual([], counting.parsed)
+
+  def test_preload_needs_parallelism(self):
+    paths = ['a/BUILD', 'b/BUILD']
+    for path in paths:
+      safe_file_dump(os.path.join(self.build_root, path), 'target()')
+
+    counting, parser = self.parser()
+    parser.preload(paths)
+    self.assertFalse(os.path.exists(self.cache_dir))
+    for path in paths:
+      parser.parse(path, 'target()')
+    self.assertEqual(paths, counting.parsed)
+
+  def test_preload_leaves_failures_to_parse(self):
+    safe_file_dump(os.path.join(self.build_root, 'a/BUILD'), 'target()')
+    safe_file_dump(os.path.join(self.build_root, 'b/BUILD'), 'not_a_target()')
+
+    counting, parser = self.parser(parallelism=2)
+    parser.preload(['a/BUILD', 'b/BUILD'])
+    with self.assertRaises(NameError):
+      parser.parse('b/BUILD', 'not_a_target()')
+    self.assertEqual(['b/BUILD'], counting.parsed)
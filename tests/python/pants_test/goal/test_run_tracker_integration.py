@@ -29,6 +29,8 @@ class RunTrackerIntegrationTest(PantsRunIntegrationTest):
         self.assertIn('self_timings', stats_json)
         self.assertIn('cumulative_timings', stats_json)
         self.assertIn('pantsd_stats', stats_json)
+        self.assertIn('worker_admission_stats', stats_json)
+        self.assertIn('nailgun_pool_stats', stats_json)
 
   def test_workunit_failure(self):
     pants_run = self.run_pants([
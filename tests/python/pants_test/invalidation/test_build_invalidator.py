@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import tempfile
+import threading
 import unittest
 from contextlib import contextmanager
 
@@ -62,10 +63,12 @@ class BaseBuildInvalidatorTest(unittest.TestCase):
 
 
 class BuildInvalidatorTest(BaseBuildInvalidatorTest):
+  store = 'files'
+
   @contextmanager
   def invalidator(self):
     with temporary_dir() as root:
-      yield BuildInvalidator(root)
+      yield BuildInvalidator(root, store=self.store)
 
   def test_cache_key_previous(self):
     with self.invalidator() as invalidator:
@@ -135,13 +138,78 @@ class BuildInvalidatorTest(BaseBuildInvalidatorTest):
       self.assertTrue(invalidator.needs_update(key1))
       self.assertTrue(invalidator.needs_update(key2))
 
+  def test_preload(self):
+    with self.invalidator() as invalidator:
+      key1 = self.cache_key(key_id='1', key_hash='1')
+      key2 = self.cache_key(key_id='2', key_hash='2')
+      invalidator.update(key1)
+      invalidator.preload([key1, key2])
+      self.assertFalse(invalidator.needs_update(key1))
+      self.assertTrue(invalidator.needs_update(key2))
+      invalidator.update(key2)
+      self.assertFalse(invalidator.needs_update(key2))
+      self.assertEqual(key2, invalidator.previous_key(key2))
+
+  def test_batched_writes(self):
+    with self.invalidator() as invalidator:
+      key1 = self.cache_key(key_id='1', key_hash='1')
+      key2 = self.cache_key(key_id='2', key_hash='2')
+      invalidator.update(key1)
+      with invalidator.batched_writes():
+        invalidator.force_invalidate(key1)
+        invalidator.update(key2)
+        self.assertTrue(invalidator.needs_update(key1))
+        self.assertFalse(invalidator.needs_update(key2))
+      self.assertTrue(invalidator.needs_update(key1))
+      self.assertFalse(invalidator.needs_update(key2))
+
+
+class SqliteBuildInvalidatorTest(BuildInvalidatorTest):
+  store = 'sqlite'
+
+  def test_batched_writes_are_deferred(self):
+    with temporary_dir() as root:
+      invalidator = BuildInvalidator(root, store='sqlite')
+      key = self.cache_key()
+      with invalidator.batched_writes():
+        invalidator.update(key)
+        self.assertTrue(BuildInvalidator(root, store='sqlite').needs_update(key))
+      self.assertFalse(BuildInvalidator(root, store='sqlite').needs_update(key))
+
+  def test_batches_are_per_thread(self):
+    with temporary_dir() as root:
+      invalidator = BuildInvalidator(root, store='sqlite')
+      key1 = self.cache_key(key_id='1', key_hash='1')
+      key2 = self.cache_key(key_id='2', key_hash='2')
+      with invalidator.batched_writes():
+        invalidator.update(key1)
+        # A write on another thread during the batch is not held back by it.
+        thread = threading.Thread(target=invalidator.update, args=(key2,))
+        thread.start()
+        thread.join()
+        self.assertTrue(BuildInvalidator(root, store='sqlite').needs_update(key1))
+        self.assertFalse(BuildInvalidator(root, store='sqlite').needs_update(key2))
+      self.assertFalse(BuildInvalidator(root, store='sqlite').needs_update(key1))
+
+  def test_many_keys(self):
+    with self.invalidator() as invalidator:
+      keys = [self.cache_key(key_id=str(i), key_hash=str(i)) for i in range(1200)]
+      with invalidator.batched_writes():
+        for key in keys:
+          invalidator.update(key)
+      invalidator.preload(keys)
+      self.assertFalse(any(invalidator.needs_update(key) for key in keys))
+
 
 class BuildInvalidatorFactoryTest(BaseBuildInvalidatorTest):
+  store = 'files'
+
   def setUp(self):
     pants_workdir = tempfile.mkdtemp()
     self.addCleanup(safe_rmtree, pants_workdir)
 
-    init_subsystem(BuildInvalidator.Factory, options={'': {'pants_workdir': pants_workdir}})
+    init_subsystem(BuildInvalidator.Factory, options={'': {'pants_workdir': pants_workdir},
+                                                      'build-invalidator': {'store': self.store}})
     self.root_invalidator = BuildInvalidator.Factory.create()
     self.scoped_invalidator1 = BuildInvalidator.Factory.create(build_task='gen')
     self.scoped_invalidator2 = BuildInvalidator.Factory.create(build_task='resolve')
@@ -169,3 +237,7 @@ class BuildInvalidatorFactoryTest(BaseBuildInvalidatorTest):
 
     self.assertTrue(self.scoped_invalidator1.needs_update(self.key))
     self.assertFalse(self.scoped_invalidator2.needs_update(self.key))
+
+
+class SqliteBuildInvalidatorFactoryTest(BuildInvalidatorFactoryTest):
+  store = 'sqlite'
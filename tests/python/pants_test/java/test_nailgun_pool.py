@@ -0,0 +1,110 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+
+import mock
+
+from pants.java.nailgun_executor import NailgunExecutor
+from pants.java.nailgun_pool import NailgunPool
+from pants_test.base_test import BaseTest
+
+
+class NailgunPoolTest(BaseTest):
+  def setUp(self):
+    super(NailgunPoolTest, self).setUp()
+    # The fingerprints and resident memory of the running servers, by identity.
+    self.servers = {}
+    self.rss = {}
+    servers = self.servers
+    rss = self.rss
+
+    def as_process(executor):
+      process = mock.Mock()
+      process.memory_info.return_value.rss = rss.get(executor.name, 0)
+      return process
+
+    for name, patched in (('is_alive', lambda executor: executor.name in servers),
+                          ('fingerprint', property(lambda executor: servers.get(executor.name))),
+                          ('terminate', lambda executor: servers.pop(executor.name)),
+                          ('_as_process', as_process)):
+      patcher = mock.patch.object(NailgunExecutor, name, patched)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+
+    self.checkouts = []
+
+  def pool(self, size, **kwargs):
+    return NailgunPool('ng_Test', '/__non_existent_dir', [], mock.Mock(), size,
+                       metadata_base_dir=self.subprocess_dir,
+                       on_checkout=lambda hit, evictions: self.checkouts.append((hit, evictions)),
+                       **kwargs)
+
+  def run_in(self, pool, classpath, jvm_options=None):
+    with pool.checkout(classpath, jvm_options) as executor:
+      # Running an invocation (re)starts the server for its fingerprint.
+      self.servers[executor.name] = executor.invocation_fingerprint(jvm_options or [], classpath)
+      return executor.name
+
+  def test_reuses_warm_server(self):
+    pool = self.pool(2)
+    self.assertEqual('ng_test', self.run_in(pool, ['a.jar']))
+    self.assertEqual('ng_test', self.run_in(pool, ['a.jar']))
+    self.assertEqual([(False, 0), (True, 0)], self.checkouts)
+    self.assertEqual((1, 1), (pool.hits, pool.misses))
+
+  def test_keeps_servers_per_fingerprint(self):
+    pool = self.pool(2)
+    self.run_in(pool, ['a.jar'])
+    self.assertEqual('ng_test_1', self.run_in(pool, ['b.jar']))
+    self.assertEqual('ng_test', self.run_in(pool, ['a.jar']))
+    self.assertEqual('ng_test_1', self.run_in(pool, ['b.jar']))
+    self.assertEqual([(False, 0), (False, 0), (True, 0), (True, 0)], self.checkouts)
+
+  def test_restarts_least_recently_used(self):
+    pool = self.pool(2)
+    self.run_in(pool, ['a.jar'])
+    self.run_in(pool, ['b.jar'])
+    self.run_in(pool, ['a.jar'])
+    # The server for `b.jar` is the least recently used.
+    self.assertEqual('ng_test_1', self.run_in(pool, ['c.jar']))
+    self.assertEqual((False, 1), self.checkouts[-1])
+    self.assertEqual(1, pool.evictions)
+
+  def test_concurrent_checkouts_use_different_servers(self):
+    pool = self.pool(2)
+    self.run_in(pool, ['a.jar'])
+    with pool.checkout(['a.jar']) as first:
+      with pool.checkout(['a.jar']) as second:
+        self.assertEqual('ng_test', first.name)
+        self.assertEqual('ng_test_1', second.name)
+
+  def test_checkout_waits_for_a_free_server(self):
+    pool = self.pool(1)
+    checked_out = threading.Event()
+
+    def checkout():
+      with pool.checkout(['a.jar']):
+        checked_out.set()
+
+    with pool.checkout(['a.jar']):
+      thread = threading.Thread(target=checkout)
+      thread.daemon = True
+      thread.start()
+      self.assertFalse(checked_out.wait(0.1))
+    self.assertTrue(checked_out.wait(5))
+    thread.join(5)
+
+  def test_memory_budget(self):
+    pool = self.pool(3, memory_budget_bytes=300)
+    self.run_in(pool, ['a.jar'])
+    self.run_in(pool, ['b.jar'])
+    self.rss.update({'ng_test': 200, 'ng_test_1': 200})
+    self.run_in(pool, ['b.jar'])
+    # The idle server for `a.jar` was terminated to get under the budget.
+    self.assertEqual({'ng_test_1'}, set(self.servers))
+    self.assertEqual((True, 1), self.checkouts[-1])
@@ -0,0 +1,122 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import cProfile
+import pstats
+
+from pants.option.config import Config
+from pants.option.global_options import GlobalOptionsRegistrar
+from pants.option.option_tracker import OptionTracker
+from pants.option.optionable import Optionable
+from pants.option.options import Options
+from pants.option.scope import ScopeInfo
+from pants.util.contextutil import Timer, temporary_file
+
+
+def create_optionables(num_optionables, options_per_optionable):
+  """Returns synthetic optionables standing in for the subsystems and tasks of a large plugin set.
+
+  Each registers a mix of string, int, bool, list and dict options, a few of them recursive or
+  fingerprinted.
+  """
+  def register_options(cls, register):
+    for i in range(options_per_optionable):
+      kind = i % 5
+      if kind == 0:
+        register('--str-{}'.format(i), default='value', fingerprint=True, help='A string.')
+      elif kind == 1:
+        register('--int-{}'.format(i), type=int, default=i, help='An int.')
+      elif kind == 2:
+        register('--bool-{}'.format(i), type=bool, default=False, help='A bool.')
+      elif kind == 3:
+        register('--list-{}'.format(i), type=list, default=['a', 'b'], help='A list.')
+      else:
+        register('--dict-{}'.format(i), type=dict, default={'a': 1}, help='A dict.')
+
+  optionables = []
+  for i in range(num_optionables):
+    optionables.append(type(str('Plugin{}'.format(i)), (Optionable,), {
+      'options_scope': 'plugin{}'.format(i),
+      'options_scope_category': ScopeInfo.SUBSYSTEM,
+      'register_options': classmethod(register_options),
+    }))
+  return optionables
+
+
+def write_config(fp, optionables, options_per_optionable):
+  """Sets every third option of every optionable in config, as a real pants.ini would."""
+  for optionable in optionables:
+    fp.write('[{}]\n'.format(optionable.options_scope).encode('utf-8'))
+    for i in range(0, options_per_optionable, 15):
+      fp.write('str_{}: configured\n'.format(i).encode('utf-8'))
+  fp.flush()
+
+
+def create_options(config_path, optionables, args):
+  known_scope_infos = [GlobalOptionsRegistrar.get_scope_info()]
+  known_scope_infos.extend(optionable.get_scope_info() for optionable in optionables)
+  options = Options.create(env={}, config=Config.load([config_path]),
+                           known_scope_infos=known_scope_infos, args=args,
+                           option_tracker=OptionTracker())
+  GlobalOptionsRegistrar.register_options_on_scope(options)
+  for optionable in optionables:
+    optionable.register_options_on_scope(options)
+  return options
+
+
+def benchmark(config_path, optionables, args, scopes_read, repeats):
+  create_times = []
+  read_times = []
+  for _ in range(repeats):
+    with Timer() as timer:
+      options = create_options(config_path, optionables, args)
+    create_times.append(timer.elapsed)
+    with Timer() as timer:
+      for scope in scopes_read:
+        options.for_scope(scope)
+    read_times.append(timer.elapsed)
+  return min(create_times), min(read_times)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Measures the startup cost of creating options and reading them, for a synthetic '
+                'set of plugin optionables.')
+  parser.add_argument('--optionables', type=int, default=400, help='Number of optionables.')
+  parser.add_argument('--options', type=int, default=30, help='Options per optionable.')
+  parser.add_argument('--read', type=int, default=10,
+                      help='Number of optionable scopes a typical run reads.')
+  parser.add_argument('--repeats', type=int, default=3, help='Best-of repetitions.')
+  parser.add_argument('--profile', action='store_true',
+                      help='Print the top functions of a profile of one full run.')
+  args = parser.parse_args()
+
+  optionables = create_optionables(args.optionables, args.options)
+  cmdline = ['./pants', '--level=debug', 'list', '--plugin0-int-1=7', '::']
+  with temporary_file() as fp:
+    write_config(fp, optionables, args.options)
+    scopes = [''] + [optionable.options_scope for optionable in optionables]
+    print('{} optionables with {} options each.'.format(args.optionables, args.options))
+    print('{:<30} {:>10} {:>10}'.format('run', 'create (s)', 'read (s)'))
+    for label, scopes_read in (('read {} scopes'.format(args.read), scopes[:args.read + 1]),
+                               ('read all scopes', scopes)):
+      create_time, read_time = benchmark(fp.name, optionables, cmdline, scopes_read, args.repeats)
+      print('{:<30} {:>10.3f} {:>10.3f}'.format(label, create_time, read_time))
+
+    if args.profile:
+      profiler = cProfile.Profile()
+      profiler.enable()
+      options = create_options(fp.name, optionables, cmdline)
+      for scope in scopes[:args.read + 1]:
+        options.for_scope(scope)
+      profiler.disable()
+      pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+  main()
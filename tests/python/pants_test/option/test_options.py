@@ -589,6 +589,61 @@ class OptionsTest(unittest.TestCase):
     with self.assertRaises(FrozenRegistration):
       options.register(GLOBAL_SCOPE, '--arg2')
 
+  def test_deferred_registration(self):
+    registrations = []
+
+    class DummyOptionable(Optionable):
+      options_scope = 'compile.java'
+
+      @classmethod
+      def register_options(cls, register):
+        registrations.append(register.scope)
+        register('--foo', default='bar')
+
+    options = self._parse('./pants')
+    DummyOptionable.register_options_on_scope(options)
+    options.for_scope('compile.scala')
+    self.assertEqual([], registrations)
+
+    self.assertEqual('bar', options.for_scope('compile.java').foo)
+    self.assertEqual(99, options.for_scope('compile.java').num)
+    options.for_scope('compile.java')
+    self.assertEqual(['compile.java'], registrations)
+
+  def test_deferred_registration_precedes_enclosed_registration(self):
+    options = Options.create(args=['./pants', 'foo', '--arg2=x'], env={},
+                             config=self._create_config({}),
+                             known_scope_infos=[task('foo')], option_tracker=OptionTracker())
+    options.defer_registration(GLOBAL_SCOPE,
+                               lambda: options.register(GLOBAL_SCOPE, '--arg1', recursive=True))
+    # Registering in an enclosed scope runs the deferred registration before freezing its scope.
+    options.register('foo', '--arg2')
+    self.assertEqual(None, options.for_scope('foo').arg1)
+    self.assertEqual('x', options.for_scope('foo').arg2)
+    with self.assertRaises(FrozenRegistration):
+      options.register(GLOBAL_SCOPE, '--arg3')
+
+  def test_deferred_registration_deprecated_scope(self):
+    class DummyOptionable(Optionable):
+      options_scope = 'new-scope'
+      options_scope_category = ScopeInfo.SUBSYSTEM
+      deprecated_options_scope = 'deprecated-scope'
+      deprecated_options_scope_removal_version = '9999.9.9.dev0'
+
+      @classmethod
+      def register_options(cls, register):
+        register('--foo')
+
+    options = Options.create(env={},
+                             config=self._create_config({'deprecated-scope': {'foo': 'xx'}}),
+                             known_scope_infos=[DummyOptionable.get_scope_info()],
+                             args=['./pants'],
+                             option_tracker=OptionTracker())
+    DummyOptionable.register_options_on_scope(options)
+    self.assertEqual('xx', options.for_scope('deprecated-scope').foo)
+    with self.warnings_catcher():
+      self.assertEqual('xx', options.for_scope('new-scope').foo)
+
   def test_implicit_value(self):
     options = self._parse('./pants')
     self.assertEqual('default', options.for_global_scope().implicit_valuey)
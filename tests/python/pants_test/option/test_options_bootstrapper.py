@@ -294,3 +294,23 @@ class BootstrapOptionsTest(unittest.TestCase):
       ob = OptionsBootstrapper(env={}, args=["--pants-config-files=['{}']".format(config1)])
       logdir = ob.get_bootstrap_options().for_global_scope().logdir
       self.assertEqual('logdir1', logdir)
+
+  def test_config_file_candidates(self):
+    with temporary_dir() as tmpdir:
+      config = os.path.join(tmpdir, 'config')
+      override = os.path.join(tmpdir, 'override')
+      rcfile = os.path.join(tmpdir, 'absent.rc')
+      with open(config, 'w') as out:
+        out.write(b'[DEFAULT]\n')
+      with open(override, 'w') as out:
+        out.write(b'[DEFAULT]\n')
+
+      ob = OptionsBootstrapper(env={}, args=["--pants-config-files=['{}']".format(config),
+                                             "--config-override=['{}']".format(override),
+                                             "--pantsrc-files=['{}']".format(rcfile)])
+      self.assertEqual([config, override, rcfile], ob.get_config_file_candidates())
+
+      ob = OptionsBootstrapper(env={}, args=["--pants-config-files=['{}']".format(config),
+                                             "--pantsrc-files=['{}']".format(rcfile),
+                                             '--no-pantsrc'])
+      self.assertEqual([config], ob.get_config_file_candidates())
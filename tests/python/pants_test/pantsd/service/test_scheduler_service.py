@@ -0,0 +1,57 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+import time
+import unittest
+
+import mock
+
+from pants.pantsd.service.scheduler_service import SchedulerService
+from pants.util.rwlock import ReadWriteLock
+
+
+class FakeGraphHelper(object):
+  """Records how many threads warm the product graph at once."""
+
+  def __init__(self):
+    self.scheduler = mock.Mock()
+    self.scheduler.graph_len.return_value = 0
+    self._lock = threading.Lock()
+    self.warming = 0
+    self.max_warming = 0
+
+  def warm_product_graph(self, spec_roots):
+    with self._lock:
+      self.warming += 1
+      self.max_warming = max(self.max_warming, self.warming)
+    time.sleep(0.05)
+    with self._lock:
+      self.warming -= 1
+
+
+class TestSchedulerService(unittest.TestCase):
+  def setUp(self):
+    self.graph_helper = FakeGraphHelper()
+    self.fork_lock = ReadWriteLock()
+    self.service = SchedulerService(fs_event_service=mock.Mock(),
+                                    legacy_graph_helper=self.graph_helper,
+                                    build_root='/build_root',
+                                    invalidation_globs=[])
+    self.service.setup(threading.RLock(), self.fork_lock)
+
+  def test_concurrent_requests_warm_in_turn(self):
+    threads = [threading.Thread(target=self.service.warm_product_graph, args=([],))
+               for _ in range(4)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(1, self.graph_helper.max_warming)
+
+  def test_warm_returns_graph_helper(self):
+    self.assertIs(self.graph_helper, self.service.warm_product_graph([]))
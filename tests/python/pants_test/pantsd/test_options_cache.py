@@ -0,0 +1,93 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+import mock
+
+from pants.pantsd.options_cache import OptionsCache
+from pants.util.dirutil import safe_file_dump, safe_mkdtemp, safe_rmtree
+
+
+class OptionsCacheTest(unittest.TestCase):
+  def setUp(self):
+    self.build_root = os.path.realpath(safe_mkdtemp())
+    self.addCleanup(safe_rmtree, self.build_root)
+    self.config_file = os.path.join(self.build_root, 'pants.ini')
+    self.rcfile = os.path.join(self.build_root, 'absent.rc')
+    safe_file_dump(self.config_file, '[GLOBAL]\n')
+    self.cache = OptionsCache(self.build_root)
+
+    self.parsed = []
+    def setup(init_logging):
+      options = mock.Mock()
+      self.parsed.append(options)
+      return options, None
+    initializer = mock.Mock()
+    initializer.return_value.setup.side_effect = setup
+    bootstrapper = mock.Mock()
+    bootstrapper.return_value.get_config_file_candidates.return_value = [self.config_file,
+                                                                         self.rcfile]
+    for name, patched in (('OptionsInitializer', initializer),
+                          ('OptionsBootstrapper', bootstrapper),
+                          ('Subsystem', mock.Mock())):
+      patcher = mock.patch('pants.pantsd.options_cache.{}'.format(name), patched)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+
+  def _touch(self, path, content):
+    safe_file_dump(path, content)
+    # Make sure the modification time changes, even on filesystems with coarse timestamps.
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+  def test_hit(self):
+    options = self.cache.create(['./pants', 'list', '::'], env={})
+    self.assertIs(options, self.cache.create(['./pants', 'list', '::'], env={}))
+    self.assertEqual(1, len(self.parsed))
+    self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+  def test_keyed_by_args_and_pants_env(self):
+    self.cache.create(['./pants', 'list', '::'], env={})
+    self.cache.create(['./pants', 'list', 'src::'], env={})
+    self.cache.create(['./pants', 'list', '::'], env={'PANTS_LEVEL': 'debug'})
+    self.cache.create(['./pants', 'list', '::'], env={'TERM': 'xterm'})
+    self.assertEqual(3, len(self.parsed))
+
+  def test_config_file_edit(self):
+    self.cache.create(['./pants', 'list'], env={})
+    self._touch(self.config_file, '[GLOBAL]\nlevel: debug\n')
+    self.cache.create(['./pants', 'list'], env={})
+    self.assertEqual(2, len(self.parsed))
+
+  def test_rcfile_creation(self):
+    self.cache.create(['./pants', 'list'], env={})
+    self._touch(self.rcfile, '[GLOBAL]\n')
+    self.cache.create(['./pants', 'list'], env={})
+    self.assertEqual(2, len(self.parsed))
+
+  def test_invalidate_files(self):
+    self.cache.create(['./pants', 'list'], env={})
+    self.cache.invalidate_files(['src/python/BUILD'])
+    self.cache.create(['./pants', 'list'], env={})
+    self.assertEqual(1, len(self.parsed))
+
+    self.cache.invalidate_files(['pants.ini'])
+    self.cache.create(['./pants', 'list'], env={})
+    self.assertEqual(2, len(self.parsed))
+
+  def test_max_entries(self):
+    cache = OptionsCache(self.build_root, max_entries=2)
+    cache.create(['./pants', 'a'], env={})
+    cache.create(['./pants', 'b'], env={})
+    cache.create(['./pants', 'a'], env={})
+    cache.create(['./pants', 'c'], env={})
+    # `b` was the least recently used, so it was evicted.
+    cache.create(['./pants', 'a'], env={})
+    cache.create(['./pants', 'b'], env={})
+    self.assertEqual(4, len(self.parsed))
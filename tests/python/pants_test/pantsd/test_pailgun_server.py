@@ -66,6 +66,100 @@ class TestPailgunServer(unittest.TestCase):
     self.assertIs(self.mock_handler_inst.handle_error.called, True)
     mock_shutdown_request.assert_called_once_with(self.server, mock_request)
 
+  @mock.patch.object(PailgunServer, 'close_request', **PATCH_OPTS)
+  def test_process_request_queue_secs(self, mock_close_request):
+    self.server.process_request(mock.Mock(), ('1.2.3.4', 31338), queue_secs=1.5)
+    self.assertEquals(self.mock_handler_inst.queue_secs, 1.5)
+
+
+class TestPailgunServerRequestWorkers(unittest.TestCase):
+  TIMEOUT = 5
+
+  def setUp(self):
+    self.lock = threading.RLock()
+
+    @contextmanager
+    def lock():
+      with self.lock:
+        yield
+
+    with mock.patch.object(PailgunServer, 'server_bind'), \
+         mock.patch.object(PailgunServer, 'server_activate'):
+      self.server = PailgunServer(
+        server_address=('0.0.0.0', 0),
+        runner_factory=mock.Mock(),
+        handler_class=mock.Mock(),
+        lifecycle_lock=lock,
+        request_workers=2,
+        request_queue_size=4
+      )
+    self.server.socket = mock.Mock()
+    self.server.socket.gettimeout.return_value = None
+    self.requests = []
+
+    def get_request():
+      request = mock.Mock()
+      self.requests.append(request)
+      return request, ('1.2.3.4', 31338)
+    self.server.get_request = get_request
+
+  def tearDown(self):
+    self.server.server_close()
+
+  def _handle_requests(self, count):
+    with mock.patch('pants.pantsd.pailgun_server.safe_select', return_value=([True], [], [])):
+      for _ in range(count):
+        self.server.handle_request()
+
+  def test_requests_are_handled_concurrently(self):
+    started = []
+    release = threading.Event()
+    both_started = threading.Event()
+
+    def process_request(request, client_address, queue_secs=None):
+      started.append(queue_secs)
+      if len(started) == 2:
+        both_started.set()
+      release.wait(self.TIMEOUT)
+
+    with mock.patch.object(self.server, 'process_request', side_effect=process_request):
+      self._handle_requests(2)
+      self.assertTrue(both_started.wait(self.TIMEOUT))
+      release.set()
+      self.server.server_close()
+
+    self.assertEquals(2, len(started))
+    for queue_secs in started:
+      self.assertGreaterEqual(queue_secs, 0)
+
+  def test_server_close_waits_for_queued_requests(self):
+    handled = []
+
+    def process_request(request, client_address, queue_secs=None):
+      handled.append(request)
+
+    with mock.patch.object(self.server, 'process_request', side_effect=process_request):
+      self._handle_requests(3)
+      self.server.server_close()
+
+    self.assertEquals(sorted(self.requests), sorted(handled))
+
+  def test_worker_survives_unexpected_errors(self):
+    handled = []
+
+    def process_request(request, client_address, queue_secs=None):
+      handled.append(request)
+      raise Exception('unexpected')
+
+    with mock.patch.object(self.server, 'process_request', side_effect=process_request), \
+         mock.patch.object(self.server, 'handle_error'), \
+         mock.patch.object(self.server, 'shutdown_request') as mock_shutdown_request:
+      self._handle_requests(3)
+      self.server.server_close()
+
+    self.assertEquals(3, len(handled))
+    self.assertEquals(3, mock_shutdown_request.call_count)
+
 
 class TestPailgunHandler(unittest.TestCase):
   def setUp(self):
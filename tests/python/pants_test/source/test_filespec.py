@@ -7,8 +7,9 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import re
 import unittest
+from collections import OrderedDict
 
-from pants.source.filespec import glob_to_regex
+from pants.source.filespec import FilespecMatcher, ancestor_dirs, glob_to_regex
 
 
 class GlobToRegexTest(unittest.TestCase):
@@ -113,3 +114,49 @@ class GlobToRegexTest(unittest.TestCase):
 
   def test_glob_to_regex_literal_file(self):
     self.assert_rule_match('a/b/c.py', ('a/b/c.py',))
+
+
+class FilespecMatcherTest(unittest.TestCase):
+  def test_matches(self):
+    matcher = FilespecMatcher(('a/b/*.py', 'a/c.py', 'd/**'), ('a/b/bad.py', 'd/e/**'))
+    self.assertTrue(matcher.matches('a/b/good.py'))
+    self.assertTrue(matcher.matches('a/c.py'))
+    self.assertTrue(matcher.matches('d/f/g.py'))
+    self.assertFalse(matcher.matches('a/b/bad.py'))
+    self.assertFalse(matcher.matches('a/b/c/d.py'))
+    self.assertFalse(matcher.matches('a/d.py'))
+    self.assertFalse(matcher.matches('d/e/f.py'))
+
+  def test_literal_dirs(self):
+    matcher = FilespecMatcher(('a/b/*.py', 'a/c.py', 'a/**/d.py', '*/e.py', 'f.py'))
+    self.assertEqual({'a/b', 'a', ''}, matcher.literal_dirs)
+
+  def test_many_recursive_globs(self):
+    # More globs than python regexes support capturing groups.
+    matcher = FilespecMatcher(tuple('a{}/**/*.py'.format(i) for i in range(200)))
+    self.assertTrue(matcher.matches('a199/b/c.py'))
+
+  def test_for_filespec(self):
+    spec = {'globs': ['a/*.py'], 'exclude': [{'globs': ['a/b.py']}]}
+    matcher = FilespecMatcher.for_filespec(spec)
+    self.assertIs(matcher, FilespecMatcher.for_filespec(dict(spec)))
+    self.assertTrue(matcher.matches('a/a.py'))
+    self.assertFalse(matcher.matches('a/b.py'))
+
+  def test_shared_matchers_bounded(self):
+    class FewSharedMatcher(FilespecMatcher):
+      MAX_SHARED_MATCHERS = 2
+      _shared_matchers = OrderedDict()
+
+    a = FewSharedMatcher.for_globs(('a.py',))
+    b = FewSharedMatcher.for_globs(('b.py',))
+    self.assertIs(a, FewSharedMatcher.for_globs(('a.py',)))
+    # The least recently used matcher, for b.py, is dropped to share one more.
+    FewSharedMatcher.for_globs(('c.py',))
+    self.assertIs(a, FewSharedMatcher.for_globs(('a.py',)))
+    self.assertIsNot(b, FewSharedMatcher.for_globs(('b.py',)))
+    self.assertEqual(2, len(FewSharedMatcher._shared_matchers))
+
+  def test_ancestor_dirs(self):
+    self.assertEqual(['a/b', 'a', ''], list(ancestor_dirs('a/b/c.py')))
+    self.assertEqual([''], list(ancestor_dirs('c.py')))
@@ -0,0 +1,54 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.task.duration_history import DurationHistory, balance
+from pants.util.contextutil import temporary_dir
+
+
+class DurationHistoryTest(unittest.TestCase):
+  def test_record(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'durations', 'tests.json')
+      history = DurationHistory(path)
+      self.assertNotIn('a', history)
+      history.record('a', 4.0)
+      history.record('a', 2.0)
+      history.save()
+
+      history = DurationHistory(path)
+      self.assertEqual(3.0, history.get('a'))
+      self.assertEqual([('a', 3.0)], history.items())
+
+  def test_unreadable(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'tests.json')
+      with open(path, 'w') as fp:
+        fp.write('{')
+      self.assertEqual(0, len(DurationHistory(path)))
+
+
+class BalanceTest(unittest.TestCase):
+  def test_balance(self):
+    durations = {'a': 5.0, 'b': 4.0, 'c': 3.0, 'd': 3.0, 'e': 3.0}
+    self.assertEqual([(['a'], 5.0), (['b', 'e'], 7.0), (['c', 'd'], 6.0)],
+                     balance(sorted(durations), 3, durations.get))
+
+  def test_unknown_items_take_the_mean(self):
+    durations = {'a': 6.0, 'b': 2.0}
+    self.assertEqual([(['a'], 6.0), (['c', 'b'], 6.0)],
+                     balance(['a', 'b', 'c'], 2, durations.get))
+
+  def test_nothing_known(self):
+    self.assertEqual([(['a', 'c'], 2.0), (['b'], 1.0)], balance(['a', 'b', 'c'], 2, lambda _: None))
+
+  def test_capacity(self):
+    durations = {'a': 10.0, 'b': 1.0, 'c': 1.0, 'd': 1.0}
+    self.assertEqual([(['a', 'd'], 11.0), (['b', 'c'], 2.0)],
+                     balance(sorted(durations), 2, durations.get, capacity=2))
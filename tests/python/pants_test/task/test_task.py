@@ -7,10 +7,13 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import os
 
+import mock
+
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
 from pants.build_graph.files import Files
 from pants.cache.cache_setup import CacheSetup
+from pants.invalidation.build_invalidator import BuildInvalidator, SqliteFingerprintStore
 from pants.option.arg_splitter import GLOBAL_SCOPE
 from pants.subsystem.subsystem import Subsystem
 from pants.subsystem.subsystem_client_mixin import SubsystemDependency
@@ -58,6 +61,14 @@ class DummyTask(Task):
       return vt, was_valid
 
 
+class MultiTargetTask(Task):
+  """A task that marks all of its targets up to date, and returns those that were invalid."""
+
+  def execute(self):
+    with self.invalidated(self.context.targets()) as invalidation:
+      return invalidation.invalid_vts
+
+
 class FakeTask(Task):
   _impls = []
 
@@ -559,3 +570,34 @@ class TaskTest(TaskTestBase):
       passthru_args=['asdf'],
     )
     self.assertEqual(different_task_with_passthru_fp, different_task_with_same_opts_fp)
+
+
+class InvalidatedBatchedWritesTest(TaskTestBase):
+
+  @classmethod
+  def task_type(cls):
+    return MultiTargetTask
+
+  def test_sqlite_fingerprints_written_in_one_commit_per_phase(self):
+    self.set_options_for_scope(BuildInvalidator.Factory.options_scope, store='sqlite')
+    targets = []
+    for i in range(3):
+      self.create_file('f{}'.format(i), str(i))
+      targets.append(self.make_target(':t{}'.format(i), target_type=Files,
+                                      sources=['f{}'.format(i)]))
+    task = self.create_task(self.context(target_roots=targets))
+
+    writes = []
+    write = SqliteFingerprintStore.write
+
+    def record_write(store, updates, deletes):
+      writes.append((sorted(updates), sorted(deletes)))
+      write(store, updates, deletes)
+
+    with mock.patch.object(SqliteFingerprintStore, 'write', record_write):
+      invalid_vts = task.execute()
+
+    ids = sorted(vt.cache_key.id for vt in invalid_vts)
+    self.assertEqual(3, len(ids))
+    # One commit invalidates the targets before the task runs, and one marks them up to date after.
+    self.assertEqual([([], ids), (ids, [])], writes)
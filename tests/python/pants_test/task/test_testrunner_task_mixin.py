@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import collections
 import os
+import threading
 from contextlib import contextmanager
 from unittest import TestCase
 from xml.etree.ElementTree import ParseError
@@ -14,10 +15,13 @@ from xml.etree.ElementTree import ParseError
 from mock import Mock, patch
 
 from pants.base.exceptions import ErrorWhileTesting
+from pants.cache.cache_setup import CacheSetup
+from pants.task.duration_history import DurationHistory
 from pants.task.task import TaskBase
-from pants.task.testrunner_task_mixin import TestRunnerTaskMixin
-from pants.util.contextutil import temporary_dir
-from pants.util.dirutil import safe_open
+from pants.task.testrunner_task_mixin import (PartitionedTestRunnerTaskMixin, TestResult,
+                                              TestRunnerTaskMixin)
+from pants.util.contextutil import pushd, temporary_dir
+from pants.util.dirutil import safe_open, safe_rmtree
 from pants.util.process_handler import ProcessHandler, subprocess
 from pants_test.tasks.task_test_base import TaskTestBase
 
@@ -378,6 +382,194 @@ class TestRunnerTaskMixinMultipleTargets(TaskTestBase):
     self.assertEqual([targetB, targetC], cm.exception.failed_targets)
 
 
+class PartitionedTestRunnerTaskMixinTest(TaskTestBase):
+
+  @classmethod
+  def task_type(cls):
+    class PartitionedTestRunnerTask(PartitionedTestRunnerTaskMixin):
+      failing = ()
+
+      def __init__(self, *args, **kwargs):
+        super(PartitionedTestRunnerTask, self).__init__(*args, **kwargs)
+        self.started = []
+        self.lock = threading.Lock()
+        self.second_started = threading.Event()
+        self.prefetched = 0
+        self.second_prefetched = threading.Event()
+        self.cache_checks = []
+
+      @property
+      def supports_concurrent_partitions(self):
+        return True
+
+      def _spawn(self, *args, **kwargs):
+        raise NotImplementedError
+
+      def _test_target_filter(self):
+        return lambda target: True
+
+      def _validate_target(self, target):
+        pass
+
+      @contextmanager
+      def partitions(self, per_target, all_targets, test_targets):
+        def iter_partitions():
+          for test_target in test_targets:
+            yield (test_target,), ()
+        yield iter_partitions
+
+      def run_tests(self, fail_fast, test_targets):
+        with self.lock:
+          self.started.extend(t.address.target_name for t in test_targets)
+          if len(self.started) == 2:
+            self.second_started.set()
+        if self.get_options().parallelism > 1:
+          # Every partition waits for a second one to start, which only happens when they run
+          # concurrently.
+          self.second_started.wait(10)
+        for target in test_targets:
+          self.report_all_info_for_single_test(self.options_scope, target,
+                                               'test_{}'.format(target.address.target_name),
+                                               {'time': 2.0, 'classname': 'Test'})
+        failed_targets = [t for t in test_targets if t.address.target_name in self.failing]
+        return TestResult.rc(1 if failed_targets else 0).with_failed_targets(failed_targets)
+
+      def prefetch_artifacts(self, vts):
+        prefetch = super(PartitionedTestRunnerTask, self).prefetch_artifacts(vts)
+        with self.lock:
+          self.prefetched += 1
+          if self.prefetched == 2:
+            self.second_prefetched.set()
+        if self.get_options().parallelism > 1:
+          # Every partition starts its prefetch before any checks the cache.
+          self.second_prefetched.wait(10)
+        return prefetch
+
+      def check_artifact_cache(self, vts, prefetch=None):
+        prefetched = list(prefetch) if prefetch is not None else []
+        with self.lock:
+          self.cache_checks.append(([vt.cache_key for vt in vts],
+                                    [cache_key for cache_key, _ in prefetched]))
+        return super(PartitionedTestRunnerTask, self).check_artifact_cache(vts,
+                                                                           iter(prefetched))
+
+      def collect_files(self):
+        return []
+
+    return PartitionedTestRunnerTask
+
+  def setUp(self):
+    super(PartitionedTestRunnerTaskMixinTest, self).setUp()
+    self.targets = [self.make_target(':{}'.format(name)) for name in ('a', 'b', 'c', 'd')]
+
+  def create_partitioned_task(self, **options):
+    self.set_options(fast=False, **options)
+    return self.create_task(self.context(target_roots=self.targets))
+
+  def test_serial(self):
+    task = self.create_partitioned_task()
+    task.execute()
+    self.assertEqual(['a', 'b', 'c', 'd'], task.started)
+
+  def test_concurrent(self):
+    task = self.create_partitioned_task(parallelism=2)
+    task.execute()
+    self.assertTrue(task.second_started.is_set())
+    self.assertEqual(['a', 'b', 'c', 'd'], sorted(task.started))
+
+  def test_concurrent_failure(self):
+    task = self.create_partitioned_task(parallelism=2)
+    task.failing = ('c',)
+    with self.assertRaises(ErrorWhileTesting) as cm:
+      task.execute()
+    self.assertEqual([self.targets[2]], cm.exception.failed_targets)
+    self.assertEqual(['a', 'b', 'c', 'd'], sorted(task.started))
+
+  def test_concurrent_artifact_cache_reads(self):
+    cache_dir = self.create_dir('artifact_cache')
+    self.set_options_for_scope(CacheSetup.options_scope, read_from=[cache_dir],
+                               write_to=[cache_dir], read=True, write=True)
+    task = self.create_partitioned_task(parallelism=2)
+    task.execute()
+    self.assertEqual(['a', 'b', 'c', 'd'], sorted(task.started))
+
+    # Forget the successful runs, so that the partitions are read from the artifact cache.
+    safe_rmtree(os.path.join(self.pants_workdir, 'build_invalidator'))
+    task = self.create_partitioned_task(parallelism=2)
+    # No tests are run, so don't wait for them to start.
+    task.second_started.set()
+    task.execute()
+    self.assertTrue(task.second_prefetched.is_set())
+    self.assertEqual([], task.started)
+    # Each partition read its own prefetch.
+    self.assertEqual(4, len(task.cache_checks))
+    for cache_keys, prefetched_keys in task.cache_checks:
+      self.assertEqual(cache_keys, prefetched_keys)
+
+  def test_durations_recorded(self):
+    task = self.create_partitioned_task()
+    task.execute()
+    history = DurationHistory(os.path.join(task.workdir, task.DURATIONS_DIR, 'partitions.json'))
+    for target in self.targets:
+      self.assertIn(target.id, history)
+
+  def test_test_durations_recorded(self):
+    task = self.create_partitioned_task()
+    task.execute()
+    tests = DurationHistory(os.path.join(task.workdir, task.DURATIONS_DIR, 'tests.json'))
+    targets = DurationHistory(os.path.join(task.workdir, task.DURATIONS_DIR, 'targets.json'))
+    for target in self.targets:
+      self.assertEqual(2.0, tests.get('Test#test_{}'.format(target.address.target_name)))
+      self.assertEqual(2.0, targets.get(target.address.spec))
+
+  def test_shard_durations(self):
+    task = self.create_partitioned_task()
+    self.assertIsNone(task.shard_durations)
+
+    path = os.path.join(self.build_root, 'durations.json')
+    history = DurationHistory(path)
+    history.record(task.test_key('Test', 'test_a'), 1.0)
+    history.save()
+    task = self.create_partitioned_task(shard_durations=path)
+    self.assertEqual(1.0, task.shard_durations.get('Test#test_a'))
+
+  def test_shard_durations_relative_to_buildroot(self):
+    path = os.path.join(self.build_root, 'durations', 'tests.json')
+    history = DurationHistory(path)
+    history.record(PartitionedTestRunnerTaskMixin.test_key('Test', 'test_a'), 1.0)
+    history.save()
+
+    # Test runners may run in a chroot, rather than in the buildroot.
+    with temporary_dir() as chroot, pushd(chroot):
+      task = self.create_partitioned_task(shard_durations='durations/tests.json')
+      self.assertEqual(path, task.shard_durations_path)
+      self.assertEqual(1.0, task.shard_durations.get('Test#test_a'))
+
+  def test_longest_recorded_first(self):
+    task = self.create_partitioned_task()
+    history = DurationHistory(os.path.join(task.workdir, task.DURATIONS_DIR, 'partitions.json'))
+    history.record(self.targets[0].id, 1.0)
+    history.record(self.targets[1].id, 3.0)
+    history.record(self.targets[3].id, 2.0)
+    history.save()
+
+    task._init_durations()
+    partitions = [((target,), ()) for target in self.targets]
+    task._run_partitions_concurrently(fail_fast=False, partitions=partitions, parallelism=1)
+    # Partitions without a recorded duration are started first.
+    self.assertEqual(['c', 'b', 'd', 'a'], task.started)
+
+  def test_fail_fast_stops_starting_partitions(self):
+    task = self.create_partitioned_task()
+    task.failing = ('a',)
+    task._init_durations()
+    partitions = [((target,), ()) for target in self.targets]
+    results = task._run_partitions_concurrently(fail_fast=True, partitions=partitions,
+                                                parallelism=1)
+    self.assertEqual(['a'], task.started)
+    self.assertEqual([(self.targets[0],)], list(results.keys()))
+
+
 class TestRunnerTaskMixinXmlParsing(TestRunnerTaskMixin, TestCase):
   @staticmethod
   def _raise_handler(e):
@@ -5,6 +5,8 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import threading
+import time
 import unittest
 
 from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
@@ -249,6 +251,69 @@ class ExecutionGraphTest(unittest.TestCase):
     self.execute(exec_graph)
     self.assertEqual(self.jobs_run, ["A", "D", "B", "C", "E"])
 
+  def test_predicted_critical_path(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, [], 1),
+                                 self.job("B", passing_fn, ["A"], 2),
+                                 self.job("C", passing_fn, ["B"], 4),
+                                 self.job("D", passing_fn, ["A"], 8),
+                                 self.job("E", passing_fn, ["C", "D"], 16),
+                                 self.job("F", passing_fn, [], 20)])
+    self.assertEqual(exec_graph.predicted_critical_path(), (["A", "D", "E"], 25))
+
+  def test_realized_critical_path(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, [], 1),
+                                 self.job("B", passing_fn, ["A"], 2),
+                                 self.job("C", passing_fn, ["A"], 1)])
+    self.assertEqual(exec_graph.job_durations, {})
+
+    self.execute(exec_graph)
+
+    self.assertEqual({"A", "B", "C"}, set(exec_graph.job_durations))
+    exec_graph._job_durations.update({"A": 1.0, "B": 0.5, "C": 3.0})
+    self.assertEqual(exec_graph.realized_critical_path(), (["A", "C"], 4.0))
+
+  def test_realized_critical_path_without_canceled_jobs(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, [], 1),
+                                 self.job("B", raising_fn, ["A"], 1),
+                                 self.job("C", passing_fn, ["B"], 1)])
+    with self.assertRaises(ExecutionFailure):
+      self.execute(exec_graph)
+
+    self.assertEqual({"A", "B"}, set(exec_graph.job_durations))
+    path, _ = exec_graph.realized_critical_path()
+    self.assertEqual(path, ["A", "B", "C"])
+
+  def test_admission_limits_jobs_in_flight(self):
+    class ThreadPerJobPool(object):
+      num_workers = 4
+
+      def submit_async_work(self, work):
+        thread = threading.Thread(target=work.func, args=work.args_tuples[0])
+        thread.daemon = True
+        thread.start()
+
+    class Admission(object):
+      def workers(self, jobs_in_flight):
+        return 2
+
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def tracking_fn():
+      with lock:
+        running.append(True)
+        max_running.append(len(running))
+      time.sleep(0.05)
+      with lock:
+        running.pop()
+
+    exec_graph = ExecutionGraph([self.job(name, tracking_fn, []) for name in "ABCD"])
+    exec_graph.execute(ThreadPerJobPool(), PrintLogger(), admission=Admission())
+
+    self.assertEqual(sorted(self.jobs_run), ["A", "B", "C", "D"])
+    self.assertLessEqual(max(max_running), 2)
+
   def test_jobs_not_canceled_multiple_times(self):
     failures = list()
 
@@ -0,0 +1,100 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+import time
+import unittest
+
+from pants.util.rwlock import ReadWriteLock
+
+
+class ReadWriteLockTest(unittest.TestCase):
+  TIMEOUT = 5
+
+  def setUp(self):
+    self.lock = ReadWriteLock()
+
+  def _start(self, target):
+    thread = threading.Thread(target=target)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+  def test_shared_holders_are_concurrent(self):
+    entered = []
+    release = threading.Event()
+
+    def read():
+      with self.lock.shared():
+        entered.append(True)
+        release.wait(self.TIMEOUT)
+
+    threads = [self._start(read), self._start(read)]
+    for _ in range(100):
+      if len(entered) == 2:
+        break
+      time.sleep(0.05)
+    self.assertEqual(2, len(entered))
+    release.set()
+    for thread in threads:
+      thread.join(self.TIMEOUT)
+
+  def test_exclusive_waits_for_shared(self):
+    acquired = threading.Event()
+    with self.lock.shared():
+      def write():
+        with self.lock:
+          acquired.set()
+      thread = self._start(write)
+      self.assertFalse(acquired.wait(0.1))
+    self.assertTrue(acquired.wait(self.TIMEOUT))
+    thread.join(self.TIMEOUT)
+
+  def test_waiting_exclusive_blocks_new_shared(self):
+    writer_acquired = threading.Event()
+    reader_acquired = threading.Event()
+    with self.lock.shared():
+      def write():
+        with self.lock:
+          writer_acquired.set()
+      def read():
+        with self.lock.shared():
+          reader_acquired.set()
+      writer = self._start(write)
+      # Wait for the writer to queue up before starting the reader.
+      for _ in range(100):
+        if self.lock._waiting_writers:
+          break
+        time.sleep(0.01)
+      reader = self._start(read)
+      self.assertFalse(reader_acquired.wait(0.1))
+    self.assertTrue(writer_acquired.wait(self.TIMEOUT))
+    self.assertTrue(reader_acquired.wait(self.TIMEOUT))
+    writer.join(self.TIMEOUT)
+    reader.join(self.TIMEOUT)
+
+  def test_reentrant(self):
+    with self.lock:
+      with self.lock:
+        with self.lock.shared():
+          pass
+    with self.lock.shared():
+      with self.lock.shared():
+        pass
+    # Fully released: another thread can acquire it exclusively.
+    acquired = threading.Event()
+    def write():
+      with self.lock:
+        acquired.set()
+    self._start(write).join(self.TIMEOUT)
+    self.assertTrue(acquired.is_set())
+
+  def test_release_unheld(self):
+    with self.assertRaises(RuntimeError):
+      self.lock.release()
+    with self.assertRaises(RuntimeError):
+      self.lock.release_shared()